@@ -19,9 +19,6 @@ from radbot.agent.agent_initializer import (
 from radbot.agent.agent_tools_setup import (
     tools,
     setup_before_agent_call,
-    search_agent,
-    code_execution_agent,
-    scout_agent
 )
 
 from radbot.agent.agent_core import (
@@ -4,8 +4,14 @@ RadBot - A modular AI agent framework using Google ADK, Qdrant, MCP, and A2A.
 
 __version__ = "0.1.0"
 
-from radbot.agent import (
-    RadBotAgent, 
-    create_agent, 
-    create_memory_enabled_agent
-)
\ No newline at end of file
+# Imported on first access, so importing radbot.web or radbot.cli does not
+# build the agent tree
+_AGENT_EXPORTS = ("RadBotAgent", "create_agent", "create_memory_enabled_agent")
+
+def __getattr__(name):
+    if name not in _AGENT_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import radbot.agent
+    value = getattr(radbot.agent, name)
+    globals()[name] = value
+    return value
@@ -16,52 +16,62 @@ The REST API approach allows:
 - Authentication using long-lived access tokens
 """
 
+import importlib
 import logging
-import sys
 logger = logging.getLogger(__name__)
 
-# Import agent classes and factories from the proper modules
-from radbot.agent.agent import (
-    RadBotAgent, 
-    AgentFactory, 
-    create_agent as internal_create_agent,  # Renamed to avoid confusion
-    create_runner
-)
-from radbot.agent.memory_agent_factory import create_memory_enabled_agent
-from radbot.agent.web_search_agent_factory import (
-    create_websearch_agent,
-    create_websearch_enabled_root_agent
-)
-from radbot.agent.home_assistant_agent_factory import create_home_assistant_agent_factory
-from radbot.agent.shell_agent_factory import (
-    create_shell_agent,
-    create_shell_enabled_root_agent
-)
-from radbot.agent.todo_agent_factory import create_todo_agent
-from radbot.agent.calendar_agent_factory import create_calendar_agent
+# Agent classes and factories, imported on first access so that importing one
+# agent module does not build the whole agent tree
+_LAZY_EXPORTS = {
+    "RadBotAgent": ("radbot.agent.agent", "RadBotAgent"),
+    "AgentFactory": ("radbot.agent.agent", "AgentFactory"),
+    "create_runner": ("radbot.agent.agent", "create_runner"),
+    "create_memory_enabled_agent": ("radbot.agent.memory_agent_factory", "create_memory_enabled_agent"),
+    "create_websearch_agent": ("radbot.agent.web_search_agent_factory", "create_websearch_agent"),
+    "create_websearch_enabled_root_agent": ("radbot.agent.web_search_agent_factory", "create_websearch_enabled_root_agent"),
+    "create_home_assistant_agent_factory": ("radbot.agent.home_assistant_agent_factory", "create_home_assistant_agent_factory"),
+    "create_shell_agent": ("radbot.agent.shell_agent_factory", "create_shell_agent"),
+    "create_shell_enabled_root_agent": ("radbot.agent.shell_agent_factory", "create_shell_enabled_root_agent"),
+    "create_todo_agent": ("radbot.agent.todo_agent_factory", "create_todo_agent"),
+    "create_calendar_agent": ("radbot.agent.calendar_agent_factory", "create_calendar_agent"),
+}
 
-# Import the root_agent from the root-level agent.py module
-logger.info("Importing root_agent from the root-level agent.py module")
-try:
-    # We need to import the root-level agent module
-    import agent
-    root_agent = agent.root_agent
-    
-    # Also use its create_agent function
-    create_agent = agent.create_agent
-    
-    logger.info("Successfully imported root_agent from root-level agent.py")
-except Exception as e:
-    logger.error(f"Error importing root_agent from root-level agent.py: {str(e)}")
-    # Fallback to our internal create_agent
-    create_agent = internal_create_agent
-    # Create a minimal root_agent as fallback
-    from google.adk.agents import Agent
-    root_agent = Agent(
-        name="radbot_web",
-        description="Fallback agent (error loading root_agent)",
-        tools=[]
-    )
+def _load_root_agent():
+    """Import the root_agent and create_agent from the root-level agent.py module."""
+    logger.info("Importing root_agent from the root-level agent.py module")
+    try:
+        # We need to import the root-level agent module
+        import agent
+        root_agent = agent.root_agent
+        
+        # Also use its create_agent function
+        create_agent = agent.create_agent
+        
+        logger.info("Successfully imported root_agent from root-level agent.py")
+    except Exception as e:
+        logger.error(f"Error importing root_agent from root-level agent.py: {str(e)}")
+        # Fallback to our internal create_agent
+        from radbot.agent.agent import create_agent
+        # Create a minimal root_agent as fallback
+        from google.adk.agents import Agent
+        root_agent = Agent(
+            name="radbot_web",
+            description="Fallback agent (error loading root_agent)",
+            tools=[]
+        )
+    return root_agent, create_agent
+
+def __getattr__(name):
+    if name in ("root_agent", "create_agent"):
+        root_agent, create_agent = _load_root_agent()
+        globals().update(root_agent=root_agent, create_agent=create_agent)
+        return globals()[name]
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attribute = _LAZY_EXPORTS[name]
+    value = getattr(importlib.import_module(module), attribute)
+    globals()[name] = value
+    return value
 
 # Export classes and functions
 __all__ = [
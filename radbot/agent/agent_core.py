@@ -21,9 +21,6 @@ from radbot.agent.agent_initializer import (
 from radbot.agent.agent_tools_setup import (
     tools,
     setup_before_agent_call,
-    search_agent,
-    code_execution_agent,
-    scout_agent
 )
 
 # Import specialized agents factory
@@ -31,7 +28,6 @@ from radbot.agent.specialized_agent_factory import create_specialized_agents
 
 # Import memory tools and services
 from radbot.memory.qdrant_memory import QdrantMemoryService
-from radbot.tools.memory import search_past_conversations, store_important_information
 from radbot.config.config_loader import config_loader
 
 # Get the instruction from the config manager
@@ -95,6 +91,8 @@ try:
     logger.info(f"Successfully initialized QdrantMemoryService with collection '{collection}'")
     
     # Add memory tools to the tools list if they're not already included
+    # (the lazy tool registry normally provides them)
+    from radbot.tools.memory import search_past_conversations, store_important_information
     memory_tools = [search_past_conversations, store_important_information]
     tool_names = [tool.__name__ if hasattr(tool, '__name__') else tool.name if hasattr(tool, 'name') else None for tool in tools]
     
@@ -123,7 +121,9 @@ root_agent = Agent(
     name="beto",
     instruction=instruction,
     global_instruction=f"""Today's date: {today}""",
-    sub_agents=[search_agent, code_execution_agent, scout_agent],
+    # The search, code execution and scout sub-agents are attached on the first
+    # turn by setup_before_agent_call (see agent_tools_setup.attach_sub_agents)
+    sub_agents=[],
     tools=tools,
     before_agent_callback=setup_before_agent_call,
     generate_content_config=types.GenerateContentConfig(temperature=0.2),
@@ -140,7 +140,7 @@ if memory_service:
     logger.info("Added memory_service to root_agent as _memory_service attribute")
 
 # Log agent creation
-logger.info(f"Created root agent 'beto' with {len(tools)} tools and {len(root_agent.sub_agents)} sub-agents")
+logger.info(f"Created root agent 'beto' with {len(tools)} tools; sub-agents are built on first use")
 
 def create_agent(tools: Optional[List[Any]] = None, app_name: str = "beto"):
     """
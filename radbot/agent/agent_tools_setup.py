@@ -7,7 +7,8 @@ It creates the tools list and manages callback functions.
 
 import logging
 import os
-from typing import List, Any, Optional
+import threading
+from typing import List, Any, Optional, Tuple
 from datetime import date
 
 # Import from our initialization module
@@ -18,53 +19,25 @@ from radbot.agent.agent_initializer import (
     types,
     config_manager,
     
-    # Import tool factories
-    call_search_agent,
-    call_code_execution_agent,
-    call_scout_agent,
-    create_search_agent,
-    create_code_execution_agent,
-    create_research_agent,
-    
-    # Import built-in tools
-    load_artifacts,
-    get_current_time,
-    get_weather,
-    search_past_conversations,
-    store_important_information,
-    create_tavily_search_tool,
-    create_fileserver_toolset,
-    create_crawl4ai_toolset,
-    get_shell_tool,
-    ALL_TOOLS,
-    init_database,
-    
-    # Import calendar tools
-    list_calendar_events_tool,
-    create_calendar_event_tool,
-    update_calendar_event_tool,
-    delete_calendar_event_tool,
-    check_calendar_availability_tool,
-    
-    # Import Home Assistant tools
-    list_ha_entities,
-    get_ha_entity_state,
-    turn_on_ha_entity,
-    turn_off_ha_entity,
-    toggle_ha_entity,
-    search_ha_entities,
-    get_ha_client,
-    
     # Import dynamic MCP tools loader
     load_dynamic_mcp_tools,
     load_specific_mcp_tools
 )
 
+# Tools are declared in radbot.tools.registry and imported on first use
+from radbot.tools.registry import create_lazy_tools
+
 def setup_before_agent_call(callback_context: CallbackContext):
     """Setup agent before each call."""
+    # The sub-agents are built on the first turn, before the model sees the transfer targets
+    invocation_context = getattr(callback_context, "_invocation_context", None)
+    if invocation_context is not None:
+        attach_sub_agents(invocation_context.agent)
+    
     # Initialize Todo database schema if needed
     if "todo_init" not in callback_context.state:
         try:
+            from radbot.tools.todo import init_database
             init_database()
             callback_context.state["todo_init"] = True
             logger.info("Todo database schema initialized successfully")
@@ -75,6 +48,7 @@ def setup_before_agent_call(callback_context: CallbackContext):
     # Initialize Home Assistant client if not already done
     if "ha_client_init" not in callback_context.state:
         try:
+            from radbot.tools.homeassistant import get_ha_client
             ha_client = get_ha_client()
             if ha_client:
                 try:
@@ -96,63 +70,88 @@ def setup_before_agent_call(callback_context: CallbackContext):
             callback_context.state["ha_client_init"] = False
 
 
-# Create all the sub-agents we'll need
-search_agent = create_search_agent(name="search_agent")
-code_execution_agent = create_code_execution_agent(name="code_execution_agent")
-scout_agent = create_research_agent(name="scout", as_subagent=False)
-
-# Create all the tools we'll use
-tools = []
+def create_sub_agents():
+    """Create the search, code execution and scout sub-agents of the root agent.
+    
+    Returns:
+        Tuple of (search_agent, code_execution_agent, scout_agent)
+    """
+    from radbot.tools.adk_builtin.search_tool import create_search_agent
+    from radbot.tools.adk_builtin.code_execution_tool import create_code_execution_agent
+    from radbot.agent.research_agent.factory import create_research_agent
+    
+    return (
+        create_search_agent(name="search_agent"),
+        create_code_execution_agent(name="code_execution_agent"),
+        create_research_agent(name="scout", as_subagent=False),
+    )
 
-# Add AgentTool functions first (high priority)
-tools.extend([
-    call_search_agent,
-    call_code_execution_agent,
-    call_scout_agent
-])
+_sub_agents: Optional[Tuple[Any, ...]] = None
+_sub_agents_lock = threading.Lock()
 
-# Add Tavily web search tool
-try:
-    web_search_tool = create_tavily_search_tool(
-        max_results=3,
-        search_depth="advanced",
-        include_answer=True,
-        include_raw_content=True
-    )
-    if web_search_tool:
-        tools.append(web_search_tool)
-        logger.info("Added web_search tool")
-except Exception as e:
-    logger.warning(f"Failed to create Tavily search tool: {e}")
 
-# Add basic tools
-tools.extend([
-    get_current_time,
-    get_weather
-])
+def get_sub_agents() -> Tuple[Any, ...]:
+    """Get the sub-agents of the root agent, building them on first use.
+    
+    Building them imports the search, code execution and research agent
+    modules and their models, so it is left until an agent turn needs them.
+    
+    Returns:
+        Tuple of (search_agent, code_execution_agent, scout_agent); empty if
+        they could not be built
+    """
+    global _sub_agents
+    if _sub_agents is None:
+        with _sub_agents_lock:
+            if _sub_agents is None:
+                try:
+                    _sub_agents = create_sub_agents()
+                    logger.info(f"Built {len(_sub_agents)} sub-agents of the root agent")
+                except Exception as e:
+                    logger.error(f"Failed to create sub-agents: {str(e)}")
+                    _sub_agents = ()
+    return _sub_agents
 
-# Add calendar tools
-tools.extend([
-    list_calendar_events_tool,
-    create_calendar_event_tool,
-    update_calendar_event_tool,
-    delete_calendar_event_tool,
-    check_calendar_availability_tool
-])
 
-# Add Home Assistant tools
-tools.extend([
-    search_ha_entities,
-    list_ha_entities,
-    get_ha_entity_state,
-    turn_on_ha_entity,
-    turn_off_ha_entity,
-    toggle_ha_entity
-])
+def attach_sub_agents(agent: Any) -> None:
+    """Attach the sub-agents to the root agent, if they are not attached yet.
+    
+    The sub-agents get the context window manager of the root agent, if it has
+    one, before they become reachable. The root agent's sub_agents list is
+    replaced rather than appended to, so turns walking it are not disturbed.
+    
+    Args:
+        agent: The root agent
+    """
+    attached = {getattr(sub_agent, "name", None) for sub_agent in agent.sub_agents}
+    missing = [sub_agent for sub_agent in get_sub_agents() if sub_agent.name not in attached]
+    if not missing:
+        return
+    
+    from radbot.callbacks.context_window import find_context_window_manager, install_context_window_manager
+    manager = find_context_window_manager(agent)
+    with _sub_agents_lock:
+        attached = {getattr(sub_agent, "name", None) for sub_agent in agent.sub_agents}
+        new_sub_agents = [sub_agent for sub_agent in missing if sub_agent.name not in attached]
+        for sub_agent in new_sub_agents:
+            if manager is not None:
+                install_context_window_manager(sub_agent, manager)
+            sub_agent.parent_agent = agent
+        if new_sub_agents:
+            agent.sub_agents = list(agent.sub_agents) + new_sub_agents
+    for sub_agent in new_sub_agents:
+        logger.info(f"Attached sub-agent '{sub_agent.name}' to '{agent.name}'")
+
+# Create all the tools we'll use. Tools from the registry only import their
+# module when the agent first needs them, so a backend that is down or slow to
+# import does not hold up (or break) startup.
+tools = create_lazy_tools()
+logger.info(f"Registered {len(tools)} lazily loaded tools")
 
 # Add filesystem tools using the direct implementation
 # We're avoiding the MCP tools at import time due to async initialization issues
 try:
+    from radbot.tools.mcp.filesystem_adapter import create_fileserver_toolset
     fs_tools = create_fileserver_toolset()
     if fs_tools:
         tools.extend(fs_tools)
@@ -160,15 +159,6 @@ try:
 except Exception as e:
     logger.warning(f"Failed to create filesystem tools: {e}")
 
-# For Crawl4AI, we'll use the compatibility stub which will output deprecation warnings
-try:
-    # This function now returns [] but logs a deprecation warning
-    crawl4ai_tools = create_crawl4ai_toolset()
-    # No need to extend tools since the stub returns empty list
-    logger.info("Crawl4AI direct integration is deprecated - use MCP server instead")
-except Exception as e:
-    logger.warning(f"Failed to create Crawl4AI tools: {e}")
-
 # Add dynamic MCP tools from all enabled servers
 try:
     mcp_tools = load_dynamic_mcp_tools()
@@ -177,28 +167,3 @@ try:
         logger.info(f"Added {len(mcp_tools)} tools from enabled MCP servers")
 except Exception as e:
     logger.warning(f"Failed to load dynamic MCP tools: {e}")
-
-# Add Shell Command Execution tool
-try:
-    # Default to strict mode
-    shell_tool = get_shell_tool(strict_mode=True)
-    tools.append(shell_tool)
-    logger.info("Added shell command execution tool in STRICT mode")
-except Exception as e:
-    logger.warning(f"Failed to create shell command execution tool: {e}")
-
-# Add Todo Tools
-try:
-    tools.extend(ALL_TOOLS)
-    logger.info(f"Added {len(ALL_TOOLS)} Todo tools")
-except Exception as e:
-    logger.warning(f"Failed to add Todo tools: {e}")
-
-# Add memory tools
-tools.extend([
-    search_past_conversations,
-    store_important_information
-])
-
-# Add artifacts loading tool
-tools.append(load_artifacts)
\ No newline at end of file
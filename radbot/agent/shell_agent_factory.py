@@ -12,7 +12,7 @@ from google.adk.agents import Agent
 
 from radbot.agent.agent import AgentFactory, RadBotAgent, create_agent
 from radbot.config.settings import ConfigManager
-from radbot.tools.shell import get_shell_tool
+from radbot.tools.shell import get_shell_tool, get_shell_session_tools
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +65,7 @@ def create_shell_agent(
     
     # Add the shell tool to the tools list
     tools.append(shell_tool)
+    tools.extend(get_shell_session_tools(strict_mode=strict_mode))
     logger.info(f"Added shell command execution tool to agent tools {backend_info}")
     
     # Create the agent with all the specified parameters and tools
@@ -141,6 +142,7 @@ def create_shell_enabled_root_agent(
     
     # Add the shell tool to the tools list
     tools.append(shell_tool)
+    tools.extend(get_shell_session_tools(strict_mode=strict_mode))
     logger.info(f"Added shell command execution tool to agent tools {backend_info}")
     
     # Create the root agent
@@ -0,0 +1,383 @@
+"""Token-budget-aware context window management for model requests.
+
+The ContextWindowManager runs as a ``before_model_callback``. It estimates the
+size of ``llm_request.contents`` with a fast local heuristic and, when the
+request exceeds the token budget for its model, evicts the oldest conversation
+turns. The system instruction, tool declarations and the current turn
+(including any in-flight tool calls and responses) are always kept. Evicted
+turns are folded into a rolling extractive summary that is kept in session
+state and prepended to the first kept user message, counted against the budget.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Rough number of characters per token for Gemini-style tokenizers
+CHARS_PER_TOKEN = 4
+
+# Fixed token cost Gemini charges for an inline image or other blob
+INLINE_DATA_TOKENS = 258
+
+# Default token budget for the conversation part of a request
+DEFAULT_BUDGET = 32000
+
+# Maximum characters kept in the rolling summary of evicted turns
+DEFAULT_SUMMARY_MAX_CHARS = 4000
+
+# Characters of each message kept when summarizing an evicted turn
+SUMMARY_SNIPPET_CHARS = 200
+
+# Prefix of the session state key holding the rolling summary for an agent
+SUMMARY_STATE_PREFIX = "context_summary:"
+
+# Heading of the summary sent in place of evicted turns
+SUMMARY_HEADER = "[Summary of earlier conversation]"
+
+
+def estimate_text_tokens(text: Optional[str]) -> int:
+    """Estimate the number of tokens in a string."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_content_tokens(content: types.Content) -> int:
+    """Estimate the number of tokens in a Content without calling a tokenizer.
+
+    Args:
+        content: The content to estimate
+
+    Returns:
+        Estimated token count
+    """
+    tokens = 0
+    for part in content.parts or []:
+        if part.text:
+            tokens += estimate_text_tokens(part.text)
+        elif part.function_call:
+            tokens += estimate_text_tokens(part.function_call.name)
+            tokens += estimate_text_tokens(json.dumps(part.function_call.args or {}, default=str))
+        elif part.function_response:
+            tokens += estimate_text_tokens(part.function_response.name)
+            tokens += estimate_text_tokens(json.dumps(part.function_response.response or {}, default=str))
+        elif part.inline_data or part.file_data:
+            tokens += INLINE_DATA_TOKENS
+    return tokens
+
+
+def _starts_turn(content: types.Content) -> bool:
+    """A turn starts with a user message that carries text rather than tool output."""
+    if content.role != "user" or not content.parts:
+        return False
+    return any(part.text for part in content.parts) and not any(
+        part.function_response for part in content.parts
+    )
+
+
+def split_turns(contents: List[types.Content]) -> List[List[types.Content]]:
+    """Group request contents into conversation turns.
+
+    Each turn starts at a user text message and includes every model reply,
+    tool call and tool response up to the next one, so function calls are
+    never separated from their responses.
+    """
+    turns: List[List[types.Content]] = []
+    for content in contents:
+        if not turns or _starts_turn(content):
+            turns.append([content])
+        else:
+            turns[-1].append(content)
+    return turns
+
+
+def summarize_turn(turn: List[types.Content]) -> str:
+    """Build a one-line extractive summary of a conversation turn."""
+    user_text = ""
+    model_text = ""
+    tool_names = []
+    for content in turn:
+        for part in content.parts or []:
+            if part.function_call and part.function_call.name:
+                tool_names.append(part.function_call.name)
+            elif part.text:
+                if content.role == "user" and not user_text:
+                    user_text = part.text
+                elif content.role == "model":
+                    model_text = part.text
+
+    pieces = []
+    if user_text:
+        pieces.append(f"User: {_snippet(user_text)}")
+    if tool_names:
+        pieces.append(f"Tools: {', '.join(dict.fromkeys(tool_names))}")
+    if model_text:
+        pieces.append(f"Assistant: {_snippet(model_text)}")
+    return "- " + " | ".join(pieces) if pieces else ""
+
+
+def _snippet(text: str) -> str:
+    """Collapse whitespace and shorten text for a summary line."""
+    text = " ".join(text.split())
+    if len(text) > SUMMARY_SNIPPET_CHARS:
+        text = text[:SUMMARY_SNIPPET_CHARS - 3] + "..."
+    return text
+
+
+def _summary_tokens(summary: str) -> int:
+    """Estimate the tokens the summary adds to a request, heading included."""
+    return estimate_text_tokens(f"{SUMMARY_HEADER}\n{summary}") if summary else 0
+
+
+def _trim_summary(text: str, max_chars: int) -> str:
+    """Keep the most recent whole lines of a summary that fit in max_chars."""
+    if len(text) <= max_chars:
+        return text
+    text = text[len(text) - max_chars:] if max_chars else ""
+    return text[text.find("\n") + 1:] if "\n" in text else text
+
+
+def _turn_marker(turn: List[types.Content], index: int) -> str:
+    """Fingerprint a turn and its position so the rolling summary can find where it left off."""
+    digest = hashlib.sha1()
+    for content in turn:
+        digest.update((content.role or "").encode("utf-8"))
+        for part in content.parts or []:
+            if part.text:
+                digest.update(part.text.encode("utf-8", "ignore"))
+            elif part.function_call:
+                digest.update((part.function_call.id or part.function_call.name or "").encode("utf-8"))
+            elif part.function_response:
+                digest.update((part.function_response.id or part.function_response.name or "").encode("utf-8"))
+    return f"{index}:{digest.hexdigest()}"
+
+
+def _summarized_turns(turns: List[List[types.Content]], marker: Optional[str]) -> int:
+    """Number of leading turns already folded into the summary, or 0 if the marker doesn't match."""
+    if not marker:
+        return 0
+    try:
+        index = int(marker.split(":", 1)[0])
+    except ValueError:
+        return 0
+    if index < len(turns) and _turn_marker(turns[index], index) == marker:
+        return index + 1
+    return 0
+
+
+class ContextWindowManager:
+    """Keeps model requests within a per-model token budget."""
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        default_budget: int = DEFAULT_BUDGET,
+        summary_max_chars: int = DEFAULT_SUMMARY_MAX_CHARS,
+        summarizer: Callable[[List[types.Content]], str] = summarize_turn,
+    ):
+        """Initialize the context window manager.
+
+        Args:
+            budgets: Token budget per model name; prefixes of the model name match too
+            default_budget: Token budget for models without an explicit entry
+            summary_max_chars: Maximum size of the rolling summary of evicted turns
+            summarizer: Function turning one evicted turn into a summary line
+        """
+        self.budgets = budgets or {}
+        self.default_budget = default_budget
+        self.summary_max_chars = summary_max_chars
+        self.summarizer = summarizer
+        # Estimated size of the fixed part of each agent's request (instruction and tools)
+        self._fixed_tokens: Dict[str, int] = {}
+
+    def get_budget(self, model: Optional[str]) -> int:
+        """Get the token budget for a model."""
+        if model:
+            if model in self.budgets:
+                return self.budgets[model]
+            for name, budget in self.budgets.items():
+                if model.startswith(name):
+                    return budget
+        return self.default_budget
+
+    def _estimate_fixed_tokens(self, agent_name: str, llm_request: Any) -> int:
+        """Estimate the tokens used by the system instruction and tool declarations."""
+        config = getattr(llm_request, "config", None)
+        instruction = getattr(config, "system_instruction", None) if config else None
+        if isinstance(instruction, types.Content):
+            instruction_tokens = estimate_content_tokens(instruction)
+        else:
+            instruction_tokens = estimate_text_tokens(instruction if isinstance(instruction, str) else None)
+
+        # Tool declarations don't change between calls of the same agent
+        if agent_name not in self._fixed_tokens:
+            tool_tokens = 0
+            for tool in (getattr(config, "tools", None) or []) if config else []:
+                try:
+                    tool_tokens += estimate_text_tokens(tool.model_dump_json(exclude_none=True))
+                except Exception:
+                    tool_tokens += estimate_text_tokens(str(tool))
+            self._fixed_tokens[agent_name] = tool_tokens
+
+        return instruction_tokens + self._fixed_tokens[agent_name]
+
+    def __call__(self, callback_context: Any, llm_request: Any) -> None:
+        """Trim the request contents in place. Always lets the model call proceed."""
+        contents = llm_request.contents
+        if not contents:
+            return None
+
+        agent_name = getattr(callback_context, "agent_name", "") or ""
+        budget = self.get_budget(getattr(llm_request, "model", None))
+        fixed_tokens = self._estimate_fixed_tokens(agent_name, llm_request)
+
+        turns = split_turns(contents)
+        turn_tokens = [sum(estimate_content_tokens(c) for c in turn) for turn in turns]
+        total = fixed_tokens + sum(turn_tokens)
+        if total <= budget:
+            return None
+
+        # Evict the oldest turns, always keeping the current one. The summary
+        # that replaces them counts against the budget too.
+        state_key = SUMMARY_STATE_PREFIX + agent_name
+        stored = callback_context.state.get(state_key) or {}
+        evicted = 0
+        summary, marker = "", None
+        while evicted < len(turns) - 1 and total + _summary_tokens(summary) > budget:
+            total -= turn_tokens[evicted]
+            evicted += 1
+            if total <= budget:
+                summary, marker = self._build_summary(stored, turns, evicted)
+        if not evicted:
+            return None
+        if marker is None:
+            summary, marker = self._build_summary(stored, turns, evicted)
+        callback_context.state[state_key] = {"text": summary, "marker": marker}
+
+        # Only the current turn is left: send as much of the summary as still fits
+        room = (budget - total) * CHARS_PER_TOKEN - len(SUMMARY_HEADER) - 1
+        if len(summary) > room:
+            summary = _trim_summary(summary, max(room, 0))
+
+        kept = [content for turn in turns[evicted:] for content in turn]
+        if summary:
+            # Merge into the first kept user message so user and model turns still alternate
+            first = kept[0]
+            kept[0] = types.Content(
+                role=first.role,
+                parts=[types.Part(text=f"{SUMMARY_HEADER}\n{summary}")] + list(first.parts or []),
+            )
+            total += _summary_tokens(summary)
+        llm_request.contents = kept
+
+        logger.debug(
+            f"Context window for '{agent_name}': evicted {evicted}/{len(turns)} turns, "
+            f"~{total} of {budget} tokens"
+        )
+        return None
+
+    def _build_summary(self, stored: Dict[str, Any], turns: List[List[types.Content]],
+                       evicted: int) -> Tuple[str, str]:
+        """Fold the turns evicted since the last call into the rolling summary.
+
+        Args:
+            stored: Summary state saved by the previous call
+            turns: All turns of the request
+            evicted: Number of leading turns being evicted
+
+        Returns:
+            Tuple of the summary text and the marker of the last summarized turn
+        """
+        done = _summarized_turns(turns, stored.get("marker"))
+        if not done:
+            # No summary yet, or the history no longer matches it: start over
+            text = ""
+        else:
+            text = stored.get("text", "")
+        if done >= evicted:
+            return text, stored["marker"]
+
+        lines = [line for line in (self.summarizer(turn) for turn in turns[done:evicted]) if line]
+        if lines:
+            text = "\n".join(filter(None, [text] + lines))
+            if len(text) > self.summary_max_chars:
+                text = _trim_summary(text, self.summary_max_chars)
+
+        return text, _turn_marker(turns[evicted - 1], evicted - 1)
+
+
+def _chain_before_model_callbacks(first: Callable, second: Callable) -> Callable:
+    """Run two before_model callbacks in order, stopping at the first response."""
+    def chained(callback_context, llm_request):
+        response = first(callback_context=callback_context, llm_request=llm_request)
+        if response is not None:
+            return response
+        return second(callback_context=callback_context, llm_request=llm_request)
+    chained._context_window_manager = first
+    return chained
+
+
+def find_context_window_manager(agent: Any) -> Optional[ContextWindowManager]:
+    """Get the context window manager installed on an agent, if any."""
+    callback = getattr(agent, "before_model_callback", None)
+    for candidate in callback if isinstance(callback, list) else [callback]:
+        if isinstance(candidate, ContextWindowManager):
+            return candidate
+        manager = getattr(candidate, "_context_window_manager", None)
+        if isinstance(manager, ContextWindowManager):
+            return manager
+    return None
+
+
+def create_context_window_manager(config: Optional[Dict[str, Any]] = None) -> ContextWindowManager:
+    """Create a ContextWindowManager from the agent.context_window config section."""
+    config = config or {}
+    return ContextWindowManager(
+        budgets={k: int(v) for k, v in (config.get("budgets") or {}).items()},
+        default_budget=int(config.get("default_budget", DEFAULT_BUDGET)),
+        summary_max_chars=int(config.get("summary_max_chars", DEFAULT_SUMMARY_MAX_CHARS)),
+    )
+
+
+def install_context_window_manager(agent: Any, manager: ContextWindowManager) -> int:
+    """Register the manager as a before_model_callback on an agent tree.
+
+    The manager runs before any callback already registered (such as the prompt
+    cache), so those see the trimmed request.
+
+    Args:
+        agent: Root of the agent tree
+        manager: The context window manager to install
+
+    Returns:
+        Number of agents the manager was installed on
+    """
+    installed = 0
+    seen = set()
+    stack = [agent]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        stack.extend(getattr(current, "sub_agents", None) or [])
+
+        if not hasattr(current, "before_model_callback"):
+            continue
+        existing = current.before_model_callback
+        try:
+            if existing is None:
+                current.before_model_callback = manager
+            elif isinstance(existing, list):
+                current.before_model_callback = [manager] + [cb for cb in existing if cb is not manager]
+            elif existing is not manager and getattr(existing, "_context_window_manager", None) is not manager:
+                current.before_model_callback = _chain_before_model_callbacks(manager, existing)
+            installed += 1
+        except Exception as e:
+            logger.warning(f"Could not install context window manager on {getattr(current, 'name', current)}: {e}")
+    return installed
@@ -0,0 +1,21 @@
+"""
+Shared PostgreSQL access layer.
+"""
+
+from .pool import (
+    DatabasePool,
+    PoolTimeoutError,
+    check_pools_health,
+    get_pool,
+    get_pool_metrics,
+    run_db,
+)
+
+__all__ = [
+    "DatabasePool",
+    "PoolTimeoutError",
+    "check_pools_health",
+    "get_pool",
+    "get_pool_metrics",
+    "run_db",
+]
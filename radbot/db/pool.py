@@ -0,0 +1,316 @@
+"""
+Shared PostgreSQL connection pools.
+
+Chat history, ADK sessions and the todo tool all talk to PostgreSQL. This
+module gives them one pooled access layer instead of a private pool each:
+
+- Pools are shared by every caller connecting with the same parameters.
+- Pool sizing, checkout timeout and health checks come from ``database.pool``
+  in config.yaml.
+- Checkouts wait for a free connection (up to a timeout) instead of failing
+  as soon as the pool is exhausted.
+- Connections idle for longer than the health check interval are validated
+  before being handed out, and broken ones are replaced.
+- Pool metrics (checkouts, waits, errors, connections in use) are kept for
+  monitoring.
+- ``run_db`` runs blocking database work on a dedicated thread pool sized to
+  the connection pool, so async handlers don't block the event loop.
+
+SQL is expected to be schema-qualified, so connections need no per-checkout
+``SET search_path``.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generator, Optional, Tuple
+
+import psycopg2
+import psycopg2.pool
+
+from radbot.config.config_loader import config_loader
+
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable via database.pool in config.yaml
+DEFAULT_MIN_CONNECTIONS = 1
+DEFAULT_MAX_CONNECTIONS = 10
+DEFAULT_CHECKOUT_TIMEOUT = 10.0  # seconds
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0  # seconds
+
+
+class PoolTimeoutError(psycopg2.OperationalError):
+    """Raised when no connection became free within the checkout timeout."""
+    pass
+
+
+class DatabasePool:
+    """A bounded, health-checked psycopg2 connection pool with metrics."""
+
+    def __init__(self, name: str, connect_kwargs: Dict[str, Any],
+                 min_connections: int = DEFAULT_MIN_CONNECTIONS,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT,
+                 health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL):
+        """
+        Create the pool. Connections are opened lazily, on first checkout.
+
+        Args:
+            name: Name used in logs and metrics
+            connect_kwargs: Keyword arguments for psycopg2.connect
+            min_connections: Connections kept open when idle
+            max_connections: Maximum number of open connections
+            checkout_timeout: Seconds to wait for a free connection
+            health_check_interval: Seconds a connection may sit idle before it
+                is validated on checkout
+        """
+        self.name = name
+        self.connect_kwargs = connect_kwargs
+        self.min_connections = min_connections
+        self.max_connections = max(max_connections, min_connections, 1)
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+        self._init_lock = threading.Lock()
+        # ThreadedConnectionPool raises when exhausted; the semaphore makes callers wait instead
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._last_used: Dict[int, float] = {}
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "checkouts": 0,
+            "checkout_errors": 0,
+            "checkout_timeouts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "in_use": 0,
+            "health_checks": 0,
+            "health_check_failures": 0,
+            "connections_replaced": 0,
+        }
+
+    def _get_pool(self) -> psycopg2.pool.ThreadedConnectionPool:
+        """Open the underlying pool on first use."""
+        if self._pool is None:
+            with self._init_lock:
+                if self._pool is None:
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(
+                        minconn=self.min_connections,
+                        maxconn=self.max_connections,
+                        **self.connect_kwargs
+                    )
+                    logger.info(
+                        f"Database pool '{self.name}' initialized (Min: {self.min_connections}, "
+                        f"Max: {self.max_connections}) for database '{self.connect_kwargs.get('database')}' "
+                        f"at {self.connect_kwargs.get('host')}:{self.connect_kwargs.get('port')}"
+                    )
+        return self._pool
+
+    def _record(self, **changes: float) -> None:
+        with self._metrics_lock:
+            for key, value in changes.items():
+                self._metrics[key] += value
+
+    def _is_healthy(self, conn: psycopg2.extensions.connection) -> bool:
+        """Check that a connection is open and answers a trivial query."""
+        if conn.closed:
+            return False
+        self._record(health_checks=1)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            self._record(health_check_failures=1)
+            return False
+
+    @contextmanager
+    def connection(self) -> Generator[psycopg2.extensions.connection, None, None]:
+        """Check out a connection, returning it to the pool afterwards."""
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            self._record(checkout_timeouts=1)
+            raise PoolTimeoutError(
+                f"No connection available from pool '{self.name}' within {self.checkout_timeout}s"
+            )
+
+        conn = None
+        pool = None
+        try:
+            try:
+                pool = self._get_pool()
+                conn = pool.getconn()
+
+                # Validate connections that sat idle long enough to have been dropped
+                last_used = self._last_used.get(id(conn), 0.0)
+                if conn.closed or time.monotonic() - last_used > self.health_check_interval:
+                    if not self._is_healthy(conn):
+                        pool.putconn(conn, close=True)
+                        self._record(connections_replaced=1)
+                        conn = pool.getconn()
+            except psycopg2.Error as e:
+                self._record(checkout_errors=1)
+                logger.error(f"Error getting connection from pool '{self.name}': {e}")
+                raise
+
+            waited = time.monotonic() - start
+            with self._metrics_lock:
+                self._metrics["checkouts"] += 1
+                self._metrics["in_use"] += 1
+                self._metrics["wait_time_total"] += waited
+                self._metrics["wait_time_max"] = max(self._metrics["wait_time_max"], waited)
+
+            try:
+                yield conn
+            finally:
+                self._record(in_use=-1)
+        finally:
+            if conn is not None and pool is not None:
+                # Never hand out a connection left inside a transaction
+                if not conn.closed and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    try:
+                        conn.rollback()
+                    except psycopg2.Error:
+                        pass
+                self._last_used[id(conn)] = time.monotonic()
+                pool.putconn(conn, close=bool(conn.closed))
+            self._slots.release()
+
+    def health_check(self) -> Dict[str, Any]:
+        """Check that the database is reachable through this pool.
+
+        Returns:
+            Dictionary with ``healthy``, ``latency_ms`` and an ``error`` if unhealthy
+        """
+        start = time.monotonic()
+        try:
+            with self.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+            return {"healthy": True, "latency_ms": round((time.monotonic() - start) * 1000, 2)}
+        except Exception as e:
+            return {"healthy": False, "latency_ms": round((time.monotonic() - start) * 1000, 2), "error": str(e)}
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get a snapshot of the pool metrics."""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        checkouts = metrics["checkouts"]
+        metrics["wait_time_avg"] = metrics["wait_time_total"] / checkouts if checkouts else 0.0
+        metrics["name"] = self.name
+        metrics["max_connections"] = self.max_connections
+        metrics["initialized"] = self._pool is not None
+        return metrics
+
+    def close(self) -> None:
+        """Close every connection of the pool."""
+        with self._init_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+                self._last_used.clear()
+                logger.info(f"Database pool '{self.name}' closed")
+
+
+def get_pool_settings() -> Dict[str, Any]:
+    """Get the pool settings from the database.pool section of config.yaml."""
+    pool_config = config_loader.get_config().get("database", {}).get("pool", {}) or {}
+    return {
+        "min_connections": int(pool_config.get("min_connections", DEFAULT_MIN_CONNECTIONS)),
+        "max_connections": int(pool_config.get("max_connections", DEFAULT_MAX_CONNECTIONS)),
+        "checkout_timeout": float(pool_config.get("checkout_timeout", DEFAULT_CHECKOUT_TIMEOUT)),
+        "health_check_interval": float(pool_config.get("health_check_interval", DEFAULT_HEALTH_CHECK_INTERVAL)),
+    }
+
+
+# Pools shared by every caller with the same connection parameters
+_pools: Dict[Tuple, DatabasePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str, database: str, user: str, password: str,
+             host: str = "localhost", port: Any = 5432) -> DatabasePool:
+    """
+    Get the shared pool for a set of connection parameters, creating it if needed.
+
+    Args:
+        name: Name for logs and metrics, used when the pool is created
+        database: Database name
+        user: Database user
+        password: Database password
+        host: Database host
+        port: Database port
+
+    Returns:
+        DatabasePool: The shared pool
+    """
+    key = (database, user, host, str(port))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = DatabasePool(
+                    name,
+                    {"database": database, "user": user, "password": password, "host": host, "port": port},
+                    **get_pool_settings()
+                )
+                _pools[key] = pool
+    return pool
+
+
+def get_pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """Get metrics for every shared pool, keyed by pool name."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.metrics() for pool in pools}
+
+
+def check_pools_health() -> Dict[str, Dict[str, Any]]:
+    """Run a health check on every shared pool, keyed by pool name."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.health_check() for pool in pools}
+
+
+# Thread pool for blocking database work called from async code
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_pool_settings()["max_connections"],
+                    thread_name_prefix="radbot-db"
+                )
+    return _executor
+
+
+async def run_db(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking database function without blocking the event loop.
+
+    The work runs on a thread pool sized to the connection pool, so queued
+    calls wait for a thread rather than for a connection.
+
+    Args:
+        func: Blocking function to call
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
@@ -8,6 +8,9 @@ the local filesystem without requiring external processes or servers.
 
 from radbot.filesystem.tools import (
     read_file,
+    read_file_window,
+    tail_file,
+    grep_file,
     write_file,
     edit_file,
     copy,
@@ -15,12 +18,16 @@ from radbot.filesystem.tools import (
     list_directory,
     get_info,
     search,
+    search_file_contents,
 )
 
 from radbot.filesystem.security import set_allowed_directories, get_allowed_directories
 
 __all__ = [
     "read_file",
+    "read_file_window",
+    "tail_file",
+    "grep_file",
     "write_file",
     "edit_file",
     "copy",
@@ -28,6 +35,7 @@ __all__ = [
     "list_directory",
     "get_info",
     "search",
+    "search_file_contents",
     "set_allowed_directories",
     "get_allowed_directories",
 ]
@@ -0,0 +1,281 @@
+"""
+Incremental catalog of the files in the allowed directories.
+
+Searching by walking the tree on every call costs one directory read per
+directory and one stat per match, which takes seconds on large trees. The
+catalog crawls the allowed directories once with ``os.scandir`` and keeps the
+listing of every directory in memory, so a search only matches names.
+
+The catalog is kept fresh in one of two ways:
+
+- with ``watchdog`` installed, filesystem events mark the directories they
+  touch, which are re-read before the next search;
+- otherwise, before a search, at most once per poll interval, every known
+  directory is stat-ed and the ones whose modification time changed are
+  re-read. Adding, removing or renaming an entry changes the modification
+  time of its directory; rewriting a file in place does not, so sizes may lag
+  behind in this mode.
+
+The filesystem tools also mark the directories they change themselves.
+"""
+
+import fnmatch
+import logging
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
+
+from radbot.filesystem.security import get_allowed_directories
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two checks of the directory modification times, without watchdog
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Listing of one directory: name -> (is_dir, size)
+Listing = Dict[str, Tuple[bool, int]]
+
+
+@lru_cache(maxsize=256)
+def compile_glob(pattern: str) -> Pattern:
+    """Compile a glob pattern to a regular expression matching whole names."""
+    return re.compile(fnmatch.translate(pattern))
+
+
+@lru_cache(maxsize=256)
+def compile_globs(patterns: Tuple[str, ...]) -> Optional[Pattern]:
+    """Compile several glob patterns into one regular expression matching any of them."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+
+
+class FileCatalog:
+    """In-memory listing of every directory under a set of roots."""
+
+    def __init__(self, roots: List[str], poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 use_watchdog: bool = True):
+        """
+        Initialize the catalog. The roots are crawled on first use.
+
+        Args:
+            roots: Absolute paths of the directories to catalog
+            poll_interval: Seconds between checks for changes, when not watching
+            use_watchdog: Watch the roots for changes if watchdog is installed
+        """
+        self.roots = [os.path.abspath(r) for r in roots]
+        self.poll_interval = poll_interval
+        self._use_watchdog = use_watchdog
+        self._lock = threading.RLock()
+        self._listings: Dict[str, Listing] = {}
+        self._mtimes: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
+        self._crawled = False
+        self._last_poll = 0.0
+        self._observer = None
+
+    @property
+    def watching(self) -> bool:
+        """Whether filesystem events keep the catalog fresh."""
+        return self._observer is not None
+
+    def _scan(self, directory: str) -> None:
+        """Read one directory into the catalog, crawling new subdirectories. Called with the lock held."""
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            try:
+                mtime = os.stat(current).st_mtime_ns
+                listing: Listing = {}
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            is_dir = entry.is_dir()
+                            size = 0 if is_dir else entry.stat().st_size
+                        except OSError:
+                            is_dir, size = False, 0
+                        listing[entry.name] = (is_dir, size)
+            except OSError:
+                self._drop(current)
+                continue
+
+            old = self._listings.get(current, {})
+            for name, (was_dir, _) in old.items():
+                if was_dir and not listing.get(name, (False, 0))[0]:
+                    self._drop(os.path.join(current, name))
+            self._listings[current] = listing
+            self._mtimes[current] = mtime
+            self._dirty.discard(current)
+
+            for name, (is_dir, _) in listing.items():
+                child = os.path.join(current, name)
+                # Like os.walk, do not descend into symlinked directories
+                if is_dir and child not in self._listings and not os.path.islink(child):
+                    pending.append(child)
+
+    def _drop(self, directory: str) -> None:
+        """Remove a directory and everything below it. Called with the lock held."""
+        prefix = directory + os.sep
+        for known in [d for d in self._listings if d == directory or d.startswith(prefix)]:
+            del self._listings[known]
+            self._mtimes.pop(known, None)
+            self._dirty.discard(known)
+
+    def _ensure_fresh(self) -> None:
+        """Crawl on first use, then re-read changed directories. Called with the lock held."""
+        if not self._crawled:
+            start = time.perf_counter()
+            for root in self.roots:
+                self._scan(root)
+            self._crawled = True
+            self._last_poll = time.monotonic()
+            self._start_watching()
+            logger.info(f"Cataloged {len(self._listings)} directories under {self.roots} "
+                        f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+            return
+
+        if not self.watching and time.monotonic() - self._last_poll >= self.poll_interval:
+            for directory, mtime in list(self._mtimes.items()):
+                try:
+                    if os.stat(directory).st_mtime_ns != mtime:
+                        self._dirty.add(directory)
+                except OSError:
+                    self._dirty.add(directory)
+            self._last_poll = time.monotonic()
+
+        for directory in sorted(self._dirty, key=len):
+            if directory in self._listings:
+                self._scan(directory)
+        self._dirty.clear()
+
+    def _start_watching(self) -> None:
+        """Watch the roots for changes with watchdog, if it is installed."""
+        if not self._use_watchdog:
+            return
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            logger.debug("watchdog is not installed, polling the file catalog for changes")
+            return
+
+        catalog = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type not in ("created", "deleted", "modified", "moved"):
+                    return
+                paths = [event.src_path, getattr(event, "dest_path", None)]
+                for path in filter(None, paths):
+                    catalog.invalidate(os.fsdecode(path))
+
+        try:
+            observer = Observer()
+            observer.daemon = True
+            for root in self.roots:
+                observer.schedule(_Handler(), root, recursive=True)
+            observer.start()
+            self._observer = observer
+        except Exception as e:
+            logger.warning(f"Could not watch {self.roots} for changes, polling instead: {e}")
+
+    def invalidate(self, path: str) -> None:
+        """
+        Mark the directory containing a path, and the path itself if it is a directory, as changed.
+
+        Args:
+            path: Absolute path of a file or directory that was created, changed or removed
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            if path in self._listings:
+                self._dirty.add(path)
+            # New parent directories are found by re-reading the closest known one
+            parent = os.path.dirname(path)
+            while parent not in self._listings and os.path.dirname(parent) != parent:
+                parent = os.path.dirname(parent)
+            self._dirty.add(parent)
+
+    def walk(self, base: str, exclude: Optional[Pattern] = None) -> List[Tuple[str, List[str], List[str], Listing]]:
+        """
+        Walk the cataloged tree below a directory, top-down like os.walk.
+
+        Args:
+            base: Absolute path of the directory to start from
+            exclude: Directory names matching this are not descended into
+
+        Returns:
+            (directory, subdirectory names, file names, listing) tuples
+        """
+        result = []
+        with self._lock:
+            self._ensure_fresh()
+            base = os.path.abspath(base)
+            if base not in self._listings:
+                self._scan(base)
+            pending = [base]
+            while pending:
+                directory = pending.pop()
+                listing = self._listings.get(directory)
+                if listing is None:
+                    continue
+                dirs = [n for n, (is_dir, _) in listing.items() if is_dir and not (exclude and exclude.match(n))]
+                files = [n for n, (is_dir, _) in listing.items() if not is_dir]
+                result.append((directory, dirs, files, listing))
+                pending.extend(os.path.join(directory, d) for d in reversed(dirs))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the size of the catalog and how it is kept fresh."""
+        with self._lock:
+            return {
+                "roots": list(self.roots),
+                "directories": len(self._listings),
+                "entries": sum(len(listing) for listing in self._listings.values()),
+                "crawled": self._crawled,
+                "watching": self.watching,
+            }
+
+    def close(self) -> None:
+        """Stop watching for changes."""
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+                self._observer.join(timeout=2)
+            except Exception as e:
+                logger.debug(f"Error stopping file catalog observer: {e}")
+            self._observer = None
+
+
+# Catalog of the current allowed directories
+_catalog: Optional[FileCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> FileCatalog:
+    """
+    Get the catalog of the allowed directories, replacing it when they changed.
+
+    Returns:
+        The shared FileCatalog
+    """
+    global _catalog
+    roots = get_allowed_directories()
+    catalog = _catalog
+    if catalog is None or catalog.roots != roots:
+        with _catalog_lock:
+            if _catalog is None or _catalog.roots != roots:
+                if _catalog is not None:
+                    _catalog.close()
+                _catalog = FileCatalog(roots)
+            catalog = _catalog
+    return catalog
+
+
+def invalidate_path(path: str) -> None:
+    """Tell the catalog, if one exists, that a path changed."""
+    if _catalog is not None:
+        _catalog.invalidate(path)
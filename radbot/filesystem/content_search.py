@@ -0,0 +1,257 @@
+"""
+Parallel search of file contents.
+
+Finding text with read_file means one tool call per file and the whole file in
+the model's context. This module searches many files for a pattern at once and
+returns only the matching lines, with optional context lines.
+
+Each file is scanned in one pass: the compiled pattern runs over the file's
+bytes (read whole for small files, memory-mapped from MMAP_THRESHOLD on), and
+line numbers are worked out only around matches. Files are scanned on a thread
+pool so that reading one file overlaps with scanning others. Binary files
+(a NUL byte in the first block) and files over the size limit are skipped.
+"""
+
+import logging
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from radbot.filesystem import windowed
+
+logger = logging.getLogger(__name__)
+
+# Files larger than this are skipped
+DEFAULT_MAX_FILE_BYTES = 64 * 1024 * 1024
+
+# Default cap on the number of matching lines returned
+DEFAULT_MAX_RESULTS = 100
+
+# Longest line text returned; longer lines are cut around the match
+MAX_LINE_CHARS = 500
+
+# Bytes checked for a NUL byte to detect binary files
+BINARY_SNIFF_BYTES = 8192
+
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+_NEWLINE_COUNT_CHUNK = 1024 * 1024
+
+
+def compile_pattern(pattern: str, literal: bool = False, ignore_case: bool = False) -> Pattern:
+    """
+    Compile a search pattern for matching file bytes.
+
+    Args:
+        pattern: Regular expression, or literal text if literal is True
+        literal: Match the pattern as plain text
+        ignore_case: Match case-insensitively
+
+    Returns:
+        Compiled bytes pattern; ``^`` and ``$`` match at line boundaries
+
+    Raises:
+        ValueError: If the pattern is empty or not a valid regular expression
+    """
+    if not pattern:
+        raise ValueError("Pattern is required")
+    source = re.escape(pattern) if literal else pattern
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    try:
+        return re.compile(source.encode("utf-8"), flags)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern {pattern!r}: {e}")
+
+
+def _count_newlines(data: Any, start: int, end: int) -> int:
+    """Count newlines in data[start:end] without copying more than a chunk at a time."""
+    count = 0
+    for chunk_start in range(start, end, _NEWLINE_COUNT_CHUNK):
+        count += data[chunk_start:min(end, chunk_start + _NEWLINE_COUNT_CHUNK)].count(b"\n")
+    return count
+
+
+def _line_bounds(data: Any, pos: int) -> Tuple[int, int]:
+    """Find the start and end (excluding the newline) of the line containing pos."""
+    start = data.rfind(b"\n", 0, pos) + 1
+    end = data.find(b"\n", pos)
+    return start, len(data) if end == -1 else end
+
+
+def _line_text(data: Any, start: int, end: int, focus: Optional[int] = None) -> str:
+    """Decode a line, cut to MAX_LINE_CHARS around focus."""
+    if end - start > MAX_LINE_CHARS * 4:
+        # Cut long lines in bytes first, so minified files do not decode megabytes
+        center = focus if focus is not None else start
+        start = max(start, center - MAX_LINE_CHARS * 2)
+        end = min(end, start + MAX_LINE_CHARS * 4)
+    text = bytes(data[start:end]).decode("utf-8", errors="replace").rstrip("\r")
+    return text[:MAX_LINE_CHARS]
+
+
+def _scan(data: Any, regex: Pattern, context: int, max_matches: int) -> List[Dict[str, Any]]:
+    """Find the lines of data matching regex, one result per line."""
+    matches = []
+    pos = 0
+    line_number = 1
+    counted_to = 0
+    size = len(data)
+    while pos <= size and len(matches) < max_matches:
+        m = regex.search(data, pos)
+        if m is None:
+            break
+        start, end = _line_bounds(data, m.start())
+        if m.end() > end and not regex.search(bytes(data[start:end])):
+            # The match runs across lines (e.g. through \s); like grep, only match within a line
+            pos = end + 1
+            continue
+        line_number += _count_newlines(data, counted_to, start)
+        counted_to = start
+
+        match = {"line": line_number, "text": _line_text(data, start, end, m.start())}
+        if context:
+            before = deque()
+            cursor = start
+            while len(before) < context and cursor > 0:
+                prev_start, prev_end = _line_bounds(data, cursor - 1)
+                before.appendleft(_line_text(data, prev_start, prev_end))
+                cursor = prev_start
+            after = []
+            cursor = end
+            while len(after) < context and cursor < size:
+                next_start, next_end = _line_bounds(data, cursor + 1)
+                if next_start >= size:
+                    break
+                after.append(_line_text(data, next_start, next_end))
+                cursor = next_end
+            match["before"] = list(before)
+            match["after"] = after
+        matches.append(match)
+        # Continue after this line
+        pos = end + 1
+    return matches
+
+
+def is_searchable(full_path: str, max_file_bytes: int = DEFAULT_MAX_FILE_BYTES) -> bool:
+    """
+    Check that a file is not binary and not larger than max_file_bytes.
+
+    Args:
+        full_path: Validated absolute path of the file
+        max_file_bytes: Largest file size searched
+
+    Returns:
+        False for binary, oversized or unreadable files
+    """
+    try:
+        with open(full_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size > max_file_bytes:
+                return False
+            return b"\0" not in f.read(BINARY_SNIFF_BYTES)
+    except OSError:
+        return False
+
+
+def scan_file(full_path: str, regex: Pattern, context: int = 0,
+              max_matches: int = DEFAULT_MAX_RESULTS,
+              max_file_bytes: int = DEFAULT_MAX_FILE_BYTES) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Search one file.
+
+    Args:
+        full_path: Validated absolute path of the file
+        regex: Pattern from compile_pattern
+        context: Number of lines to include before and after each match
+        max_matches: Stop after this many matching lines
+        max_file_bytes: Skip files larger than this
+
+    Returns:
+        (status, matches); status is "scanned", "binary", "too_large" or "error"
+    """
+    try:
+        with open(full_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size > max_file_bytes:
+                return "too_large", []
+            if size == 0:
+                return "scanned", []
+            if b"\0" in f.read(BINARY_SNIFF_BYTES):
+                return "binary", []
+            if size >= windowed.MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return "scanned", _scan(mm, regex, context, max_matches)
+            f.seek(0)
+            return "scanned", _scan(f.read(), regex, context, max_matches)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Could not search {full_path}: {e}")
+        return "error", []
+
+
+def search_contents(files: Iterable[Tuple[str, str]], regex: Pattern, context: int = 0,
+                    max_results: int = DEFAULT_MAX_RESULTS,
+                    max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                    workers: int = DEFAULT_WORKERS) -> Dict[str, Any]:
+    """
+    Search many files in parallel, returning matches in file order.
+
+    Args:
+        files: (absolute path, path to report) pairs of the files to search
+        regex: Pattern from compile_pattern
+        context: Number of lines to include before and after each match
+        max_results: Stop after this many matching lines in total
+        max_file_bytes: Skip files larger than this
+        workers: Number of files scanned at once
+
+    Returns:
+        Dict with the matches (each with its path, line number and text),
+        counts of scanned, matching and skipped files, and whether the results
+        were capped
+    """
+    max_results = max(1, max_results)
+    results: List[Dict[str, Any]] = []
+    counts = {"scanned": 0, "binary": 0, "too_large": 0, "error": 0}
+    files_matched = 0
+    truncated = False
+    files = iter(files)
+    in_flight = deque()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="content-search") as executor:
+        def submit_next() -> bool:
+            for full_path, display_path in files:
+                future = executor.submit(scan_file, full_path, regex, context, max_results + 1, max_file_bytes)
+                in_flight.append((display_path, future))
+                return True
+            return False
+
+        # Keep a few files queued per worker, and consume results in order
+        for _ in range(max(1, workers) * 4):
+            if not submit_next():
+                break
+        while in_flight:
+            display_path, future = in_flight.popleft()
+            status, matches = future.result()
+            counts[status] += 1
+            if matches:
+                files_matched += 1
+                for match in matches:
+                    if len(results) >= max_results:
+                        truncated = True
+                        break
+                    results.append({"path": display_path, **match})
+            if truncated:
+                break
+            submit_next()
+        for _, future in in_flight:
+            future.cancel()
+
+    return {
+        "matches": results,
+        "files_scanned": counts["scanned"],
+        "files_matched": files_matched,
+        "files_skipped": {"binary": counts["binary"], "too_large": counts["too_large"],
+                          "unreadable": counts["error"]},
+        "truncated": truncated,
+    }
@@ -13,6 +13,9 @@ from google.adk.tools import FunctionTool
 
 from radbot.filesystem.tools import (
     read_file,
+    read_file_window,
+    tail_file,
+    grep_file,
     write_file,
     edit_file,
     copy,
@@ -20,6 +23,7 @@ from radbot.filesystem.tools import (
     list_directory,
     get_info,
     search,
+    search_file_contents,
 )
 from radbot.filesystem.security import (
     set_allowed_directories,
@@ -46,6 +50,69 @@ def _create_read_file_tool() -> FunctionTool:
     return FunctionTool(func=read_file_func)
 
 
+def _create_read_file_window_tool() -> FunctionTool:
+    """Create the read_file_window tool."""
+    def read_file_window_func(path: str, offset: int = 0, length: int = 65536,
+                              start_line: int = 0, end_line: int = 0) -> Dict[str, Any]:
+        """
+        Read part of a file, by byte range or by line range. Use this for large files.
+
+        Args:
+            path: Path to the file to read
+            offset: First byte to read; negative values count from the end of the file
+            length: Number of bytes to read (at most 1 MiB)
+            start_line: First line to read, counting from 1; when set, reads lines instead of bytes
+            end_line: Last line to read, inclusive (0 reads as many lines as fit in 64 KiB)
+
+        Returns:
+            The content and where the next window starts (next_offset or next_line)
+        """
+        return read_file_window(path, offset, length,
+                                start_line=start_line or None, end_line=end_line or None)
+
+    return FunctionTool(func=read_file_window_func)
+
+
+def _create_tail_file_tool() -> FunctionTool:
+    """Create the tail_file tool."""
+    def tail_file_func(path: str, lines: int = 50) -> Dict[str, Any]:
+        """
+        Read the last lines of a file, such as the latest entries of a log.
+
+        Args:
+            path: Path to the file to read
+            lines: Number of lines to return
+
+        Returns:
+            The last lines of the file
+        """
+        return tail_file(path, lines)
+
+    return FunctionTool(func=tail_file_func)
+
+
+def _create_grep_file_tool() -> FunctionTool:
+    """Create the grep_file tool."""
+    def grep_file_func(path: str, pattern: str, ignore_case: bool = False,
+                       context: int = 0, max_matches: int = 100) -> Dict[str, Any]:
+        """
+        Find the lines of a file matching a regular expression.
+
+        Args:
+            path: Path to the file to search
+            pattern: Regular expression searched for in each line
+            ignore_case: Match case-insensitively
+            context: Number of lines to include before and after each match
+            max_matches: Stop after this many matching lines
+
+        Returns:
+            The matching lines with their line numbers
+        """
+        return grep_file(path, pattern, ignore_case, context, max_matches)
+
+    return FunctionTool(func=grep_file_func)
+
+
 def _create_write_file_tool() -> FunctionTool:
     """Create the write_file tool."""
     def write_file_func(path: str, content: str, overwrite: bool = False) -> Dict[str, Any]:
@@ -155,7 +222,8 @@ def _create_get_info_tool() -> FunctionTool:
 
 def _create_search_tool() -> FunctionTool:
     """Create the search tool."""
-    def search_func(path: str, pattern: str, exclude_patterns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    def search_func(path: str, pattern: str, exclude_patterns: Optional[List[str]] = None,
+                    content_pattern: str = "", max_results: int = 200) -> List[Dict[str, Any]]:
         """
         Search for files or directories matching a pattern.
 
@@ -163,15 +231,46 @@ def _create_search_tool() -> FunctionTool:
             path: Base path to search from
             pattern: Glob pattern to match filenames against
             exclude_patterns: Optional list of patterns to exclude
+            content_pattern: Optional regular expression; only files containing a matching line are returned
+            max_results: Maximum number of results
 
         Returns:
             List of matching file and directory information
         """
-        return search(path, pattern, exclude_patterns)
+        return search(path, pattern, exclude_patterns,
+                      content_pattern=content_pattern or None, max_results=max_results)
 
     return FunctionTool(func=search_func)
 
 
+def _create_search_file_contents_tool() -> FunctionTool:
+    """Create the search_file_contents tool."""
+    def search_file_contents_func(path: str, pattern: str, literal: bool = False, ignore_case: bool = False,
+                                  include_patterns: Optional[List[str]] = None,
+                                  exclude_patterns: Optional[List[str]] = None,
+                                  context: int = 0, max_results: int = 100) -> Dict[str, Any]:
+        """
+        Search the contents of files for text, like grep -rn. Prefer this to reading files one by one.
+
+        Args:
+            path: File, or directory to search recursively
+            pattern: Regular expression, or plain text if literal is True
+            literal: Match the pattern as plain text
+            ignore_case: Match case-insensitively
+            include_patterns: Optional glob patterns of file names to search, e.g. ["*.py"]
+            exclude_patterns: Optional glob patterns of file and directory names to skip
+            context: Number of lines to include before and after each match
+            max_results: Maximum number of matching lines to return
+
+        Returns:
+            Matching lines with their file paths and line numbers
+        """
+        return search_file_contents(path, pattern, literal, ignore_case, include_patterns,
+                                    exclude_patterns, context, max_results)
+
+    return FunctionTool(func=search_file_contents_func)
+
+
 def create_filesystem_tools(
     allowed_directories: List[str],
     enable_write: bool = False,
@@ -198,9 +297,13 @@ def create_filesystem_tools(
     # Create the tools
     tools = [
         _create_read_file_tool(),
+        _create_read_file_window_tool(),
+        _create_tail_file_tool(),
+        _create_grep_file_tool(),
         _create_list_directory_tool(),
         _create_get_info_tool(),
         _create_search_tool(),
+        _create_search_file_contents_tool(),
     ]
     
     # Add write tools if enabled
@@ -84,6 +84,26 @@ def validate_path(path: str, must_exist: bool = False) -> str:
     )
 
 
+def is_path_allowed(path: str) -> bool:
+    """
+    Check, without logging, whether a path resolves inside an allowed directory.
+
+    Used for the many files found by a search, where a symlink may point
+    outside the allowed directories.
+
+    Args:
+        path: Absolute path to check
+
+    Returns:
+        True if the path, with symlinks resolved, is within an allowed directory
+    """
+    real_path = os.path.realpath(os.path.abspath(path))
+    return any(
+        real_path.startswith(allowed_dir + os.sep) or real_path == allowed_dir
+        for allowed_dir in _ALLOWED_DIRECTORIES
+    )
+
+
 def create_parent_directory(path: str) -> None:
     """
     Create the parent directory of a path if it doesn't exist.
@@ -6,17 +6,23 @@ that can be used by ADK agents.
 """
 
 import os
+import re
 import shutil
 import logging
-import fnmatch
 import difflib
+import tempfile
+import contextlib
 from datetime import datetime
-from typing import List, Dict, Any, Union, Optional
+from typing import List, Dict, Any, Union, Optional, Tuple
 
-from radbot.filesystem.security import validate_path, create_parent_directory
+from radbot.filesystem.security import validate_path, is_path_allowed, create_parent_directory
+from radbot.filesystem import catalog, content_search, windowed
 
 logger = logging.getLogger(__name__)
 
+# Matching lines listed per file by a content search
+CONTENT_MATCHES_PER_FILE = 5
+
 
 def read_file(path: str) -> str:
     """
@@ -31,16 +37,19 @@ def read_file(path: str) -> str:
     Raises:
         PermissionError: If path is outside allowed directories
         FileNotFoundError: If file doesn't exist
-        ValueError: If path is not a file
+        ValueError: If path is not a file, or the file is too large to read whole
         IOError: If file cannot be read
     """
     try:
-        # Validate path
-        full_path = validate_path(path, must_exist=True)
+        full_path = _validate_file(path)
         
-        # Check if it's a file
-        if not os.path.isfile(full_path):
-            raise ValueError(f"Path is not a file: {path}")
+        # Large files have to be read a window at a time
+        size = os.path.getsize(full_path)
+        if size > windowed.MAX_FULL_READ_BYTES:
+            raise ValueError(
+                f"File is too large to read whole ({size} bytes): {path}. "
+                f"Use read_file_window, tail_file or grep_file instead"
+            )
         
         # Read file with UTF-8 encoding
         with open(full_path, 'r', encoding='utf-8') as f:
@@ -57,6 +66,135 @@ def read_file(path: str) -> str:
         raise IOError(f"Error reading file: {str(e)}")
 
 
+def _validate_file(path: str) -> str:
+    """
+    Validate that a path is an existing file in the allowed directories.
+
+    Args:
+        path: Path to validate
+
+    Returns:
+        Absolute path of the file
+
+    Raises:
+        PermissionError: If path is outside allowed directories
+        FileNotFoundError: If file doesn't exist
+        ValueError: If path is not a file
+    """
+    full_path = validate_path(path, must_exist=True)
+    if not os.path.isfile(full_path):
+        raise ValueError(f"Path is not a file: {path}")
+    return full_path
+
+
+def read_file_window(path: str, offset: int = 0, length: Optional[int] = None,
+                     start_line: Optional[int] = None, end_line: Optional[int] = None,
+                     max_bytes: Optional[int] = None,
+                     progress: Optional[windowed.ProgressCallback] = None) -> Dict[str, Any]:
+    """
+    Read part of a file, by byte range or by line range.
+
+    Memory use does not depend on the size of the file. The result says where
+    the next window starts (next_offset or next_line).
+
+    Args:
+        path: Path to the file to read
+        offset: First byte to read; negative values count from the end of the file
+        length: Number of bytes to read
+        start_line: First line to read, counting from 1; selects a line range instead of a byte range
+        end_line: Last line to read, inclusive
+        max_bytes: Largest content to return for a line range
+        progress: Optional callback with (bytes scanned, file size)
+
+    Returns:
+        Dict with the window's content and position
+
+    Raises:
+        PermissionError: If path is outside allowed directories
+        FileNotFoundError: If file doesn't exist
+        ValueError: If path is not a file
+        IOError: If file cannot be read
+    """
+    try:
+        full_path = _validate_file(path)
+        if start_line is not None or end_line is not None:
+            result = windowed.read_lines(full_path, start_line or 1, end_line, max_bytes, progress)
+        else:
+            result = windowed.read_range(full_path, offset, length)
+        return {"path": path, **result}
+    except (PermissionError, FileNotFoundError, ValueError) as e:
+        logger.warning(f"Error reading window of file {path}: {str(e)}")
+        raise
+    except Exception as e:
+        logger.error(f"Error reading window of file {path}: {str(e)}")
+        raise IOError(f"Error reading file: {str(e)}")
+
+
+def tail_file(path: str, lines: int = 50, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Read the last lines of a file.
+
+    Args:
+        path: Path to the file to read
+        lines: Number of lines to return
+        max_bytes: Largest content to return
+
+    Returns:
+        Dict with the content, the number of lines and the offset it starts at
+
+    Raises:
+        PermissionError: If path is outside allowed directories
+        FileNotFoundError: If file doesn't exist
+        ValueError: If path is not a file
+        IOError: If file cannot be read
+    """
+    try:
+        full_path = _validate_file(path)
+        return {"path": path, **windowed.tail_lines(full_path, lines, max_bytes)}
+    except (PermissionError, FileNotFoundError, ValueError) as e:
+        logger.warning(f"Error reading tail of file {path}: {str(e)}")
+        raise
+    except Exception as e:
+        logger.error(f"Error reading tail of file {path}: {str(e)}")
+        raise IOError(f"Error reading file: {str(e)}")
+
+
+def grep_file(path: str, pattern: str, ignore_case: bool = False, context: int = 0,
+              max_matches: int = 100, max_bytes: Optional[int] = None,
+              progress: Optional[windowed.ProgressCallback] = None) -> Dict[str, Any]:
+    """
+    Find the lines of a file matching a regular expression.
+
+    Args:
+        path: Path to the file to search
+        pattern: Regular expression searched for in each line
+        ignore_case: Match case-insensitively
+        context: Number of lines to include before and after each match
+        max_matches: Stop after this many matching lines
+        max_bytes: Largest output to return
+        progress: Optional callback with (bytes scanned, file size)
+
+    Returns:
+        Dict with the matching lines and their line numbers
+
+    Raises:
+        PermissionError: If path is outside allowed directories
+        FileNotFoundError: If file doesn't exist
+        ValueError: If path is not a file or the pattern is invalid
+        IOError: If file cannot be read
+    """
+    try:
+        full_path = _validate_file(path)
+        result = windowed.grep_lines(full_path, pattern, ignore_case, context, max_matches, max_bytes, progress)
+        return {"path": path, **result}
+    except (PermissionError, FileNotFoundError, ValueError) as e:
+        logger.warning(f"Error searching file {path} for {pattern}: {str(e)}")
+        raise
+    except Exception as e:
+        logger.error(f"Error searching file {path} for {pattern}: {str(e)}")
+        raise IOError(f"Error searching file: {str(e)}")
+
+
 def write_file(path: str, content: str, overwrite: bool = False) -> Dict[str, Any]:
     """
     Write content to a specified file.
@@ -88,6 +226,7 @@ def write_file(path: str, content: str, overwrite: bool = False) -> Dict[str, An
         # Write file with UTF-8 encoding
         with open(full_path, 'w', encoding='utf-8') as f:
             f.write(content)
+        catalog.invalidate_path(full_path)
         
         return {
             "path": path,
@@ -192,10 +331,226 @@ def _preserve_indentation(original_line: str, new_text: str) -> str:
     return '\n'.join(lines)
 
 
+class _LineIndex:
+    """Line offsets and stripped lines of a text, built once for whitespace-insensitive matching."""
+
+    def __init__(self, content: str):
+        self.lines = content.split('\n')
+        self.stripped = [line.strip() for line in self.lines]
+        self.starts = [0]
+        for line in self.lines[:-1]:
+            self.starts.append(self.starts[-1] + len(line) + 1)
+
+    def find(self, old_text: str) -> Optional[Tuple[int, int]]:
+        """Find old_text line by line, ignoring leading and trailing whitespace."""
+        old_lines = [line.strip() for line in old_text.split('\n')]
+        count = len(old_lines)
+        first = old_lines[0]
+        for i in range(len(self.lines) - count + 1):
+            if self.stripped[i] == first and self.stripped[i:i + count] == old_lines:
+                last = i + count - 1
+                return self.starts[i], self.starts[last] + len(self.lines[last])
+        return None
+
+
+def _locate_edits(content: str, edits: List[Dict[str, str]]) -> Optional[List[Tuple[int, int, str]]]:
+    """
+    Find where every edit applies in the original content.
+
+    Args:
+        content: Content with normalized line endings
+        edits: Edits with 'oldText' and 'newText' keys
+
+    Returns:
+        Sorted (start, end, new text) replacements, or None if the edits
+        overlap or build on each other and have to be applied one by one
+
+    Raises:
+        ValueError: If an edit is invalid or its text cannot be found
+    """
+    normalized = []
+    for i, edit in enumerate(edits):
+        if 'oldText' not in edit or 'newText' not in edit:
+            raise ValueError(f"Edit {i} is missing 'oldText' or 'newText'")
+        normalized.append((_normalize_line_endings(edit['oldText']), _normalize_line_endings(edit['newText'])))
+    
+    # An edit matching text inserted by an earlier edit depends on the order
+    for i, (_, new_text) in enumerate(normalized):
+        if any(old_text and old_text in new_text for old_text, _ in normalized[i + 1:]):
+            return None
+    
+    line_index = None
+    replacements = []
+    for i, (old_text, new_text) in enumerate(normalized):
+        index = content.find(old_text)
+        if index != -1:
+            start, end = index, index + len(old_text)
+        else:
+            if line_index is None:
+                line_index = _LineIndex(content)
+            span = line_index.find(old_text)
+            if span is None:
+                return None
+            start, end = span
+        
+        # Preserve the indentation of the original line in multi-line replacements
+        if '\n' in old_text:
+            line_start = content.rfind('\n', 0, start) + 1
+            line_end = content.find('\n', start)
+            original_line = content[line_start:line_end if line_end != -1 else len(content)]
+            new_text = _preserve_indentation(original_line, new_text)
+        replacements.append((start, end, new_text))
+    
+    replacements.sort(key=lambda r: r[0])
+    for (_, previous_end, _), (start, _, _) in zip(replacements, replacements[1:]):
+        if start < previous_end:
+            return None
+    return replacements
+
+
+def _apply_edits_sequentially(content: str, edits: List[Dict[str, str]]) -> str:
+    """Apply edits one after another, each to the result of the previous ones."""
+    for i, edit in enumerate(edits):
+        old_text = _normalize_line_endings(edit['oldText'])
+        new_text = _normalize_line_endings(edit['newText'])
+        
+        # Find the match
+        index = _find_text_match(content, old_text)
+        if index is None:
+            raise ValueError(f"Could not find text to replace for edit {i}")
+        
+        # Identify the original indentation for preserving in new text
+        if '\n' in old_text:
+            line_start = content.rfind('\n', 0, index) + 1
+            line_end = content.find('\n', index)
+            original_line = content[line_start:line_end if line_end != -1 else len(content)]
+            new_text = _preserve_indentation(original_line, new_text)
+        
+        # Apply the edit
+        content = content[:index] + new_text + content[index + len(old_text):]
+    return content
+
+
+def _compact_diff(path: str, content: str, replacements: List[Tuple[int, int, str]], context: int = 3) -> str:
+    """
+    Build a unified diff of replacements, diffing only the lines around them.
+
+    Args:
+        path: Path shown in the diff header
+        content: Original content
+        replacements: Sorted, non-overlapping (start, end, new text) replacements
+        context: Context lines around each change
+
+    Returns:
+        Unified diff
+    """
+    # Line number (0-based) of every replacement's first and last line
+    spans = []
+    line = 0
+    position = 0
+    for start, end, new_text in replacements:
+        line += content.count('\n', position, start)
+        last_line = line + content.count('\n', start, end)
+        spans.append((line, last_line, start, end, new_text))
+        position = start
+    
+    # Group replacements whose context windows touch
+    groups = []
+    for span in spans:
+        if groups and span[0] - groups[-1][-1][1] <= 2 * context + 1:
+            groups[-1].append(span)
+        else:
+            groups.append([span])
+    
+    hunks = []
+    line_delta = 0
+    for group in groups:
+        # Character range of whole lines around the group, with context
+        seg_start = content.rfind('\n', 0, group[0][2]) + 1
+        first_line = group[0][0]
+        while first_line > 0 and group[0][0] - first_line < context:
+            seg_start = content.rfind('\n', 0, seg_start - 1) + 1
+            first_line -= 1
+        seg_end = group[-1][3]
+        for _ in range(context + 1):
+            next_newline = content.find('\n', seg_end)
+            if next_newline == -1:
+                seg_end = len(content)
+                break
+            seg_end = next_newline + 1
+        
+        old_segment = content[seg_start:seg_end]
+        pieces = []
+        cursor = seg_start
+        for _, _, start, end, new_text in group:
+            pieces.append(content[cursor:start])
+            pieces.append(new_text)
+            cursor = end
+        pieces.append(content[cursor:seg_end])
+        new_segment = ''.join(pieces)
+        
+        old_lines = old_segment.splitlines(keepends=True)
+        new_lines = new_segment.splitlines(keepends=True)
+        for diff_line in list(difflib.unified_diff(old_lines, new_lines, n=context))[2:]:
+            header = _HUNK_HEADER.match(diff_line)
+            if header:
+                old_start, old_len, new_start, new_len = header.groups()
+                diff_line = (f"@@ -{int(old_start) + first_line}{old_len or ''} "
+                             f"+{int(new_start) + first_line + line_delta}{new_len or ''} @@\n")
+            hunks.append(diff_line)
+        line_delta += len(new_lines) - len(old_lines)
+    
+    if not hunks:
+        return ''
+    return ''.join([f'--- a/{path}\n', f'+++ b/{path}\n'] + hunks)
+
+
+_HUNK_HEADER = re.compile(r'^@@ -(\d+)(,\d+)? \+(\d+)(,\d+)? @@')
+
+
+def _atomic_write(full_path: str, pieces: List[str]) -> None:
+    """
+    Replace a file with new content, so that it is never left half-written.
+
+    The content is written to a temporary file in the same directory, flushed
+    to disk, and renamed over the original, keeping its permissions.
+
+    Args:
+        full_path: Absolute path of the file
+        pieces: Content to write, in order
+    """
+    directory = os.path.dirname(full_path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(full_path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            for piece in pieces:
+                f.write(piece)
+            f.flush()
+            os.fsync(f.fileno())
+        shutil.copymode(full_path, tmp_path)
+        os.replace(tmp_path, full_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    
+    # Make the rename itself durable
+    with contextlib.suppress(OSError):
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
 def edit_file(path: str, edits: List[Dict[str, str]], dry_run: bool = False) -> str:
     """
     Edit a file by applying a list of changes.
 
+    All edits are located in the original content and applied in one pass;
+    edits that overlap or match text inserted by an earlier edit are applied
+    one after another instead. The file is replaced atomically.
+
     Args:
         path: Path to the file to edit
         edits: List of edits, each with 'oldText' and 'newText' keys
@@ -218,50 +573,37 @@ def edit_file(path: str, edits: List[Dict[str, str]], dry_run: bool = False) ->
         if not os.path.isfile(full_path):
             raise ValueError(f"Path is not a file: {path}")
         
-        # Read file with UTF-8 encoding
+        # Read file with UTF-8 encoding; universal newlines normalize line endings
         with open(full_path, 'r', encoding='utf-8') as f:
-            original_content = f.read()
-        
-        # Normalize line endings
-        content = _normalize_line_endings(original_content)
+            content = f.read()
         
-        # Apply each edit
-        for i, edit in enumerate(edits):
-            if 'oldText' not in edit or 'newText' not in edit:
-                raise ValueError(f"Edit {i} is missing 'oldText' or 'newText'")
-            
-            old_text = _normalize_line_endings(edit['oldText'])
-            new_text = _normalize_line_endings(edit['newText'])
-            
-            # Find the match
-            index = _find_text_match(content, old_text)
-            if index is None:
-                raise ValueError(f"Could not find text to replace for edit {i}")
-            
-            # Identify the original indentation for preserving in new text
-            if '\n' in old_text:
-                # Find the original line at this position
-                original_line = original_content.split('\n')[len(content[:index].split('\n')) - 1]
-                # Preserve indentation in new text
-                new_text = _preserve_indentation(original_line, new_text)
+        replacements = _locate_edits(content, edits)
+        if replacements is None:
+            # Edits depend on each other: apply them in order and diff the whole file
+            new_content = _apply_edits_sequentially(content, edits)
+            diff = ''.join(difflib.unified_diff(
+                content.splitlines(keepends=True), new_content.splitlines(keepends=True),
+                fromfile=f'a/{path}',
+                tofile=f'b/{path}',
+                n=3  # Context lines
+            ))
+            pieces = [new_content]
+        else:
+            diff = _compact_diff(path, content, replacements)
             
-            # Apply the edit
-            content = content[:index] + new_text + content[index + len(old_text):]
-        
-        # Generate the diff
-        original_lines = original_content.splitlines(keepends=True)
-        new_lines = content.splitlines(keepends=True)
-        diff = ''.join(difflib.unified_diff(
-            original_lines, new_lines,
-            fromfile=f'a/{path}',
-            tofile=f'b/{path}',
-            n=3  # Context lines
-        ))
+            # Build the new content from slices of the original
+            pieces = []
+            cursor = 0
+            for start, end, new_text in replacements:
+                pieces.append(content[cursor:start])
+                pieces.append(new_text)
+                cursor = end
+            pieces.append(content[cursor:])
         
         # Write the changes if not dry run
         if not dry_run:
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            _atomic_write(full_path, pieces)
+            catalog.invalidate_path(full_path)
         
         return diff
     except (PermissionError, FileNotFoundError, ValueError) as e:
@@ -311,6 +653,7 @@ def copy(source_path: str, destination_path: str) -> Dict[str, Any]:
             shutil.copytree(src_path, dst_path)
         else:
             shutil.copy2(src_path, dst_path)
+        catalog.invalidate_path(dst_path)
         
         return {
             "source": source_path,
@@ -356,6 +699,7 @@ def delete(path: str) -> Dict[str, Any]:
             shutil.rmtree(full_path)
         else:
             os.remove(full_path)
+        catalog.invalidate_path(full_path)
         
         return {
             "path": path,
@@ -405,18 +749,22 @@ def list_directory(path: str = "") -> List[Dict[str, Any]]:
         if not os.path.isdir(full_path):
             raise ValueError(f"Path is not a directory: {path}")
         
-        # List directory contents
+        # List directory contents; scandir entries carry their type and stat
         contents = []
-        for item in os.listdir(full_path):
-            item_path = os.path.join(full_path, item)
-            is_dir = os.path.isdir(item_path)
-            
-            contents.append({
-                "name": item,
-                "path": os.path.join(path, item),
-                "type": "[DIR]" if is_dir else "[FILE]",
-                "size": 0 if is_dir else os.path.getsize(item_path)
-            })
+        with os.scandir(full_path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                    size = 0 if is_dir else entry.stat().st_size
+                except OSError:
+                    is_dir, size = False, 0
+                
+                contents.append({
+                    "name": entry.name,
+                    "path": os.path.join(path, entry.name),
+                    "type": "[DIR]" if is_dir else "[FILE]",
+                    "size": size
+                })
         
         return contents
     except (PermissionError, FileNotFoundError, ValueError) as e:
@@ -475,25 +823,35 @@ def get_info(path: str) -> Dict[str, Any]:
         raise IOError(f"Error getting file info: {str(e)}")
 
 
-def search(path: str, pattern: str, exclude_patterns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+def search(path: str, pattern: str, exclude_patterns: Optional[List[str]] = None,
+           regex: bool = False, content_pattern: Optional[str] = None,
+           max_results: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Search for files or directories matching a pattern.
 
+    Names are matched against the file catalog of the allowed directories,
+    which is crawled once and kept up to date, instead of walking the tree.
+
     Args:
         path: Base path to search from
-        pattern: Glob pattern to match filenames against
-        exclude_patterns: Optional list of patterns to exclude
+        pattern: Glob pattern to match filenames against, or a regular expression if regex is True
+        exclude_patterns: Optional list of glob patterns to exclude
+        regex: Treat pattern as a regular expression searched for in each name
+        content_pattern: Optional regular expression; only files with a matching line are returned.
+            Binary files, files over the content search size limit, and symlinks
+            to files outside the allowed directories are not searched
+        max_results: Optional maximum number of results
 
     Returns:
-        List of matching file and directory information
+        List of matching file and directory information; with content_pattern,
+        each file also lists its matching lines
 
     Raises:
         PermissionError: If path is outside allowed directories
         FileNotFoundError: If base path doesn't exist
-        ValueError: If path is not a directory
+        ValueError: If path is not a directory or a pattern is invalid
         IOError: If search fails
     """
-    exclude_patterns = exclude_patterns or []
     results = []
     
     try:
@@ -504,36 +862,60 @@ def search(path: str, pattern: str, exclude_patterns: Optional[List[str]] = None
         if not os.path.isdir(full_path):
             raise ValueError(f"Path is not a directory: {path}")
         
-        # Walk the directory tree
-        for root, dirs, files in os.walk(full_path):
-            # Filter directories to exclude
-            dirs[:] = [d for d in dirs if not any(fnmatch.fnmatch(d, p) for p in exclude_patterns)]
+        try:
+            name_pattern = re.compile(pattern) if regex else catalog.compile_glob(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid pattern {pattern!r}: {e}")
+        matches_name = name_pattern.search if regex else name_pattern.match
+        exclude = catalog.compile_globs(tuple(exclude_patterns or ()))
+        
+        def wanted(name: str) -> bool:
+            return bool(matches_name(name)) and not (exclude and exclude.match(name))
+        
+        # Walk the cataloged tree
+        for root, dirs, files, listing in catalog.get_catalog().walk(full_path, exclude):
+            # Get paths relative to the search path
+            rel_root = os.path.relpath(root, full_path)
             
             # Check files
             for name in files:
-                if fnmatch.fnmatch(name, pattern) and not any(fnmatch.fnmatch(name, p) for p in exclude_patterns):
+                if not wanted(name):
+                    continue
+                entry = {
+                    "name": name,
+                    "path": os.path.normpath(os.path.join(path, rel_root, name)),
+                    "type": "[FILE]",
+                    "size": listing[name][1]
+                }
+                if content_pattern:
                     file_path = os.path.join(root, name)
-                    # Get path relative to the search path
-                    rel_path = os.path.relpath(file_path, full_path)
-                    results.append({
-                        "name": name,
-                        "path": os.path.join(path, rel_path),
-                        "type": "[FILE]",
-                        "size": os.path.getsize(file_path)
-                    })
+                    # Symlinks may point outside the allowed directories
+                    if not is_path_allowed(file_path) or not content_search.is_searchable(file_path):
+                        continue
+                    found = windowed.grep_lines(file_path, content_pattern,
+                                                max_matches=CONTENT_MATCHES_PER_FILE)
+                    if not found["match_count"]:
+                        continue
+                    entry["matches"] = [{"line": m["line"], "text": m["text"]} for m in found["matches"]]
+                results.append(entry)
+                if max_results and len(results) >= max_results:
+                    return results
+            
+            # Directories have no content to match
+            if content_pattern:
+                continue
             
             # Check directories
             for name in dirs:
-                if fnmatch.fnmatch(name, pattern) and not any(fnmatch.fnmatch(name, p) for p in exclude_patterns):
-                    dir_path = os.path.join(root, name)
-                    # Get path relative to the search path
-                    rel_path = os.path.relpath(dir_path, full_path)
+                if wanted(name):
                     results.append({
                         "name": name,
-                        "path": os.path.join(path, rel_path),
+                        "path": os.path.normpath(os.path.join(path, rel_root, name)),
                         "type": "[DIR]",
                         "size": 0
                     })
+                    if max_results and len(results) >= max_results:
+                        return results
         
         return results
     except (PermissionError, FileNotFoundError, ValueError) as e:
@@ -544,3 +926,65 @@ def search(path: str, pattern: str, exclude_patterns: Optional[List[str]] = None
         # Log and wrap other exceptions
         logger.error(f"Error searching in {path} for {pattern}: {str(e)}")
         raise IOError(f"Error searching: {str(e)}")
+
+
+def search_file_contents(path: str, pattern: str, literal: bool = False, ignore_case: bool = False,
+                         include_patterns: Optional[List[str]] = None,
+                         exclude_patterns: Optional[List[str]] = None,
+                         context: int = 0, max_results: int = content_search.DEFAULT_MAX_RESULTS,
+                         max_file_bytes: int = content_search.DEFAULT_MAX_FILE_BYTES) -> Dict[str, Any]:
+    """
+    Search the contents of files for a pattern, like grep -rn.
+
+    Files are scanned in parallel; binary files, files over max_file_bytes and
+    symlinks to files outside the allowed directories are skipped.
+
+    Args:
+        path: File, or directory to search recursively
+        pattern: Regular expression, or literal text if literal is True
+        literal: Match the pattern as plain text
+        ignore_case: Match case-insensitively
+        include_patterns: Optional glob patterns; only files with matching names are searched
+        exclude_patterns: Optional glob patterns of file and directory names to skip
+        context: Number of lines to include before and after each match
+        max_results: Maximum number of matching lines to return
+        max_file_bytes: Skip files larger than this
+
+    Returns:
+        Dict with the matching lines (path, line number, text) and file counts
+
+    Raises:
+        PermissionError: If path is outside allowed directories
+        FileNotFoundError: If path doesn't exist
+        ValueError: If the pattern is invalid
+        IOError: If search fails
+    """
+    try:
+        # Validate path
+        full_path = validate_path(path, must_exist=True)
+        regex = content_search.compile_pattern(pattern, literal, ignore_case)
+        
+        if os.path.isfile(full_path):
+            files = [(full_path, path)]
+        else:
+            include = catalog.compile_globs(tuple(include_patterns or ()))
+            exclude = catalog.compile_globs(tuple(exclude_patterns or ()))
+            files = [
+                (os.path.join(root, name), os.path.normpath(os.path.join(path, os.path.relpath(root, full_path), name)))
+                for root, _, names, _ in catalog.get_catalog().walk(full_path, exclude)
+                for name in names
+                if (include is None or include.match(name)) and not (exclude and exclude.match(name))
+                # Symlinks may point outside the allowed directories
+                and is_path_allowed(os.path.join(root, name))
+            ]
+        
+        result = content_search.search_contents(files, regex, context, max_results, max_file_bytes)
+        return {"path": path, "pattern": pattern, **result}
+    except (PermissionError, FileNotFoundError, ValueError) as e:
+        # Re-raise known exceptions
+        logger.warning(f"Error searching contents of {path} for {pattern}: {str(e)}")
+        raise
+    except Exception as e:
+        # Log and wrap other exceptions
+        logger.error(f"Error searching contents of {path} for {pattern}: {str(e)}")
+        raise IOError(f"Error searching file contents: {str(e)}")
@@ -0,0 +1,341 @@
+"""
+Windowed reads of large files.
+
+Reading a whole file into one string does not work for multi-gigabyte logs:
+it takes the memory of the whole file, and the result does not fit in a model's
+context anyway. These functions return one bounded window of a file at a
+time: a byte range, a range of lines, the last lines, or the lines matching a
+pattern. Each of them reads the file sequentially (or memory-maps it, for
+byte ranges of large files), so memory use does not depend on the file size.
+
+The functions take absolute paths that the caller has already validated.
+Byte windows are aligned to UTF-8 character boundaries, and every result says
+where the next window starts, so a file can be paged through window by window.
+"""
+
+import mmap
+import os
+import re
+from collections import deque
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional
+
+# Default and largest size of a returned window, in bytes
+DEFAULT_WINDOW_BYTES = 64 * 1024
+MAX_WINDOW_BYTES = 1024 * 1024
+
+# Largest file read_file returns whole; larger files need a windowed read
+MAX_FULL_READ_BYTES = 10 * 1024 * 1024
+
+# Byte ranges of files from this size on are read through a memory map
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# Longest line kept by line-based reads; the rest of a longer line is skipped
+MAX_LINE_BYTES = 64 * 1024
+
+# Bytes scanned between two progress reports
+PROGRESS_INTERVAL = 8 * 1024 * 1024
+
+_BLOCK_SIZE = 64 * 1024
+
+# Called with (bytes scanned, file size) while a file is scanned
+ProgressCallback = Callable[[int, int], None]
+
+
+def _clamp_window(max_bytes: Optional[int]) -> int:
+    if not max_bytes or max_bytes <= 0:
+        return DEFAULT_WINDOW_BYTES
+    return min(max_bytes, MAX_WINDOW_BYTES)
+
+
+def _leading_continuation_bytes(data: bytes) -> int:
+    """Count the bytes at the start of data that continue a previous UTF-8 character."""
+    count = 0
+    while count < min(3, len(data)) and 0x80 <= data[count] < 0xC0:
+        count += 1
+    return count
+
+
+def _incomplete_trailing_bytes(data: bytes) -> int:
+    """Count the bytes at the end of data that start a UTF-8 character cut off by the window."""
+    for i in range(1, min(4, len(data)) + 1):
+        byte = data[-i]
+        if byte < 0x80:
+            return 0
+        if byte >= 0xC0:
+            needed = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return i if needed > i else 0
+    return 0
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+
+def _iter_lines(f: BinaryIO, size: int, progress: Optional[ProgressCallback] = None) -> Iterator[bytes]:
+    """
+    Iterate over the lines of a binary file, keeping at most MAX_LINE_BYTES of each.
+
+    Args:
+        f: File opened in binary mode
+        size: Size of the file, for progress reports
+        progress: Optional progress callback
+
+    Yields:
+        Lines, with their line ending if they have one
+    """
+    next_report = PROGRESS_INTERVAL
+    while True:
+        line = f.readline(MAX_LINE_BYTES)
+        if not line:
+            break
+        if not line.endswith(b"\n"):
+            # Skip the rest of an overlong line without holding it in memory
+            while True:
+                rest = f.readline(_BLOCK_SIZE)
+                if not rest or rest.endswith(b"\n"):
+                    break
+        if progress is not None and f.tell() >= next_report:
+            progress(f.tell(), size)
+            next_report = f.tell() + PROGRESS_INTERVAL
+        yield line
+
+
+def read_range(full_path: str, offset: int = 0, length: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Read a byte range of a file.
+
+    Args:
+        full_path: Validated absolute path of the file
+        offset: First byte to read; negative values count from the end of the file
+        length: Number of bytes to read (default DEFAULT_WINDOW_BYTES, at most MAX_WINDOW_BYTES)
+
+    Returns:
+        Dict with the decoded content, the offset and length actually read,
+        next_offset, the file size and whether the end of the file was reached
+    """
+    length = _clamp_window(length)
+    size = os.path.getsize(full_path)
+    if offset < 0:
+        offset = max(0, size + offset)
+    offset = min(offset, size)
+    end = min(offset + length, size)
+
+    with open(full_path, "rb") as f:
+        if end <= offset:
+            data = b""
+        elif size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = mm[offset:end]
+        else:
+            f.seek(offset)
+            data = f.read(end - offset)
+
+    # Align the window to character boundaries; the cut-off bytes belong to the neighbouring windows
+    skipped = _leading_continuation_bytes(data) if offset > 0 else 0
+    cut = _incomplete_trailing_bytes(data) if end < size else 0
+    data = data[skipped:len(data) - cut]
+    start = offset + skipped
+    next_offset = start + len(data)
+
+    return {
+        "content": _decode(data),
+        "offset": start,
+        "length": len(data),
+        "next_offset": next_offset,
+        "size": size,
+        "eof": next_offset >= size,
+    }
+
+
+def read_lines(full_path: str, start_line: int = 1, end_line: Optional[int] = None,
+               max_bytes: Optional[int] = None,
+               progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """
+    Read a range of lines of a file.
+
+    Args:
+        full_path: Validated absolute path of the file
+        start_line: First line to read, counting from 1
+        end_line: Last line to read, inclusive (default: as many as fit in max_bytes)
+        max_bytes: Largest content to return (default DEFAULT_WINDOW_BYTES)
+        progress: Optional callback for the bytes scanned to reach the lines
+
+    Returns:
+        Dict with the content, the first and last line returned, next_line,
+        and whether the output was truncated or the end of the file was reached
+    """
+    max_bytes = _clamp_window(max_bytes)
+    start_line = max(1, start_line)
+    size = os.path.getsize(full_path)
+    lines = []
+    used = 0
+    line_number = 0
+    truncated = False
+    eof = True
+
+    with open(full_path, "rb") as f:
+        for line in _iter_lines(f, size, progress):
+            line_number += 1
+            if line_number < start_line:
+                continue
+            if end_line is not None and line_number > end_line:
+                eof = False
+                break
+            if lines and used + len(line) > max_bytes:
+                truncated = True
+                eof = False
+                break
+            lines.append(line)
+            used += len(line)
+
+    last_line = start_line + len(lines) - 1
+    return {
+        "content": _decode(b"".join(lines)),
+        "start_line": start_line,
+        "end_line": last_line,
+        "next_line": last_line + 1,
+        "truncated": truncated,
+        "eof": eof,
+    }
+
+
+def tail_lines(full_path: str, lines: int = 50, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Read the last lines of a file, reading backwards from its end.
+
+    Args:
+        full_path: Validated absolute path of the file
+        lines: Number of lines to return
+        max_bytes: Largest content to return (default DEFAULT_WINDOW_BYTES)
+
+    Returns:
+        Dict with the content, the number of lines returned, the offset the
+        content starts at, the file size, and whether fewer lines than requested
+        were returned because of max_bytes
+    """
+    max_bytes = _clamp_window(max_bytes)
+    lines = max(1, lines)
+    blocks = deque()
+    newlines = 0
+    read = 0
+
+    with open(full_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        pos = size
+        # The newline ending the last line does not start another one
+        while pos > 0 and newlines <= lines and read < max_bytes + 1:
+            step = min(_BLOCK_SIZE, pos, max_bytes + 1 - read)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            blocks.appendleft(block)
+            read += len(block)
+            newlines += block.count(b"\n")
+
+    data = b"".join(blocks)
+    trailing_newline = data.endswith(b"\n")
+    parts = (data[:-1] if trailing_newline else data).split(b"\n")
+    truncated = False
+    if len(parts) > lines:
+        parts = parts[-lines:]
+    elif pos > 0:
+        # The first part is the end of a line that did not fit
+        truncated = True
+        if len(parts) > 1:
+            parts = parts[1:]
+    content = b"\n".join(parts) + (b"\n" if trailing_newline else b"")
+    if len(content) > max_bytes:
+        # A single line longer than the window: keep its end
+        content = content[-max_bytes:]
+        content = content[_leading_continuation_bytes(content):]
+        truncated = True
+
+    return {
+        "content": _decode(content),
+        "lines": len(parts),
+        "offset": size - len(content),
+        "size": size,
+        "truncated": truncated,
+    }
+
+
+def grep_lines(full_path: str, pattern: str, ignore_case: bool = False, context: int = 0,
+               max_matches: int = 100, max_bytes: Optional[int] = None,
+               progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """
+    Find the lines of a file matching a regular expression.
+
+    Args:
+        full_path: Validated absolute path of the file
+        pattern: Regular expression searched for in each line
+        ignore_case: Match case-insensitively
+        context: Number of lines to include before and after each match
+        max_matches: Stop after this many matching lines
+        max_bytes: Largest output to return (default DEFAULT_WINDOW_BYTES)
+        progress: Optional callback for the bytes scanned
+
+    Returns:
+        Dict with the matching lines (and context lines) in file order, each
+        with its line number, the number of matches, the lines scanned, and
+        whether the search stopped early
+
+    Raises:
+        ValueError: If the pattern is not a valid regular expression
+    """
+    max_bytes = _clamp_window(max_bytes)
+    context = max(0, context)
+    try:
+        regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern {pattern!r}: {e}")
+
+    size = os.path.getsize(full_path)
+    results = []
+    before = deque(maxlen=context)
+    after = 0
+    used = 0
+    match_count = 0
+    line_number = 0
+    truncated = False
+
+    def add(number: int, text: str, is_match: bool) -> bool:
+        nonlocal used
+        if results and used + len(text) > max_bytes:
+            return False
+        results.append({"line": number, "text": text, "match": is_match})
+        used += len(text)
+        return True
+
+    with open(full_path, "rb") as f:
+        for line in _iter_lines(f, size, progress):
+            line_number += 1
+            text = _decode(line).rstrip("\r\n")
+            if regex.search(text):
+                if match_count >= max_matches:
+                    truncated = True
+                    break
+                while before:
+                    number, previous = before.popleft()
+                    if not add(number, previous, False):
+                        truncated = True
+                        break
+                if truncated or not add(line_number, text, True):
+                    truncated = True
+                    break
+                match_count += 1
+                after = context
+            elif after > 0:
+                after -= 1
+                if not add(line_number, text, False):
+                    truncated = True
+                    break
+            elif context:
+                before.append((line_number, text))
+
+    return {
+        "matches": results,
+        "match_count": match_count,
+        "lines_scanned": line_number,
+        "truncated": truncated,
+    }
@@ -2,81 +2,66 @@
 Tools package for Radbot.
 
 This package provides various tools for the Radbot agent.
-"""
 
-# Re-export tools from subpackages
-from radbot.tools.basic import get_current_time, get_weather, get_weather_details
-from radbot.tools.homeassistant import (
-    get_ha_client,
-    HomeAssistantRESTClient,
-    search_ha_entities,
-    list_ha_entities,
-    get_ha_entity_state,
-    turn_on_ha_entity,
-    turn_off_ha_entity,
-    toggle_ha_entity,
-)
-from radbot.tools.memory import search_past_conversations, store_important_information
-from radbot.tools.mcp import (
-    create_fileserver_toolset,
-    FileServerMCP,
-    get_available_mcp_tools,
-    convert_to_adk_tool,
-)
-# NOTE: Direct Crawl4AI imports removed - now available via MCP server integration
-# Import compatibility layer for backward compatibility
-from radbot.tools.mcp.mcp_crawl4ai_client import (
-    create_crawl4ai_toolset,
-    test_crawl4ai_connection,
-)
-from radbot.tools.shell import execute_shell_command, ALLOWED_COMMANDS, get_shell_tool
-from radbot.tools.web_search import (
-    create_tavily_search_tool,
-    create_tavily_search_enabled_agent,
-    TavilySearchResults,
-    HAVE_TAVILY,
-)
+The re-exports below are imported on first access: importing one tool
+family (or radbot.tools.registry) does not import the others.
+"""
 
-# Keep todo tools as-is since they're already in a directory
+import importlib
 
-__all__ = [
+# Re-export tools from subpackages
+_LAZY_EXPORTS = {
     # Basic tools
-    "get_current_time",
-    "get_weather",
-    "get_weather_details",
-    
+    "get_current_time": "radbot.tools.basic",
+    "get_weather": "radbot.tools.basic",
+    "get_weather_details": "radbot.tools.basic",
+
     # Home Assistant tools
-    "get_ha_client",
-    "HomeAssistantRESTClient",
-    "search_ha_entities",
-    "list_ha_entities",
-    "get_ha_entity_state",
-    "turn_on_ha_entity",
-    "turn_off_ha_entity",
-    "toggle_ha_entity",
-    
+    "get_ha_client": "radbot.tools.homeassistant",
+    "HomeAssistantRESTClient": "radbot.tools.homeassistant",
+    "search_ha_entities": "radbot.tools.homeassistant",
+    "list_ha_entities": "radbot.tools.homeassistant",
+    "get_ha_entity_state": "radbot.tools.homeassistant",
+    "turn_on_ha_entity": "radbot.tools.homeassistant",
+    "turn_off_ha_entity": "radbot.tools.homeassistant",
+    "toggle_ha_entity": "radbot.tools.homeassistant",
+
     # Memory tools
-    "search_past_conversations",
-    "store_important_information",
-    
+    "search_past_conversations": "radbot.tools.memory",
+    "store_important_information": "radbot.tools.memory",
+
     # MCP tools
-    "create_fileserver_toolset",
-    "FileServerMCP",
-    "get_available_mcp_tools", 
-    "convert_to_adk_tool",
-    
-    # Crawl4AI tools (now via MCP server compatibility layer)
-    "create_crawl4ai_toolset",
-    "test_crawl4ai_connection",
-    
+    "create_fileserver_toolset": "radbot.tools.mcp",
+    "FileServerMCP": "radbot.tools.mcp",
+    "get_available_mcp_tools": "radbot.tools.mcp",
+    "convert_to_adk_tool": "radbot.tools.mcp",
+
+    # NOTE: Direct Crawl4AI imports removed - now available via MCP server integration
+    # Compatibility layer for backward compatibility
+    "create_crawl4ai_toolset": "radbot.tools.mcp.mcp_crawl4ai_client",
+    "test_crawl4ai_connection": "radbot.tools.mcp.mcp_crawl4ai_client",
+
     # Shell tools
-    "execute_shell_command",
-    "ALLOWED_COMMANDS",
-    "get_shell_tool",
-    
+    "execute_shell_command": "radbot.tools.shell",
+    "ALLOWED_COMMANDS": "radbot.tools.shell",
+    "get_shell_tool": "radbot.tools.shell",
+    "get_shell_session_tools": "radbot.tools.shell",
+
     # Web search tools
-    "create_tavily_search_tool",
-    "create_tavily_search_enabled_agent",
-    "TavilySearchResults",
-    "HAVE_TAVILY",
-]
+    "create_tavily_search_tool": "radbot.tools.web_search",
+    "create_tavily_search_enabled_agent": "radbot.tools.web_search",
+    "TavilySearchResults": "radbot.tools.web_search",
+    "HAVE_TAVILY": "radbot.tools.web_search",
+}
+
+# Keep todo tools as-is since they're already in a directory
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+__all__ = list(_LAZY_EXPORTS)
@@ -2,17 +2,30 @@
 MCP tools package.
 
 This package provides the functionality for interacting with Model Context Protocol servers.
+
+The exports below are imported on first access, so importing a submodule
+such as the dynamic tools loader does not import the MCP server library.
 """
 
-# Import Event from ADK 0.3.0
-from google.adk.events import Event
+import importlib
 
 # Direct Crawl4AI imports have been removed - now handled via MCP servers only
 # Use the new adapter instead of the original MCP fileserver client
-from radbot.tools.mcp.filesystem_adapter import create_fileserver_toolset
-from radbot.tools.mcp.mcp_fileserver_server import FileServerMCP
-from radbot.tools.mcp.mcp_tools import get_available_mcp_tools
-from radbot.tools.mcp.mcp_utils import convert_to_adk_tool
+_LAZY_EXPORTS = {
+    "Event": "google.adk.events",
+    "create_fileserver_toolset": "radbot.tools.mcp.filesystem_adapter",
+    "FileServerMCP": "radbot.tools.mcp.mcp_fileserver_server",
+    "get_available_mcp_tools": "radbot.tools.mcp.mcp_tools",
+    "convert_to_adk_tool": "radbot.tools.mcp.mcp_utils",
+}
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
 
 __all__ = [
     "Event",
@@ -10,8 +10,10 @@ import logging
 import json
 import uuid
 import asyncio
+import concurrent.futures
 import inspect
 import contextlib
+from collections import deque
 from typing import Dict, Any, List, Optional, Union, Tuple, Callable
 
 # Import from MCP SDK
@@ -26,6 +28,8 @@ except ImportError:
         "Please install required dependencies with: uv pip install mcp httpx"
     )
 
+from radbot.tools.mcp.io_loop import get_io_loop
+
 logger = logging.getLogger(__name__)
 
 class MCPSSEClient:
@@ -86,10 +90,15 @@ class MCPSSEClient:
         self.server_info = {}
         self.server_version = None
         
-        # For async event loop handling
-        self._loop = None
+        # The session and all HTTP traffic live on the shared MCP I/O loop
+        self._io = get_io_loop()
         self.initialized = False
         
+        # Crawl4AI SSE stream state
+        self._sse_task: Optional[asyncio.Task] = None
+        self._sse_active = False
+        self._pending: Dict[str, asyncio.Future] = {}
+        
         logger.info(f"Initialized MCPSSEClient for {url}")
     
     def _normalize_url(self, url: str) -> str:
@@ -117,7 +126,9 @@ class MCPSSEClient:
         Initialize the connection to the MCP server and retrieve tools.
         
         This method establishes a connection to the MCP server, sets up the
-        client session, and discovers available tools.
+        client session, and discovers available tools. The connection lives on
+        the shared MCP I/O loop, so this is safe to call from any thread,
+        including one running an event loop of its own.
         
         Returns:
             True if initialization was successful, False otherwise
@@ -126,23 +137,15 @@ class MCPSSEClient:
             logger.info("Client already initialized")
             return True
             
-        # Handle special case for Crawl4AI
-        if "crawl4ai" in self.url.lower():
-            success = self._initialize_crawl4ai()
-            if success:
-                self.initialized = True
-                return True
-                
-        # Use asyncio to run the async initialization
         try:
-            if asyncio.get_event_loop().is_running():
-                # We're already in an event loop, use create_task
-                import nest_asyncio
-                nest_asyncio.apply()
-                
-            # Create a new event loop if needed
-            loop = asyncio.get_event_loop()
-            result = loop.run_until_complete(self._initialize_async())
+            # Handle special case for Crawl4AI
+            if "crawl4ai" in self.url.lower():
+                success = self._io.run(self._initialize_crawl4ai(), timeout=self._init_timeout())
+                if success:
+                    self.initialized = True
+                    return True
+                    
+            result = self._io.run(self._initialize_async(), timeout=self._init_timeout())
             
             # If the async initialization failed, try direct HTTP initialization as fallback
             if not result and not self.message_endpoint:
@@ -156,7 +159,7 @@ class MCPSSEClient:
                 
                 # Send initialization request
                 logger.info("Attempting direct HTTP initialization")
-                init_success = self._send_initialization_request()
+                init_success = self._io.run(self._send_initialization_request(), timeout=self._init_timeout())
                 if init_success:
                     # Create default tools
                     logger.info("Direct HTTP initialization succeeded")
@@ -167,9 +170,13 @@ class MCPSSEClient:
             self.initialized = result
             return result
         except Exception as e:
-            logger.error(f"Error initializing MCP client: {e}")
+            logger.error(f"Error initializing MCP client: {e or type(e).__name__}")
             return False
             
+    def _init_timeout(self) -> float:
+        """Seconds an initialization step may take, including the configured delay."""
+        return self.timeout + 20 + (self.initialization_delay or 0) / 1000.0
+    
     async def _initialize_async(self) -> bool:
         """
         Asynchronous initialization method for the MCP client.
@@ -245,13 +252,13 @@ class MCPSSEClient:
                     
             return False
             
-    def _initialize_crawl4ai(self) -> bool:
+    async def _initialize_crawl4ai(self) -> bool:
         """
         Special initialization for Crawl4AI servers.
         
         Crawl4AI servers have specific patterns and tool formats that
         need special handling. This method establishes a persistent SSE connection
-        and sets up event handling.
+        and sets up event handling. Runs on the MCP I/O loop.
         
         Returns:
             True if initialization was successful, False otherwise
@@ -274,178 +281,23 @@ class MCPSSEClient:
             if self.auth_token:
                 sse_headers["Authorization"] = f"Bearer {self.auth_token}"
                 
-            import requests
-            import threading
-            import json
-            import time
-            from collections import deque
-            
-            # Store responses for each request ID
-            self._response_store = {}
-            self._response_events = {}
-            self._response_lock = threading.Lock()
-            self._sse_active = True
+            # Futures of requests waiting for their result on the SSE stream, by request ID
+            self._pending = {}
             self._event_queue = deque(maxlen=100)  # Store last 100 events
+            self._endpoint_ready = asyncio.Event()
+            self._sse_active = True
+            self._sse_task = asyncio.create_task(self._read_crawl4ai_events(sse_url, sse_headers, base_url))
             
-            # Create a new session for SSE
-            self._sse_session = requests.Session()
-            
-            # Function to process SSE events in a background thread
-            def sse_event_handler():
-                try:
-                    logger.info(f"Starting SSE event handler thread for {sse_url}")
-                    sse_response = self._sse_session.get(
-                        sse_url,
-                        headers=sse_headers,
-                        stream=True,
-                        timeout=60
-                    )
-                    
-                    if sse_response.status_code != 200:
-                        logger.error(f"Failed to connect to SSE endpoint: {sse_response.status_code}")
-                        return
-                        
-                    logger.info("SSE connection established, listening for events...")
-                    
-                    # Variables for parsing SSE events
-                    current_event_type = None
-                    current_data = []
-                    message_endpoint = None
-                    session_id = None
-                    
-                    # Process events line by line
-                    for line in sse_response.iter_lines(decode_unicode=True):
-                        if not self._sse_active:
-                            logger.info("SSE connection closing as requested")
-                            break
-                            
-                        if not line:
-                            # Empty line means end of event, process it
-                            if current_event_type and current_data:
-                                event_data = "\n".join(current_data)
-                                
-                                # Store event for debugging/analysis
-                                with self._response_lock:
-                                    self._event_queue.append({
-                                        "type": current_event_type,
-                                        "data": event_data
-                                    })
-                                
-                                logger.debug(f"SSE event: {current_event_type}, data: {event_data[:100]}...")
-                                
-                                # Handle different event types
-                                if current_event_type == "endpoint":
-                                    # Extract message endpoint
-                                    try:
-                                        endpoint_path = event_data.strip()
-                                        message_endpoint = f"{base_url}{endpoint_path}"
-                                        
-                                        # Extract session ID if present
-                                        if "session_id=" in message_endpoint:
-                                            session_id = message_endpoint.split("session_id=")[1].split("&")[0]
-                                            logger.info(f"Extracted session ID: {session_id}")
-                                            
-                                            # Set them in the client instance
-                                            with self._response_lock:
-                                                self.session_id = session_id
-                                                self.message_endpoint = message_endpoint
-                                                
-                                            logger.info(f"Set message endpoint: {message_endpoint}")
-                                    except Exception as e:
-                                        logger.error(f"Error parsing endpoint event: {e}")
-                                        
-                                elif current_event_type == "result":
-                                    # This is a tool response
-                                    try:
-                                        result_data = json.loads(event_data)
-                                        
-                                        # Check if this is a response to a specific request
-                                        if "id" in result_data:
-                                            request_id = result_data["id"]
-                                            
-                                            # Store the result for the request
-                                            with self._response_lock:
-                                                self._response_store[request_id] = result_data
-                                                
-                                                # Signal any waiting threads
-                                                if request_id in self._response_events:
-                                                    self._response_events[request_id].set()
-                                                    
-                                            logger.info(f"Stored result for request {request_id}")
-                                    except json.JSONDecodeError:
-                                        logger.warning(f"Failed to parse result event as JSON: {event_data[:100]}...")
-                                    except Exception as e:
-                                        logger.error(f"Error handling result event: {e}")
-                                        
-                                # Reset for next event
-                                current_event_type = None
-                                current_data = []
-                                
-                        elif line.startswith("event:"):
-                            # Start of new event
-                            current_event_type = line[6:].strip()
-                            current_data = []
-                        elif line.startswith("data:"):
-                            # Event data
-                            data_content = line[5:].strip()
-                            current_data.append(data_content)
-                            
-                            # Direct data line might contain session info
-                            if not session_id and not message_endpoint:
-                                try:
-                                    # Check if it contains a session ID path
-                                    if "/session_id=" in data_content or "session_id=" in data_content:
-                                        logger.info(f"Found direct data with session ID: {data_content}")
-                                        
-                                        # Determine if it's a full URL or just a path
-                                        if data_content.startswith("http"):
-                                            message_endpoint = data_content
-                                        else:
-                                            message_endpoint = f"{base_url}{data_content}"
-                                        
-                                        # Extract session ID
-                                        if "session_id=" in message_endpoint:
-                                            session_id = message_endpoint.split("session_id=")[1].split("&")[0]
-                                            logger.info(f"Extracted session ID from data: {session_id}")
-                                            
-                                            # Set them in the client instance
-                                            with self._response_lock:
-                                                self.session_id = session_id
-                                                self.message_endpoint = message_endpoint
-                                                
-                                            logger.info(f"Set message endpoint from data: {message_endpoint}")
-                                except Exception as e:
-                                    logger.error(f"Error parsing data content: {e}")
-                                    
-                    logger.info("SSE event stream ended")
-                    
-                    # Clean up
-                    sse_response.close()
-                    
-                except Exception as e:
-                    logger.error(f"Error in SSE event handler: {e}")
-                finally:
-                    # Make sure we mark the connection as inactive
-                    self._sse_active = False
-                    logger.info("SSE event handler thread exiting")
-            
-            # Start the SSE event handler in a background thread
-            self._sse_thread = threading.Thread(target=sse_event_handler, daemon=True)
-            self._sse_thread.start()
-            
-            # Wait for session ID and message endpoint to be set by the event handler
+            # Wait for session ID and message endpoint to be set by the event reader
             # This is necessary before we can send requests
-            start_time = time.time()
-            max_wait = 15  # seconds
-            while time.time() - start_time < max_wait:
-                if self.session_id and self.message_endpoint:
-                    logger.info("Session ID and message endpoint received")
-                    break
-                time.sleep(0.1)
+            try:
+                await asyncio.wait_for(self._endpoint_ready.wait(), timeout=15)
+                logger.info("Session ID and message endpoint received")
+            except asyncio.TimeoutError:
+                logger.warning(f"Timed out waiting for session ID and message endpoint")
                 
             # Check if we got the session ID and message endpoint
             if not self.session_id or not self.message_endpoint:
-                logger.warning(f"Timed out waiting for session ID and message endpoint")
                 # Generate fallbacks
                 self.session_id = self.session_id or str(uuid.uuid4())
                 self.message_endpoint = self.message_endpoint or f"{base_url}/mcp/messages/?session_id={self.session_id}"
@@ -456,11 +308,11 @@ class MCPSSEClient:
             if self.initialization_delay:
                 delay_seconds = self.initialization_delay / 1000.0
                 logger.info(f"Waiting {delay_seconds}s before continuing (initialization delay)")
-                time.sleep(delay_seconds)
+                await asyncio.sleep(delay_seconds)
             
             # Send initialization request to establish the session properly
             # This is crucial for MCP protocol compliance
-            init_success = self._send_initialization_request()
+            init_success = await self._send_initialization_request()
             logger.info(f"Initialization request {'succeeded' if init_success else 'failed'}")
             
             # Create the Crawl4AI tools
@@ -472,7 +324,110 @@ class MCPSSEClient:
             logger.error(f"Error initializing Crawl4AI client: {e}")
             return False
     
-    def _send_initialization_request(self) -> bool:
+    async def _read_crawl4ai_events(self, sse_url: str, sse_headers: Dict[str, str], base_url: str) -> None:
+        """
+        Read the Crawl4AI SSE stream, resolving the futures of pending requests.
+        
+        Args:
+            sse_url: URL of the SSE stream
+            sse_headers: Headers for the stream request
+            base_url: Base URL that endpoint paths are relative to
+        """
+        try:
+            logger.info(f"Starting SSE event reader for {sse_url}")
+            async with self._io.get_http_client().stream("GET", sse_url, headers=sse_headers) as sse_response:
+                if sse_response.status_code != 200:
+                    logger.error(f"Failed to connect to SSE endpoint: {sse_response.status_code}")
+                    return
+                    
+                logger.info("SSE connection established, listening for events...")
+                
+                # Variables for parsing SSE events
+                current_event_type = None
+                current_data = []
+                
+                # Process events line by line
+                async for line in sse_response.aiter_lines():
+                    if not line:
+                        # Empty line means end of event, process it
+                        if current_event_type and current_data:
+                            self._handle_crawl4ai_event(current_event_type, "\n".join(current_data), base_url)
+                        # Reset for next event
+                        current_event_type = None
+                        current_data = []
+                        
+                    elif line.startswith("event:"):
+                        # Start of new event
+                        current_event_type = line[6:].strip()
+                        current_data = []
+                    elif line.startswith("data:"):
+                        # Event data
+                        data_content = line[5:].strip()
+                        current_data.append(data_content)
+                        
+                        # Direct data line might contain session info
+                        if not self._endpoint_ready.is_set() and "session_id=" in data_content:
+                            logger.info(f"Found direct data with session ID: {data_content}")
+                            # Determine if it's a full URL or just a path
+                            if data_content.startswith("http"):
+                                self._set_message_endpoint(data_content)
+                            else:
+                                self._set_message_endpoint(f"{base_url}{data_content}")
+                                
+            logger.info("SSE event stream ended")
+            
+        except asyncio.CancelledError:
+            logger.info("SSE connection closing as requested")
+            raise
+        except Exception as e:
+            logger.error(f"Error in SSE event reader: {e}")
+        finally:
+            # Make sure we mark the connection as inactive, and fail the requests still waiting
+            self._sse_active = False
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("SSE stream closed"))
+            logger.info("SSE event reader exiting")
+    
+    def _handle_crawl4ai_event(self, event_type: str, event_data: str, base_url: str) -> None:
+        """Handle one complete event of the Crawl4AI SSE stream."""
+        # Store event for debugging/analysis
+        self._event_queue.append({
+            "type": event_type,
+            "data": event_data
+        })
+        logger.debug(f"SSE event: {event_type}, data: {event_data[:100]}...")
+        
+        # Handle different event types
+        if event_type == "endpoint":
+            # Extract message endpoint
+            self._set_message_endpoint(f"{base_url}{event_data.strip()}")
+                
+        elif event_type == "result":
+            # This is a tool response
+            try:
+                result_data = json.loads(event_data)
+            except json.JSONDecodeError:
+                logger.warning(f"Failed to parse result event as JSON: {event_data[:100]}...")
+                return
+                
+            # Check if this is a response to a specific request
+            request_id = result_data.get("id") if isinstance(result_data, dict) else None
+            future = self._pending.get(request_id)
+            if future is not None and not future.done():
+                future.set_result(result_data)
+                logger.info(f"Received result for request {request_id}")
+    
+    def _set_message_endpoint(self, message_endpoint: str) -> None:
+        """Take the message endpoint and session ID announced by the server."""
+        if "session_id=" not in message_endpoint:
+            return
+        self.session_id = message_endpoint.split("session_id=")[1].split("&")[0]
+        self.message_endpoint = message_endpoint
+        logger.info(f"Set message endpoint: {message_endpoint}")
+        self._endpoint_ready.set()
+    
+    async def _send_initialization_request(self) -> bool:
         """
         Send a proper initialization request to the server.
         
@@ -487,7 +442,7 @@ class MCPSSEClient:
             return False
             
         try:
-            import requests
+            http = self._io.get_http_client()
             
             # Prepare the initialization request
             init_request = {
@@ -515,7 +470,7 @@ class MCPSSEClient:
             
             # Send the initialization request
             logger.info(f"Sending initialization request to {self.message_endpoint}")
-            response = requests.post(
+            response = await http.post(
                 self.message_endpoint,
                 headers=headers,
                 json=init_request,
@@ -534,7 +489,7 @@ class MCPSSEClient:
                 }
                 
                 logger.info(f"Sending tools/list request to {self.message_endpoint}")
-                list_response = requests.post(
+                list_response = await http.post(
                     self.message_endpoint,
                     headers=headers,
                     json=list_tools_request,
@@ -659,13 +614,7 @@ class MCPSSEClient:
             tool_schema = tool_def["schema"]
             
             # Create the function that will call the MCP server
-            def create_tool_function(name):
-                def tool_function(**kwargs):
-                    return self._call_tool(name, kwargs)
-                tool_function.__name__ = name
-                return tool_function
-                
-            function = create_tool_function(tool_name)
+            function = self._make_tool_function(tool_name)
             
             try:
                 # Try different approaches to create FunctionTool based on ADK version
@@ -747,13 +696,7 @@ class MCPSSEClient:
                     logger.info(f"Processing tool: {tool_name}")
                     
                     # Create function for this tool
-                    def create_tool_function(name):
-                        def tool_function(**kwargs):
-                            return self._call_tool(name, kwargs)
-                        tool_function.__name__ = name
-                        return tool_function
-                        
-                    function = create_tool_function(tool_name)
+                    function = self._make_tool_function(tool_name)
                     
                     # Create FunctionTool with appropriate schema
                     try:
@@ -789,13 +732,7 @@ class MCPSSEClient:
                     logger.info(f"Processing tuple tool: {tool_name}")
                     
                     # Create function for this tool
-                    def create_tool_function(name):
-                        def tool_function(**kwargs):
-                            return self._call_tool(name, kwargs)
-                        tool_function.__name__ = name
-                        return tool_function
-                        
-                    function = create_tool_function(tool_name)
+                    function = self._make_tool_function(tool_name)
                     
                     # Create schema if available
                     if len(tool_info) >= 3:
@@ -835,13 +772,7 @@ class MCPSSEClient:
                     logger.info(f"Processing dict tool: {tool_name}")
                     
                     # Create function for this tool
-                    def create_tool_function(name):
-                        def tool_function(**kwargs):
-                            return self._call_tool(name, kwargs)
-                        tool_function.__name__ = name
-                        return tool_function
-                        
-                    function = create_tool_function(tool_name)
+                    function = self._make_tool_function(tool_name)
                     
                     # Get schema from dictionary
                     schema = {
@@ -875,9 +806,52 @@ class MCPSSEClient:
                 
         logger.info(f"Processed {len(self.tools)} tools")
         
-    def _call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
+    def _make_tool_function(self, name: str) -> Callable[..., Any]:
+        """Create the function an ADK tool calls to run an MCP tool."""
+        async def tool_function(**kwargs):
+            return await self.call_tool_async(name, kwargs)
+        tool_function.__name__ = name
+        return tool_function
+        
+    def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
+        """
+        Call a tool on the MCP server, blocking until the result is ready.
+        
+        Safe to call from any thread except the MCP I/O loop's; coroutines
+        should await call_tool_async instead.
+        
+        Args:
+            tool_name: The name of the tool to call
+            args: The arguments to pass to the tool
+            
+        Returns:
+            The result of the tool call, or a dict with "error" and "message"
+        """
+        try:
+            return self.submit_tool_call(tool_name, args).result(timeout=self.timeout + 35)
+        except Exception as e:
+            logger.error(f"Error calling tool {tool_name}: {e or type(e).__name__}")
+            return {
+                "error": f"Failed to call tool {tool_name}",
+                "message": str(e) or type(e).__name__
+            }
+        
+    def submit_tool_call(self, tool_name: str, args: Dict[str, Any]) -> concurrent.futures.Future:
         """
-        Call a tool on the MCP server.
+        Start a tool call on the MCP server without waiting for it, from any thread.
+        
+        Args:
+            tool_name: The name of the tool to call
+            args: The arguments to pass to the tool
+            
+        Returns:
+            A future of the result of the tool call; cancelling it cancels the call
+        """
+        return self._io.submit(self._dispatch_tool_call(tool_name, args))
+        
+    async def call_tool_async(self, tool_name: str, args: Dict[str, Any]) -> Any:
+        """
+        Call a tool on the MCP server from a coroutine, on any event loop.
         
         Args:
             tool_name: The name of the tool to call
@@ -886,68 +860,47 @@ class MCPSSEClient:
         Returns:
             The result of the tool call
         """
+        return await self._io.run_async(self._dispatch_tool_call(tool_name, args))
+        
+    async def _dispatch_tool_call(self, tool_name: str, args: Dict[str, Any]) -> Any:
+        """
+        Call a tool over the session, falling back to the message endpoint. Runs on the MCP I/O loop.
+        
+        Args:
+            tool_name: The name of the tool to call
+            args: The arguments to pass to the tool
+            
+        Returns:
+            The result of the tool call, or a dict with "error" and "message"
+        """
         logger.info(f"Calling tool {tool_name} with args: {args}")
         
         # If we have an active session, use it
         if self.session:
             try:
-                # Run the async call in the event loop
-                if asyncio.get_event_loop().is_running():
-                    # We're already in an event loop, use create_task
-                    import nest_asyncio
-                    nest_asyncio.apply()
-                    
-                loop = asyncio.get_event_loop()
-                result = loop.run_until_complete(self._call_tool_async(tool_name, args))
+                result = await self.session.call_tool(tool_name, args)
+                logger.info(f"Tool call successful: {result}")
                 return result
             except Exception as e:
-                logger.error(f"Error calling tool via session: {e}")
-                # Fall back to direct HTTP call
+                if not self.message_endpoint:
+                    logger.error(f"Error calling tool {tool_name} via session: {e}")
+                    return {
+                        "error": f"Failed to call tool {tool_name}",
+                        "message": str(e)
+                    }
+                logger.warning(f"Error calling tool {tool_name} via session, falling back to HTTP: {e}")
                 
         # If we have a message endpoint, make a direct HTTP call
         if self.message_endpoint:
-            return self._call_tool_http(tool_name, args)
+            return await self._call_tool_http(tool_name, args)
             
         logger.error(f"No session or message endpoint available to call tool {tool_name}")
         return {
             "error": f"Failed to call tool {tool_name}",
             "message": "No session or message endpoint available"
         }
-        
-    async def _call_tool_async(self, tool_name: str, args: Dict[str, Any]) -> Any:
-        """
-        Call a tool on the MCP server asynchronously.
-        
-        Args:
-            tool_name: The name of the tool to call
-            args: The arguments to pass to the tool
-            
-        Returns:
-            The result of the tool call
-        """
-        try:
-            logger.info(f"Calling tool {tool_name} asynchronously")
-            
-            if not self.session:
-                logger.error("No session available")
-                return {
-                    "error": f"Failed to call tool {tool_name}",
-                    "message": "No session available"
-                }
-                
-            # Call the tool using the session
-            result = await self.session.call_tool(tool_name, args)
-            logger.info(f"Tool call successful: {result}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error in async tool call: {e}")
-            return {
-                "error": f"Failed to call tool {tool_name}",
-                "message": str(e)
-            }
             
-    def _call_tool_http(self, tool_name: str, args: Dict[str, Any]) -> Any:
+    async def _call_tool_http(self, tool_name: str, args: Dict[str, Any]) -> Any:
         """
         Call a tool on the MCP server via direct HTTP request.
         
@@ -955,6 +908,8 @@ class MCPSSEClient:
         1. Send the request via HTTP
         2. Wait for a response from the SSE stream if the call returns 202 Accepted
         
+        Runs on the MCP I/O loop.
+        
         Args:
             tool_name: The name of the tool to call
             args: The arguments to pass to the tool
@@ -962,10 +917,7 @@ class MCPSSEClient:
         Returns:
             The result of the tool call
         """
-        import requests
-        import threading
-        import time
-        
+        request_id = None
         try:
             # For Crawl4AI, we need to ensure the session_id is in the URL
             endpoint_url = self.message_endpoint
@@ -1018,20 +970,16 @@ class MCPSSEClient:
             headers = {**self.headers}
             headers["Content-Type"] = "application/json"
             
-            # For Crawl4AI, set up an event to wait for the SSE response
-            waiting_for_sse_response = False
-            sse_response_event = None
+            # For Crawl4AI, register a future the SSE reader resolves with the response
+            sse_response_future = None
             
-            if "crawl4ai" in self.url.lower() and hasattr(self, '_sse_active') and self._sse_active:
-                # Create an event for this request
-                sse_response_event = threading.Event()
-                with self._response_lock:
-                    self._response_events[request_id] = sse_response_event
-                waiting_for_sse_response = True
-                logger.info(f"Set up SSE response event for request {request_id}")
+            if "crawl4ai" in self.url.lower() and self._sse_active:
+                sse_response_future = asyncio.get_running_loop().create_future()
+                self._pending[request_id] = sse_response_future
+                logger.info(f"Waiting on the SSE stream for request {request_id}")
             
             # Make the request
-            response = requests.post(
+            response = await self._io.get_http_client().post(
                 endpoint_url,
                 headers=headers,
                 json=request_data,
@@ -1078,36 +1026,23 @@ class MCPSSEClient:
                         logger.info(f"Tool {tool_name} call accepted (202)")
                         
                         # If we're waiting for an SSE response from Crawl4AI
-                        if waiting_for_sse_response and sse_response_event:
-                            # Wait for the result to come through the SSE stream
-                            logger.info(f"Waiting for SSE response for request {request_id}")
-                            
-                            # Wait up to 30 seconds for a response
+                        if sse_response_future is not None:
+                            # Wait up to 30 seconds for the result to come through the SSE stream
                             max_wait = 30
-                            sse_response_event.wait(timeout=max_wait)
-                            
-                            # Check if we got a response
-                            with self._response_lock:
-                                if request_id in self._response_store:
-                                    result = self._response_store[request_id]
-                                    logger.info(f"Received SSE response for request {request_id}")
-                                    
-                                    # Clean up
-                                    del self._response_store[request_id]
-                                    del self._response_events[request_id]
-                                    
-                                    # Process the result
-                                    if "result" in result:
-                                        return result.get("result")
-                                    elif "output" in result:
-                                        return result.get("output")
-                                    else:
-                                        return result
+                            try:
+                                result = await asyncio.wait_for(sse_response_future, timeout=max_wait)
+                                logger.info(f"Received SSE response for request {request_id}")
+                                
+                                # Process the result
+                                if "result" in result:
+                                    return result.get("result")
+                                elif "output" in result:
+                                    return result.get("output")
                                 else:
-                                    logger.warning(f"No SSE response received for request {request_id} after {max_wait}s")
-                                    # Clean up
-                                    if request_id in self._response_events:
-                                        del self._response_events[request_id]
+                                    return result
+                            except (asyncio.TimeoutError, ConnectionError) as e:
+                                logger.warning(f"No SSE response received for request {request_id}: "
+                                               f"{e or f'timed out after {max_wait}s'}")
                         
                         # If no SSE response or we didn't get one in time, return basic accepted response
                         if response.text.strip():
@@ -1151,6 +1086,8 @@ class MCPSSEClient:
                 "error": f"Failed to call tool {tool_name}",
                 "message": str(e)
             }
+        finally:
+            self._pending.pop(request_id, None)
             
     def discover_tools(self) -> List[str]:
         """
@@ -1258,41 +1195,77 @@ class MCPSSEClient:
             
         return self.tools
         
+    def ping(self) -> bool:
+        """
+        Check that the server connection is alive.
+        
+        Returns:
+            True if the server answered a ping (over the session, or the message
+            endpoint for clients initialized over direct HTTP), or the Crawl4AI
+            event stream is open
+        """
+        if self._sse_task is not None:
+            return self._sse_active
+        if self.session:
+            ping = self.session.send_ping()
+        elif self.initialized and self.message_endpoint:
+            # Initialized through the direct HTTP fallback: ping the message endpoint
+            ping = self._ping_http()
+        else:
+            return False
+        try:
+            self._io.run(ping, timeout=self.timeout)
+            return True
+        except Exception as e:
+            logger.debug(f"Ping to {self.url} failed: {e or type(e).__name__}")
+            return False
+    
+    async def _ping_http(self) -> None:
+        """
+        Send a JSON-RPC ping to the message endpoint. Runs on the MCP I/O loop.
+        
+        Raises:
+            ConnectionError: If the server did not accept the ping
+        """
+        response = await self._io.get_http_client().post(
+            self.message_endpoint,
+            headers={**self.headers, "Content-Type": "application/json"},
+            json={"jsonrpc": "2.0", "method": "ping", "id": str(uuid.uuid4())},
+            timeout=self.timeout
+        )
+        if response.status_code not in (200, 202):
+            raise ConnectionError(f"HTTP error: {response.status_code}")
+    
+    def stop(self) -> None:
+        """Close the session and the Crawl4AI event stream."""
+        if self.session is None and self._sse_task is None:
+            return
+        try:
+            self._io.run(self._close_async(), timeout=10)
+        except Exception as e:
+            logger.warning(f"Could not close MCP session for {self.url}: {e or type(e).__name__}")
+    
+    async def _close_async(self) -> None:
+        """Stop the Crawl4AI event reader, then close the session. Runs on the MCP I/O loop."""
+        if self._sse_task is not None:
+            logger.info("Closing SSE connection")
+            self._sse_task.cancel()
+            await asyncio.gather(self._sse_task, return_exceptions=True)
+            self._sse_task = None
+            self._sse_active = False
+        await self._close_session()
+    
     def __del__(self):
         """
         Clean up resources when the client is deleted.
         """
-        # First, clean up any Crawl4AI SSE connections
-        if hasattr(self, '_sse_active') and self._sse_active:
-            try:
-                logger.info("Closing SSE connection")
-                self._sse_active = False
-                
-                # Close the session if it exists
-                if hasattr(self, '_sse_session'):
-                    self._sse_session.close()
-                    
-                # Wait a little for the SSE thread to finish if it's running
-                if hasattr(self, '_sse_thread') and self._sse_thread.is_alive():
-                    self._sse_thread.join(timeout=1.0)
-                    
-                logger.info("SSE connection closed")
-            except Exception as e:
-                logger.warning(f"Error closing SSE connection: {e}")
-        
-        # Close any open async sessions/contexts
-        if self.session and self._session_context:
-            # We need to close the session in the event loop
-            try:
-                if asyncio.get_event_loop().is_running():
-                    # We're already in an event loop
-                    import nest_asyncio
-                    nest_asyncio.apply()
-                    
-                loop = asyncio.get_event_loop()
-                loop.run_until_complete(self._close_session())
-            except Exception as e:
-                logger.warning(f"Could not close session in event loop: {e}")
+        # The I/O loop may be gone at interpreter shutdown, and run() must not
+        # be called from the loop itself
+        try:
+            if not self._io.in_loop_thread() and self._io.loop.is_running():
+                self.stop()
+        except Exception:
+            pass
                 
     async def _close_session(self):
         """
@@ -8,10 +8,7 @@ agent initialization code when adding new MCP servers.
 """
 
 import logging
-import asyncio
-import threading
 from typing import List, Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor
 
 from radbot.config.config_loader import config_loader
 from radbot.tools.mcp.mcp_client_factory import MCPClientFactory, MCPClientError
@@ -24,8 +21,8 @@ def load_dynamic_mcp_tools() -> List[Any]:
     
     This function:
     1. Reads all MCP servers from config
-    2. Gets clients for enabled servers
-    3. Gets all tools from each client
+    2. Gets the client pool of each enabled server
+    3. Gets all tools from each pool
     4. Returns a combined list of all tools
     
     Returns:
@@ -55,57 +52,10 @@ def load_dynamic_mcp_tools() -> List[Any]:
                 continue
                 
             try:
-                # Try to get the client for this server
-                client = MCPClientFactory.get_client(server_id)
-                if not client:
-                    logger.warning(f"Failed to get client for MCP server {server_id}")
-                    continue
-                    
-                # Check if this is an async client that needs initialization
-                if hasattr(client, "check_initialization") and callable(client.check_initialization):
-                    # This is an async client that needs special handling
-                    try:
-                        # Use a background thread to run the async operation
-                        init_result = {"success": False, "error": None}
-
-                        def init_async_client():
-                            nonlocal init_result
-                            try:
-                                # This thread will have its own event loop
-                                loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(loop)
-                                try:
-                                    # Run the initialization
-                                    success = loop.run_until_complete(client.check_initialization())
-                                    init_result["success"] = success
-                                finally:
-                                    loop.close()
-                            except Exception as e:
-                                init_result["error"] = str(e)
-
-                        # Start a separate thread for async initialization
-                        init_thread = threading.Thread(target=init_async_client)
-                        init_thread.start()
-                        init_thread.join()  # Wait for it to complete
-
-                        # Check the result
-                        if not init_result["success"]:
-                            error_msg = init_result.get("error", "Unknown error")
-                            logger.warning(f"Failed to initialize async client for MCP server {server_id}: {error_msg}")
-                            continue
-                    except Exception as e:
-                        logger.error(f"Error initializing async client for MCP server {server_id}: {e}")
-                        continue
-
-                # Get tools from this client
-                if hasattr(client, "get_tools") and callable(client.get_tools):
-                    tools = client.get_tools()
-                elif hasattr(client, "tools"):
-                    tools = client.tools
-                else:
-                    # No tools found
-                    logger.warning(f"No tools found for MCP server {server_id}")
-                    continue
+                # The server's pool starts its clients and hands out tools that
+                # dispatch each call to a healthy one of them
+                pool = MCPClientFactory.get_pool(server_id)
+                tools = pool.get_tools()
                     
                 # Add tools to our list
                 if tools:
@@ -144,57 +94,9 @@ def load_specific_mcp_tools(server_id: str) -> List[Any]:
         List of tools from the specified server
     """
     try:
-        # Try to get the client for this server
-        client = MCPClientFactory.get_client(server_id)
-        if not client:
-            logger.warning(f"Failed to get client for MCP server {server_id}")
-            return []
-            
-        # Check if this is an async client that needs initialization
-        if hasattr(client, "check_initialization") and callable(client.check_initialization):
-            # This is an async client that needs special handling
-            try:
-                # Use a background thread to run the async operation
-                init_result = {"success": False, "error": None}
-
-                def init_async_client():
-                    nonlocal init_result
-                    try:
-                        # This thread will have its own event loop
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        try:
-                            # Run the initialization
-                            success = loop.run_until_complete(client.check_initialization())
-                            init_result["success"] = success
-                        finally:
-                            loop.close()
-                    except Exception as e:
-                        init_result["error"] = str(e)
-
-                # Start a separate thread for async initialization
-                init_thread = threading.Thread(target=init_async_client)
-                init_thread.start()
-                init_thread.join()  # Wait for it to complete
-
-                # Check the result
-                if not init_result["success"]:
-                    error_msg = init_result.get("error", "Unknown error")
-                    logger.warning(f"Failed to initialize async client for MCP server {server_id}: {error_msg}")
-                    return []
-            except Exception as e:
-                logger.error(f"Error initializing async client for MCP server {server_id}: {e}")
-                return []
-
-        # Get tools from this client
-        if hasattr(client, "get_tools") and callable(client.get_tools):
-            tools = client.get_tools()
-        elif hasattr(client, "tools"):
-            tools = client.tools
-        else:
-            # No tools found
-            logger.warning(f"No tools found for MCP server {server_id}")
-            return []
+        # The server's pool starts its clients and hands out tools that
+        # dispatch each call to a healthy one of them
+        tools = MCPClientFactory.get_pool(server_id).get_tools()
             
         # Return the tools
         if tools:
@@ -0,0 +1,149 @@
+"""
+Background asyncio loop for MCP network I/O.
+
+MCP SSE sessions are asyncio objects bound to the loop they were opened on.
+Running them on whatever loop the caller happens to have (and re-entering it
+with nest_asyncio when it is already running) blocks the web server's loop
+and breaks sessions opened on another loop. Instead, one daemon thread runs
+a loop that owns every MCP HTTP/SSE connection, plus a shared keep-alive
+``httpx.AsyncClient``. Callers hand it coroutines:
+
+- ``submit`` returns a ``concurrent.futures.Future``, from any thread;
+- ``run`` blocks a synchronous caller until the result is ready;
+- ``run_async`` awaits the result from a coroutine on another loop.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class MCPIOLoop:
+    """An asyncio loop on a daemon thread, owning MCP network connections."""
+
+    def __init__(self, name: str = "mcp-io"):
+        """
+        Start the loop thread.
+
+        Args:
+            name: Name of the thread
+        """
+        self._loop = asyncio.new_event_loop()
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The loop the MCP connections live on."""
+        return self._loop
+
+    def in_loop_thread(self) -> bool:
+        """Whether the caller is running on the I/O loop's thread."""
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the I/O loop.
+
+        Args:
+            coro: The coroutine to run
+
+        Returns:
+            A future of its result; cancelling it cancels the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the I/O loop and wait for its result.
+
+        Args:
+            coro: The coroutine to run
+            timeout: Seconds to wait; the coroutine is cancelled on timeout
+
+        Returns:
+            The coroutine's result
+
+        Raises:
+            RuntimeError: If called from the I/O loop itself, which would deadlock
+            concurrent.futures.TimeoutError: If the timeout expired
+        """
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("MCPIOLoop.run() called from the MCP I/O loop; await the coroutine instead")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    async def run_async(self, coro: Awaitable[Any]) -> Any:
+        """
+        Await a coroutine on the I/O loop from another loop.
+
+        Args:
+            coro: The coroutine to run
+
+        Returns:
+            The coroutine's result
+        """
+        if self.in_loop_thread():
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def get_http_client(self) -> httpx.AsyncClient:
+        """
+        Get the shared HTTP client. Only use it from the I/O loop.
+
+        Returns:
+            An httpx.AsyncClient keeping connections alive between requests
+        """
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0, read=None),
+                limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60.0),
+            )
+        return self._http_client
+
+    def close(self, timeout: float = 5) -> None:
+        """Close the shared HTTP client and stop the loop."""
+        if self._loop.is_closed():
+            return
+        if self._http_client is not None:
+            client, self._http_client = self._http_client, None
+            try:
+                self.run(client.aclose(), timeout=timeout)
+            except Exception as e:
+                logger.warning(f"Error closing MCP HTTP client: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=timeout)
+
+
+# Singleton I/O loop instance
+_io_loop: Optional[MCPIOLoop] = None
+_io_loop_lock = threading.Lock()
+
+
+def get_io_loop() -> MCPIOLoop:
+    """Get the shared MCP I/O loop, starting it on first call."""
+    global _io_loop
+    if _io_loop is None:
+        with _io_loop_lock:
+            if _io_loop is None:
+                _io_loop = MCPIOLoop()
+    return _io_loop
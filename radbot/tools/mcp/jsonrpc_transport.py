@@ -0,0 +1,309 @@
+"""
+Multiplexed JSON-RPC transport over the stdio of an MCP server process.
+
+MCP stdio servers speak newline-delimited JSON-RPC 2.0. The transport runs the
+server as an asyncio subprocess and keeps one reader task on its stdout that
+matches each response to the pending request with the same ``id``, so any
+number of requests can be in flight at once and responses may arrive in any
+order. Server notifications are passed to registered handlers; coroutine
+handlers run as tasks of their own, so a handler may itself send requests
+whose responses the reader delivers. Each request has its own timeout; a request that times out or is cancelled is
+withdrawn with a ``notifications/cancelled`` message to the server.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+# Longest line read from the server; tool results can be large
+DEFAULT_LINE_LIMIT = 64 * 1024 * 1024
+
+NotificationHandler = Callable[[str, Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+class JSONRPCError(Exception):
+    """An error response from the server."""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(f"{message} (code {code})")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class StdioJSONRPCTransport:
+    """JSON-RPC client for a server process speaking over stdin and stdout."""
+
+    def __init__(self,
+                 command: str,
+                 args: Optional[List[str]] = None,
+                 working_directory: Optional[str] = None,
+                 env: Optional[Dict[str, str]] = None,
+                 timeout: float = 30,
+                 stderr_callback: Optional[Callable[[str], None]] = None,
+                 line_limit: int = DEFAULT_LINE_LIMIT):
+        """
+        Initialize the transport.
+
+        Args:
+            command: The command to execute
+            args: Arguments for the command
+            working_directory: Working directory for the command
+            env: Environment variables added to the current environment
+            timeout: Default request timeout in seconds
+            stderr_callback: Called with each line the server writes to stderr
+            line_limit: Longest message accepted from the server, in bytes
+        """
+        self.command = command
+        self.args = args or []
+        self.working_directory = working_directory
+        self.env = env
+        self.timeout = timeout
+        self.stderr_callback = stderr_callback or (lambda line: logger.debug(f"Server stderr: {line.rstrip()}"))
+        self.line_limit = line_limit
+
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._handlers: Dict[str, List[NotificationHandler]] = {}
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._tasks: List[asyncio.Task] = []
+        self._handler_tasks: Set[asyncio.Task] = set()
+        self._closed = True
+
+    @property
+    def closed(self) -> bool:
+        """Whether the server process is gone or the transport was closed."""
+        return self._closed
+
+    @property
+    def pending_count(self) -> int:
+        """Number of requests waiting for a response."""
+        return len(self._pending)
+
+    def on_notification(self, method: str, handler: NotificationHandler) -> None:
+        """
+        Register a handler for server notifications.
+
+        Args:
+            method: Notification method, or "*" for every notification
+            handler: Function or coroutine function called with (method, params)
+        """
+        self._handlers.setdefault(method, []).append(handler)
+
+    async def start(self) -> None:
+        """Start the server process and the reader tasks."""
+        if not self._closed:
+            return
+        process_env = os.environ.copy()
+        if self.env:
+            process_env.update(self.env)
+
+        logger.info(f"Starting MCP server process: {' '.join([self.command] + self.args)}")
+        self.process = await asyncio.create_subprocess_exec(
+            self.command, *self.args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.working_directory,
+            env=process_env,
+            limit=self.line_limit,
+        )
+        self._write_lock = asyncio.Lock()
+        self._closed = False
+        self._tasks = [
+            asyncio.create_task(self._read_stdout()),
+            asyncio.create_task(self._read_stderr()),
+        ]
+        logger.info(f"Started MCP server process with PID: {self.process.pid}")
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None) -> Any:
+        """
+        Send a request and wait for its response.
+
+        Args:
+            method: JSON-RPC method
+            params: Request parameters
+            timeout: Seconds to wait for the response (default: the transport timeout)
+
+        Returns:
+            The result of the response
+
+        Raises:
+            JSONRPCError: If the server answered with an error
+            asyncio.TimeoutError: If no response arrived in time
+            ConnectionError: If the server process is gone
+        """
+        if self._closed:
+            raise ConnectionError("MCP server process is not running")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+            return await asyncio.wait_for(future, timeout if timeout is not None else self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if request_id in self._pending and not self._closed:
+                reason = "timeout" if isinstance(e, asyncio.TimeoutError) else "cancelled"
+                asyncio.ensure_future(self._cancel_on_server(request_id, reason))
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """Send a notification, which has no response."""
+        if self._closed:
+            raise ConnectionError("MCP server process is not running")
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._send(message)
+
+    async def close(self, timeout: float = 5) -> None:
+        """Fail pending requests, stop the reader tasks and end the server process."""
+        was_closed = self._closed
+        self._closed = True
+        self._fail_pending(ConnectionError("MCP transport closed"))
+        process = self.process
+        if process is not None and process.returncode is None:
+            try:
+                process.stdin.close()
+            except Exception:
+                pass
+            try:
+                await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                process.terminate()
+                try:
+                    await asyncio.wait_for(process.wait(), timeout)
+                except asyncio.TimeoutError:
+                    logger.warning("MCP server process did not terminate gracefully, forcing kill")
+                    process.kill()
+                    await process.wait()
+        tasks = self._tasks + list(self._handler_tasks)
+        for task in tasks:
+            if task is not asyncio.current_task():
+                task.cancel()
+        await asyncio.gather(*[t for t in tasks if t is not asyncio.current_task()],
+                             return_exceptions=True)
+        self._tasks = []
+        self._handler_tasks.clear()
+        if not was_closed:
+            logger.info("MCP server process stopped")
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        data = (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+        async with self._write_lock:
+            self.process.stdin.write(data)
+            await self.process.stdin.drain()
+
+    async def _cancel_on_server(self, request_id: int, reason: str) -> None:
+        try:
+            await self.notify("notifications/cancelled", {"requestId": request_id, "reason": reason})
+        except Exception as e:
+            logger.debug(f"Could not send cancellation for request {request_id}: {e}")
+
+    async def _read_stdout(self) -> None:
+        """Dispatch every message from the server until its stdout closes."""
+        try:
+            while True:
+                try:
+                    line = await self.process.stdout.readline()
+                except ValueError:
+                    # Line over the limit; the rest of it has been discarded
+                    logger.error(f"Dropped a message over {self.line_limit} bytes from the MCP server")
+                    continue
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.debug(f"Ignoring non-JSON output from MCP server: {line[:200]!r}")
+                    continue
+                if isinstance(message, list):
+                    for item in message:
+                        await self._dispatch(item)
+                else:
+                    await self._dispatch(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error reading from MCP server: {e}")
+        finally:
+            if not self._closed:
+                logger.warning("MCP server closed its output")
+            self._closed = True
+            self._fail_pending(ConnectionError("MCP server process exited"))
+
+    async def _dispatch(self, message: Any) -> None:
+        if not isinstance(message, dict):
+            return
+        method = message.get("method")
+        if method is None:
+            # A response to one of our requests
+            future = self._pending.get(message.get("id"))
+            if future is None or future.done():
+                logger.debug(f"Ignoring response to unknown or withdrawn request {message.get('id')}")
+                return
+            if "error" in message:
+                error = message["error"] or {}
+                future.set_exception(JSONRPCError(error.get("code", -32603),
+                                                  error.get("message", "Unknown error"),
+                                                  error.get("data")))
+            else:
+                future.set_result(message.get("result"))
+        elif "id" in message:
+            # A request from the server; ping is the only one a client must answer.
+            # Reply from a task: a full server stdin must not stall the reader
+            if method == "ping":
+                reply = {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+            else:
+                reply = {"jsonrpc": "2.0", "id": message["id"],
+                         "error": {"code": -32601, "message": f"Method not found: {method}"}}
+            self._spawn(self._send(reply), f"reply to MCP server request {method}")
+        else:
+            params = message.get("params") or {}
+            for handler in self._handlers.get(method, []) + self._handlers.get("*", []):
+                try:
+                    result = handler(method, params)
+                    if asyncio.iscoroutine(result):
+                        # Not awaited here: the handler may wait on responses this reader delivers
+                        self._spawn(result, f"handler for MCP notification {method}")
+                except Exception as e:
+                    logger.error(f"Error in handler for MCP notification {method}: {e}")
+
+    def _spawn(self, coro: Awaitable[Any], description: str) -> None:
+        """Run a coroutine as a task kept until it finishes, logging its errors."""
+        task = asyncio.ensure_future(coro)
+        self._handler_tasks.add(task)
+
+        def done(task: asyncio.Task) -> None:
+            self._handler_tasks.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"Error in {description}: {task.exception()}")
+
+        task.add_done_callback(done)
+
+    async def _read_stderr(self) -> None:
+        try:
+            async for line in self.process.stderr:
+                try:
+                    self.stderr_callback(line.decode("utf-8", errors="replace"))
+                except Exception as e:
+                    logger.debug(f"Error in stderr callback: {e}")
+        except (asyncio.CancelledError, ValueError):
+            pass
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in list(self._pending.values()):
+            if not future.done():
+                future.set_exception(error)
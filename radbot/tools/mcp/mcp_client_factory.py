@@ -4,6 +4,7 @@ Factory for creating MCP clients based on configuration.
 
 import logging
 import importlib
+import threading
 from typing import Dict, Any, Optional, List, Callable, Union
 
 from radbot.config.config_loader import config_loader
@@ -17,27 +18,32 @@ class MCPClientError(Exception):
 class MCPClientFactory:
     """
     Factory for creating MCP clients based on configuration.
+    
+    Clients are kept in one supervised pool per server (see mcp_pool), which
+    restarts dead clients and spreads tool calls over ``pool_size`` clients.
     """
     
-    _client_cache: Dict[str, Any] = {}
+    _pools: Dict[str, Any] = {}
+    _pools_lock = threading.Lock()
     
     @classmethod
-    def get_client(cls, server_id: str) -> Any:
+    def get_pool(cls, server_id: str) -> Any:
         """
-        Get or create an MCP client for the given server ID.
+        Get or create the client pool for the given server ID.
         
         Args:
             server_id: The ID of the MCP server
             
         Returns:
-            MCP client instance
+            MCPServerPool for the server
             
         Raises:
-            MCPClientError: If the server is not configured or client creation fails
+            MCPClientError: If the server is not configured or is disabled
         """
-        # Check if client is already cached
-        if server_id in cls._client_cache:
-            return cls._client_cache[server_id]
+        pool = cls._pools.get(server_id)
+        if pool is not None:
+            pool.wait_started()
+            return pool
         
         # Get server configuration
         server_config = config_loader.get_mcp_server(server_id)
@@ -48,11 +54,82 @@ class MCPClientFactory:
         if not server_config.get("enabled", True):
             raise MCPClientError(f"MCP server '{server_id}' is disabled")
         
-        # Create and cache the client
-        client = cls.create_client(server_config)
-        cls._client_cache[server_id] = client
+        from radbot.tools.mcp.mcp_pool import (
+            MCPServerPool, DEFAULT_POOL_SIZE, DEFAULT_HEALTH_CHECK_INTERVAL
+        )
+        from radbot.tools.mcp import schema_cache
+        
+        # With cached tool schemas the pool need not wait for the server
+        cache = schema_cache.get_schema_cache()
+        server_hash = schema_cache.config_hash(server_config)
+        cached = None
+        if cache is not None:
+            entry = cache.get(server_id, server_hash)
+            if entry is not None:
+                try:
+                    cached = {name: schema_cache.load_declaration(data)
+                              for name, data in entry["tools"].items()}
+                    logger.info(f"Using {len(cached)} cached tool schemas for MCP server: {server_id}")
+                except Exception as e:
+                    logger.warning(f"Ignoring cached tool schemas of MCP server {server_id}: {e}")
+        
+        def store_schemas(client: Any, tools: Dict[str, Any]) -> None:
+            if cache is None:
+                return
+            server_info = getattr(client, "server_info", None) or {}
+            version = (server_info.get("serverInfo") or {}).get("version") if isinstance(server_info, dict) else None
+            if cache.put(server_id, server_hash, schema_cache.dump_declarations(tools), version):
+                logger.info(f"Updated cached tool schemas of MCP server: {server_id}")
+        
+        # Register the pool under the lock but start it outside, so starting one
+        # server doesn't hold up the pools of other servers or their metrics
+        with cls._pools_lock:
+            pool = cls._pools.get(server_id)
+            created = pool is None
+            if created:
+                pool = MCPServerPool(
+                    server_id,
+                    lambda: cls.create_client(server_config),
+                    size=int(server_config.get("pool_size", DEFAULT_POOL_SIZE)),
+                    health_check_interval=float(
+                        server_config.get("health_check_interval", DEFAULT_HEALTH_CHECK_INTERVAL)
+                    ),
+                    cached_declarations=cached,
+                    on_tools_loaded=store_schemas
+                )
+                cls._pools[server_id] = pool
+        if created:
+            pool.start(background=cached is not None)
+        else:
+            pool.wait_started()
+        return pool
+    
+    @classmethod
+    def get_client(cls, server_id: str) -> Any:
+        """
+        Get a healthy MCP client for the given server ID.
+        
+        Args:
+            server_id: The ID of the MCP server
+            
+        Returns:
+            MCP client instance, the least busy one of the server's pool
+            
+        Raises:
+            MCPClientError: If the server is not configured or no client could be started
+        """
+        client = cls.get_pool(server_id).get_client()
+        if client is None:
+            raise MCPClientError(f"No MCP client for server '{server_id}' could be started")
         return client
     
+    @classmethod
+    def get_pool_metrics(cls) -> Dict[str, Dict[str, Any]]:
+        """Get metrics for every client pool, keyed by server ID."""
+        with cls._pools_lock:
+            pools = dict(cls._pools)
+        return {server_id: pool.metrics() for server_id, pool in pools.items()}
+    
     @classmethod
     def create_client(cls, server_config: Dict[str, Any]) -> Any:
         """
@@ -215,17 +292,16 @@ class MCPClientFactory:
     @classmethod
     def clear_cache(cls) -> None:
         """
-        Clear the client cache.
+        Stop every client pool and forget it.
         """
-        # Stop each client before clearing the cache
-        for client_id, client in cls._client_cache.items():
+        with cls._pools_lock:
+            pools = dict(cls._pools)
+            cls._pools.clear()
+        for server_id, pool in pools.items():
             try:
-                if hasattr(client, "stop") and callable(client.stop):
-                    client.stop()
+                pool.close()
             except Exception as e:
-                logger.warning(f"Error stopping client {client_id}: {e}")
-                
-        cls._client_cache.clear()
+                logger.warning(f"Error stopping client pool {server_id}: {e}")
     
     @classmethod
     def get_all_enabled_clients(cls) -> Dict[str, Any]:
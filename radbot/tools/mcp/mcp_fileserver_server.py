@@ -18,7 +18,7 @@ import sys
 import asyncio
 import json
 import logging
-from typing import Dict, Any, List, Optional, Tuple, Union
+from typing import Dict, Any, List, Optional, Tuple, Union, Callable
 import argparse
 from pathlib import Path
 from datetime import datetime
@@ -29,6 +29,9 @@ from mcp.server.lowlevel import Server, NotificationOptions
 from mcp.server.models import InitializationOptions
 import mcp.server.stdio
 
+from radbot.filesystem import content_search, windowed
+from radbot.filesystem.catalog import FileCatalog, compile_globs
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -65,6 +68,9 @@ class FileServerMCP:
         if not os.path.isdir(self.root_dir):
             logger.error(f"Root directory does not exist: {self.root_dir}")
             raise ValueError(f"Root directory does not exist: {self.root_dir}")
+        
+        # File listing for content searches, crawled on first search
+        self._catalog = FileCatalog([self.root_dir])
     
     def _validate_path(self, path: str) -> str:
         """
@@ -97,6 +103,20 @@ class FileServerMCP:
         
         return full_path
     
+    def _resolves_within_root(self, full_path: str) -> bool:
+        """
+        Check that a path, with symlinks resolved, is within the root directory.
+        
+        Args:
+            full_path: Absolute path, e.g. a file found by a search
+            
+        Returns:
+            True if the resolved path is the root directory or inside it
+        """
+        real_root = os.path.realpath(self.root_dir)
+        real_path = os.path.realpath(full_path)
+        return real_path == real_root or real_path.startswith(real_root + os.sep)
+    
     def _get_relative_path(self, full_path: str) -> str:
         """
         Get the relative path from the root directory.
@@ -172,6 +192,30 @@ class FileServerMCP:
             logger.error(f"Error listing files: {str(e)}")
             raise
     
+    def _validate_file(self, path: str) -> str:
+        """
+        Validate that a path is an existing file within the root directory.
+        
+        Args:
+            path: Path to the file (relative to root directory)
+            
+        Returns:
+            Absolute path of the file
+        """
+        full_path = self._validate_path(path)
+        
+        # Check if path exists
+        if not os.path.exists(full_path):
+            logger.warning(f"File not found: {path}")
+            raise FileNotFoundError(f"File not found: {path}")
+        
+        # Check if path is a file
+        if not os.path.isfile(full_path):
+            logger.warning(f"Path is not a file: {path}")
+            raise ValueError(f"Path is not a file: {path}")
+        
+        return full_path
+    
     async def read_file(self, path: str) -> str:
         """
         Read the contents of a file.
@@ -183,17 +227,15 @@ class FileServerMCP:
             Contents of the file
         """
         try:
-            full_path = self._validate_path(path)
+            full_path = self._validate_file(path)
             
-            # Check if path exists
-            if not os.path.exists(full_path):
-                logger.warning(f"File not found: {path}")
-                raise FileNotFoundError(f"File not found: {path}")
-            
-            # Check if path is a file
-            if not os.path.isfile(full_path):
-                logger.warning(f"Path is not a file: {path}")
-                raise ValueError(f"Path is not a file: {path}")
+            # Large files have to be read a window at a time
+            size = os.path.getsize(full_path)
+            if size > windowed.MAX_FULL_READ_BYTES:
+                raise ValueError(
+                    f"File is too large to read whole ({size} bytes): {path}. "
+                    f"Pass offset/length or start_line/end_line, or use tail_file or grep_file"
+                )
             
             # Read file contents
             with open(full_path, 'r', encoding='utf-8') as f:
@@ -204,6 +246,139 @@ class FileServerMCP:
             logger.error(f"Error reading file: {str(e)}")
             raise
     
+    async def read_file_window(self, path: str, offset: int = 0, length: Optional[int] = None,
+                               start_line: Optional[int] = None, end_line: Optional[int] = None,
+                               progress: Optional[windowed.ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Read part of a file, by byte range or by line range.
+        
+        Args:
+            path: Path to the file (relative to root directory)
+            offset: First byte to read; negative values count from the end of the file
+            length: Number of bytes to read
+            start_line: First line to read, counting from 1; selects a line range
+            end_line: Last line to read, inclusive
+            progress: Optional callback with (bytes scanned, file size)
+            
+        Returns:
+            Dictionary with the window's content and where the next one starts
+        """
+        try:
+            full_path = self._validate_file(path)
+            if start_line is not None or end_line is not None:
+                result = await asyncio.to_thread(
+                    windowed.read_lines, full_path, start_line or 1, end_line, None, progress
+                )
+            else:
+                result = await asyncio.to_thread(windowed.read_range, full_path, offset, length)
+            return {"path": path, **result}
+        except Exception as e:
+            logger.error(f"Error reading file window: {str(e)}")
+            raise
+    
+    async def tail_file(self, path: str, lines: int = 50) -> Dict[str, Any]:
+        """
+        Read the last lines of a file.
+        
+        Args:
+            path: Path to the file (relative to root directory)
+            lines: Number of lines to return
+            
+        Returns:
+            Dictionary with the last lines of the file
+        """
+        try:
+            full_path = self._validate_file(path)
+            result = await asyncio.to_thread(windowed.tail_lines, full_path, lines)
+            return {"path": path, **result}
+        except Exception as e:
+            logger.error(f"Error reading file tail: {str(e)}")
+            raise
+    
+    async def grep_file(self, path: str, pattern: str, ignore_case: bool = False, context: int = 0,
+                        max_matches: int = 100,
+                        progress: Optional[windowed.ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Find the lines of a file matching a regular expression.
+        
+        Args:
+            path: Path to the file (relative to root directory)
+            pattern: Regular expression searched for in each line
+            ignore_case: Match case-insensitively
+            context: Number of lines to include before and after each match
+            max_matches: Stop after this many matching lines
+            progress: Optional callback with (bytes scanned, file size)
+            
+        Returns:
+            Dictionary with the matching lines and their line numbers
+        """
+        try:
+            full_path = self._validate_file(path)
+            result = await asyncio.to_thread(
+                windowed.grep_lines, full_path, pattern, ignore_case, context, max_matches, None, progress
+            )
+            return {"path": path, **result}
+        except Exception as e:
+            logger.error(f"Error searching file: {str(e)}")
+            raise
+    
+    async def search_file_contents(self, path: str, pattern: str, literal: bool = False,
+                                   ignore_case: bool = False,
+                                   include_patterns: Optional[List[str]] = None,
+                                   exclude_patterns: Optional[List[str]] = None,
+                                   context: int = 0,
+                                   max_results: int = content_search.DEFAULT_MAX_RESULTS) -> Dict[str, Any]:
+        """
+        Search the contents of files for a pattern.
+        
+        Args:
+            path: File, or directory to search recursively (relative to root directory)
+            pattern: Regular expression, or literal text if literal is True
+            literal: Match the pattern as plain text
+            ignore_case: Match case-insensitively
+            include_patterns: Optional glob patterns; only files with matching names are searched
+            exclude_patterns: Optional glob patterns of file and directory names to skip
+            context: Number of lines to include before and after each match
+            max_results: Maximum number of matching lines to return
+            
+        Returns:
+            Dictionary with the matching lines (path, line number, text) and file counts
+        """
+        try:
+            full_path = self._validate_path(path)
+            
+            # Check if path exists
+            if not os.path.exists(full_path):
+                logger.warning(f"Path not found: {path}")
+                raise FileNotFoundError(f"Path not found: {path}")
+            
+            regex = content_search.compile_pattern(pattern, literal, ignore_case)
+            
+            # Symlinks may point outside the root directory
+            if not self._resolves_within_root(full_path):
+                logger.warning(f"Attempted access outside root directory: {path}")
+                raise ValueError(f"Path is outside root directory: {path}")
+            
+            if os.path.isfile(full_path):
+                files = [(full_path, self._get_relative_path(full_path))]
+            else:
+                include = compile_globs(tuple(include_patterns or ()))
+                exclude = compile_globs(tuple(exclude_patterns or ()))
+                walked = await asyncio.to_thread(self._catalog.walk, full_path, exclude)
+                files = [
+                    (os.path.join(root, name), self._get_relative_path(os.path.join(root, name)))
+                    for root, _, names, _ in walked
+                    for name in names
+                    if (include is None or include.match(name)) and not (exclude and exclude.match(name))
+                    and self._resolves_within_root(os.path.join(root, name))
+                ]
+            
+            result = await asyncio.to_thread(content_search.search_contents, files, regex, context, max_results)
+            return {"path": path, "pattern": pattern, **result}
+        except Exception as e:
+            logger.error(f"Error searching file contents: {str(e)}")
+            raise
+    
     async def write_file(self, path: str, content: str, append: bool = False) -> Dict[str, Any]:
         """
         Write content to a file.
@@ -233,6 +408,8 @@ class FileServerMCP:
             with open(full_path, mode, encoding='utf-8') as f:
                 f.write(content)
             
+            self._catalog.invalidate(full_path)
+            
             return {
                 "path": path,
                 "operation": "append" if append else "write",
@@ -274,6 +451,8 @@ class FileServerMCP:
                 os.remove(full_path)
                 item_type = "file"
             
+            self._catalog.invalidate(full_path)
+            
             return {
                 "path": path,
                 "operation": "delete",
@@ -346,6 +525,8 @@ class FileServerMCP:
                 shutil.copy2(src_path, dst_path)
                 item_type = "file"
             
+            self._catalog.invalidate(dst_path)
+            
             return {
                 "source": source,
                 "destination": destination,
@@ -391,6 +572,9 @@ class FileServerMCP:
             shutil.move(src_path, dst_path)
             item_type = "directory" if os.path.isdir(dst_path) else "file"
             
+            self._catalog.invalidate(src_path)
+            self._catalog.invalidate(dst_path)
+            
             return {
                 "source": source,
                 "destination": destination,
@@ -447,18 +631,129 @@ def setup_mcp_server(root_dir: str, allow_write: bool = False, allow_delete: boo
             ),
             mcp_types.Tool(
                 name="read_file",
-                description="Read the contents of a file",
+                description=(
+                    "Read the contents of a file. For large files, read a window "
+                    "with offset/length (bytes) or start_line/end_line"
+                ),
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "path": {
+                            "type": "string",
+                            "description": "Path to the file (relative to root directory)"
+                        },
+                        "offset": {
+                            "type": "integer",
+                            "description": "First byte to read; negative values count from the end of the file"
+                        },
+                        "length": {
+                            "type": "integer",
+                            "description": "Number of bytes to read (at most 1 MiB)"
+                        },
+                        "start_line": {
+                            "type": "integer",
+                            "description": "First line to read, counting from 1"
+                        },
+                        "end_line": {
+                            "type": "integer",
+                            "description": "Last line to read, inclusive"
+                        }
+                    },
+                    "required": ["path"]
+                }
+            ),
+            mcp_types.Tool(
+                name="tail_file",
+                description="Read the last lines of a file",
                 inputSchema={
                     "type": "object",
                     "properties": {
                         "path": {
                             "type": "string",
                             "description": "Path to the file (relative to root directory)"
+                        },
+                        "lines": {
+                            "type": "integer",
+                            "description": "Number of lines to return"
                         }
                     },
                     "required": ["path"]
                 }
             ),
+            mcp_types.Tool(
+                name="grep_file",
+                description="Find the lines of a file matching a regular expression",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "path": {
+                            "type": "string",
+                            "description": "Path to the file (relative to root directory)"
+                        },
+                        "pattern": {
+                            "type": "string",
+                            "description": "Regular expression searched for in each line"
+                        },
+                        "ignore_case": {
+                            "type": "boolean",
+                            "description": "Match case-insensitively"
+                        },
+                        "context": {
+                            "type": "integer",
+                            "description": "Number of lines to include before and after each match"
+                        },
+                        "max_matches": {
+                            "type": "integer",
+                            "description": "Stop after this many matching lines"
+                        }
+                    },
+                    "required": ["path", "pattern"]
+                }
+            ),
+            mcp_types.Tool(
+                name="search_file_contents",
+                description="Search the contents of files for text, like grep -rn",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "path": {
+                            "type": "string",
+                            "description": "File, or directory to search recursively (relative to root directory)"
+                        },
+                        "pattern": {
+                            "type": "string",
+                            "description": "Regular expression, or plain text if literal is true"
+                        },
+                        "literal": {
+                            "type": "boolean",
+                            "description": "Match the pattern as plain text"
+                        },
+                        "ignore_case": {
+                            "type": "boolean",
+                            "description": "Match case-insensitively"
+                        },
+                        "include_patterns": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Glob patterns of file names to search, e.g. [\"*.py\"]"
+                        },
+                        "exclude_patterns": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Glob patterns of file and directory names to skip"
+                        },
+                        "context": {
+                            "type": "integer",
+                            "description": "Number of lines to include before and after each match"
+                        },
+                        "max_results": {
+                            "type": "integer",
+                            "description": "Maximum number of matching lines to return"
+                        }
+                    },
+                    "required": ["pattern"]
+                }
+            ),
             mcp_types.Tool(
                 name="get_file_info",
                 description="Get information about a file or directory",
@@ -560,6 +855,25 @@ def setup_mcp_server(root_dir: str, allow_write: bool = False, allow_delete: boo
         logger.info(f"MCP Server: Advertising {len(tools)} tools")
         return tools
     
+    def _progress_reporter() -> Optional[Callable[[int, int], None]]:
+        """
+        Create a progress callback for the current request, if the client asked for progress.
+        
+        The callback is called from the worker thread scanning the file and
+        sends MCP progress notifications on the server's event loop.
+        """
+        ctx = app.request_context
+        token = getattr(ctx.meta, "progressToken", None) if ctx.meta else None
+        if token is None:
+            return None
+        loop = asyncio.get_running_loop()
+        
+        def report(done: int, total: int) -> None:
+            asyncio.run_coroutine_threadsafe(
+                ctx.session.send_progress_notification(token, done, total), loop
+            )
+        return report
+    
     @app.call_tool()
     async def call_tool(
         name: str, arguments: Dict[str, Any]
@@ -581,6 +895,21 @@ def setup_mcp_server(root_dir: str, allow_write: bool = False, allow_delete: boo
                 path = arguments.get("path", "")
                 if not path:
                     raise ValueError("Path is required")
+                
+                # Any range argument selects a windowed read
+                if any(arguments.get(key) is not None for key in ("offset", "length", "start_line", "end_line")):
+                    result = await fs.read_file_window(
+                        path,
+                        offset=arguments.get("offset") or 0,
+                        length=arguments.get("length"),
+                        start_line=arguments.get("start_line"),
+                        end_line=arguments.get("end_line"),
+                        progress=_progress_reporter()
+                    )
+                    return [mcp_types.TextContent(
+                        type="text",
+                        text=json.dumps(result, indent=2)
+                    )]
                     
                 result = await fs.read_file(path)
                 return [mcp_types.TextContent(
@@ -588,6 +917,58 @@ def setup_mcp_server(root_dir: str, allow_write: bool = False, allow_delete: boo
                     text=result
                 )]
                 
+            elif name == "tail_file":
+                path = arguments.get("path", "")
+                if not path:
+                    raise ValueError("Path is required")
+                    
+                result = await fs.tail_file(path, arguments.get("lines") or 50)
+                return [mcp_types.TextContent(
+                    type="text",
+                    text=json.dumps(result, indent=2)
+                )]
+                
+            elif name == "grep_file":
+                path = arguments.get("path", "")
+                pattern = arguments.get("pattern", "")
+                if not path:
+                    raise ValueError("Path is required")
+                if not pattern:
+                    raise ValueError("Pattern is required")
+                    
+                result = await fs.grep_file(
+                    path,
+                    pattern,
+                    ignore_case=arguments.get("ignore_case", False),
+                    context=arguments.get("context") or 0,
+                    max_matches=arguments.get("max_matches") or 100,
+                    progress=_progress_reporter()
+                )
+                return [mcp_types.TextContent(
+                    type="text",
+                    text=json.dumps(result, indent=2)
+                )]
+                
+            elif name == "search_file_contents":
+                pattern = arguments.get("pattern", "")
+                if not pattern:
+                    raise ValueError("Pattern is required")
+                    
+                result = await fs.search_file_contents(
+                    arguments.get("path", ""),
+                    pattern,
+                    literal=arguments.get("literal", False),
+                    ignore_case=arguments.get("ignore_case", False),
+                    include_patterns=arguments.get("include_patterns"),
+                    exclude_patterns=arguments.get("exclude_patterns"),
+                    context=arguments.get("context") or 0,
+                    max_results=arguments.get("max_results") or content_search.DEFAULT_MAX_RESULTS
+                )
+                return [mcp_types.TextContent(
+                    type="text",
+                    text=json.dumps(result, indent=2)
+                )]
+                
             elif name == "write_file":
                 path = arguments.get("path", "")
                 content = arguments.get("content", "")
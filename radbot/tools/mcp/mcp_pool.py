@@ -0,0 +1,516 @@
+"""
+Supervised pools of MCP server connections.
+
+Each configured MCP server gets a pool of ``pool_size`` clients (server
+processes for stdio servers, connections for SSE/HTTP servers):
+
+- Tool calls go to the least busy healthy client that has the tool.
+- A supervisor thread pings every client each ``health_check_interval``
+  seconds and restarts dead ones, with exponential backoff.
+- A call that fails because its server died is retried once on another
+  client; other failures are returned to the caller unchanged.
+- Calls, failures, restarts and ping results are counted for monitoring.
+
+The agent gets ``PooledTool``s from ``MCPServerPool.get_tools``, so its tools
+keep working across server restarts. A pool can be given the tool declarations
+of an earlier run (see schema_cache); its tools are then available before any
+client is up, clients start in the background, and declarations the server
+reports differently replace the cached ones.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from google.adk.tools import FunctionTool
+from google.adk.tools.base_tool import BaseTool
+
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable per server in integrations.mcp.servers
+DEFAULT_POOL_SIZE = 1
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0  # seconds
+DEFAULT_MAX_RESTART_BACKOFF = 60.0  # seconds
+INITIAL_RESTART_BACKOFF = 1.0  # seconds
+
+# Error statuses MCP clients return when a call never reached the server
+UNSENT_STATUSES = ("not_initialized", "no_loop")
+
+
+def _client_tools(client: Any) -> Dict[str, BaseTool]:
+    """Get the tools of a client, by name."""
+    if hasattr(client, "get_tools") and callable(client.get_tools):
+        tools = client.get_tools()
+    else:
+        tools = getattr(client, "tools", None)
+    named = {}
+    for tool in tools or []:
+        if not isinstance(tool, BaseTool) and callable(tool):
+            tool = FunctionTool(tool)
+        name = getattr(tool, "name", None)
+        if name:
+            named[name] = tool
+    return named
+
+
+def _initialize_async_client(client: Any) -> None:
+    """Run the async initialization of a client, on a private event loop."""
+    result = {"success": False, "error": None}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        try:
+            result["success"] = loop.run_until_complete(client.check_initialization())
+        except Exception as e:
+            result["error"] = str(e)
+        finally:
+            loop.close()
+
+    # A thread of its own, since the caller may be running an event loop
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    if not result["success"]:
+        raise ConnectionError(result["error"] or "async initialization failed")
+
+
+def _client_alive(client: Any) -> bool:
+    """Check whether a client still talks to its server."""
+    if hasattr(client, "ping") and callable(client.ping):
+        return bool(client.ping())
+    process = getattr(client, "process", None)
+    if process is not None:
+        returncode = getattr(process, "returncode", None)
+        if returncode is None and hasattr(process, "poll"):
+            returncode = process.poll()
+        if returncode is not None:
+            return False
+    return bool(getattr(client, "initialized", getattr(client, "_initialized", True)))
+
+
+def _stop_client(client: Any) -> None:
+    if hasattr(client, "stop") and callable(client.stop):
+        try:
+            client.stop()
+        except Exception as e:
+            logger.warning(f"Error stopping MCP client: {e}")
+
+
+class PoolMember:
+    """One client of a pool, with its health and load."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.client: Any = None
+        self.tools: Dict[str, BaseTool] = {}
+        self.healthy = False
+        self.started = False
+        # Held while the client is being replaced
+        self.restart_lock = threading.Lock()
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.restarts = 0
+        self.backoff = INITIAL_RESTART_BACKOFF
+        self.next_restart = 0.0
+        self.last_error: Optional[str] = None
+        self.last_ping_ms: Optional[float] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "tools": len(self.tools),
+            "last_ping_ms": self.last_ping_ms,
+            "last_error": self.last_error,
+        }
+
+
+class MCPServerPool:
+    """A supervised pool of clients for one MCP server."""
+
+    def __init__(self, server_id: str, client_factory: Callable[[], Any],
+                 size: int = DEFAULT_POOL_SIZE,
+                 health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+                 max_restart_backoff: float = DEFAULT_MAX_RESTART_BACKOFF,
+                 cached_declarations: Optional[Dict[str, Any]] = None,
+                 on_tools_loaded: Optional[Callable[[Any, Dict[str, BaseTool]], None]] = None):
+        """
+        Create the pool. Clients are started by ``start``.
+
+        Args:
+            server_id: The ID of the MCP server, for logs and metrics
+            client_factory: Creates and initializes a new client
+            size: Number of clients kept running
+            health_check_interval: Seconds between pings of each client
+            max_restart_backoff: Longest wait between restarts of a failing client
+            cached_declarations: Function declarations of the server's tools, by
+                name, from an earlier run
+            on_tools_loaded: Called with a client and its tools each time a
+                client comes up
+        """
+        self.server_id = server_id
+        self.client_factory = client_factory
+        self.size = max(1, size)
+        self.health_check_interval = health_check_interval
+        self.max_restart_backoff = max_restart_backoff
+        self.on_tools_loaded = on_tools_loaded
+
+        # Declarations the tools are offered with; live ones replace cached ones
+        self._declarations: Dict[str, Any] = dict(cached_declarations or {})
+        self._members = [PoolMember(i) for i in range(self.size)]
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        # Set once ``start`` has returned
+        self._started = threading.Event()
+        self._closed = False
+        self._supervisor: Optional[threading.Thread] = None
+        self._metrics = {"calls": 0, "call_errors": 0, "retries": 0, "no_client": 0,
+                         "pings": 0, "ping_failures": 0, "restarts": 0}
+
+    def start(self, background: bool = False) -> None:
+        """
+        Start the clients.
+
+        Args:
+            background: Start every client in the background; otherwise the
+                first one is started before returning
+        """
+        try:
+            if not background:
+                self._restart(self._members[0])
+            self._supervisor = threading.Thread(target=self._supervise, name=f"mcp-pool-{self.server_id}",
+                                                daemon=True)
+            self._supervisor.start()
+        finally:
+            self._started.set()
+
+    def wait_started(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until ``start`` has returned, so the first client had its chance to come up.
+
+        Args:
+            timeout: Longest time to wait in seconds; None waits as long as it takes
+
+        Returns:
+            True if the pool has been started
+        """
+        return self._started.wait(timeout)
+
+    def close(self) -> None:
+        """Stop the supervisor and every client."""
+        self._closed = True
+        self._wake.set()
+        if self._supervisor is not None and self._supervisor is not threading.current_thread():
+            self._supervisor.join(timeout=5)
+        with self._lock:
+            clients = [m.client for m in self._members if m.client is not None]
+            for member in self._members:
+                member.client = None
+                member.tools = {}
+                member.healthy = False
+        for client in clients:
+            _stop_client(client)
+        logger.info(f"MCP pool for server '{self.server_id}' closed")
+
+    def _restart(self, member: PoolMember) -> bool:
+        """Replace the client of a member. Called without the lock held."""
+        with member.restart_lock:
+            if member.healthy:
+                # Restarted meanwhile by another thread
+                return True
+            return self._replace_client(member)
+
+    def _replace_client(self, member: PoolMember) -> bool:
+        with self._lock:
+            old = member.client
+            member.client = None
+            member.tools = {}
+            member.healthy = False
+        if old is not None:
+            _stop_client(old)
+        if self._closed:
+            return False
+
+        client = None
+        try:
+            client = self.client_factory()
+            if hasattr(client, "check_initialization") and callable(client.check_initialization):
+                _initialize_async_client(client)
+            tools = _client_tools(client)
+            if not _client_alive(client):
+                raise ConnectionError("client did not initialize")
+        except Exception as e:
+            if client is not None:
+                _stop_client(client)
+            with self._lock:
+                delay = member.backoff
+                member.failures += 1
+                member.last_error = str(e)
+                member.next_restart = time.monotonic() + delay
+                member.backoff = min(delay * 2, self.max_restart_backoff)
+            logger.warning(f"Could not start MCP client {member.index} for server '{self.server_id}': {e}; "
+                           f"retrying in {delay:.0f}s")
+            return False
+
+        with self._lock:
+            if self._closed:
+                closing = client
+            else:
+                closing = None
+                member.client = client
+                member.tools = tools
+                member.healthy = True
+                member.backoff = INITIAL_RESTART_BACKOFF
+                member.last_error = None
+                if member.started:
+                    member.restarts += 1
+                    self._metrics["restarts"] += 1
+                member.started = True
+        if closing is not None:
+            _stop_client(closing)
+            return False
+        logger.info(f"MCP client {member.index} for server '{self.server_id}' is up with {len(tools)} tools")
+        self._update_declarations(tools)
+        if self.on_tools_loaded is not None:
+            try:
+                self.on_tools_loaded(client, tools)
+            except Exception as e:
+                logger.warning(f"Error handling the tools of MCP server '{self.server_id}': {e}")
+        return True
+
+    def _update_declarations(self, tools: Dict[str, BaseTool]) -> None:
+        """Replace the declarations of tools the server now declares differently."""
+        live = {}
+        for name, tool in tools.items():
+            try:
+                declaration = tool._get_declaration()
+            except Exception as e:
+                logger.debug(f"Could not get the declaration of tool {name}: {e}")
+                continue
+            if declaration is not None:
+                live[name] = declaration
+        with self._lock:
+            changed = [name for name, declaration in live.items() if self._declarations.get(name) != declaration]
+            removed = [name for name in self._declarations if name not in live]
+            self._declarations.update(live)
+            for name in removed:
+                del self._declarations[name]
+        if changed or removed:
+            logger.info(f"Tools of MCP server '{self.server_id}' updated: "
+                        f"{len(changed)} new or changed, {len(removed)} removed")
+
+    def _mark_down(self, member: PoolMember, error: str) -> None:
+        with self._lock:
+            if not member.healthy:
+                return
+            member.healthy = False
+            member.failures += 1
+            member.last_error = error
+            member.next_restart = time.monotonic()
+        logger.warning(f"MCP client {member.index} for server '{self.server_id}' is down: {error}")
+        self._wake.set()
+
+    def _ping(self, member: PoolMember) -> None:
+        client = member.client
+        if client is None:
+            return
+        start = time.monotonic()
+        try:
+            alive = _client_alive(client)
+            error = "ping failed"
+        except Exception as e:
+            alive = False
+            error = str(e)
+        with self._lock:
+            self._metrics["pings"] += 1
+            member.last_ping_ms = round((time.monotonic() - start) * 1000, 2)
+            if not alive:
+                self._metrics["ping_failures"] += 1
+        if not alive:
+            self._mark_down(member, error)
+
+    def _supervise(self) -> None:
+        """Ping healthy clients and restart dead ones until the pool is closed."""
+        next_ping = time.monotonic() + self.health_check_interval
+        while not self._closed:
+            now = time.monotonic()
+            for member in self._members:
+                if self._closed:
+                    break
+                if not member.healthy and now >= member.next_restart:
+                    self._restart(member)
+            if now >= next_ping:
+                for member in self._members:
+                    if member.healthy and not self._closed:
+                        self._ping(member)
+                next_ping = time.monotonic() + self.health_check_interval
+
+            with self._lock:
+                waits = [m.next_restart for m in self._members if not m.healthy]
+            deadline = min(waits + [next_ping])
+            self._wake.wait(timeout=max(0.05, deadline - time.monotonic()))
+            self._wake.clear()
+
+    def _checkout(self, tool_name: Optional[str] = None,
+                  exclude: Optional[PoolMember] = None) -> Optional[PoolMember]:
+        """Pick the least busy healthy member, optionally one having a tool."""
+        with self._lock:
+            candidates = [
+                m for m in self._members
+                if m.healthy and m is not exclude and (tool_name is None or tool_name in m.tools)
+            ]
+            if not candidates:
+                return None
+            member = min(candidates, key=lambda m: (m.in_flight, m.calls))
+            member.in_flight += 1
+            member.calls += 1
+            self._metrics["calls"] += 1
+            return member
+
+    def _checkin(self, member: PoolMember) -> None:
+        with self._lock:
+            member.in_flight -= 1
+
+    def get_client(self) -> Any:
+        """
+        Get the least busy healthy client, restarting one if none is up.
+
+        Returns:
+            An MCP client, or None if no client could be started
+        """
+        member = self._checkout()
+        if member is None:
+            self._start_any()
+            member = self._checkout()
+            if member is None:
+                return None
+        # Callers hold plain clients for unknown durations; count the call only
+        self._checkin(member)
+        return member.client
+
+    def _start_any(self) -> bool:
+        """Start a client now, if none is up, skipping clients in backoff."""
+        now = time.monotonic()
+        for member in self._members:
+            if member.healthy:
+                return True
+            if member.next_restart <= now and self._restart(member):
+                return True
+        return False
+
+    def get_declaration(self, tool_name: str) -> Any:
+        """Get the current function declaration of a tool, or None."""
+        with self._lock:
+            declaration = self._declarations.get(tool_name)
+            if declaration is None:
+                for member in self._members:
+                    if tool_name in member.tools:
+                        template = member.tools[tool_name]
+                        break
+                else:
+                    return None
+        return declaration if declaration is not None else template._get_declaration()
+
+    def get_tools(self) -> List["PooledTool"]:
+        """Get tools that dispatch each call to a client of the pool."""
+        with self._lock:
+            descriptions: Dict[str, str] = {}
+            for name, declaration in self._declarations.items():
+                descriptions[name] = getattr(declaration, "description", None) or ""
+            for member in self._members:
+                for name, tool in member.tools.items():
+                    descriptions.setdefault(name, tool.description or "")
+        return [PooledTool(self, name, description) for name, description in descriptions.items()]
+
+    async def run_tool(self, tool_name: str, args: Dict[str, Any], tool_context: Any) -> Any:
+        """
+        Run a tool on the least busy healthy client.
+
+        Args:
+            tool_name: Name of the tool
+            args: Arguments for the tool
+            tool_context: ADK tool context
+
+        Returns:
+            The tool result, or an error dict if no client could run it
+        """
+        failed: Optional[PoolMember] = None
+        for attempt in range(2):
+            member = self._checkout(tool_name, exclude=failed)
+            if member is None and not self._closed and not any(m.healthy for m in self._members):
+                # No client up yet, or all of them died: start one for this call
+                await asyncio.get_running_loop().run_in_executor(None, self._start_any)
+                member = self._checkout(tool_name, exclude=failed)
+            if member is None:
+                break
+            if attempt:
+                self._record(retries=1)
+            tool = member.tools[tool_name]
+            try:
+                result = await tool.run_async(args=args, tool_context=tool_context)
+            except ConnectionError as e:
+                self._record(call_errors=1)
+                self._mark_down(member, str(e))
+                failed = member
+                continue
+            except Exception:
+                self._record(call_errors=1)
+                raise
+            finally:
+                self._checkin(member)
+
+            if isinstance(result, dict) and result.get("status") in ("error", "timeout") + UNSENT_STATUSES:
+                self._record(call_errors=1)
+                alive = await asyncio.get_running_loop().run_in_executor(None, _client_alive, member.client)
+                if not alive:
+                    self._mark_down(member, str(result.get("error") or result.get("error_message")))
+                    if result.get("status") in UNSENT_STATUSES:
+                        # The call never reached the server; safe to send it elsewhere
+                        failed = member
+                        continue
+            return result
+
+        self._record(no_client=1)
+        return {
+            "status": "error",
+            "error_message": f"No healthy client of MCP server '{self.server_id}' can run {tool_name}"
+        }
+
+    def _record(self, **changes: int) -> None:
+        with self._lock:
+            for key, value in changes.items():
+                self._metrics[key] += value
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get a snapshot of the pool metrics."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            members = [m.stats() for m in self._members]
+        metrics["server_id"] = self.server_id
+        metrics["size"] = self.size
+        metrics["healthy"] = sum(1 for m in members if m["healthy"])
+        metrics["in_flight"] = sum(m["in_flight"] for m in members)
+        metrics["members"] = members
+        return metrics
+
+
+class PooledTool(BaseTool):
+    """An MCP tool whose calls are dispatched by a pool."""
+
+    def __init__(self, pool: MCPServerPool, name: str, description: str = ""):
+        super().__init__(name=name, description=description)
+        self.pool = pool
+
+    def _get_declaration(self):
+        # Looked up on every request, so changed declarations take effect
+        return self.pool.get_declaration(self.name)
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context) -> Any:
+        return await self.pool.run_tool(self.name, args, tool_context)
@@ -7,15 +7,11 @@ via standard input/output streams, especially for local processes like Claude CL
 """
 
 import logging
-import json
-import uuid
 import asyncio
-import subprocess
+import concurrent.futures
 import threading
-import signal
 import os
-import time
-from typing import Dict, Any, List, Optional, Union, Tuple, Callable
+from typing import Dict, Any, List, Optional, Callable
 
 # Import from MCP SDK
 try:
@@ -28,6 +24,8 @@ except ImportError:
         "Please install required dependencies with: uv pip install mcp"
     )
 
+from radbot.tools.mcp.jsonrpc_transport import JSONRPCError, StdioJSONRPCTransport
+
 logger = logging.getLogger(__name__)
 
 class MCPStdioClient:
@@ -35,7 +33,9 @@ class MCPStdioClient:
     MCP Client for communicating with MCP servers via standard input/output streams.
     
     This client is designed for MCP servers that communicate via stdio, such as
-    Claude CLI's 'claude mcp serve' command.
+    Claude CLI's 'claude mcp serve' command. Requests go through a multiplexed
+    JSON-RPC transport running on a private event loop, so tool calls from
+    several threads or coroutines are in flight at the same time.
     """
     
     # Protocol and version constants
@@ -68,21 +68,22 @@ class MCPStdioClient:
         self.stderr_callback = stderr_callback or (lambda x: logger.debug(f"Server stderr: {x.strip()}"))
         
         # State variables
-        self.process = None
-        self.session = None
-        self._session_context = None
+        self.transport: Optional[StdioJSONRPCTransport] = None
+        self.server_info = None
         self._async_loop = None
         self._async_thread = None
+        self._lock = threading.Lock()
         self.tools = []
         self._tool_schemas = {}
         self.initialized = False
         
-        # Event for synchronization
-        self._ready_event = threading.Event()
-        self._exit_event = threading.Event()
-        
         logger.info(f"Initialized MCPStdioClient with command: {command} {' '.join(args or [])}")
     
+    @property
+    def process(self):
+        """The server process, while it is running."""
+        return self.transport.process if self.transport else None
+    
     def initialize(self) -> bool:
         """
         Initialize the connection to the MCP server and retrieve tools.
@@ -90,292 +91,98 @@ class MCPStdioClient:
         Returns:
             True if initialization was successful, False otherwise
         """
-        if self.initialized and self.process and self.process.poll() is None:
-            logger.info("Client already initialized and process is running")
-            return True
+        with self._lock:
+            if self.initialized and self.transport and not self.transport.closed:
+                logger.info("Client already initialized and process is running")
+                return True
             
-        try:
-            # Start the server process
-            if not self._start_process():
-                logger.error("Failed to start server process")
-                return False
-                
-            # Wait for the process to be ready
-            if not self._ready_event.wait(timeout=10):
-                logger.warning("Timed out waiting for server process to start")
-                # Continue anyway, as it might still be starting
-                
-            # Start the async thread for the MCP session
-            self._start_async_thread()
-            
-            # Wait for initialization to complete
-            timeout = time.time() + 15
-            while not self.initialized and time.time() < timeout:
-                time.sleep(0.1)
+            try:
+                self._start_async_thread()
+                future = asyncio.run_coroutine_threadsafe(self._initialize_async(), self._async_loop)
+                future.result(timeout=self.timeout + 5)
+                logger.info(f"Successfully initialized MCP client with {len(self.tools)} tools")
+                return True
                 
-            if not self.initialized:
-                logger.error("Failed to initialize MCP client")
-                self.stop()
+            except Exception as e:
+                logger.error(f"Error initializing MCP stdio client: {e or type(e).__name__}")
+                self._stop_locked()
                 return False
-                
-            logger.info(f"Successfully initialized MCP client with {len(self.tools)} tools")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error initializing MCP stdio client: {e}")
-            self.stop()
-            return False
-    
-    def _start_process(self) -> bool:
-        """
-        Start the MCP server process.
-        
-        Returns:
-            True if the process started successfully, False otherwise
-        """
-        try:
-            # Build the full command
-            cmd = [self.command] + self.args
-            logger.info(f"Starting MCP server process: {' '.join(cmd)}")
-            
-            # Start the process with pipes
-            # Merge the process environment with any custom environment variables
-            process_env = os.environ.copy()
-            if self.env:
-                process_env.update(self.env)
-                
-            self.process = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=self.working_directory,
-                env=process_env,
-                universal_newlines=False,  # Use binary mode for proper asyncio compatibility
-                bufsize=0  # Unbuffered
-            )
-            
-            # Start a thread to monitor stderr
-            threading.Thread(
-                target=self._monitor_stderr,
-                daemon=True
-            ).start()
-            
-            logger.info(f"Started MCP server process with PID: {self.process.pid}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to start MCP server process: {e}")
-            return False
-    
-    def _monitor_stderr(self):
-        """Monitor the server process stderr for output and errors."""
-        if not self.process:
-            return
-            
-        try:
-            # Read from stderr line by line
-            for line_bytes in iter(self.process.stderr.readline, b''):
-                try:
-                    line = line_bytes.decode('utf-8')
-                    
-                    # Call the callback with the line
-                    if self.stderr_callback:
-                        self.stderr_callback(line)
-                    
-                    # Check for ready signals
-                    if any(msg in line.lower() for msg in ["ready", "listening", "started", "server running"]):
-                        logger.info("MCP server process is ready")
-                        self._ready_event.set()
-                        
-                    # Check for error signals
-                    if any(msg in line.lower() for msg in ["error", "exception", "fatal"]):
-                        logger.error(f"MCP server error: {line.strip()}")
-                        
-                except UnicodeDecodeError:
-                    logger.warning("Could not decode stderr line")
-                
-                # Exit if requested
-                if self._exit_event.is_set():
-                    break
-                    
-        except Exception as e:
-            logger.error(f"Error monitoring stderr: {e}")
-        finally:
-            logger.info("Stopped monitoring stderr")
     
     def _start_async_thread(self):
-        """Start an async thread for the MCP session."""
+        """Start the thread running the private event loop of the transport."""
         if self._async_thread and self._async_thread.is_alive():
-            logger.info("Async thread is already running")
             return
-            
-        # Create and start the thread
+        
+        loop = asyncio.new_event_loop()
+        self._async_loop = loop
         self._async_thread = threading.Thread(
             target=self._run_async_loop,
+            args=(loop,),
+            name=f"mcp-stdio-{self.command}",
             daemon=True
         )
         self._async_thread.start()
         logger.info("Started async thread for MCP session")
     
-    def _run_async_loop(self):
-        """Run the async event loop for the MCP session."""
+    def _run_async_loop(self, loop):
+        """Run the event loop of the transport until stop() is called."""
         try:
-            # Create a new event loop
-            loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-            self._async_loop = loop
-            
-            # Run the async initialization
-            loop.run_until_complete(self._initialize_async())
-            
-            # Run the event loop
             loop.run_forever()
-            
         except Exception as e:
             logger.error(f"Error in async thread: {e}")
         finally:
-            # Clean up
             try:
-                if loop and loop.is_running():
-                    loop.stop()
-                if loop and not loop.is_closed():
-                    loop.close()
+                loop.close()
             except Exception as e:
                 logger.error(f"Error cleaning up async loop: {e}")
-            
             logger.info("Async thread exiting")
     
     async def _initialize_async(self):
         """
-        Asynchronously initialize the MCP session.
+        Start the server process and run the MCP initialization handshake.
         """
+        if self.transport is not None:
+            await self.transport.close()
+        self.transport = StdioJSONRPCTransport(
+            self.command,
+            self.args,
+            working_directory=self.working_directory,
+            env=self.env,
+            timeout=self.timeout,
+            stderr_callback=self.stderr_callback
+        )
+        self.transport.on_notification("notifications/tools/list_changed", self._on_tools_changed)
+        await self.transport.start()
+        
+        # Configure client capabilities; we only need tools
+        self.server_info = await self.transport.request("initialize", {
+            "protocolVersion": self.PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {
+                "name": "RadbotMCPClient",
+                "version": "1.0.0"
+            }
+        })
+        await self.transport.notify("notifications/initialized")
+        logger.info("MCP session initialized")
+        
+        tools_info = await self.transport.request("tools/list", {})
+        self.tools = []
+        self._tool_schemas = {}
+        self._process_tools(tools_info)
+        self.initialized = True
+        logger.info(f"Async initialization complete, found {len(self.tools)} tools")
+    
+    async def _on_tools_changed(self, method, params):
+        """Reload the tool list when the server says it changed."""
         try:
-            if not self.process:
-                logger.error("Cannot initialize: No server process")
-                return
-                
-            logger.info("Initializing MCP client session asynchronously")
-            
-            # Create the session using the stdio client from the MCP SDK
-            # We need to create StdioServerParameters for existing stdin/stdout
-            try:
-                # We'll use a direct asyncio-based approach that doesn't depend on external libraries
-                logger.info("Using direct asyncio-based MCP client")
-                
-                # Create a direct MCP client using asyncio
-                class DirectMCPClient:
-                    """Direct implementation of MCP client using asyncio and subprocess."""
-                    
-                    def __init__(self, process):
-                        self.process = process
-                        self.initialized = False
-                        self.message_id = 0
-                        
-                    async def send_request(self, method, params=None):
-                        """Send a JSON-RPC request and get a response using subprocess pipes directly."""
-                        self.message_id += 1
-                        request = {
-                            "jsonrpc": "2.0",
-                            "id": self.message_id,
-                            "method": method,
-                            "params": params or {}
-                        }
-                        
-                        # Convert request to JSON
-                        request_json = json.dumps(request) + "\n"
-                        
-                        # Send to stdin
-                        self.process.stdin.write(request_json.encode("utf-8"))
-                        self.process.stdin.flush()
-                        
-                        # Read response from stdout
-                        response_line = self.process.stdout.readline().decode("utf-8").strip()
-                        
-                        if not response_line:
-                            raise Exception(f"No response received for method {method}")
-                            
-                        # Parse the response
-                        try:
-                            response = json.loads(response_line)
-                            if "error" in response:
-                                error_info = response.get("error", {})
-                                raise Exception(f"Error in MCP response: {error_info}")
-                            return response.get("result")
-                        except json.JSONDecodeError as e:
-                            raise Exception(f"Invalid JSON response: {str(e)}")
-                            
-                    async def initialize(self, protocol_version, capabilities, client_info):
-                        """Initialize the MCP session."""
-                        params = {
-                            "protocolVersion": protocol_version,
-                            "capabilities": capabilities,
-                            "clientInfo": client_info
-                        }
-                        
-                        result = await self.send_request("initialize", params)
-                        self.initialized = True
-                        return result
-                        
-                    async def list_tools(self):
-                        """List available tools."""
-                        return await self.send_request("tools/list", {})
-                        
-                    async def call_tool(self, tool_name, args):
-                        """Call a tool on the server."""
-                        params = {
-                            "name": tool_name,
-                            "inputs": args
-                        }
-                        return await self.send_request("tools/call", params)
-                
-                # Create and use our direct MCP client
-                self.session = DirectMCPClient(self.process)
-                
-                # Configure client capabilities
-                capabilities = {
-                    "completions": False,  # We don't need completion capabilities
-                    "prompts": False,      # We don't need prompt management
-                    "resources": False,    # We don't need resource management
-                    "tools": True          # We only need tools
-                }
-                
-                # Initialize the session
-                await self.session.initialize(
-                    protocol_version=self.PROTOCOL_VERSION,
-                    capabilities=capabilities,
-                    client_info={
-                        "name": "RadbotMCPClient",
-                        "version": "1.0.0",
-                        "protocol_version": self.PROTOCOL_VERSION
-                    }
-                )
-                logger.info("MCP session initialized")
-                
-                # Get list of tools
-                tools_info = await self.session.list_tools()
-                self._process_tools(tools_info)
-                
-                # Mark as initialized
-                self.initialized = True
-                logger.info(f"Async initialization complete, found {len(self.tools)} tools")
-                
-                # Keep the session alive until exit_event is set
-                while not self._exit_event.is_set():
-                    await asyncio.sleep(0.1)
-                    
-                logger.info("Closing session due to exit event")
-                
-            except ImportError as e:
-                logger.error(f"Import error in stdio_client: {e}")
-            except Exception as e:
-                logger.error(f"Error in stdio_client: {e}")
-                # Log more detailed error information
-                import traceback
-                logger.error(f"Detailed error: {traceback.format_exc()}")
-                
+            tools_info = await self.transport.request("tools/list", {})
+            self.tools = []
+            self._tool_schemas = {}
+            self._process_tools(tools_info)
         except Exception as e:
-            logger.error(f"Error in async initialization: {e}")
+            logger.warning(f"Could not reload tools after {method}: {e}")
     
     def _process_tools(self, tools_info):
         """
@@ -422,8 +229,8 @@ class MCPStdioClient:
                 
                 # Create function for this tool
                 def create_tool_function(name):
-                    def tool_function(**kwargs):
-                        return self.call_tool(name, kwargs)
+                    async def tool_function(**kwargs):
+                        return await self.call_tool_async(name, kwargs)
                     tool_function.__name__ = name
                     return tool_function
                     
@@ -438,6 +245,13 @@ class MCPStdioClient:
                         "parameters": getattr(tool_info, 'inputSchema', {})
                     }
                     self._tool_schemas[tool_name] = schema
+                elif isinstance(tool_info, dict) and 'inputSchema' in tool_info:
+                    schema = {
+                        "name": tool_name,
+                        "description": tool_info.get('description', ''),
+                        "parameters": tool_info['inputSchema']
+                    }
+                    self._tool_schemas[tool_name] = schema
                 
                 # Create FunctionTool
                 try:
@@ -469,130 +283,164 @@ class MCPStdioClient:
         """
         Stop the MCP client and server process.
         """
+        with self._lock:
+            self._stop_locked()
+    
+    def _stop_locked(self):
         logger.info("Stopping MCP stdio client")
-        
-        # Signal the async thread to exit
-        self._exit_event.set()
-        
-        # Wait for async thread to finish
+        loop = self._async_loop
+        if loop is not None and not loop.is_closed():
+            if self.transport is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(self.transport.close(), loop).result(timeout=15)
+                except Exception as e:
+                    logger.error(f"Error terminating MCP server process: {e}")
+            loop.call_soon_threadsafe(loop.stop)
         if self._async_thread and self._async_thread.is_alive():
             self._async_thread.join(timeout=2)
-            
-        # Terminate the process
-        if self.process:
-            try:
-                # Send SIGTERM to the process
-                self.process.terminate()
-                
-                # Wait for the process to terminate
-                try:
-                    self.process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    # Force kill if it doesn't terminate gracefully
-                    logger.warning("MCP server process did not terminate gracefully, forcing kill")
-                    self.process.kill()
-                    self.process.wait(timeout=1)
-                    
-                logger.info("MCP server process terminated")
-            except Exception as e:
-                logger.error(f"Error terminating MCP server process: {e}")
-                
-            self.process = None
         
-        # Clean up other resources
-        self.session = None
-        self._session_context = None
+        self.transport = None
+        self._async_loop = None
+        self._async_thread = None
         self.tools = []
         self._tool_schemas = {}
         self.initialized = False
-        self._ready_event.clear()
-        self._exit_event.clear()
         
         logger.info("MCP stdio client stopped")
     
-    def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
+    def ping(self, timeout: float = 5) -> bool:
         """
-        Call a tool on the MCP server.
+        Check that the server answers an MCP ping.
         
         Args:
-            tool_name: Name of the tool to call
-            args: Arguments for the tool
+            timeout: Seconds to wait for the answer
             
         Returns:
-            Tool result or error information
+            True if the server answered, False otherwise
         """
-        # Check if initialized
-        if not self.initialized or not self.session:
+        transport = self.transport
+        loop = self._async_loop
+        if not self.initialized or transport is None or transport.closed or loop is None or loop.is_closed():
+            return False
+        try:
+            asyncio.run_coroutine_threadsafe(
+                transport.request("ping", {}, timeout=timeout), loop
+            ).result(timeout=timeout + 1)
+            return True
+        except JSONRPCError:
+            # The server answered, even if it does not implement ping
+            return True
+        except Exception as e:
+            logger.warning(f"MCP server {self.command} did not answer ping: {e or type(e).__name__}")
+            return False
+    
+    async def _call_tool_on_loop(self, tool_name: str, args: Dict[str, Any],
+                                 timeout: Optional[float]) -> Any:
+        """Call a tool through the transport; runs on the private event loop."""
+        try:
+            return await self.transport.request(
+                "tools/call",
+                {"name": tool_name, "arguments": args},
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            return {
+                "error": f"Timeout waiting for tool {tool_name}",
+                "status": "timeout"
+            }
+        except JSONRPCError as e:
+            logger.error(f"Error calling tool {tool_name}: {e}")
+            return {
+                "error": str(e),
+                "status": "error"
+            }
+        except ConnectionError as e:
+            logger.error(f"Error calling tool {tool_name}: {e}")
+            self.initialized = False
+            return {
+                "error": str(e),
+                "status": "error"
+            }
+    
+    def _submit_tool_call(self, tool_name: str, args: Dict[str, Any],
+                          timeout: Optional[float]):
+        """Initialize if needed and schedule a tool call on the private loop.
+        
+        Returns:
+            A concurrent future of the call, or an error dict
+        """
+        if not self.initialized or not self.transport or self.transport.closed:
             if not self.initialize():
                 return {
                     "error": f"Failed to initialize MCP client before calling tool {tool_name}",
                     "status": "not_initialized"
                 }
         
-        logger.info(f"Calling tool {tool_name} with args: {args}")
+        loop = self._async_loop
+        if loop is None or loop.is_closed():
+            return {
+                "error": f"No async loop available to call tool {tool_name}",
+                "status": "no_loop"
+            }
         
-        # Create a result container with event for synchronization
-        result_container = {"result": None, "error": None, "done": threading.Event()}
+        logger.info(f"Calling tool {tool_name} with args: {args}")
+        return asyncio.run_coroutine_threadsafe(
+            self._call_tool_on_loop(tool_name, args, timeout), loop
+        )
+    
+    def call_tool(self, tool_name: str, args: Dict[str, Any],
+                  timeout: Optional[float] = None) -> Any:
+        """
+        Call a tool on the MCP server.
         
-        # Define an async function to call the tool
-        async def call_tool_async():
-            try:
-                response = await self.session.call_tool(tool_name, args)
-                result_container["result"] = response
-            except Exception as e:
-                logger.error(f"Error calling tool {tool_name}: {e}")
-                result_container["error"] = str(e)
-            finally:
-                result_container["done"].set()
+        Safe to call from several threads at once; the calls run concurrently.
         
-        # Schedule the async call in the event loop
-        if self._async_loop:
-            asyncio.run_coroutine_threadsafe(call_tool_async(), self._async_loop)
-            
-            # Wait for the result with timeout
-            if not result_container["done"].wait(timeout=self.timeout):
-                return {
-                    "error": f"Timeout waiting for tool {tool_name}",
-                    "status": "timeout"
-                }
-                
-            # Check for error
-            if result_container["error"]:
-                return {
-                    "error": result_container["error"],
-                    "status": "error"
-                }
-                
-            # Process the result
-            response = result_container["result"]
+        Args:
+            tool_name: Name of the tool to call
+            args: Arguments for the tool
+            timeout: Seconds to wait for the result (default: the client timeout)
             
-            # Extract the result from the MCP response
-            if hasattr(response, 'outputs') and response.outputs:
-                # Try to get the content
-                content = None
-                try:
-                    if hasattr(response.outputs, 'content'):
-                        content = response.outputs.content
-                    elif isinstance(response.outputs, dict) and 'content' in response.outputs:
-                        content = response.outputs['content']
-                except:
-                    pass
-                    
-                # If we have content, return it
-                if content:
-                    return content
-                    
-                # Otherwise, return the whole outputs
-                return response.outputs
-                
-            # If no outputs, return the whole response
-            return response
-        else:
+        Returns:
+            Tool result or error information
+        """
+        future = self._submit_tool_call(tool_name, args, timeout)
+        if isinstance(future, dict):
+            return future
+        
+        # The call enforces its own timeout; this only guards against a stuck loop
+        wait = (timeout if timeout is not None else self.timeout) + 5
+        try:
+            return future.result(timeout=wait)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
             return {
-                "error": f"No async loop available to call tool {tool_name}",
-                "status": "no_loop"
+                "error": f"Timeout waiting for tool {tool_name}",
+                "status": "timeout"
             }
+    
+    async def call_tool_async(self, tool_name: str, args: Dict[str, Any],
+                              timeout: Optional[float] = None) -> Any:
+        """
+        Call a tool on the MCP server from a coroutine.
+        
+        Cancelling the calling task withdraws the request from the server.
+        
+        Args:
+            tool_name: Name of the tool to call
+            args: Arguments for the tool
+            timeout: Seconds to wait for the result (default: the client timeout)
             
+        Returns:
+            Tool result or error information
+        """
+        if not self.initialized or not self.transport or self.transport.closed:
+            # Starting the server blocks; keep it off the caller's loop
+            await asyncio.get_running_loop().run_in_executor(None, self.initialize)
+        future = self._submit_tool_call(tool_name, args, timeout)
+        if isinstance(future, dict):
+            return future
+        return await asyncio.wrap_future(future)
+    
     def get_tools(self) -> List[Any]:
         """
         Get the list of tools available from this client.
@@ -617,4 +465,7 @@ class MCPStdioClient:
     
     def __del__(self):
         """Clean up resources when the object is deleted."""
-        self.stop()
\ No newline at end of file
+        try:
+            self.stop()
+        except Exception:
+            pass
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""
+On-disk cache of MCP tool schemas.
+
+Listing the tools of an MCP server means starting it (or connecting to it) and
+running the ``initialize`` + ``tools/list`` handshake, which can take seconds
+per server. The cache keeps the tool declarations of every server, keyed by a
+hash of the server's configuration, so the agent can be built from the cache
+while the servers are started in the background. When a server reports
+different tools, the cache entry is replaced.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from radbot.config.config_loader import config_loader
+
+logger = logging.getLogger(__name__)
+
+# Default, overridable via integrations.mcp.schema_cache in config.yaml
+DEFAULT_CACHE_FILE = "data/mcp_schema_cache.json"
+
+# Bump when the layout of cache entries changes
+CACHE_FORMAT = 1
+
+
+def config_hash(server_config: Dict[str, Any]) -> str:
+    """
+    Hash the configuration of an MCP server.
+
+    Secrets are part of the hash, so a changed token invalidates the entry,
+    but only the hash is stored.
+
+    Args:
+        server_config: The server's entry in integrations.mcp.servers
+
+    Returns:
+        Hex digest of the configuration
+    """
+    data = json.dumps(server_config, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def dump_declarations(tools: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Serialize the function declarations of tools.
+
+    Args:
+        tools: ADK tools by name
+
+    Returns:
+        JSON-ready declarations by tool name; tools without one are left out
+    """
+    declarations = {}
+    for name, tool in tools.items():
+        try:
+            declaration = tool._get_declaration()
+        except Exception as e:
+            logger.debug(f"Could not get the declaration of tool {name}: {e}")
+            continue
+        if declaration is not None:
+            declarations[name] = declaration.model_dump(mode="json", exclude_none=True)
+    return declarations
+
+
+def load_declaration(data: Dict[str, Any]) -> Any:
+    """Build a function declaration from its serialized form."""
+    from google.genai import types
+    return types.FunctionDeclaration.model_validate(data)
+
+
+class MCPSchemaCache:
+    """JSON file of tool declarations, one entry per MCP server."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE):
+        """
+        Initialize the cache, reading the file if it exists.
+
+        Args:
+            path: Path of the cache file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") == CACHE_FORMAT:
+                self._entries = data.get("servers", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable MCP schema cache {path}: {e}")
+
+    def get(self, server_id: str, server_config_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached tools of a server.
+
+        Args:
+            server_id: The ID of the MCP server
+            server_config_hash: Hash of the server's current configuration
+
+        Returns:
+            The entry, with ``tools`` (declarations by name) and
+            ``server_version``, or None if there is no entry for this configuration
+        """
+        with self._lock:
+            entry = self._entries.get(server_id)
+        if entry is None or entry.get("config_hash") != server_config_hash:
+            return None
+        return entry
+
+    def put(self, server_id: str, server_config_hash: str, tools: Dict[str, Dict[str, Any]],
+            server_version: Optional[str] = None) -> bool:
+        """
+        Store the tools of a server, if they changed.
+
+        Args:
+            server_id: The ID of the MCP server
+            server_config_hash: Hash of the server's configuration
+            tools: Serialized declarations by tool name
+            server_version: Version the server reported, if any
+
+        Returns:
+            True if the entry changed
+        """
+        with self._lock:
+            old = self._entries.get(server_id)
+            if (old is not None and old.get("config_hash") == server_config_hash
+                    and old.get("server_version") == server_version and old.get("tools") == tools):
+                return False
+            self._entries[server_id] = {
+                "config_hash": server_config_hash,
+                "server_version": server_version,
+                "tools": tools,
+                "updated_at": time.time(),
+            }
+            self._write()
+        return True
+
+    def _write(self) -> None:
+        """Write the cache file atomically. Called with the lock held."""
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"format": CACHE_FORMAT, "servers": self._entries}, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write MCP schema cache {self.path}: {e}")
+
+
+# Singleton cache instance
+_schema_cache: Optional[MCPSchemaCache] = None
+_schema_cache_lock = threading.Lock()
+
+
+def get_schema_cache() -> Optional[MCPSchemaCache]:
+    """
+    Get the shared schema cache, configured by integrations.mcp.schema_cache.
+
+    Returns:
+        The cache, or None if it is disabled
+    """
+    global _schema_cache
+    cache_config = config_loader.get_mcp_config().get("schema_cache", {}) or {}
+    if not cache_config.get("enabled", True):
+        return None
+    if _schema_cache is None:
+        with _schema_cache_lock:
+            if _schema_cache is None:
+                _schema_cache = MCPSchemaCache(cache_config.get("path", DEFAULT_CACHE_FILE))
+    return _schema_cache
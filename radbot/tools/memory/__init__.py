@@ -5,8 +5,10 @@ This package provides the functionality for conversation memory.
 """
 
 from radbot.tools.memory.memory_tools import search_past_conversations, store_important_information
+from radbot.tools.memory.chat_search_tools import search_chat_history
 
 __all__ = [
     "search_past_conversations",
     "store_important_information",
+    "search_chat_history",
 ]
@@ -0,0 +1,79 @@
+"""
+Chat history search tool for the radbot agent framework.
+
+Unlike search_past_conversations, which does a semantic search of the vector
+memory, this tool does an indexed full-text search of the stored chat
+messages, so exact words and phrases are always found.
+"""
+
+import logging
+from typing import Dict, Any, Optional
+
+from google.adk.tools.tool_context import ToolContext
+
+logger = logging.getLogger(__name__)
+
+# Longest message content returned to the agent per result
+MAX_RESULT_CONTENT_CHARS = 500
+
+def search_chat_history(
+    query: str,
+    max_results: int = 5,
+    session_id: Optional[str] = None,
+    tool_context: Optional[ToolContext] = None
+) -> Dict[str, Any]:
+    """
+    Search the stored chat history for messages containing words or phrases.
+
+    Use this tool to find where something was said in earlier chats, for
+    example a name, a command or an exact quote. Put a phrase in double quotes
+    to match it exactly; small typos still find matches.
+
+    Args:
+        query: Words or a "quoted phrase" to look for
+        max_results: Maximum number of results to return (default: 5)
+        session_id: Optional chat session to search in (default: all chats)
+        tool_context: Tool context, unused
+
+    Returns:
+        dict: A dictionary containing:
+              'status' (str): 'success' or 'error'
+              'results' (list, optional): Matching messages, best first, each with
+                  'session_name', 'role', 'timestamp', 'snippet' (matches in **bold**)
+                  and 'content'
+              'error_message' (str, optional): Description of the error if failed
+    """
+    try:
+        # Imported here: the chat database module needs database credentials at import
+        from radbot.web.db import chat_operations
+
+        results = chat_operations.search_messages(
+            query,
+            session_id=session_id,
+            limit=max(1, min(max_results, 50)),
+            html=False
+        )
+
+        formatted = []
+        for result in results:
+            content = result["content"]
+            if len(content) > MAX_RESULT_CONTENT_CHARS:
+                content = content[:MAX_RESULT_CONTENT_CHARS - 3] + "..."
+            formatted.append({
+                "session_id": result["session_id"],
+                "session_name": result.get("session_name"),
+                "role": result["role"],
+                "agent_name": result.get("agent_name"),
+                "timestamp": result["timestamp"],
+                "snippet": result["snippet"],
+                "content": content,
+            })
+
+        logger.info(f"Chat history search for '{query}' found {len(formatted)} results")
+        return {"status": "success", "results": formatted}
+    except Exception as e:
+        logger.error(f"Error searching chat history: {str(e)}")
+        return {
+            "status": "error",
+            "error_message": f"Failed to search chat history: {str(e)}"
+        }
@@ -0,0 +1,231 @@
+"""
+Lazy tool registry for the root agent.
+
+Importing a tool family is not free: Home Assistant, calendar, Tavily and the
+todo database pull in client libraries, and some of them read credentials or
+talk to their backend when first imported. The registry declares every tool
+of the root agent up front, by name and by where it lives. A tool's module is
+imported the first time the agent needs the tool's declaration or calls it,
+so the agent tree can be built without importing any tool family. A family
+that fails to import loses its tools, with a warning, instead of stopping the
+whole agent from starting.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from google.adk.tools import FunctionTool
+from google.adk.tools.base_tool import BaseTool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """Where to find a tool, and what to call it before it is loaded."""
+
+    # Name the model calls the tool by
+    name: str
+    # Module and attribute holding the tool, a plain function, or a factory
+    module: str
+    attribute: str
+    # Tool family, for logs and load statistics
+    family: str
+    description: str = ""
+    # When set, the attribute is a factory called with these keyword arguments
+    factory_kwargs: Optional[Dict[str, Any]] = field(default=None, hash=False)
+
+
+def _as_tool(obj: Any) -> Optional[BaseTool]:
+    """Wrap a loaded tool object for ADK, if needed."""
+    if obj is None:
+        return None
+    if isinstance(obj, BaseTool):
+        return obj
+    if callable(obj):
+        return FunctionTool(obj)
+    raise TypeError(f"{type(obj).__name__} is not a tool")
+
+
+class LazyTool(BaseTool):
+    """A tool whose module is imported on first use.
+
+    Until then it only knows its name and description. Declarations and calls
+    are delegated to the real tool, which registers itself with the request
+    under its own name, so ADK dispatches function calls to it directly.
+    """
+
+    def __init__(self, spec: ToolSpec):
+        super().__init__(name=spec.name, description=spec.description)
+        self.spec = spec
+        self._tool: Optional[BaseTool] = None
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the tool's module has been imported successfully."""
+        return self._tool is not None
+
+    def resolve(self) -> Optional[BaseTool]:
+        """Import and build the real tool, once.
+
+        Returns:
+            The tool, or None if it could not be loaded
+        """
+        if self._tool is not None or self._error is not None:
+            return self._tool
+        with self._lock:
+            if self._tool is None and self._error is None:
+                start = time.perf_counter()
+                try:
+                    obj = getattr(importlib.import_module(self.spec.module), self.spec.attribute)
+                    if self.spec.factory_kwargs is not None:
+                        obj = obj(**self.spec.factory_kwargs)
+                    tool = _as_tool(obj)
+                    if tool is None:
+                        raise ValueError("factory returned no tool")
+                    self._tool = tool
+                    self.is_long_running = tool.is_long_running
+                    logger.debug(f"Loaded tool {self.name} from {self.spec.module} "
+                                 f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+                except Exception as e:
+                    self._error = str(e) or type(e).__name__
+                    logger.warning(f"Tool {self.name} ({self.spec.family}) is unavailable: {self._error}")
+        return self._tool
+
+    def _get_declaration(self):
+        tool = self.resolve()
+        return tool._get_declaration() if tool is not None else None
+
+    async def process_llm_request(self, *, tool_context, llm_request) -> None:
+        tool = self.resolve()
+        if tool is not None:
+            await tool.process_llm_request(tool_context=tool_context, llm_request=llm_request)
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context) -> Any:
+        tool = self.resolve()
+        if tool is None:
+            return {
+                "status": "error",
+                "error_message": f"The {self.name} tool is unavailable: {self._error}"
+            }
+        return await tool.run_async(args=args, tool_context=tool_context)
+
+
+# Tools of the root agent, in the order the agent sees them
+ROOT_TOOL_SPECS: List[ToolSpec] = [
+    # Sub-agent tools; their module builds the agents they call when it is first imported
+    ToolSpec("call_search_agent", "radbot.tools.agent_tools", "call_search_agent", "agents",
+             "Execute a web search query using the search agent"),
+    ToolSpec("call_code_execution_agent", "radbot.tools.agent_tools", "call_code_execution_agent", "agents",
+             "Execute Python code using the code execution agent"),
+    ToolSpec("call_scout_agent", "radbot.tools.agent_tools", "call_scout_agent", "agents",
+             "Research a topic using the scout agent"),
+
+    ToolSpec("web_search", "radbot.tools.web_search.web_search_tools", "create_tavily_search_tool", "web_search",
+             "Search the web for information about the query",
+             factory_kwargs={"max_results": 3, "search_depth": "advanced",
+                             "include_answer": True, "include_raw_content": True}),
+
+    ToolSpec("get_current_time", "radbot.tools.basic.basic_tools", "get_current_time", "basic",
+             "Get the current time for a city"),
+    ToolSpec("get_weather", "radbot.tools.basic.basic_tools", "get_weather", "basic",
+             "Get the weather for a city"),
+
+    ToolSpec("list_calendar_events_wrapper", "radbot.tools.calendar.calendar_tools",
+             "list_calendar_events_tool", "calendar", "List upcoming calendar events"),
+    ToolSpec("create_calendar_event_wrapper", "radbot.tools.calendar.calendar_tools",
+             "create_calendar_event_tool", "calendar", "Create a calendar event"),
+    ToolSpec("update_calendar_event_wrapper", "radbot.tools.calendar.calendar_tools",
+             "update_calendar_event_tool", "calendar", "Update a calendar event"),
+    ToolSpec("delete_calendar_event_wrapper", "radbot.tools.calendar.calendar_tools",
+             "delete_calendar_event_tool", "calendar", "Delete a calendar event"),
+    ToolSpec("check_calendar_availability_wrapper", "radbot.tools.calendar.calendar_tools",
+             "check_calendar_availability_tool", "calendar", "Check calendar availability"),
+
+    ToolSpec("search_ha_entities", "radbot.tools.homeassistant", "search_ha_entities", "homeassistant",
+             "Search Home Assistant entities"),
+    ToolSpec("list_ha_entities", "radbot.tools.homeassistant", "list_ha_entities", "homeassistant",
+             "List Home Assistant entities"),
+    ToolSpec("get_ha_entity_state", "radbot.tools.homeassistant", "get_ha_entity_state", "homeassistant",
+             "Get the state of a Home Assistant entity"),
+    ToolSpec("turn_on_ha_entity", "radbot.tools.homeassistant", "turn_on_ha_entity", "homeassistant",
+             "Turn on a Home Assistant entity"),
+    ToolSpec("turn_off_ha_entity", "radbot.tools.homeassistant", "turn_off_ha_entity", "homeassistant",
+             "Turn off a Home Assistant entity"),
+    ToolSpec("toggle_ha_entity", "radbot.tools.homeassistant", "toggle_ha_entity", "homeassistant",
+             "Toggle a Home Assistant entity"),
+
+    ToolSpec("execute_shell_command", "radbot.tools.shell.shell_tool", "get_shell_tool", "shell",
+             "Execute an allow-listed shell command", factory_kwargs={"strict_mode": True}),
+    ToolSpec("shell_session_run", "radbot.tools.shell.shell_tool", "get_shell_session_run_tool", "shell",
+             "Run an allow-listed command in this conversation's persistent shell",
+             factory_kwargs={"strict_mode": True}),
+    ToolSpec("shell_session_close", "radbot.tools.shell.shell_tool", "get_shell_session_close_tool", "shell",
+             "Close this conversation's persistent shell", factory_kwargs={}),
+
+    ToolSpec("add_task", "radbot.tools.todo.api.task_tools", "add_task_tool", "todo", "Add a todo task"),
+    ToolSpec("complete_task", "radbot.tools.todo.api.task_tools", "complete_task_tool", "todo",
+             "Mark a todo task as done"),
+    ToolSpec("remove_task", "radbot.tools.todo.api.task_tools", "remove_task_tool", "todo",
+             "Remove a todo task"),
+    ToolSpec("list_projects", "radbot.tools.todo.api.project_tools", "list_projects_tool", "todo",
+             "List todo projects"),
+    ToolSpec("list_project_tasks", "radbot.tools.todo.api.list_tools", "list_project_tasks_tool", "todo",
+             "List the tasks of a todo project"),
+    ToolSpec("list_all_tasks", "radbot.tools.todo.api.list_tools", "list_all_tasks_tool", "todo",
+             "List all todo tasks"),
+    ToolSpec("update_task", "radbot.tools.todo.api.update_tools", "update_task_tool", "todo",
+             "Update a todo task"),
+    ToolSpec("update_project", "radbot.tools.todo.api.update_tools", "update_project_tool", "todo",
+             "Rename a todo project"),
+
+    ToolSpec("search_past_conversations", "radbot.tools.memory.memory_tools", "search_past_conversations",
+             "memory", "Search the memory of past conversations"),
+    ToolSpec("store_important_information", "radbot.tools.memory.memory_tools", "store_important_information",
+             "memory", "Store important information in memory"),
+    ToolSpec("search_chat_history", "radbot.tools.memory.chat_search_tools", "search_chat_history",
+             "memory", "Search the stored chat history for words or phrases"),
+
+    ToolSpec("load_artifacts", "google.adk.tools", "load_artifacts", "artifacts",
+             "Load artifacts of the session"),
+]
+
+
+def create_lazy_tools(specs: Optional[List[ToolSpec]] = None) -> List[LazyTool]:
+    """Create lazy tools for a list of specs, importing nothing.
+
+    Args:
+        specs: Tool specs (default: ROOT_TOOL_SPECS)
+
+    Returns:
+        One LazyTool per spec
+    """
+    return [LazyTool(spec) for spec in (ROOT_TOOL_SPECS if specs is None else specs)]
+
+
+def get_tool_load_status(tools: List[Any]) -> Dict[str, str]:
+    """Report which lazy tools are loaded, pending or unavailable.
+
+    Args:
+        tools: An agent's tools; tools that are not lazy are reported as loaded
+
+    Returns:
+        Tool name -> "loaded", "pending" or "unavailable"
+    """
+    status = {}
+    for tool in tools:
+        if isinstance(tool, LazyTool):
+            if tool.loaded:
+                status[tool.name] = "loaded"
+            else:
+                status[tool.name] = "unavailable" if tool._error is not None else "pending"
+        else:
+            name = getattr(tool, "name", None) or getattr(tool, "__name__", str(tool))
+            status[name] = "loaded"
+    return status
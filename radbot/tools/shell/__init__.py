@@ -5,10 +5,26 @@ This package provides the functionality for executing shell commands.
 """
 
 from radbot.tools.shell.shell_command import execute_shell_command, ALLOWED_COMMANDS
-from radbot.tools.shell.shell_tool import get_shell_tool
+from radbot.tools.shell.streaming import (
+    execute_shell_command_async,
+    cancel_command,
+    list_running_commands,
+    add_output_listener,
+    remove_output_listener,
+)
+from radbot.tools.shell.shell_session import run_in_session, close_session
+from radbot.tools.shell.shell_tool import get_shell_tool, get_shell_session_tools
 
 __all__ = [
     "execute_shell_command",
+    "execute_shell_command_async",
+    "cancel_command",
+    "list_running_commands",
+    "add_output_listener",
+    "remove_output_listener",
     "ALLOWED_COMMANDS",
+    "run_in_session",
+    "close_session",
     "get_shell_tool",
+    "get_shell_session_tools",
 ]
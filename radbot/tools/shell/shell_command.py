@@ -63,42 +63,73 @@ DEFAULT_TIMEOUT = 120  # Default execution timeout in seconds (increased to 2 mi
 logger = logging.getLogger(__name__)
 
 
-def execute_shell_command(
-    command: str, 
-    arguments: List[str] = [], 
-    timeout: int = DEFAULT_TIMEOUT,
-    strict_mode: bool = True
-) -> Dict[str, Any]:
-    """Execute a shell command securely using subprocess.
+# High-risk shell metacharacters that could allow command chaining or injection
+HIGH_RISK_CHARS = [';', '|', '&', '$', '`']
+
+# Exempt certain commands from strict character filtering
+# These commands commonly need special characters in their arguments
+COMMAND_EXEMPTIONS = {
+    # Git commands often use special characters
+    "git": ['<', '>', '(', ')', '\\', '..' ],
+    "gh": ['<', '>', '(', ')', '\\', '..' ],
+    
+    # Search tools often need regex patterns with special characters
+    "grep": ['|', '(', ')', '[', ']', '{', '}', '\\', '.'],
+    "egrep": ['|', '(', ')', '[', ']', '{', '}', '\\', '.'],
+    "fgrep": ['|', '(', ')', '[', ']', '{', '}', '\\', '.'],
+    "rg": ['|', '(', ')', '[', ']', '{', '}', '\\', '.'],
+    "ripgrep": ['|', '(', ')', '[', ']', '{', '}', '\\', '.'],
+    
+    # Text processing tools that use regex or special syntax
+    "sed": ['|', '(', ')', '[', ']', '{', '}', '\\', '.', '/'],
+    "awk": ['|', '(', ')', '[', ']', '{', '}', '\\', '.', '/'],
+    "tr": ['[', ']', '\\'],
+    
+    # Shell utilities that might need path traversal
+    "cd": ['..'],
+    "cp": ['..'],
+    "mv": ['..'],
+    "find": ['..', '(', ')', '\\'],
+    
+    # Package managers often use URLs or complex arguments
+    "pip": ['<', '>', '@', '=', '+', '..' ],
+    "uv": ['<', '>', '@', '=', '+', '..' ],
+}
+
+
+def error_result(error_message: str) -> Dict[str, Any]:
+    """Build the result of a command that could not run.
+
+    Args:
+        error_message: Description of the error.
+
+    Returns:
+        A result dictionary with the error as stderr and return code -1.
+    """
+    return {
+        "stdout": "",
+        "stderr": error_message,
+        "return_code": -1,
+        "error": error_message,
+    }
+
+
+def validate_command(command: str, arguments: List[str], strict_mode: bool = True) -> Optional[str]:
+    """Check a command and its arguments against the security rules.
 
     Args:
         command: The command to execute. In strict mode, must be in ALLOWED_COMMANDS.
         arguments: A list of string arguments to pass to the command.
-        timeout: Maximum execution time in seconds. Defaults to DEFAULT_TIMEOUT.
         strict_mode: When True, only allow-listed commands are permitted.
-                    When False, any command can be executed (SECURITY RISK).
 
     Returns:
-        A dictionary containing:
-        - 'stdout' (str): The standard output captured from the command.
-        - 'stderr' (str): The standard error captured from the command.
-        - 'return_code' (int): The exit code returned by the command.
-          -1 indicates an execution error before the command ran.
-        - 'error' (Optional[str]): Description of any error that occurred.
-          None on success (return code 0).
+        An error message if the command must not run, None if it may.
     """
-    logger.info(f"Attempting to execute command: {command} with arguments: {arguments}")
-
     # --- Security Check 1: Command Allow-listing (only when strict_mode is True) ---
     if strict_mode and command not in ALLOWED_COMMANDS:
         error_message = f"Error: Command '{command}' is not allowed in strict mode."
         logger.warning(error_message)
-        return {
-            "stdout": "",
-            "stderr": error_message,
-            "return_code": -1,
-            "error": error_message,
-        }
+        return error_message
 
     # Log security warning if executing non-allow-listed command
     if not strict_mode and command not in ALLOWED_COMMANDS:
@@ -109,74 +140,59 @@ def execute_shell_command(
     # --- Security Check 2: Smart Argument Validation ---
     # More robust validation that provides reasonable flexibility 
     # while maintaining security controls
-    sanitized_arguments = []
-    
-    # High-risk shell metacharacters that could allow command chaining or injection
-    high_risk_chars = [';', '|', '&', '$', '`']
-    
-    # Exempt certain commands from strict character filtering
-    # These commands commonly need special characters in their arguments
-    command_exemptions = {
-        # Git commands often use special characters
-        "git": ['<', '>', '(', ')', '\\', '..' ],
-        "gh": ['<', '>', '(', ')', '\\', '..' ],
-        
-        # Search tools often need regex patterns with special characters
-        "grep": ['|', '(', ')', '[', ']', '{', '}', '\\', '.'],
-        "egrep": ['|', '(', ')', '[', ']', '{', '}', '\\', '.'],
-        "fgrep": ['|', '(', ')', '[', ']', '{', '}', '\\', '.'],
-        "rg": ['|', '(', ')', '[', ']', '{', '}', '\\', '.'],
-        "ripgrep": ['|', '(', ')', '[', ']', '{', '}', '\\', '.'],
-        
-        # Text processing tools that use regex or special syntax
-        "sed": ['|', '(', ')', '[', ']', '{', '}', '\\', '.', '/'],
-        "awk": ['|', '(', ')', '[', ']', '{', '}', '\\', '.', '/'],
-        "tr": ['[', ']', '\\'],
-        
-        # Shell utilities that might need path traversal
-        "cd": ['..'],
-        "cp": ['..'],
-        "mv": ['..'],
-        "find": ['..', '(', ')', '\\'],
-        
-        # Package managers often use URLs or complex arguments
-        "pip": ['<', '>', '@', '=', '+', '..' ],
-        "uv": ['<', '>', '@', '=', '+', '..' ],
-    }
     
     # Get the list of characters exempted for this command
-    exempted_chars = command_exemptions.get(command, [])
+    exempted_chars = COMMAND_EXEMPTIONS.get(command, [])
     
     for arg in arguments:
         # Filter out high-risk characters that aren't exempted for this command
-        risky_chars_present = [char for char in high_risk_chars if char in arg and char not in exempted_chars]
+        risky_chars_present = [char for char in HIGH_RISK_CHARS if char in arg and char not in exempted_chars]
         
         # Check for potential path traversal (.. in paths) unless exempted
         path_traversal_risk = '..' in arg and '..' not in exempted_chars
         
         if risky_chars_present:
-            error_message = f"Error: Argument '{arg}' contains potentially unsafe characters: {', '.join(risky_chars_present)}"
             logger.warning(f"Rejected unsafe argument for command '{command}': {arg}")
-            return {
-                "stdout": "",
-                "stderr": error_message,
-                "return_code": -1,
-                "error": error_message,
-            }
+            return f"Error: Argument '{arg}' contains potentially unsafe characters: {', '.join(risky_chars_present)}"
         
         if path_traversal_risk:
-            error_message = f"Error: Argument '{arg}' contains path traversal sequences which are not allowed for this command."
             logger.warning(f"Rejected path traversal in argument for command '{command}': {arg}")
-            return {
-                "stdout": "",
-                "stderr": error_message,
-                "return_code": -1,
-                "error": error_message,
-            }
-            
-        sanitized_arguments.append(arg)
-
-    command_to_run = [command] + sanitized_arguments
+            return f"Error: Argument '{arg}' contains path traversal sequences which are not allowed for this command."
+
+    return None
+
+
+def execute_shell_command(
+    command: str, 
+    arguments: List[str] = [], 
+    timeout: int = DEFAULT_TIMEOUT,
+    strict_mode: bool = True
+) -> Dict[str, Any]:
+    """Execute a shell command securely using subprocess.
+
+    Args:
+        command: The command to execute. In strict mode, must be in ALLOWED_COMMANDS.
+        arguments: A list of string arguments to pass to the command.
+        timeout: Maximum execution time in seconds. Defaults to DEFAULT_TIMEOUT.
+        strict_mode: When True, only allow-listed commands are permitted.
+                    When False, any command can be executed (SECURITY RISK).
+
+    Returns:
+        A dictionary containing:
+        - 'stdout' (str): The standard output captured from the command.
+        - 'stderr' (str): The standard error captured from the command.
+        - 'return_code' (int): The exit code returned by the command.
+          -1 indicates an execution error before the command ran.
+        - 'error' (Optional[str]): Description of any error that occurred.
+          None on success (return code 0).
+    """
+    logger.info(f"Attempting to execute command: {command} with arguments: {arguments}")
+
+    error_message = validate_command(command, arguments, strict_mode)
+    if error_message:
+        return error_result(error_message)
+
+    command_to_run = [command] + list(arguments)
     logger.info(f"Executing validated command list: {command_to_run}")
 
     try:
@@ -0,0 +1,474 @@
+"""Persistent shell sessions.
+
+Every ``execute_shell_command`` call starts a fresh process, so the working
+directory and environment set by one step are gone by the next, and
+multi-step work repeats its setup. A shell session is one long-lived
+``/bin/sh`` process per chat session that runs the agent's commands one after
+another, keeping its working directory (``cd``) and environment (``export``,
+``unset``) between them.
+
+The session shell is kept on a short leash:
+
+- every command passes the same allow-list and argument checks as
+  ``execute_shell_command``, and is written to the shell with each word
+  quoted, so the shell never sees an unquoted metacharacter;
+- ``export`` and ``unset`` only accept variables on an allow-list
+  (``RADBOT_*`` plus ``agent.shell.session_env_allow``), since almost any
+  other variable can change what an allowed command runs, loads or talks to
+  (``PATH``, ``LD_*``, ``http_proxy``, ``SSL_CERT_FILE``, ``GZIP``, ...);
+- commands read their stdin from ``/dev/null``, so they cannot consume the
+  protocol stream;
+- after each command the shell prints a per-session random sentinel, with
+  the return code and working directory, on stdout (and the sentinel alone on
+  stderr). Output up to the sentinel belongs to the command;
+- a command that times out or is cancelled takes the session down with it:
+  the shell's whole process group is killed and the next command starts a
+  fresh session;
+- sessions idle for longer than the idle timeout are closed, and at most
+  ``max_sessions`` are kept.
+
+Commands run on the ShellExecutor loop, so they share its concurrency limit,
+stream their output to the UI and can be cancelled like any other command.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shlex
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from radbot.config.config_loader import config_loader
+from radbot.tools.shell.shell_command import DEFAULT_TIMEOUT, HIGH_RISK_CHARS, error_result, validate_command
+from radbot.tools.shell.streaming import (
+    READ_CHUNK_BYTES,
+    CommandError,
+    OutputBuffer,
+    OutputListener,
+    RunningCommand,
+    ShellExecutor,
+    get_shell_executor,
+    kill_process_group,
+)
+
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable via agent.shell in the configuration
+DEFAULT_IDLE_TIMEOUT = 600
+DEFAULT_MAX_SESSIONS = 8
+
+# Shell run by sessions
+SESSION_SHELL = "/bin/sh"
+
+# Shell builtins a session accepts besides ALLOWED_COMMANDS; they only change the session
+SESSION_BUILTINS = {"export", "unset"}
+
+_ENV_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Prefixes of the variables export and unset always accept: radbot's own namespace,
+# which no allow-listed command reads
+SESSION_ENV_PREFIXES = ("RADBOT_",)
+
+# Further variables export and unset accept, overridable via agent.shell.session_env_allow.
+# Everything else is rejected: an export persists for every later command of
+# the session, and most variables change what some command runs, loads or
+# connects to.
+DEFAULT_SESSION_ENV_ALLOW = ["LANG", "LC_ALL", "NO_COLOR", "COLUMNS"]
+
+
+def is_allowed_env_name(name: str, allow: Optional[List[str]] = None) -> bool:
+    """
+    Whether a session may set or unset an environment variable.
+
+    Args:
+        name: Name of the variable
+        allow: Names accepted besides SESSION_ENV_PREFIXES; an entry ending in
+            ``*`` accepts every name starting with the rest (default: DEFAULT_SESSION_ENV_ALLOW)
+
+    Returns:
+        True if the variable may be changed
+    """
+    if name.startswith(SESSION_ENV_PREFIXES):
+        return True
+    for pattern in DEFAULT_SESSION_ENV_ALLOW if allow is None else allow:
+        if pattern.endswith("*") and name.startswith(pattern[:-1]):
+            return True
+        if pattern == name:
+            return True
+    return False
+
+
+class ShellSession:
+    """A long-lived shell running one chat session's commands in turn."""
+
+    def __init__(self, key: str, cwd: Optional[str] = None, env_allow: Optional[List[str]] = None):
+        """
+        Initialize the session. The shell starts with the first command.
+
+        Args:
+            key: Chat session the shell belongs to
+            cwd: Working directory the shell starts in (default: the server's)
+            env_allow: Variables export and unset accept besides RADBOT_*
+                (default: DEFAULT_SESSION_ENV_ALLOW)
+        """
+        self.key = key
+        self.env_allow = list(DEFAULT_SESSION_ENV_ALLOW if env_allow is None else env_allow)
+        self.initial_cwd = cwd
+        self.cwd = cwd or os.getcwd()
+        self.sentinel = f"__radbot_{uuid.uuid4().hex}__"
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.commands_run = 0
+        self.last_used = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def alive(self) -> bool:
+        """Whether the shell process is running."""
+        return self.process is not None and self.process.returncode is None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a command is running or waiting in this session."""
+        return self._lock is not None and self._lock.locked()
+
+    def validate(self, command: str, arguments: List[str], strict_mode: bool = True) -> Optional[str]:
+        """
+        Check a command for this session: the builtins of SESSION_BUILTINS, or validate_command.
+
+        The builtins only accept variables of the session's allow-list, in every
+        mode, since others could change what the allow-listed commands run.
+
+        Returns:
+            An error message if the command must not run, None if it may
+        """
+        if command not in SESSION_BUILTINS:
+            return validate_command(command, arguments, strict_mode)
+        if not arguments:
+            return f"Error: '{command}' needs at least one variable name."
+        for arg in arguments:
+            name, _, value = arg.partition("=")
+            if not _ENV_NAME.match(name) or (command == "unset" and "=" in arg):
+                return f"Error: '{arg}' is not a valid argument for '{command}'."
+            if not is_allowed_env_name(name, self.env_allow):
+                logger.warning(f"Rejected variable outside the allow-list for command '{command}': {name}")
+                return (f"Error: The variable '{name}' cannot be changed in a shell session. "
+                        f"Allowed: {', '.join(p + '*' for p in SESSION_ENV_PREFIXES)}"
+                        f"{''.join(', ' + p for p in self.env_allow)}.")
+            risky_chars_present = [char for char in HIGH_RISK_CHARS if char in value]
+            if risky_chars_present:
+                logger.warning(f"Rejected unsafe argument for command '{command}': {arg}")
+                return f"Error: Argument '{arg}' contains potentially unsafe characters: {', '.join(risky_chars_present)}"
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.key,
+            "alive": self.alive,
+            "busy": self.busy,
+            "cwd": self.cwd,
+            "pid": self.process.pid if self.alive else None,
+            "commands_run": self.commands_run,
+            "idle_seconds": round(time.monotonic() - self.last_used, 1),
+        }
+
+    async def _start(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            SESSION_SHELL,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.initial_cwd,
+            # Own process group, so closing the session also stops what it started
+            start_new_session=hasattr(os, "killpg"),
+        )
+        self.cwd = self.initial_cwd or os.getcwd()
+        logger.info(f"Started shell session {self.key} (pid {self.process.pid})")
+
+    def _script(self, command: str, arguments: List[str]) -> bytes:
+        """The lines written to the shell for one command."""
+        line = shlex.join([command] + arguments)
+        return (
+            f"{line} </dev/null\n"
+            f"printf '\\n%s:%d:%s\\n' '{self.sentinel}' \"$?\" \"$PWD\"\n"
+            f"printf '\\n%s:\\n' '{self.sentinel}' >&2\n"
+        ).encode("utf-8")
+
+    async def _read_until_sentinel(self, stream: asyncio.StreamReader, name: str,
+                                   buffer: OutputBuffer, publisher: Any) -> str:
+        """Copy a pipe's output up to the sentinel, returning what the sentinel line carries."""
+        marker = f"\n{self.sentinel}:".encode("utf-8")
+        # Bytes that could be the start of the marker are held back until the next read
+        keep = len(marker) - 1
+        pending = b""
+        while True:
+            index = pending.find(marker)
+            if index >= 0:
+                if index:
+                    buffer.append(pending[:index])
+                    publisher.add(name, pending[:index])
+                rest = pending[index + len(marker):]
+                while b"\n" not in rest:
+                    data = await stream.read(READ_CHUNK_BYTES)
+                    if not data:
+                        raise CommandError("The shell session exited.")
+                    rest += data
+                return rest.split(b"\n", 1)[0].decode("utf-8", errors="replace")
+            if len(pending) > keep:
+                buffer.append(pending[:-keep])
+                publisher.add(name, pending[:-keep])
+                pending = pending[-keep:]
+            data = await stream.read(READ_CHUNK_BYTES)
+            if not data:
+                raise CommandError("The shell session exited.")
+            pending += data
+
+    async def run(self, record: RunningCommand, publisher: Any, stdout: OutputBuffer,
+                  stderr: OutputBuffer, timeout: float) -> int:
+        """
+        Run a validated command in the session. Called by the ShellExecutor.
+
+        Returns:
+            The command's return code
+
+        Raises:
+            asyncio.TimeoutError: If the command did not finish in time; the session is closed
+            CommandError: If the shell exited
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self.alive:
+                await self._start()
+            record.pid = self.process.pid
+            logger.info(f"Executing validated command list in shell session {self.key}: "
+                        f"{[record.command] + record.arguments}")
+            completed = False
+            readers = []
+            try:
+                try:
+                    self.process.stdin.write(self._script(record.command, record.arguments))
+                    await self.process.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    raise CommandError("The shell session exited.")
+                readers = [
+                    asyncio.ensure_future(self._read_until_sentinel(self.process.stdout, "stdout", stdout, publisher)),
+                    asyncio.ensure_future(self._read_until_sentinel(self.process.stderr, "stderr", stderr, publisher)),
+                ]
+                _, still_running = await asyncio.wait(readers, timeout=timeout)
+                if still_running:
+                    raise asyncio.TimeoutError()
+                status, _, cwd = readers[0].result().partition(":")
+                readers[1].result()
+                completed = True
+                self.cwd = cwd or self.cwd
+                return int(status)
+            finally:
+                for reader in readers:
+                    reader.cancel()
+                self.commands_run += 1
+                self.last_used = time.monotonic()
+                if not completed:
+                    # The shell's state is unknown after an interrupted command; start over
+                    await self.close()
+
+    async def close(self) -> None:
+        """Kill the shell and everything it started."""
+        process, self.process = self.process, None
+        self.cwd = self.initial_cwd or os.getcwd()
+        if process is not None and process.returncode is None:
+            kill_process_group(process)
+            # Not cancellable: the process must be reaped even when the caller gave up
+            await asyncio.shield(process.wait())
+            logger.info(f"Closed shell session {self.key}")
+
+
+class ShellSessionManager:
+    """The shell sessions of all chat sessions, closed when idle."""
+
+    def __init__(self, executor: ShellExecutor, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS, cwd: Optional[str] = None,
+                 env_allow: Optional[List[str]] = None):
+        """
+        Initialize the manager.
+
+        Args:
+            executor: Executor the session commands run on
+            idle_timeout: Seconds after which an unused session is closed
+            max_sessions: Number of sessions kept; the least recently used idle one is closed beyond it
+            cwd: Working directory new sessions start in
+            env_allow: Variables the sessions' export and unset accept besides RADBOT_*
+        """
+        self.executor = executor
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max(1, max_sessions)
+        self.cwd = cwd
+        self.env_allow = env_allow
+        self._sessions: Dict[str, ShellSession] = {}
+        self._lock = threading.Lock()
+        self._reaper: Optional[asyncio.Future] = None
+
+    def _close_later(self, session: ShellSession) -> None:
+        asyncio.run_coroutine_threadsafe(session.close(), self.executor.loop)
+
+    def get(self, key: str) -> Optional[ShellSession]:
+        """
+        Get the session of a chat session, creating it if needed.
+
+        Args:
+            key: Chat session identifier
+
+        Returns:
+            The session, or None if max_sessions sessions are all busy
+        """
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                return session
+            if len(self._sessions) >= self.max_sessions:
+                idle = [s for s in self._sessions.values() if not s.busy]
+                if not idle:
+                    return None
+                oldest = min(idle, key=lambda s: s.last_used)
+                logger.info(f"Closing shell session {oldest.key} to make room for {key}")
+                del self._sessions[oldest.key]
+                self._close_later(oldest)
+            session = ShellSession(key, self.cwd, self.env_allow)
+            self._sessions[key] = session
+            if self._reaper is None:
+                self._reaper = asyncio.run_coroutine_threadsafe(self._reap_idle(), self.executor.loop)
+            return session
+
+    def close(self, key: str) -> bool:
+        """
+        Close the session of a chat session.
+
+        Args:
+            key: Chat session identifier
+
+        Returns:
+            True if the chat session had a shell session
+        """
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session is None:
+            return False
+        self._close_later(session)
+        return True
+
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        """Describe the open sessions."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return [s.to_dict() for s in sessions]
+
+    async def _reap_idle(self) -> None:
+        """Close sessions unused for longer than the idle timeout."""
+        while True:
+            await asyncio.sleep(max(1.0, min(60.0, self.idle_timeout / 4)))
+            now = time.monotonic()
+            with self._lock:
+                expired = [s for s in self._sessions.values()
+                           if not s.busy and now - s.last_used > self.idle_timeout]
+                for session in expired:
+                    del self._sessions[session.key]
+            for session in expired:
+                logger.info(f"Closing shell session {session.key} after {self.idle_timeout}s idle")
+                await session.close()
+
+    def close_all(self, timeout: float = 5) -> None:
+        """Close every session and stop closing idle ones."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            reaper, self._reaper = self._reaper, None
+        if reaper is not None:
+            reaper.cancel()
+        for session in sessions:
+            try:
+                asyncio.run_coroutine_threadsafe(session.close(), self.executor.loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"Error closing shell session {session.key}: {e}")
+
+
+# Singleton session manager instance
+_manager: Optional[ShellSessionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_session_manager() -> ShellSessionManager:
+    """Get the shared session manager, configured from agent.shell, on the shared executor."""
+    global _manager
+    executor = get_shell_executor()
+    if _manager is None or _manager.executor is not executor:
+        with _manager_lock:
+            if _manager is None or _manager.executor is not executor:
+                shell_config = config_loader.get_agent_config().get("shell", {})
+                _manager = ShellSessionManager(
+                    executor,
+                    idle_timeout=float(shell_config.get("session_idle_timeout", DEFAULT_IDLE_TIMEOUT)),
+                    max_sessions=int(shell_config.get("max_sessions", DEFAULT_MAX_SESSIONS)),
+                    cwd=shell_config.get("session_cwd"),
+                    env_allow=shell_config.get("session_env_allow"),
+                )
+    return _manager
+
+
+def close_shell_sessions() -> None:
+    """Close every shell session, if any were opened."""
+    global _manager
+    with _manager_lock:
+        manager, _manager = _manager, None
+    if manager is not None:
+        manager.close_all()
+
+
+async def run_in_session(
+    session_key: str,
+    command: str,
+    arguments: Optional[List[str]] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    strict_mode: bool = True,
+    on_output: Optional[OutputListener] = None,
+) -> Dict[str, Any]:
+    """Run a command in the shell session of a chat session, starting it if needed.
+
+    Args:
+        session_key: Chat session the shell belongs to; its output events carry it as session_id.
+        command: The command to execute. In strict mode, must be in ALLOWED_COMMANDS or SESSION_BUILTINS.
+        arguments: A list of string arguments to pass to the command.
+        timeout: Maximum execution time in seconds. A command that times out closes the session.
+        strict_mode: When True, only allow-listed commands are permitted.
+        on_output: Optional listener for this command's events only.
+
+    Returns:
+        The dictionary execute_shell_command_async returns, plus the session's
+        working directory after the command as 'cwd'.
+    """
+    manager = get_session_manager()
+    session = manager.get(session_key)
+    if session is None:
+        return error_result(f"Error: All {manager.max_sessions} shell sessions are busy. Try again later.")
+    result = await manager.executor.run_async(
+        command, arguments, timeout=timeout, strict_mode=strict_mode,
+        session_id=session_key, on_output=on_output, shell_session=session,
+    )
+    result["cwd"] = session.cwd
+    if result["return_code"] == -1 and session.commands_run and not session.alive:
+        result["error"] = (f"{result['error']} The shell session was closed; the next command "
+                           f"starts a new one in the initial directory and environment.")
+    return result
+
+
+def close_session(session_key: str) -> bool:
+    """Close the shell session of a chat session.
+
+    Args:
+        session_key: Chat session the shell belongs to.
+
+    Returns:
+        True if the chat session had a shell session.
+    """
+    return get_session_manager().close(session_key)
@@ -11,10 +11,24 @@ from typing import Dict, List, Any, Optional, Union
 from google.ai.generativelanguage import Tool, FunctionDeclaration, Schema, Type
 from google.adk.tools import FunctionTool
 
-from radbot.tools.shell.shell_command import execute_shell_command, ALLOWED_COMMANDS
+from radbot.tools.shell.shell_command import ALLOWED_COMMANDS, error_result
+from radbot.tools.shell.streaming import execute_shell_command_async
+from radbot.tools.shell.shell_session import SESSION_BUILTINS, close_session, run_in_session
 
 logger = logging.getLogger(__name__)
 
+NO_SESSION_ERROR = (
+    "Error: Shell sessions are only available within a chat session. "
+    "Use execute_shell_command instead."
+)
+
+
+def _get_session_id(tool_context: Any) -> Optional[str]:
+    """Get the ID of the chat session a tool call belongs to, if the context has one."""
+    invocation_context = getattr(tool_context, "_invocation_context", None)
+    session = getattr(invocation_context, "session", None)
+    return getattr(session, "id", None)
+
 
 def execute_command_with_claude(
     command: str,
@@ -84,13 +98,16 @@ def get_shell_tool(strict_mode: bool = True, use_claude_cli: bool = False) -> An
     tool_description += f" (Using subprocess for execution)"
     
     # Create a wrapper function for ADK compatibility
-    def shell_command_tool(command: str, arguments: Optional[List[str]] = None, timeout: int = 60) -> Dict[str, Any]:
+    async def shell_command_tool(
+        command: str, arguments: Optional[List[str]] = None, timeout: int = 60, tool_context=None
+    ) -> Dict[str, Any]:
         """Execute a shell command securely.
         
         Args:
             command: The command to execute. In strict mode, must be in ALLOWED_COMMANDS.
             arguments: A list of arguments to pass to the command.
             timeout: Maximum execution time in seconds.
+            tool_context: Tool context from ADK, identifying the chat session to stream output to.
             
         Returns:
             A dictionary with stdout, stderr, return_code, and error information.
@@ -98,13 +115,14 @@ def get_shell_tool(strict_mode: bool = True, use_claude_cli: bool = False) -> An
         if arguments is None:
             arguments = []
         
-        # Always use subprocess
+        # Run on the shell loop, so the output streams to the UI while the command runs
         logger.info(f"Executing command '{command}' using subprocess")
-        return execute_shell_command(
+        return await execute_shell_command_async(
             command=command,
             arguments=arguments,
             timeout=timeout,
-            strict_mode=strict_mode
+            strict_mode=strict_mode,
+            session_id=_get_session_id(tool_context),
         )
     
     # Set metadata for the function
@@ -115,6 +133,95 @@ def get_shell_tool(strict_mode: bool = True, use_claude_cli: bool = False) -> An
     return FunctionTool(shell_command_tool)
 
 
+def get_shell_session_run_tool(strict_mode: bool = True) -> Any:
+    """Get the tool running commands in the agent session's persistent shell.
+    
+    Args:
+        strict_mode: When True, only allow-listed commands are permitted.
+                    When False, any command can be executed (SECURITY RISK).
+    
+    Returns:
+        A FunctionTool named shell_session_run.
+    """
+    if strict_mode:
+        allowed = ", ".join(sorted(ALLOWED_COMMANDS | SESSION_BUILTINS))
+        tool_description = (
+            f"Runs an allow-listed command in a persistent shell kept for this conversation. "
+            f"The working directory ('cd') and environment ('export NAME=value', 'unset NAME') "
+            f"carry over to the next shell_session_run call. "
+            f"Only the following commands are permitted: {allowed}. "
+            f"Provide the command name and a list of arguments; arguments are passed literally, "
+            f"without globbing or variable expansion."
+        )
+    else:
+        tool_description = (
+            "WARNING - SECURITY RISK: Runs any command in a persistent shell kept for this conversation. "
+            "The working directory and environment carry over to the next call. "
+            "Provide the command name and a list of arguments."
+        )
+        logger.warning("Shell session tool initialized in ALLOW ALL mode - SECURITY RISK")
+    
+    async def shell_session_run(
+        command: str, arguments: Optional[List[str]] = None, timeout: int = 60, tool_context=None
+    ) -> Dict[str, Any]:
+        """Run a command in the persistent shell session.
+        
+        Args:
+            command: The command to execute.
+            arguments: A list of arguments to pass to the command.
+            timeout: Maximum execution time in seconds. A command that times out closes the session.
+            tool_context: Tool context from ADK, identifying the session the shell belongs to.
+            
+        Returns:
+            A dictionary with stdout, stderr, return_code, error and the shell's working directory.
+        """
+        # Sessions are never shared: without a chat session there is no shell to keep
+        session_id = _get_session_id(tool_context)
+        if not session_id:
+            return error_result(NO_SESSION_ERROR)
+        return await run_in_session(
+            session_id,
+            command,
+            arguments or [],
+            timeout=timeout,
+            strict_mode=strict_mode,
+        )
+    
+    shell_session_run.__doc__ = tool_description
+    return FunctionTool(shell_session_run)
+
+
+def get_shell_session_close_tool() -> Any:
+    """Get the tool closing the agent session's persistent shell.
+    
+    Returns:
+        A FunctionTool named shell_session_close.
+    """
+    async def shell_session_close(tool_context=None) -> Dict[str, Any]:
+        """Close the persistent shell of this conversation, resetting its working directory and environment.
+        
+        Shells are also closed after a period without commands.
+        """
+        session_id = _get_session_id(tool_context)
+        if not session_id:
+            return {"closed": False, "error": NO_SESSION_ERROR}
+        return {"closed": close_session(session_id), "error": None}
+    
+    return FunctionTool(shell_session_close)
+
+
+def get_shell_session_tools(strict_mode: bool = True) -> List[Any]:
+    """Get the shell_session_run and shell_session_close tools.
+    
+    Args:
+        strict_mode: When True, only allow-listed commands are permitted.
+    
+    Returns:
+        A list of the two tools.
+    """
+    return [get_shell_session_run_tool(strict_mode), get_shell_session_close_tool()]
+
+
 async def handle_shell_function_call(
     function_name: str, arguments: Dict[str, Any], strict_mode: bool = True, use_claude_cli: bool = False
 ) -> Dict[str, Any]:
@@ -183,7 +290,7 @@ async def handle_shell_function_call(
     
     # Always use subprocess now
     logger.info(f"Function call: Executing command '{command}' using subprocess")
-    return execute_shell_command(
+    return await execute_shell_command_async(
         command=command,
         arguments=arg_list,
         timeout=timeout,
@@ -0,0 +1,592 @@
+"""Streaming shell command execution.
+
+``execute_shell_command`` runs a command with ``subprocess.run`` and returns
+only when it exits, blocking its thread, and with all of the output held in
+memory. This module runs commands as asyncio subprocesses on a dedicated
+loop thread, so that any caller (the ADK runner's loop, the web server, a
+synchronous thread) can hand it commands:
+
+- stdout and stderr are read as they are produced and published, a few times
+  a second, to output listeners (the web UI) as incremental events;
+- each stream keeps at most ``max_output_bytes``: the beginning and a ring
+  buffer of the end, with the size of the dropped middle reported;
+- at most ``max_concurrent_commands`` run at once, further commands wait;
+- a running or waiting command can be cancelled by its ID, which kills its
+  process group.
+
+Commands pass the same allow-list and argument checks as
+``execute_shell_command`` and run without a shell, unless they are submitted
+with a shell session (``shell_session.py``), which runs them in its
+persistent shell instead.
+"""
+
+import asyncio
+import codecs
+import concurrent.futures
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from radbot.config.config_loader import config_loader
+from radbot.tools.shell.shell_command import DEFAULT_TIMEOUT, error_result, validate_command
+
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable via agent.shell in the configuration
+DEFAULT_MAX_CONCURRENT_COMMANDS = 4
+DEFAULT_MAX_OUTPUT_BYTES = 256 * 1024
+
+# Bytes read from a pipe at a time
+READ_CHUNK_BYTES = 64 * 1024
+
+# Seconds between two output events of a command
+OUTPUT_FLUSH_INTERVAL = 0.2
+
+# Largest text sent in one output event; the rest of a burst is skipped
+MAX_EVENT_CHARS = 16 * 1024
+
+# Called with an output event: command_id, session_id, command, state, and
+# for output events the stream, the text and the number of characters skipped
+OutputListener = Callable[[Dict[str, Any]], None]
+
+
+
+class CommandError(Exception):
+    """An error running a command whose message is reported to the caller."""
+
+
+_listeners: List[OutputListener] = []
+_listeners_lock = threading.Lock()
+
+
+def add_output_listener(listener: OutputListener) -> None:
+    """Receive the events of every command. Listeners are called on the shell loop thread."""
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def remove_output_listener(listener: OutputListener) -> None:
+    """Stop receiving command events."""
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+class OutputBuffer:
+    """Bounded capture of one output stream: its beginning plus a ring buffer of its end."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_OUTPUT_BYTES):
+        """
+        Initialize the buffer.
+
+        Args:
+            max_bytes: Largest output kept; half for the beginning, half for the end
+        """
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = bytearray()
+        self.tail: Deque[bytes] = deque()
+        self.tail_size = 0
+        self.dropped = 0
+
+    def append(self, data: bytes) -> None:
+        """Add output, dropping the oldest bytes past the beginning once full."""
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if not data:
+            return
+        self.tail.append(data)
+        self.tail_size += len(data)
+        while self.tail_size > self.tail_limit:
+            excess = self.tail_size - self.tail_limit
+            oldest = self.tail[0]
+            if len(oldest) <= excess:
+                self.tail.popleft()
+                self.tail_size -= len(oldest)
+                self.dropped += len(oldest)
+            else:
+                self.tail[0] = oldest[excess:]
+                self.tail_size -= excess
+                self.dropped += excess
+
+    def text(self) -> str:
+        """Decode the kept output, marking where the middle was dropped."""
+        head = bytes(self.head).decode("utf-8", errors="replace")
+        tail = b"".join(self.tail)
+        if not self.dropped:
+            return head + tail.decode("utf-8", errors="replace")
+        # The ring may start inside a multi-byte character
+        skip = 0
+        while skip < min(3, len(tail)) and 0x80 <= tail[skip] < 0xC0:
+            skip += 1
+        return (f"{head}\n[... {self.dropped} bytes of output omitted ...]\n"
+                f"{tail[skip:].decode('utf-8', errors='replace')}")
+
+
+class RunningCommand:
+    """A command waiting for a slot or running on the shell loop."""
+
+    def __init__(self, command_id: str, command: str, arguments: List[str], session_id: Optional[str]):
+        self.command_id = command_id
+        self.command = command
+        self.arguments = arguments
+        self.session_id = session_id
+        self.state = "queued"
+        self.pid: Optional[int] = None
+        self.queued_at = time.time()
+        self.started_at: Optional[float] = None
+        self.cancel_requested = False
+        self.task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "command_id": self.command_id,
+            "command": self.command,
+            "arguments": self.arguments,
+            "session_id": self.session_id,
+            "state": self.state,
+            "pid": self.pid,
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+        }
+
+
+class _StreamPublisher:
+    """Coalesces the output of one command into periodic events."""
+
+    def __init__(self, record: RunningCommand, on_output: Optional[OutputListener]):
+        self.record = record
+        self.on_output = on_output
+        self.decoders = {name: codecs.getincrementaldecoder("utf-8")(errors="replace")
+                         for name in ("stdout", "stderr")}
+        self.pending: Dict[str, Deque[str]] = {"stdout": deque(), "stderr": deque()}
+        self.pending_chars = {"stdout": 0, "stderr": 0}
+        self.skipped_chars = {"stdout": 0, "stderr": 0}
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        event = {
+            "command_id": self.record.command_id,
+            "session_id": self.record.session_id,
+            "command": self.record.command,
+            "state": self.record.state,
+            **event,
+        }
+        with _listeners_lock:
+            listeners = list(_listeners)
+        if self.on_output is not None:
+            listeners.append(self.on_output)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.debug(f"Shell output listener failed: {e}")
+
+    def add(self, stream: str, data: bytes) -> None:
+        text = self.decoders[stream].decode(data)
+        if not text:
+            return
+        parts = self.pending[stream]
+        parts.append(text)
+        self.pending_chars[stream] += len(text)
+        # Keep up with fast output by sending only the end of a burst
+        while len(parts) > 1 and self.pending_chars[stream] - len(parts[0]) >= MAX_EVENT_CHARS:
+            dropped = parts.popleft()
+            self.pending_chars[stream] -= len(dropped)
+            self.skipped_chars[stream] += len(dropped)
+
+    def flush(self, final: bool = False) -> None:
+        for stream, parts in self.pending.items():
+            if final:
+                parts.append(self.decoders[stream].decode(b"", final=True))
+            text = "".join(parts)
+            parts.clear()
+            self.pending_chars[stream] = 0
+            if not text:
+                continue
+            cut = max(0, len(text) - MAX_EVENT_CHARS)
+            skipped = self.skipped_chars[stream] + cut
+            self.skipped_chars[stream] = 0
+            self.emit({"stream": stream, "text": text[cut:], "skipped_chars": skipped})
+
+
+# Runs a started command to completion: (record, publisher, stdout, stderr, timeout) -> return code
+Runner = Callable[..., Awaitable[int]]
+
+
+async def pump_stream(stream: asyncio.StreamReader, name: str, buffer: OutputBuffer,
+                      publisher: _StreamPublisher) -> None:
+    """Copy a pipe into an output buffer and the command's events until it closes."""
+    while True:
+        data = await stream.read(READ_CHUNK_BYTES)
+        if not data:
+            return
+        buffer.append(data)
+        publisher.add(name, data)
+
+
+def kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kill a process started in its own session, and the processes it started."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class ShellExecutor:
+    """Runs shell commands as asyncio subprocesses on a dedicated loop thread."""
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT_COMMANDS,
+                 max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES, name: str = "shell-io"):
+        """
+        Start the loop thread.
+
+        Args:
+            max_concurrent: Number of commands run at once
+            max_output_bytes: Output kept per stream of a command
+            name: Name of the thread
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_output_bytes = max_output_bytes
+        self._loop = asyncio.new_event_loop()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._commands: Dict[str, RunningCommand] = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The loop the commands run on."""
+        return self._loop
+
+    def submit(self, command: str, arguments: Optional[List[str]] = None,
+               timeout: float = DEFAULT_TIMEOUT, strict_mode: bool = True,
+               session_id: Optional[str] = None,
+               on_output: Optional[OutputListener] = None,
+               shell_session: Optional[Any] = None) -> concurrent.futures.Future:
+        """
+        Start a command on the shell loop.
+
+        Args:
+            command: The command to execute. In strict mode, must be in ALLOWED_COMMANDS.
+            arguments: A list of string arguments to pass to the command.
+            timeout: Maximum execution time in seconds, not counting time waiting for a slot.
+            strict_mode: When True, only allow-listed commands are permitted.
+            session_id: Chat session the command runs for, passed on in its events
+            on_output: Optional listener for this command's events only
+            shell_session: Optional ShellSession to run the command in, instead of a new process
+
+        Returns:
+            A future of the result dictionary; cancelling it kills the command
+        """
+        arguments = list(arguments or [])
+        logger.info(f"Attempting to execute command: {command} with arguments: {arguments}")
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        if shell_session is not None:
+            error_message = shell_session.validate(command, arguments, strict_mode)
+        else:
+            error_message = validate_command(command, arguments, strict_mode)
+        if error_message:
+            future.set_result(error_result(error_message))
+            return future
+
+        record = RunningCommand(uuid.uuid4().hex[:12], command, arguments, session_id)
+        with self._lock:
+            self._commands[record.command_id] = record
+        runner = shell_session.run if shell_session is not None else self._run_process
+        return asyncio.run_coroutine_threadsafe(self._execute(record, timeout, on_output, runner), self._loop)
+
+    def run(self, command: str, arguments: Optional[List[str]] = None, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Run a command and wait for its result. Takes the arguments of submit.
+
+        Returns:
+            The result dictionary
+
+        Raises:
+            RuntimeError: If called from the shell loop itself, which would deadlock
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("ShellExecutor.run() called from the shell loop; await run_async() instead")
+        return self.submit(command, arguments, **kwargs).result()
+
+    async def run_async(self, command: str, arguments: Optional[List[str]] = None, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Run a command from a coroutine on any loop. Takes the arguments of submit.
+
+        Returns:
+            The result dictionary
+        """
+        return await asyncio.wrap_future(self.submit(command, arguments, **kwargs))
+
+    def cancel(self, command_id: str, session_id: Optional[str] = None) -> bool:
+        """
+        Cancel a waiting or running command. Its result reports the cancellation.
+
+        Args:
+            command_id: ID of the command, from its events or list_commands
+            session_id: Only cancel the command if it belongs to this chat session
+
+        Returns:
+            True if the command was found and is being cancelled
+        """
+        with self._lock:
+            record = self._commands.get(command_id)
+            if record is None or (session_id is not None and record.session_id != session_id):
+                return False
+            record.cancel_requested = True
+            task = record.task
+        logger.info(f"Cancelling command {command_id} ({record.command})")
+        # A command whose task has not started yet sees the flag when it starts
+        if task is not None:
+            self._loop.call_soon_threadsafe(task.cancel)
+        return True
+
+    def list_commands(self, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List the waiting and running commands.
+
+        Args:
+            session_id: Only list the commands of this chat session
+
+        Returns:
+            A dictionary per command
+        """
+        with self._lock:
+            records = list(self._commands.values())
+        return [r.to_dict() for r in records if session_id is None or r.session_id == session_id]
+
+    async def _flush_periodically(self, publisher: _StreamPublisher) -> None:
+        while True:
+            await asyncio.sleep(OUTPUT_FLUSH_INTERVAL)
+            publisher.flush()
+
+    async def _run_process(self, record: RunningCommand, publisher: _StreamPublisher,
+                           stdout: OutputBuffer, stderr: OutputBuffer, timeout: float) -> int:
+        """
+        Run a command in a new process, without a shell.
+
+        Returns:
+            The command's return code
+
+        Raises:
+            asyncio.TimeoutError: If the command did not finish in time; it is killed
+        """
+        command_to_run = [record.command] + record.arguments
+        logger.info(f"Executing validated command list: {command_to_run}")
+        process = await asyncio.create_subprocess_exec(
+            *command_to_run,
+            stdin=subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            # Own process group, so cancellation also stops the command's children
+            start_new_session=hasattr(os, "killpg"),
+        )
+        record.pid = process.pid
+        waiters = [
+            asyncio.ensure_future(pump_stream(process.stdout, "stdout", stdout, publisher)),
+            asyncio.ensure_future(pump_stream(process.stderr, "stderr", stderr, publisher)),
+            asyncio.ensure_future(process.wait()),
+        ]
+        try:
+            _, still_running = await asyncio.wait(waiters, timeout=timeout)
+            if still_running:
+                raise asyncio.TimeoutError()
+            return process.returncode
+        finally:
+            if process.returncode is None:
+                kill_process_group(process)
+                # Not cancellable: the process must be reaped even when the caller gave up
+                await asyncio.shield(process.wait())
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _execute(self, record: RunningCommand, timeout: float,
+                       on_output: Optional[OutputListener], runner: Runner) -> Dict[str, Any]:
+        with self._lock:
+            record.task = asyncio.current_task()
+        publisher = _StreamPublisher(record, on_output)
+        stdout = OutputBuffer(self.max_output_bytes)
+        stderr = OutputBuffer(self.max_output_bytes)
+        flusher = None
+        return_code = None
+        error_message = None
+        try:
+            if record.cancel_requested:
+                raise asyncio.CancelledError()
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            if self._semaphore.locked():
+                publisher.emit({})
+            async with self._semaphore:
+                record.state = "running"
+                record.started_at = time.time()
+                publisher.emit({})
+                flusher = asyncio.ensure_future(self._flush_periodically(publisher))
+                return_code = await runner(record, publisher, stdout, stderr, timeout)
+
+        except asyncio.TimeoutError:
+            error_message = f"Error: Command '{record.command}' timed out after {timeout} seconds."
+            logger.warning(error_message)
+        except asyncio.CancelledError:
+            if not record.cancel_requested:
+                raise
+            error_message = f"Error: Command '{record.command}' was cancelled."
+            logger.info(error_message)
+        except CommandError as e:
+            error_message = f"Error: {e}"
+            logger.warning(f"Command '{record.command}' failed: {e}")
+        except FileNotFoundError:
+            error_message = f"Error: Command '{record.command}' not found. Check system PATH."
+            logger.error(error_message)
+        except PermissionError:
+            error_message = f"Error: Permission denied executing command '{record.command}'."
+            logger.error(error_message)
+        except Exception as e:
+            error_message = f"An unexpected error occurred: {type(e).__name__}"
+            logger.exception(f"Unexpected error executing command '{record.command}': {e}")
+        finally:
+            if flusher is not None:
+                flusher.cancel()
+            publisher.flush(final=True)
+            with self._lock:
+                self._commands.pop(record.command_id, None)
+
+        if return_code is None or error_message is not None:
+            # Not started, timed out, cancelled or failed: like execute_shell_command, report -1
+            return_code = -1
+        else:
+            if return_code == 0:
+                logger.info(f"Command '{record.command}' executed successfully. Return code: 0.")
+            else:
+                error_message = f"Command exited with non-zero status {return_code}."
+                logger.warning(f"Command '{record.command}' failed. Return code: {return_code}.")
+
+        record.state = "cancelled" if record.cancel_requested else "finished"
+        publisher.emit({"return_code": return_code, "error": error_message})
+
+        stderr_text = stderr.text()
+        if return_code == -1:
+            stderr_text = f"{stderr_text}\n{error_message}" if stderr_text else error_message
+        result = {
+            "command_id": record.command_id,
+            "stdout": stdout.text(),
+            "stderr": stderr_text,
+            "return_code": return_code,
+            "error": error_message,
+        }
+        if stdout.dropped or stderr.dropped:
+            result["omitted_bytes"] = {"stdout": stdout.dropped, "stderr": stderr.dropped}
+        return result
+
+    async def _drain(self, tasks: List[asyncio.Task]) -> None:
+        """Wait for the cancelled commands to be killed and reaped."""
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self, timeout: float = 5) -> None:
+        """Kill the remaining commands and stop the loop."""
+        if self._loop.is_closed():
+            return
+        with self._lock:
+            tasks = [r.task for r in self._commands.values() if r.task is not None]
+        for command_id in [c["command_id"] for c in self.list_commands()]:
+            self.cancel(command_id)
+        try:
+            asyncio.run_coroutine_threadsafe(self._drain(tasks), self._loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"Error waiting for shell commands to stop: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=timeout)
+
+
+# Singleton executor instance
+_executor: Optional[ShellExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_shell_executor() -> ShellExecutor:
+    """Get the shared shell executor, configured from agent.shell, starting it on first call."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                shell_config = config_loader.get_agent_config().get("shell", {})
+                _executor = ShellExecutor(
+                    max_concurrent=int(shell_config.get("max_concurrent_commands", DEFAULT_MAX_CONCURRENT_COMMANDS)),
+                    max_output_bytes=int(shell_config.get("max_output_bytes", DEFAULT_MAX_OUTPUT_BYTES)),
+                )
+    return _executor
+
+
+def close_shell_executor() -> None:
+    """Kill the running commands and stop the shared executor, if it was started."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.close()
+
+
+async def execute_shell_command_async(
+    command: str,
+    arguments: Optional[List[str]] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    strict_mode: bool = True,
+    session_id: Optional[str] = None,
+    on_output: Optional[OutputListener] = None,
+) -> Dict[str, Any]:
+    """Execute a shell command without blocking, streaming its output to listeners.
+
+    Args:
+        command: The command to execute. In strict mode, must be in ALLOWED_COMMANDS.
+        arguments: A list of string arguments to pass to the command.
+        timeout: Maximum execution time in seconds. Defaults to DEFAULT_TIMEOUT.
+        strict_mode: When True, only allow-listed commands are permitted.
+                    When False, any command can be executed (SECURITY RISK).
+        session_id: Chat session the command runs for, passed on in its events.
+        on_output: Optional listener for this command's events only.
+
+    Returns:
+        The dictionary execute_shell_command returns, plus the 'command_id' and,
+        when output was dropped, 'omitted_bytes' per stream.
+    """
+    return await get_shell_executor().run_async(
+        command, arguments, timeout=timeout, strict_mode=strict_mode,
+        session_id=session_id, on_output=on_output,
+    )
+
+
+def cancel_command(command_id: str, session_id: Optional[str] = None) -> bool:
+    """Cancel a waiting or running command by its ID.
+
+    Args:
+        command_id: ID of the command, from its events or list_running_commands.
+        session_id: Only cancel the command if it belongs to this chat session.
+
+    Returns:
+        True if the command was found and is being cancelled.
+    """
+    return get_shell_executor().cancel(command_id, session_id)
+
+
+def list_running_commands(session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """List the waiting and running commands, optionally of one chat session."""
+    return get_shell_executor().list_commands(session_id)
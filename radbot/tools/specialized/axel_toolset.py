@@ -26,7 +26,7 @@ except ImportError:
 
 # Import code execution tools for Axel
 try:
-    from radbot.tools.shell.shell_tool import execute_shell_command
+    from radbot.tools.shell.shell_command import execute_shell_command
 except ImportError:
     execute_shell_command = None
 
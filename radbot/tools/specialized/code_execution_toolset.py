@@ -9,7 +9,7 @@ from typing import List, Any, Optional
 
 # Import shell execution tools
 try:
-    from radbot.tools.shell.shell_tool import execute_shell_command
+    from radbot.tools.shell.shell_command import execute_shell_command
 except ImportError:
     execute_shell_command = None
 
@@ -16,6 +16,7 @@ try:
         edit_file,
         list_directory,
         search,
+        search_file_contents,
         get_info,
         copy,
         delete
@@ -27,6 +28,7 @@ except ImportError:
     edit_file = None
     list_directory = None
     search = None
+    search_file_contents = None
     get_info = None
     copy = None
     delete = None
@@ -93,6 +95,26 @@ def create_search_func(fn):
     search_func.__name__ = "search_func"
     return search_func
 
+def create_search_file_contents_func(fn):
+    """Create a content search function tool."""
+    @functools.wraps(fn)
+    def search_file_contents_func(params):
+        path = params.get("path", "")
+        pattern = params.get("pattern", "")
+        return fn(
+            path,
+            pattern,
+            literal=params.get("literal", False),
+            ignore_case=params.get("ignore_case", False),
+            include_patterns=params.get("include_patterns"),
+            exclude_patterns=params.get("exclude_patterns"),
+            context=params.get("context", 0),
+            max_results=params.get("max_results", 100)
+        )
+    
+    search_file_contents_func.__name__ = "search_file_contents_func"
+    return search_file_contents_func
+
 def create_get_info_func(fn):
     """Create a get info function tool."""
     @functools.wraps(fn)
@@ -139,6 +161,7 @@ def create_filesystem_toolset() -> List[Any]:
         (edit_file, create_edit_file_func, "edit_file_func"),
         (list_directory, create_list_directory_func, "list_directory_func"),
         (search, create_search_func, "search_func"),
+        (search_file_contents, create_search_file_contents_func, "search_file_contents_func"),
         (get_info, create_get_info_func, "get_info_func"),
         (copy, create_copy_func, "copy_func"),
         (delete, create_delete_func, "delete_func")
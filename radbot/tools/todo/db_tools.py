@@ -9,7 +9,6 @@ defines private functions for core CRUD operations.
 import os
 import logging
 import psycopg2
-import psycopg2.pool
 import psycopg2.extras  # For RealDictCursor
 import uuid
 from contextlib import contextmanager
@@ -17,6 +16,7 @@ from typing import List, Dict, Optional, Any, Generator
 
 # Import configuration
 from radbot.config import config_loader
+from radbot.db import get_pool
 
 # Register UUID adapter for psycopg2
 psycopg2.extensions.register_adapter(uuid.UUID, lambda u: psycopg2.extensions.adapt(str(u)))
@@ -42,43 +42,15 @@ if not all([DB_NAME, DB_USER, DB_PASSWORD]):
     logger.error(error_msg)
     raise ValueError(error_msg)
 
-# Configure and initialize the connection pool
-# Adjust minconn and maxconn based on expected load
-MIN_CONN = 1
-MAX_CONN = 5  # Start conservatively
-
-try:
-    pool = psycopg2.pool.ThreadedConnectionPool(
-        minconn=MIN_CONN,
-        maxconn=MAX_CONN,
-        database=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        host=DB_HOST,
-        port=DB_PORT
-    )
-    logger.info(f"Database connection pool initialized (Min: {MIN_CONN}, Max: {MAX_CONN})")
-    logger.info(f"Connected to PostgreSQL database '{DB_NAME}' at {DB_HOST}:{DB_PORT}")
-except psycopg2.OperationalError as e:
-    logger.error(f"FATAL: Could not connect to database: {e}")
-    # Handle fatal error appropriately - maybe exit or raise
-    raise
+# Shared pool; sizing comes from database.pool in config.yaml
+pool = get_pool("todo", DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT)
 
 
 @contextmanager
 def get_db_connection() -> Generator[psycopg2.extensions.connection, None, None]:
     """Provides a database connection from the pool, managing cleanup."""
-    conn = None
-    try:
-        conn = pool.getconn()
+    with pool.connection() as conn:
         yield conn
-    except psycopg2.Error as e:
-        # Log or handle pool errors if necessary
-        logger.error(f"Error getting connection from pool: {e}")
-        raise  # Re-raise the original psycopg2 error
-    finally:
-        if conn:
-            pool.putconn(conn)  # Return connection to the pool
 
 
 @contextmanager
@@ -0,0 +1,281 @@
+"""Lightweight structured tracing for agent turns.
+
+Spans follow the OpenTelemetry model (trace id, span id, parent, start and end
+time, attributes) but are recorded by a local exporter instead of being sent
+to a collector. Sampling is decided once per trace at the root span.
+
+When tracing is disabled, or a trace is not sampled, ``start_span`` returns a
+shared no-op span. Callers guard anything expensive to compute behind
+``span.is_recording()`` so an untraced turn does no extra work.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default number of finished spans kept by the in-memory exporter
+DEFAULT_MAX_SPANS = 2000
+
+# Span currently active in this thread or task
+_current_span: contextvars.ContextVar = contextvars.ContextVar("radbot_current_span", default=None)
+
+
+class _NoopSpan:
+    """Span that records nothing. Returned when tracing is off or not sampled."""
+
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def set_status(self, status: str, description: Optional[str] = None) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledSpan(_NoopSpan):
+    """No-op root span that keeps the children of an unsampled trace unsampled."""
+
+    def __init__(self):
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        return False
+
+
+class Span(_NoopSpan):
+    """A recorded span. Use as a context manager or call ``end()`` explicitly."""
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Optional[Dict[str, Any]] = None, start_time: Optional[float] = None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_time = start_time if start_time is not None else time.time()
+        self.end_time: Optional[float] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status = "unset"
+        self.status_description: Optional[str] = None
+        self._token = None
+
+    def is_recording(self) -> bool:
+        return self.end_time is None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append({"name": name, "time": time.time(), "attributes": dict(attributes or {})})
+
+    def set_status(self, status: str, description: Optional[str] = None) -> None:
+        self.status = status
+        self.status_description = description
+
+    def end(self, end_time: Optional[float] = None) -> None:
+        if self.end_time is not None:
+            return
+        self.end_time = end_time if end_time is not None else time.time()
+        self.tracer._export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the span to a JSON-serializable dictionary."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration_ms": round((self.end_time - self.start_time) * 1000, 3) if self.end_time else None,
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": self.status,
+            "status_description": self.status_description,
+        }
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.set_status("error", f"{exc_type.__name__}: {exc}")
+        elif self.status == "unset":
+            self.status = "ok"
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        self.end()
+        return False
+
+
+class InMemorySpanExporter:
+    """Keeps the most recent finished spans in memory."""
+
+    def __init__(self, max_spans: int = DEFAULT_MAX_SPANS):
+        self._spans: Deque[Dict[str, Any]] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span.to_dict())
+
+    def get_finished_spans(self, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get finished spans, optionally only those of one trace."""
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id:
+            spans = [s for s in spans if s["trace_id"] == trace_id]
+        return spans
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class JsonlFileSpanExporter:
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter."""
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 1.0, exporter: Any = None):
+        """Initialize the tracer.
+
+        Args:
+            enabled: Whether spans are recorded at all
+            sample_rate: Fraction of traces (0.0-1.0) that are recorded
+            exporter: Object with an ``export(span)`` method; defaults to an in-memory exporter
+        """
+        self.enabled = enabled
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.exporter = exporter if exporter is not None else InMemorySpanExporter()
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   start_time: Optional[float] = None):
+        """Start a span as a child of the current span, or as a new sampled trace.
+
+        Args:
+            name: Span name
+            attributes: Initial span attributes
+            start_time: Start time in seconds since the epoch; defaults to now
+
+        Returns:
+            A Span, or a no-op span when tracing is disabled or the trace is not sampled
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        parent = _current_span.get()
+        if isinstance(parent, Span):
+            return Span(self, name, parent.trace_id, parent.span_id, attributes, start_time)
+        if parent is not None:
+            # Inside an unsampled trace
+            return NOOP_SPAN
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return _UnsampledSpan()
+        return Span(self, name, f"{random.getrandbits(128):032x}", None, attributes, start_time)
+
+    def _export(self, span: Span) -> None:
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            logger.warning(f"Could not export span {span.name}: {e}")
+
+
+def create_tracer(config: Optional[Dict[str, Any]] = None) -> Tracer:
+    """Create a tracer from the logging.tracing config section."""
+    config = config or {}
+    if not config.get("enabled", False):
+        return Tracer(enabled=False)
+
+    exporter_name = config.get("exporter", "memory")
+    if exporter_name == "file":
+        exporter = JsonlFileSpanExporter(config.get("file") or "logs/traces.jsonl")
+    else:
+        if exporter_name != "memory":
+            logger.warning(f"Unknown span exporter '{exporter_name}', using in-memory exporter")
+        exporter = InMemorySpanExporter(int(config.get("max_spans", DEFAULT_MAX_SPANS)))
+
+    tracer = Tracer(enabled=True, sample_rate=float(config.get("sample_rate", 1.0)), exporter=exporter)
+    logger.info(f"Tracing enabled (exporter={exporter_name}, sample_rate={tracer.sample_rate})")
+    return tracer
+
+
+# Singleton tracer, configured lazily from config.yaml
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer, creating it from config on first call."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                try:
+                    from radbot.config.config_loader import config_loader
+                    config = config_loader.get_logging_config().get("tracing", {})
+                except Exception as e:
+                    logger.warning(f"Could not load tracing config, tracing disabled: {e}")
+                    config = {}
+                _tracer = create_tracer(config)
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    """Replace the process-wide tracer."""
+    global _tracer
+    _tracer = tracer
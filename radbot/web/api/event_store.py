@@ -0,0 +1,234 @@
+"""
+Event store for the RadBot web interface events API.
+
+Events are kept per session in a bounded ring buffer, with a set of event keys
+for constant-time de-duplication. Every stored event gets a sequence number
+(``seq``) that clients use as a cursor. Sequence numbers come from one
+store-wide counter, so a session's numbers keep growing even after its buffer
+is dropped and recreated, and a client's cursor never skips new events. When
+spilling is enabled, events pushed out of the buffer are written to the chat
+history database so they can still be paged through, and a recreated buffer
+continues after the last spilled number.
+"""
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from radbot.config.config_loader import config_loader
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable via web.events in config.yaml
+DEFAULT_MAX_EVENTS_PER_SESSION = 1000
+DEFAULT_MAX_SESSIONS = 1000
+
+def _event_key(event: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    """Identify duplicate events by type, summary and timestamp."""
+    return (event.get("type"), event.get("summary"), event.get("timestamp"))
+
+class _SessionEvents:
+    """Ring buffer of events for one session with its de-duplication index."""
+
+    def __init__(self, max_events: int, last_seq: int = 0):
+        self.events: Deque[Dict[str, Any]] = deque()
+        self.keys: Set[Tuple[Any, Any, Any]] = set()
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.max_events = max_events
+        self.last_seq = last_seq
+
+    def first_seq(self) -> int:
+        """Sequence number of the oldest buffered event, or the next one if empty."""
+        return self.events[0]["seq"] if self.events else self.last_seq + 1
+
+class EventStore:
+    """Bounded, indexed per-session event storage."""
+
+    def __init__(self, max_events_per_session: int = DEFAULT_MAX_EVENTS_PER_SESSION,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS, spill: bool = False):
+        """Initialize the event store.
+
+        Args:
+            max_events_per_session: Number of events buffered in memory per session
+            max_sessions: Number of sessions buffered in memory before the least
+                recently used are dropped
+            spill: Write events pushed out of a buffer to the chat history database
+        """
+        self.max_events_per_session = max_events_per_session
+        self.max_sessions = max_sessions
+        self.spill = spill
+        self._sessions: "OrderedDict[str, _SessionEvents]" = OrderedDict()
+        # Highest sequence number handed out, across all sessions
+        self._last_seq = 0
+        self._lock = threading.Lock()
+
+    def add_event(self, session_id: str, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Add an event to a session unless an identical one is already buffered.
+
+        Args:
+            session_id: Session identifier
+            event: Event data to store
+
+        Returns:
+            The stored event (a copy carrying its ``seq``), or None for a duplicate
+        """
+        key = _event_key(event)
+        spilled: List[Tuple[str, List[Dict[str, Any]]]] = []
+        stored_seq = self._stored_last_seq(session_id)
+
+        with self._lock:
+            buffer = self._get_buffer(session_id, stored_seq, spilled)
+            if key in buffer.keys:
+                logger.debug(f"Skipping duplicate event: {event.get('type')} - {event.get('summary')}")
+                return None
+
+            self._last_seq = max(self._last_seq, buffer.last_seq) + 1
+            buffer.last_seq = self._last_seq
+            stored = dict(event, seq=buffer.last_seq)
+            buffer.events.append(stored)
+            buffer.keys.add(key)
+            if stored.get("event_id"):
+                buffer.by_id[stored["event_id"]] = stored
+
+            evicted = []
+            while len(buffer.events) > buffer.max_events:
+                old = buffer.events.popleft()
+                buffer.keys.discard(_event_key(old))
+                buffer.by_id.pop(old.get("event_id"), None)
+                evicted.append(old)
+            if evicted:
+                spilled.append((session_id, evicted))
+
+        self._spill(spilled)
+        logger.debug(f"Added event to session {session_id}: {event.get('type')} - {event.get('summary')}")
+        return stored
+
+    def get_events(self, session_id: str, since: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get events for a session in sequence order.
+
+        Args:
+            session_id: Session identifier
+            since: Only return events with a sequence number greater than this
+            limit: Maximum number of events to return
+
+        Returns:
+            List of events, each carrying its ``seq``
+        """
+        with self._lock:
+            buffer = self._sessions.get(session_id)
+            if buffer is not None:
+                self._sessions.move_to_end(session_id)
+                first_seq = buffer.first_seq()
+                buffered = [e for e in buffer.events if e["seq"] > since]
+            else:
+                first_seq = None
+                buffered = []
+
+        events: List[Dict[str, Any]] = []
+        # Older events than the buffer holds live in the database, if spilled
+        if self.spill and (first_seq is None or since < first_seq - 1):
+            from radbot.web.db import event_operations
+            events = event_operations.get_events(session_id, since=since, before=first_seq, limit=limit)
+
+        if limit is None:
+            return events + buffered
+        return (events + buffered)[:limit]
+
+    def get_event(self, session_id: str, event_id: str) -> Optional[Dict[str, Any]]:
+        """Get one event of a session by its ``event_id``.
+
+        Events pushed out of the buffer are looked up in the database when
+        spilling is enabled; otherwise only buffered events are found.
+
+        Args:
+            session_id: Session identifier
+            event_id: Event identifier
+
+        Returns:
+            The event, or None if it is not found
+        """
+        with self._lock:
+            buffer = self._sessions.get(session_id)
+            event = buffer.by_id.get(event_id) if buffer is not None else None
+        if event is None and self.spill:
+            from radbot.web.db import event_operations
+            event = event_operations.get_event(session_id, event_id)
+        return event
+
+    def drop_session(self, session_id: str) -> None:
+        """Forget the buffered events of a session, spilling them first if enabled."""
+        with self._lock:
+            buffer = self._sessions.pop(session_id, None)
+        if buffer is not None and buffer.events:
+            self._spill([(session_id, list(buffer.events))])
+
+    def _stored_last_seq(self, session_id: str) -> int:
+        """Get the last spilled sequence number of a session that has no buffer yet.
+
+        Queries the database, so it must be called without the lock held.
+        """
+        if not self.spill:
+            return 0
+        with self._lock:
+            if session_id in self._sessions:
+                return 0
+        # Continue the sequence of a session seen before a restart or eviction
+        from radbot.web.db import event_operations
+        return event_operations.get_last_seq(session_id)
+
+    def _get_buffer(self, session_id: str, last_seq: int,
+                    spilled: List[Tuple[str, List[Dict[str, Any]]]]) -> _SessionEvents:
+        """Get or create the buffer for a session. Must be called with the lock held.
+
+        Args:
+            session_id: Session identifier
+            last_seq: Sequence number a new buffer continues from
+            spilled: Collects the events of sessions dropped to make room
+        """
+        buffer = self._sessions.get(session_id)
+        if buffer is not None:
+            self._sessions.move_to_end(session_id)
+            return buffer
+
+        buffer = _SessionEvents(self.max_events_per_session, last_seq)
+        self._sessions[session_id] = buffer
+
+        while len(self._sessions) > self.max_sessions:
+            old_id, old_buffer = self._sessions.popitem(last=False)
+            if old_buffer.events:
+                spilled.append((old_id, list(old_buffer.events)))
+        return buffer
+
+    def _spill(self, spilled: List[Tuple[str, List[Dict[str, Any]]]]) -> None:
+        """Write events pushed out of memory to the database when spilling is enabled."""
+        if not self.spill or not spilled:
+            return
+        try:
+            from radbot.web.db import event_operations
+            for session_id, events in spilled:
+                event_operations.save_events(session_id, events)
+        except Exception as e:
+            logger.warning(f"Could not spill events to the database: {str(e)}")
+
+def create_event_store() -> EventStore:
+    """Create the event store from the web.events section of config.yaml."""
+    events_config = config_loader.get_config().get("web", {}).get("events", {})
+    return EventStore(
+        max_events_per_session=int(events_config.get("max_events_per_session", DEFAULT_MAX_EVENTS_PER_SESSION)),
+        max_sessions=int(events_config.get("max_sessions", DEFAULT_MAX_SESSIONS)),
+        spill=bool(events_config.get("spill", False)),
+    )
+
+# Singleton event store instance
+_event_store: Optional[EventStore] = None
+_event_store_lock = threading.Lock()
+
+def get_event_store() -> EventStore:
+    """Get the shared event store, creating it on first call."""
+    global _event_store
+    if _event_store is None:
+        with _event_store_lock:
+            if _event_store is None:
+                _event_store = create_event_store()
+    return _event_store
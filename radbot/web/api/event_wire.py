@@ -0,0 +1,187 @@
+"""
+Wire format for the events sent to the web UI.
+
+Events are built once per turn and then sent over the WebSocket, returned by
+the REST chat endpoint and kept in the event store. To keep that cheap:
+
+- Long event text is truncated once, in place, when the event is created
+  (``truncate_event_text``), so senders never copy or re-measure events.
+- Large tool outputs are moved to the payload store when the event is created
+  (``store_event_payload``); the event keeps a preview and a ``payload``
+  handle, and the UI fetches the output when the event is opened.
+- Clients that ask for it get a compact encoding (``encode_event``): keys are
+  shortened, and bulky fields are left out and replaced by their size. The
+  client fetches the full event by its ``event_id`` when the user opens it.
+"""
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from radbot.config.config_loader import config_loader
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable via web.events in config.yaml
+DEFAULT_MAX_TEXT_CHARS = 100000
+DEFAULT_INLINE_PAYLOAD_CHARS = 4096
+
+WIRE_FULL = "full"
+WIRE_COMPACT = "compact"
+
+# Long key -> short key of the compact encoding; socket.js has the reverse map
+WIRE_KEYS = {
+    "event_id": "id",
+    "seq": "q",
+    "type": "t",
+    "category": "c",
+    "summary": "s",
+    "timestamp": "ts",
+    "text": "x",
+    "is_final": "f",
+    "tool_name": "n",
+    "input": "i",
+    "output": "o",
+    "details": "d",
+    "raw_response": "r",
+    "plan": "p",
+    "plan_step": "ps",
+    "to_agent": "ta",
+    "from_agent": "fa",
+    "agent_name": "a",
+    "actions": "ac",
+    "payload": "pl",
+}
+
+# Fields that may be large and are only shown in the event detail view
+LAZY_FIELDS = ("input", "output", "details", "raw_response", "plan")
+
+# Detail keys the UI reads outside the detail view, kept when details are left out
+DETAIL_KEYS_INLINE = ("model", "agent_name", "agent", "recovered_from")
+
+def get_wire_settings() -> Dict[str, int]:
+    """Get the event size limits from the web.events section of config.yaml."""
+    events_config = config_loader.get_config().get("web", {}).get("events", {})
+    return {
+        "max_text_chars": int(events_config.get("max_text_chars", DEFAULT_MAX_TEXT_CHARS)),
+        "inline_payload_chars": int(events_config.get("inline_payload_chars", DEFAULT_INLINE_PAYLOAD_CHARS)),
+    }
+
+def truncate_event_text(event: Dict[str, Any], max_chars: Optional[int] = None) -> Dict[str, Any]:
+    """Truncate the text of an event in place.
+
+    Args:
+        event: Event data, modified in place
+        max_chars: Longest text kept (default: web.events.max_text_chars)
+
+    Returns:
+        The same event
+    """
+    if max_chars is None:
+        max_chars = get_wire_settings()["max_text_chars"]
+    text = event.get("text")
+    if isinstance(text, str) and len(text) > max_chars:
+        original_length = len(text)
+        event["text"] = text[:max_chars] + f"\n\n[Message truncated due to size constraints. Original length: {original_length} characters]"
+        event["truncated"] = True
+        logger.info(f"Truncated event text from {original_length} to {max_chars} characters")
+    return event
+
+def store_event_payload(session_id: str, event: Dict[str, Any], inline_chars: int,
+                        preview_chars: int) -> Dict[str, Any]:
+    """Move a large event output to the payload store, in place.
+
+    The event keeps the start of the output and a ``payload`` handle with its
+    size, content type and URL.
+
+    Args:
+        session_id: Session the event belongs to
+        event: Event data with an ``event_id``, modified in place
+        inline_chars: Largest output kept in the event
+        preview_chars: Length of the output preview kept in the event
+
+    Returns:
+        The same event
+    """
+    output = event.get("output")
+    event_id = event.get("event_id")
+    if output is None or not event_id:
+        return event
+
+    if isinstance(output, str):
+        text = output
+        content_type = "text/plain; charset=utf-8"
+    else:
+        text = json.dumps(output, ensure_ascii=False, default=str)
+        content_type = "application/json"
+    if len(text) <= inline_chars:
+        return event
+
+    from radbot.web.api.payload_store import get_payload_store
+    data = text.encode("utf-8")
+    get_payload_store().put(session_id, event_id, data, content_type)
+    event["output"] = text[:preview_chars] + "..."
+    event["payload"] = {
+        "size": len(data),
+        "content_type": content_type,
+        "url": f"/api/events/{session_id}/{event_id}/payload",
+    }
+    return event
+
+def _payload_size(value: Any) -> int:
+    """Get the serialized size of a field, in characters."""
+    if isinstance(value, str):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+def encode_event(event: Dict[str, Any], inline_chars: int = DEFAULT_INLINE_PAYLOAD_CHARS) -> Dict[str, Any]:
+    """Encode an event in the compact wire format.
+
+    Bulky fields over ``inline_chars`` are left out; their sizes are listed
+    under ``lz`` so the client knows to fetch the full event.
+
+    Args:
+        event: Event data, not modified
+        inline_chars: Largest field size sent inline
+
+    Returns:
+        The compact event
+    """
+    encoded: Dict[str, Any] = {}
+    lazy: Dict[str, int] = {}
+    for key, value in event.items():
+        if value is None:
+            continue
+        short = WIRE_KEYS.get(key, key)
+        if key in LAZY_FIELDS and event.get("event_id"):
+            size = _payload_size(value)
+            if size > inline_chars:
+                lazy[short] = size
+                if key == "details" and isinstance(value, dict):
+                    kept = {k: value[k] for k in DETAIL_KEYS_INLINE if k in value}
+                    if kept:
+                        encoded[short] = kept
+                continue
+        encoded[short] = value
+    if lazy:
+        encoded["lz"] = lazy
+    return encoded
+
+def encode_events(events: List[Dict[str, Any]], wire_format: str = WIRE_FULL,
+                  inline_chars: int = DEFAULT_INLINE_PAYLOAD_CHARS) -> List[Dict[str, Any]]:
+    """Encode a list of events for a client.
+
+    Args:
+        events: Event data
+        wire_format: WIRE_FULL to send events unchanged, or WIRE_COMPACT
+        inline_chars: Largest field size sent inline in the compact format
+
+    Returns:
+        The events to send
+    """
+    if wire_format != WIRE_COMPACT:
+        return events
+    return [encode_event(event, inline_chars) for event in events]
@@ -6,147 +6,136 @@ Events include tool calls, agent transfers, planner events, and model responses.
 """
 import logging
 from typing import Dict, List, Optional, Any
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, Response
 
+from radbot.web.api.event_store import get_event_store
+from radbot.web.api.payload_store import get_payload_store, parse_byte_range
 from radbot.web.api.session import get_or_create_runner_for_session, SessionRunner
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Largest page of events returned by one request
+MAX_EVENTS_PAGE = 1000
+
 # Create router
 router = APIRouter(
     prefix="/api/events",
     tags=["events"],
 )
 
-# In-memory storage for events (session_id -> events)
-# This would be replaced with a proper database in a production system
-session_events: Dict[str, List[Dict[str, Any]]] = {}
-
 # Add event to storage
 def add_event(session_id: str, event: Dict[str, Any]) -> None:
     """Add an event to session's event storage.
     
+    Duplicate events (same type, summary and timestamp) are skipped.
+    
     Args:
         session_id: Session identifier
         event: Event data to store
     """
-    if session_id not in session_events:
-        session_events[session_id] = []
-    
-    # Check for duplicate events
-    # We check for identical type, timestamp, and summary to identify duplicates
-    is_duplicate = False
-    for existing_event in session_events[session_id]:
-        # Compare essential fields
-        if (existing_event.get('type') == event.get('type') and
-            existing_event.get('summary') == event.get('summary') and
-            existing_event.get('timestamp') == event.get('timestamp')):
-            is_duplicate = True
-            logger.info(f"Skipping duplicate event: {event.get('type')} - {event.get('summary')}")
-            break
-    
-    # Only add if not a duplicate
-    if not is_duplicate:
-        session_events[session_id].append(event)
-        logger.info(f"Added event to session {session_id}: {event.get('type')} - {event.get('summary')}")
+    get_event_store().add_event(session_id, event)
 
 # Get events for session
 @router.get("/{session_id}", response_model=List[Dict[str, Any]])
 async def get_events(
+    response: Response,
     session_id: str = Path(..., description="Session ID"),
+    since: int = Query(0, ge=0, description="Only return events with a seq greater than this cursor"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_EVENTS_PAGE, description="Maximum number of events to return"),
     session_runner: SessionRunner = Depends(get_or_create_runner_for_session)
 ) -> List[Dict[str, Any]]:
     """Get events for a session.
     
+    Each event carries a ``seq`` number. Pass the last one seen as ``since`` to
+    fetch only newer events; the ``X-Next-Cursor`` response header holds the
+    cursor for the next page.
+    
     Args:
+        response: Response, used to set the cursor header
         session_id: Session identifier
+        since: Sequence number cursor
+        limit: Maximum number of events to return
         session_runner: Session runner for this session
     
     Returns:
         List of events for the session
-    
-    Raises:
-        HTTPException: If session not found
     """
-    # Get events for this session
-    events = session_events.get(session_id, [])
+    events = get_event_store().get_events(session_id, since=since, limit=limit)
+    response.headers["X-Next-Cursor"] = str(events[-1]["seq"] if events else since)
     
-    # If no events exist yet, create welcome and sample events
-    if not events:
-        logger.info(f"No events found for session {session_id}, creating welcome events")
-        
-        # Create a welcome message
-        welcome_event = {
-            "type": "model_response",
-            "category": "model_response",
-            "timestamp": _get_current_timestamp(),
-            "summary": "Welcome Message",
-            "text": "Welcome to RadBot! I'm ready to assist you. Try asking me a question or giving me a task to work on.",
-            "is_final": True,
-            "details": {
-                "session_id": session_id
-            }
-        }
-        add_event(session_id, welcome_event)
-        
-        # Create a sample weather tool call event
-        from datetime import datetime, timedelta
-        
-        # Tool call event (the request)
-        tool_call_time = (datetime.now() - timedelta(minutes=2)).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        weather_tool_call = {
-            "type": "tool_call",
-            "category": "tool_call",
-            "timestamp": tool_call_time,
-            "summary": "Tool Call: get_weather",
-            "tool_name": "get_weather",
-            "input": {"location": "Santa Barbara, CA"},
-            "details": {
-                "session_id": session_id,
-                "tool": "get_weather",
-                "event_type": "function_call"
-            }
-        }
-        add_event(session_id, weather_tool_call)
-        
-        # Tool result event (the response)
-        tool_result_time = (datetime.now() - timedelta(minutes=1, seconds=58)).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        weather_tool_result = {
-            "type": "tool_call",
-            "category": "tool_call",
-            "timestamp": tool_result_time,
-            "summary": "Tool Result: get_weather",
-            "tool_name": "get_weather",
-            "output": {
-                "temperature": 22,
-                "temperature_feels_like": 21,
-                "humidity": 65,
-                "wind_speed": 3.5,
-                "condition": "clear",
-                "location": "Santa Barbara, CA"
-            },
-            "details": {
-                "session_id": session_id,
-                "tool": "get_weather",
-                "event_type": "function_response"
-            }
-        }
-        add_event(session_id, weather_tool_result)
-        
-        # Refresh events list
-        events = session_events.get(session_id, [])
-    
-    # Return the events
-    logger.info(f"Retrieved {len(events)} events for session {session_id}")
+    logger.debug(f"Retrieved {len(events)} events for session {session_id} since {since}")
     return events
 
-# Helper to get timestamp in consistent format
-def _get_current_timestamp():
-    """Get current timestamp in consistent format."""
-    from datetime import datetime
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+# Get one event
+@router.get("/{session_id}/{event_id}", response_model=Dict[str, Any])
+async def get_event(
+    session_id: str = Path(..., description="Session ID"),
+    event_id: str = Path(..., description="Event ID")
+) -> Dict[str, Any]:
+    """Get one event with all its fields.
+    
+    Events sent in the compact WebSocket format leave out bulky fields such
+    as tool outputs; the UI fetches them from here when an event is opened.
+    Events are served from this process's event buffer, or from the database
+    when ``web.events.spill`` is enabled. Without spilling, an event pushed
+    out of the buffer (or held by another worker process) returns 404.
+    
+    Args:
+        session_id: Session identifier
+        event_id: Event identifier
+    
+    Returns:
+        The full event
+    """
+    event = get_event_store().get_event(session_id, event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail=f"Event {event_id} not found")
+    return event
+
+# Get the full output of one event
+@router.get("/{session_id}/{event_id}/payload")
+async def get_event_payload(
+    session_id: str = Path(..., description="Session ID"),
+    event_id: str = Path(..., description="Event ID"),
+    range_header: Optional[str] = Header(None, alias="Range")
+) -> Response:
+    """Get the full output of an event whose output was too large to send inline.
+    
+    Supports a single byte range in the Range header, so large outputs can
+    be fetched in pieces.
+    
+    Args:
+        session_id: Session identifier
+        event_id: Event identifier
+        range_header: Optional Range header, e.g. ``bytes=0-65535``
+    
+    Returns:
+        The payload (200) or the requested range of it (206)
+    """
+    store = get_payload_store()
+    info = store.get_info(session_id, event_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail=f"No payload stored for event {event_id}")
+    size, content_type = info
+    
+    headers = {"Accept-Ranges": "bytes"}
+    if range_header:
+        byte_range = parse_byte_range(range_header, size)
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        start, end = byte_range
+        data = store.read(session_id, event_id, start, end)
+        if data is None:
+            raise HTTPException(status_code=404, detail=f"No payload stored for event {event_id}")
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        return Response(content=data, status_code=206, media_type=content_type, headers=headers)
+    
+    data = store.read(session_id, event_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"No payload stored for event {event_id}")
+    return Response(content=data, media_type=content_type, headers=headers)
 
 # Register events router in the main FastAPI app
 def register_events_router(app):
@@ -4,10 +4,12 @@ Message API endpoints for RadBot web interface.
 This module provides API endpoints for storing and retrieving chat messages.
 """
 import logging
+import uuid
 from typing import Dict, List, Optional, Any
 from pydantic import BaseModel, Field
 from fastapi import APIRouter, HTTPException, Path, Query
 
+from radbot.db import run_db
 from radbot.web.db import chat_operations
 
 # Set up logging
@@ -33,17 +35,47 @@ class MessageCreateRequest(BaseModel):
     agent_name: Optional[str] = Field(None, description="Agent name for assistant messages")
     user_id: Optional[str] = Field(None, description="User identifier")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
+    message_id: Optional[str] = Field(None, description="Client-chosen message UUID; a message already stored is not written again")
 
 class MessagesResponse(BaseModel):
     """Response model for messages list."""
     messages: List[MessageModel]
-    total_count: int
+    total_count: Optional[int] = None
     has_more: bool
+    prev_cursor: Optional[str] = None
+    next_cursor: Optional[str] = None
 
 class BatchMessageCreateRequest(BaseModel):
     """Request model for batch creating messages."""
     messages: List[MessageCreateRequest]
 
+class SearchResultModel(BaseModel):
+    """A chat message matching a search, with its highlighted snippet."""
+    message_id: str
+    session_id: str
+    session_name: Optional[str] = None
+    role: str
+    content: str
+    agent_name: Optional[str] = None
+    timestamp: str
+    score: float
+    snippet: str
+
+class SearchResponse(BaseModel):
+    """Response model for chat search."""
+    results: List[SearchResultModel]
+    has_more: bool
+    next_cursor: Optional[str] = None
+
+def _validate_message_id(message_id: Optional[str]) -> None:
+    """Reject a client-chosen message ID that is not a UUID."""
+    if message_id is None:
+        return
+    try:
+        uuid.UUID(message_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"message_id must be a UUID (got '{message_id}')")
+
 # Create router function for registration
 def register_messages_router(app):
     """Register messages router with the FastAPI app."""
@@ -75,18 +107,19 @@ def register_messages_router(app):
         # Validate role
         if request.role not in ('user', 'assistant', 'system'):
             raise HTTPException(status_code=400, detail="Role must be 'user', 'assistant', or 'system'")
-
-        # Create chat session if it doesn't exist
-        chat_operations.create_or_update_session(session_id)
+        _validate_message_id(request.message_id)
 
         try:
-            message_id = chat_operations.add_message(
+            # Acknowledged once queued; the database write happens in the background
+            message_id = await run_db(
+                chat_operations.queue_message,
                 session_id=session_id,
                 role=request.role,
                 content=request.content,
                 agent_name=request.agent_name,
                 user_id=request.user_id,
-                metadata=request.metadata
+                metadata=request.metadata,
+                message_id=request.message_id
             )
 
             if not message_id:
@@ -117,28 +150,20 @@ def register_messages_router(app):
 
         logger.info(f"Batch creating {len(request.messages)} messages for session {session_id}")
 
-        # Create chat session if it doesn't exist
-        chat_operations.create_or_update_session(session_id)
+        # Validate every message before writing any of them
+        for msg in request.messages:
+            if msg.role not in ('user', 'assistant', 'system'):
+                raise HTTPException(status_code=400,
+                                  detail=f"Role must be 'user', 'assistant', or 'system' (got '{msg.role}')")
+            _validate_message_id(msg.message_id)
 
         try:
-            message_ids = []
-            for msg in request.messages:
-                # Validate role
-                if msg.role not in ('user', 'assistant', 'system'):
-                    raise HTTPException(status_code=400,
-                                      detail=f"Role must be 'user', 'assistant', or 'system' (got '{msg.role}')")
-
-                message_id = chat_operations.add_message(
-                    session_id=session_id,
-                    role=msg.role,
-                    content=msg.content,
-                    agent_name=msg.agent_name,
-                    user_id=msg.user_id,
-                    metadata=msg.metadata
-                )
-
-                if message_id:
-                    message_ids.append(message_id)
+            # Queued together and written with one multi-row insert
+            message_ids = await run_db(
+                chat_operations.queue_messages,
+                session_id,
+                [msg.model_dump() for msg in request.messages]
+            )
 
             if not message_ids:
                 raise HTTPException(status_code=500, detail="Failed to create any messages")
@@ -150,46 +175,118 @@ def register_messages_router(app):
             logger.error(f"Error batch creating messages: {e}")
             raise HTTPException(status_code=500, detail=f"Error batch creating messages: {str(e)}")
 
+    # Registered before /{session_id} so "search" is not taken for a session ID
+    @router.get("/search", response_model=SearchResponse)
+    async def search_messages(
+        q: str = Query(..., min_length=1, max_length=500, description="Search query; quote phrases for exact matches"),
+        session_id: Optional[str] = Query(None, description="Only search this session"),
+        user_id: Optional[str] = Query(None, description="Only search this user's sessions"),
+        limit: int = Query(20, ge=1, le=100, description="Maximum number of results to return"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        fuzzy: bool = Query(True, description="Also match words similar to the unquoted words (typos)")
+    ):
+        """
+        Search chat history, best matches first.
+
+        Args:
+            q: Search query
+            session_id: Optional session to search in
+            user_id: Optional user whose sessions are searched
+            limit: Maximum number of results to return
+            cursor: Cursor for the next page of results
+            fuzzy: Also match similar words
+
+        Returns:
+            SearchResponse with ranked results, HTML-safe highlighted snippets
+            and the cursor of the next page
+        """
+        logger.info(f"Searching chat history for '{q}' (session={session_id}, cursor={cursor})")
+
+        try:
+            results = await run_db(
+                chat_operations.search_messages,
+                q,
+                session_id=session_id,
+                user_id=user_id,
+                limit=limit + 1,  # Get one extra to check if there are more
+                after=cursor,
+                fuzzy=fuzzy
+            )
+
+            has_more = len(results) > limit
+            results = results[:limit]
+            return SearchResponse(
+                results=results,
+                has_more=has_more,
+                next_cursor=chat_operations.search_cursor(results[-1]) if has_more else None
+            )
+        except Exception as e:
+            logger.error(f"Error searching messages: {e}")
+            raise HTTPException(status_code=500, detail=f"Error searching messages: {str(e)}")
+
     @router.get("/{session_id}")
     async def get_messages(
         session_id: str = Path(..., description="Session identifier"),
         limit: int = Query(200, ge=1, le=500, description="Maximum number of messages to return"),
-        offset: int = Query(0, ge=0, description="Number of messages to skip")
+        offset: int = Query(0, ge=0, description="Number of messages to skip (prefer before/after)"),
+        before: Optional[str] = Query(None, description="Cursor; return the page of messages older than it"),
+        after: Optional[str] = Query(None, description="Cursor; return the page of messages newer than it"),
+        newest: bool = Query(False, description="Without a cursor, return the newest page")
     ):
         """
         Get messages for a session.
 
+        Messages are always returned oldest first. To scroll back through a long
+        chat, request ``newest=true`` and then pass ``prev_cursor`` as ``before``;
+        to catch up, pass ``next_cursor`` as ``after``.
+
         Args:
             session_id: Session identifier
             limit: Maximum number of messages to return
             offset: Number of messages to skip
+            before: Cursor for the page of older messages
+            after: Cursor for the page of newer messages
+            newest: Start from the newest messages
 
         Returns:
-            MessagesResponse with messages list, total count, and has_more flag
+            MessagesResponse with messages list, cursors and has_more flag
         """
-        logger.info(f"Getting messages for session {session_id} (limit={limit}, offset={offset})")
+        logger.info(f"Getting messages for session {session_id} (limit={limit}, before={before}, after={after}, newest={newest})")
+
+        keyset = before is not None or after is not None
+        if keyset and offset:
+            raise HTTPException(status_code=400, detail="offset cannot be combined with before/after cursors")
 
         try:
-            # Get total count first (for pagination)
-            total_count = chat_operations.get_session_message_count(session_id)
+            # Counting is a full scan of the session, so only do it for the first page
+            total_count = None if keyset else await run_db(chat_operations.get_session_message_count, session_id)
 
             # Get messages with limit+1 to check if there are more
-            messages = chat_operations.get_messages_by_session_id(
+            messages = await run_db(
+                chat_operations.get_messages_by_session_id,
                 session_id=session_id,
                 limit=limit + 1,  # Get one extra to check if there are more
-                offset=offset
+                offset=offset,
+                before=before,
+                after=after,
+                newest=newest
             )
 
-            # Check if there are more messages
+            # Check if there are more messages in the direction we are paging
             has_more = len(messages) > limit
             if has_more:
-                messages = messages[:limit]  # Remove the extra message
+                # Paging backwards, the extra message is the oldest one
+                messages = messages[1:] if (before is not None or newest) else messages[:limit]
 
             return MessagesResponse(
                 messages=messages,
                 total_count=total_count,
-                has_more=has_more
+                has_more=has_more,
+                prev_cursor=chat_operations.message_cursor(messages[0]) if messages else before,
+                next_cursor=chat_operations.message_cursor(messages[-1]) if messages else after
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error getting messages: {e}")
             raise HTTPException(status_code=500, detail=f"Error getting messages: {str(e)}")
@@ -0,0 +1,251 @@
+"""
+Payload store for the full outputs of web UI events.
+
+Tool results (crawled pages, file contents, entity listings) can be far larger
+than anything the events panel shows. Events keep only a preview and a handle;
+the full output is kept here and served on demand by
+``GET /api/events/{session_id}/{event_id}/payload``.
+
+Payloads are held in memory up to a byte budget. Beyond that the least
+recently used are spilled to files in a spill directory, which has its own
+byte budget; payloads pushed out of both are gone, and the UI falls back to
+the preview.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from radbot.config.config_loader import config_loader
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable via web.events.payloads in config.yaml
+DEFAULT_MAX_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024
+DEFAULT_PREVIEW_CHARS = 500
+
+PayloadKey = Tuple[str, str]
+
+class PayloadStore:
+    """Size-bounded store of event payloads, in memory with spill to disk."""
+
+    def __init__(self, max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+                 max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+                 spill_dir: Optional[str] = None):
+        """Initialize the payload store.
+
+        Args:
+            max_memory_bytes: Bytes of payloads held in memory
+            max_disk_bytes: Bytes of payloads held in the spill directory; 0
+                disables spilling
+            spill_dir: Directory for spilled payloads (default: a private
+                temporary directory, removed on close)
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._own_spill_dir = spill_dir is None
+        self.spill_dir = spill_dir
+        # key -> (data, content_type), least recently used first
+        self._memory: "OrderedDict[PayloadKey, Tuple[bytes, str]]" = OrderedDict()
+        self._memory_bytes = 0
+        # key -> (path, size, content_type), oldest first
+        self._disk: "OrderedDict[PayloadKey, Tuple[str, int, str]]" = OrderedDict()
+        self._disk_bytes = 0
+        self._sessions: Dict[str, Set[PayloadKey]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, session_id: str, event_id: str, data: bytes,
+            content_type: str = "application/json") -> None:
+        """Store the payload of an event.
+
+        Args:
+            session_id: Session identifier
+            event_id: Event identifier
+            data: Payload bytes
+            content_type: Media type the payload is served with
+        """
+        key = (session_id, event_id)
+        with self._lock:
+            self._remove(key)
+            self._memory[key] = (data, content_type)
+            self._memory_bytes += len(data)
+            self._sessions.setdefault(session_id, set()).add(key)
+            while self._memory_bytes > self.max_memory_bytes and self._memory:
+                old_key, (old_data, old_type) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(old_data)
+                self._spill(old_key, old_data, old_type)
+
+    def get_info(self, session_id: str, event_id: str) -> Optional[Tuple[int, str]]:
+        """Get the size and content type of a payload.
+
+        Returns:
+            (size in bytes, content type), or None if the payload is not stored
+        """
+        key = (session_id, event_id)
+        with self._lock:
+            if key in self._memory:
+                data, content_type = self._memory[key]
+                return len(data), content_type
+            if key in self._disk:
+                _, size, content_type = self._disk[key]
+                return size, content_type
+        return None
+
+    def read(self, session_id: str, event_id: str, start: int = 0,
+             end: Optional[int] = None) -> Optional[bytes]:
+        """Read a byte range of a payload.
+
+        Args:
+            session_id: Session identifier
+            event_id: Event identifier
+            start: First byte to read
+            end: Byte after the last one to read (default: end of payload)
+
+        Returns:
+            The bytes read, or None if the payload is not stored
+        """
+        key = (session_id, event_id)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                data, _ = self._memory[key]
+                return data[start:end]
+            if key not in self._disk:
+                return None
+            path, size, _ = self._disk[key]
+            end = size if end is None else min(end, size)
+            try:
+                with open(path, "rb") as f:
+                    f.seek(start)
+                    return f.read(max(0, end - start))
+            except OSError as e:
+                logger.warning(f"Could not read spilled payload {path}: {e}")
+                return None
+
+    def drop_session(self, session_id: str) -> None:
+        """Forget every payload of a session."""
+        with self._lock:
+            for key in self._sessions.pop(session_id, set()):
+                self._remove(key)
+
+    def close(self) -> None:
+        """Forget every payload and remove the private spill directory."""
+        with self._lock:
+            for key in list(self._memory) + list(self._disk):
+                self._remove(key)
+            self._sessions.clear()
+            if self._own_spill_dir and self.spill_dir:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+                self.spill_dir = None
+
+    def _spill(self, key: PayloadKey, data: bytes, content_type: str) -> None:
+        """Move a payload out of memory to disk, or drop it. Called with the lock held."""
+        if len(data) > self.max_disk_bytes:
+            self._forget_session_key(key)
+            return
+        try:
+            if self.spill_dir is None:
+                self.spill_dir = tempfile.mkdtemp(prefix="radbot-payloads-")
+            os.makedirs(self.spill_dir, exist_ok=True)
+            path = os.path.join(self.spill_dir, f"{key[0]}-{key[1]}".replace(os.sep, "_"))
+            with open(path, "wb") as f:
+                f.write(data)
+        except OSError as e:
+            logger.warning(f"Could not spill event payload to disk, dropping it: {e}")
+            self._forget_session_key(key)
+            return
+
+        self._disk[key] = (path, len(data), content_type)
+        self._disk_bytes += len(data)
+        while self._disk_bytes > self.max_disk_bytes:
+            old_key, (old_path, old_size, _) = self._disk.popitem(last=False)
+            self._disk_bytes -= old_size
+            self._unlink(old_path)
+            self._forget_session_key(old_key)
+
+    def _remove(self, key: PayloadKey) -> None:
+        """Remove a payload wherever it is. Called with the lock held."""
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[0])
+        spilled = self._disk.pop(key, None)
+        if spilled is not None:
+            self._disk_bytes -= spilled[1]
+            self._unlink(spilled[0])
+
+    def _forget_session_key(self, key: PayloadKey) -> None:
+        keys = self._sessions.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._sessions[key[0]]
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def parse_byte_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range ``bytes=`` Range header.
+
+    Args:
+        range_header: Value of the Range header
+        size: Size of the payload in bytes
+
+    Returns:
+        (start, end) with end exclusive, or None if the range is not satisfiable
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                return None
+            return max(0, size - length), size
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        return None
+    if start >= size or end <= start:
+        return None
+    return start, min(end, size)
+
+def create_payload_store() -> PayloadStore:
+    """Create the payload store from the web.events.payloads section of config.yaml."""
+    events_config = config_loader.get_config().get("web", {}).get("events", {})
+    payloads_config = events_config.get("payloads", {}) or {}
+    return PayloadStore(
+        max_memory_bytes=int(payloads_config.get("max_memory_bytes", DEFAULT_MAX_MEMORY_BYTES)),
+        max_disk_bytes=int(payloads_config.get("max_disk_bytes", DEFAULT_MAX_DISK_BYTES)),
+        spill_dir=payloads_config.get("spill_dir"),
+    )
+
+def get_preview_chars() -> int:
+    """Get the length of the output preview kept in events."""
+    events_config = config_loader.get_config().get("web", {}).get("events", {})
+    payloads_config = events_config.get("payloads", {}) or {}
+    return int(payloads_config.get("preview_chars", DEFAULT_PREVIEW_CHARS))
+
+# Singleton payload store instance
+_payload_store: Optional[PayloadStore] = None
+_payload_store_lock = threading.Lock()
+
+def get_payload_store() -> PayloadStore:
+    """Get the shared payload store, creating it on first call."""
+    global _payload_store
+    if _payload_store is None:
+        with _payload_store_lock:
+            if _payload_store is None:
+                _payload_store = create_payload_store()
+    return _payload_store
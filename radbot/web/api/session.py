@@ -8,17 +8,23 @@ This file has been split into smaller modules in the session/ directory.
 """
 
 # Export components from session modules
+from radbot.web.api.session.agent_runtime import AgentRuntime, get_agent_runtime
 from radbot.web.api.session.session_runner import SessionRunner
 from radbot.web.api.session.session_manager import SessionManager, get_session_manager
 from radbot.web.api.session.dependencies import get_or_create_runner_for_session
 from radbot.web.api.session.memory_api import memory_router, MemoryStoreRequest
+from radbot.web.api.session.replay_buffer import ReplayBuffer, get_replay_buffers
 
 # Export all key components
 __all__ = [
+    'AgentRuntime',
+    'get_agent_runtime',
     'SessionRunner',
     'SessionManager',
     'get_session_manager',
     'get_or_create_runner_for_session',
     'memory_router',
-    'MemoryStoreRequest'
+    'MemoryStoreRequest',
+    'ReplayBuffer',
+    'get_replay_buffers'
 ]
@@ -5,17 +5,24 @@ This package manages sessions for the RadBot web interface.
 It creates and manages ADK Runner instances with the root agent.
 """
 
+from radbot.web.api.session.agent_runtime import AgentRuntime, get_agent_runtime
 from radbot.web.api.session.session_runner import SessionRunner
 from radbot.web.api.session.session_manager import SessionManager, get_session_manager
-from radbot.web.api.session.dependencies import get_or_create_runner_for_session
+from radbot.web.api.session.dependencies import get_or_create_runner_for_session, get_runner_for_connection
 from radbot.web.api.session.memory_api import memory_router, MemoryStoreRequest
+from radbot.web.api.session.replay_buffer import ReplayBuffer, get_replay_buffers
 
 # Export all key components
 __all__ = [
+    'AgentRuntime',
+    'get_agent_runtime',
     'SessionRunner',
     'SessionManager',
     'get_session_manager',
     'get_or_create_runner_for_session',
+    'get_runner_for_connection',
     'memory_router',
-    'MemoryStoreRequest'
+    'MemoryStoreRequest',
+    'ReplayBuffer',
+    'get_replay_buffers'
 ]
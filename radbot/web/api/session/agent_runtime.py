@@ -0,0 +1,184 @@
+"""
+Shared agent runtime for RadBot web interface.
+
+This module provides the AgentRuntime class, which owns the pieces of the ADK
+stack that are identical for every web session: the root agent tree, the MCP
+tools loaded into it, the session and artifact services and the ADK Runner.
+They are built once per process and shared by all SessionRunner handles.
+"""
+
+import logging
+import threading
+from typing import Any, Optional
+
+# Import needed ADK components
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.artifacts import InMemoryArtifactService
+
+from radbot.config.config_loader import config_loader
+
+# Import MCP tools loader
+from radbot.web.api.session.mcp_tools import _try_load_mcp_tools
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class AgentRuntime:
+    """Process-level owner of the agent tree, services and ADK Runner."""
+
+    def __init__(self, agent: Any = None):
+        """Build the shared runtime.
+
+        Args:
+            agent: Root agent to run. Defaults to the root_agent from agent.py.
+        """
+        if agent is None:
+            # Import root_agent directly from agent.py
+            from agent import root_agent
+            agent = root_agent
+        self.agent = agent
+
+        # Load MCP tools into the agent tree once for the whole process
+        _try_load_mcp_tools(self.agent)
+
+        # Keep model requests within a token budget in long sessions
+        self._install_context_window_manager()
+
+        # Log agent tree structure
+        self._log_agent_tree()
+
+        # One session service and one artifact service shared by all sessions
+        self.session_service = self._create_session_service()
+        self.artifact_service = InMemoryArtifactService()
+
+        # Persistent sessions outlive this process and may be shared with other workers
+        self.persistent_sessions = hasattr(self.session_service, "evict_session")
+
+        # Create the ADK Runner with app_name matching the agent name for ADK 0.4.0+
+        self.app_name = getattr(self.agent, 'name', None) or "beto"
+        logger.info(f"Using app_name='{self.app_name}' for session management")
+
+        self.memory_service = self._get_memory_service()
+
+        # Store memory_service in the global ToolContext class so memory tools can find it
+        if self.memory_service:
+            from google.adk.tools.tool_context import ToolContext
+            setattr(ToolContext, "memory_service", self.memory_service)
+            logger.info("Set memory_service in global ToolContext class")
+
+        self.runner = Runner(
+            agent=self.agent,
+            app_name=self.app_name,
+            session_service=self.session_service,
+            artifact_service=self.artifact_service,
+            memory_service=self.memory_service
+        )
+        logger.info("Shared agent runtime initialized")
+
+    def _install_context_window_manager(self):
+        """Register the context window manager on the agent tree unless disabled."""
+        window_config = config_loader.get_agent_config().get("context_window", {})
+        if not window_config.get("enabled", True):
+            logger.info("Context window management disabled")
+            return
+        from radbot.callbacks.context_window import (
+            create_context_window_manager,
+            install_context_window_manager,
+        )
+        manager = create_context_window_manager(window_config)
+        installed = install_context_window_manager(self.agent, manager)
+        logger.info(f"Context window manager installed on {installed} agents (default budget {manager.default_budget} tokens)")
+
+    def _create_session_service(self):
+        """Create the session service selected by web.sessions.backend in config.yaml."""
+        sessions_config = config_loader.get_config().get("web", {}).get("sessions", {})
+        backend = sessions_config.get("backend", "memory")
+
+        if backend == "postgres":
+            try:
+                from radbot.web.db.session_service import PostgresSessionService, DEFAULT_RECENT_EVENTS
+                service = PostgresSessionService(
+                    recent_events=int(sessions_config.get("recent_events", DEFAULT_RECENT_EVENTS))
+                )
+                logger.info("Using PostgreSQL session service")
+                return service
+            except Exception as e:
+                logger.error(f"Could not create PostgreSQL session service, falling back to in-memory: {str(e)}")
+        elif backend != "memory":
+            logger.warning(f"Unknown session backend '{backend}', using in-memory sessions")
+
+        return InMemorySessionService()
+
+    def _get_memory_service(self) -> Optional[Any]:
+        """Get the memory service attached to the root agent, if any."""
+        if getattr(self.agent, '_memory_service', None):
+            logger.info("Using memory service from root agent")
+            return self.agent._memory_service
+        if getattr(self.agent, 'memory_service', None):
+            logger.info("Using memory service from root agent")
+            return self.agent.memory_service
+        return None
+
+    def _log_agent_tree(self):
+        """Log the agent tree structure once at startup."""
+        root_name = getattr(self.agent, 'name', None)
+        sub_agents = getattr(self.agent, 'sub_agents', None) or []
+        logger.info(f"Agent tree: root='{root_name}', sub_agents={[getattr(sa, 'name', '?') for sa in sub_agents]}")
+
+        if logger.isEnabledFor(logging.DEBUG):
+            for sa in sub_agents:
+                nested = getattr(sa, 'sub_agents', None) or []
+                if nested:
+                    logger.debug(f"  Sub-agents of '{getattr(sa, 'name', '?')}': {[getattr(ssa, 'name', '?') for ssa in nested]}")
+
+    def get_or_create_session(self, user_id: str, session_id: str):
+        """Get the ADK session for a user, creating it if needed."""
+        session = self.session_service.get_session(
+            app_name=self.app_name,
+            user_id=user_id,
+            session_id=session_id
+        )
+        if not session:
+            logger.info(f"Creating new session for user {user_id} with app_name='{self.app_name}'")
+            session = self.session_service.create_session(
+                app_name=self.app_name,
+                user_id=user_id,
+                session_id=session_id
+            )
+        return session
+
+    def release_session(self, user_id: str, session_id: str):
+        """Drop the ADK session state held for an evicted web session.
+
+        Persistent session services only forget their process-local state, so the
+        conversation can be resumed later or by another worker.
+        """
+        try:
+            if self.persistent_sessions:
+                self.session_service.evict_session(
+                    app_name=self.app_name,
+                    user_id=user_id,
+                    session_id=session_id
+                )
+                return
+            self.session_service.delete_session(
+                app_name=self.app_name,
+                user_id=user_id,
+                session_id=session_id
+            )
+        except Exception as e:
+            logger.warning(f"Error releasing session {session_id}: {str(e)}")
+
+# Singleton runtime instance, built lazily on first use
+_runtime: Optional[AgentRuntime] = None
+_runtime_lock = threading.Lock()
+
+def get_agent_runtime() -> AgentRuntime:
+    """Get the shared agent runtime, building it on first call."""
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = AgentRuntime()
+    return _runtime
@@ -46,3 +46,27 @@ async def get_or_create_runner_for_session(
     except Exception as e:
         logger.error(f"Error creating session runner: {str(e)}", exc_info=True)
         raise
+
+
+async def get_runner_for_connection(session_id: str, session_manager: SessionManager) -> SessionRunner:
+    """Get the SessionRunner for a new WebSocket connection.
+
+    A new session is reset so it starts with Beto. A reconnect to a live
+    session keeps the conversation and its replay buffer, so the client can
+    resume from its cursor. Persisted sessions are never reset, so a reconnect
+    to another worker resumes the conversation too.
+
+    Args:
+        session_id: Session identifier
+        session_manager: Session manager holding the live runners
+
+    Returns:
+        The session's runner
+    """
+    is_new_session = await session_manager.get_runner(session_id) is None
+    runner = await get_or_create_runner_for_session(session_id, session_manager)
+
+    if is_new_session and hasattr(runner, 'reset_session') and not runner.runtime.persistent_sessions:
+        logger.info(f"Resetting session {session_id} to ensure starting with Beto agent")
+        runner.reset_session()
+    return runner
@@ -317,4 +317,55 @@ def _get_event_details(event):
         pass
     
     # Fallback to string representation
-    return str(event)
\ No newline at end of file
+    return str(event)
+
+
+# Span names for the kinds of work an event stands for
+_EVENT_SPAN_NAMES = {
+    "model_response": "model_call",
+    "tool_call": "tool_call",
+    "agent_transfer": "agent_transfer",
+    "planner": "planner",
+}
+
+
+def _trace_event(tracer, event, start_time: float, end_time: float):
+    """Record a span for one runner event, covering the time spent producing it.
+    
+    Only called while the turn span is recording, so the introspection here
+    costs nothing for untraced turns.
+    """
+    from radbot.web.api.session.utils import _get_event_type
+    
+    event_type = _get_event_type(event)
+    attributes: Dict[str, Any] = {
+        "event.type": event_type,
+        "event.class": type(event).__name__,
+    }
+    for attr in ("id", "author", "invocation_id"):
+        value = getattr(event, attr, None)
+        if value:
+            attributes[f"event.{attr}"] = str(value)
+    
+    try:
+        if callable(getattr(event, 'is_final_response', None)):
+            attributes["event.is_final"] = bool(event.is_final_response())
+        if callable(getattr(event, 'get_function_calls', None)):
+            calls = [fc.name for fc in event.get_function_calls() if getattr(fc, 'name', None)]
+            if calls:
+                attributes["tool.calls"] = calls
+        if callable(getattr(event, 'get_function_responses', None)):
+            responses = [fr.name for fr in event.get_function_responses() if getattr(fr, 'name', None)]
+            if responses:
+                attributes["tool.responses"] = responses
+        actions = getattr(event, 'actions', None)
+        if actions is not None and getattr(actions, 'transfer_to_agent', None):
+            attributes["agent.transfer_to"] = actions.transfer_to_agent
+        content = getattr(event, 'content', None)
+        if content is not None:
+            attributes["content.parts"] = len(getattr(content, 'parts', None) or [])
+    except Exception as e:
+        attributes["trace.error"] = str(e)
+    
+    span = tracer.start_span(_EVENT_SPAN_NAMES.get(event_type, "event"), attributes, start_time=start_time)
+    span.end(end_time)
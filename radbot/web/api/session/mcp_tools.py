@@ -10,8 +10,8 @@ from typing import List, Any
 # Set up logging
 logger = logging.getLogger(__name__)
 
-def _try_load_mcp_tools(self):
-        """Try to load and add MCP tools to the root agent."""
+def _try_load_mcp_tools(agent):
+        """Try to load and add MCP tools to the given root agent."""
         try:
             # Import necessary modules
             from radbot.config.config_loader import config_loader
@@ -31,8 +31,8 @@ def _try_load_mcp_tools(self):
             existing_tool_names = set()
             
             # Get existing tool names
-            if hasattr(root_agent, "tools"):
-                for tool in root_agent.tools:
+            if hasattr(agent, "tools"):
+                for tool in agent.tools:
                     if hasattr(tool, "name"):
                         existing_tool_names.add(tool.name)
                     elif hasattr(tool, "__name__"):
@@ -44,34 +44,24 @@ def _try_load_mcp_tools(self):
                 server_name = server.get("name", server_id)
                 
                 try:
-                    # Create a client directly instead of using factory
                     transport = server.get("transport", "sse")
-                    url = server.get("url")
-                    auth_token = server.get("auth_token")
                     
                     # Handle different transport types
                     if transport == "sse":
-                        # Use our custom SSE client implementation
-                        from radbot.tools.mcp.client import MCPSSEClient
-                        client = MCPSSEClient(url=url, auth_token=auth_token)
+                        # Tools of the server's supervised pool, shared with the rest of the app
+                        server_tools = MCPClientFactory.get_pool(server_id).get_tools()
                         
-                        # Initialize the client (this is synchronous and safe)
-                        if client.initialize():
-                            # Get tools from the client
-                            server_tools = client.tools
+                        if server_tools:
+                            logger.info(f"Successfully loaded {len(server_tools)} tools from {server_name}")
                             
-                            if server_tools:
-                                logger.info(f"Successfully loaded {len(server_tools)} tools from {server_name}")
-                                
-                                # Add unique tools
-                                for tool in server_tools:
-                                    tool_name = getattr(tool, "name", None) or getattr(tool, "__name__", str(tool))
-                                    if tool_name not in existing_tool_names:
-                                        tools_to_add.append(tool)
-                                        existing_tool_names.add(tool_name)
-                                        logger.info(f"Added tool: {tool_name} from {server_name}")
+                            # Add unique tools
+                            for tool in server_tools:
+                                if tool.name not in existing_tool_names:
+                                    tools_to_add.append(tool)
+                                    existing_tool_names.add(tool.name)
+                                    logger.info(f"Added tool: {tool.name} from {server_name}")
                         else:
-                            logger.warning(f"Failed to initialize MCP client for {server_name}")
+                            logger.warning(f"No tools available from MCP server {server_name}")
                             
                     elif transport == "stdio":
                         # For Claude CLI, use the simplified prompt tool implementation
@@ -123,8 +113,8 @@ def _try_load_mcp_tools(self):
                     logger.warning(f"Error loading tools from MCP server {server_name}: {str(e)}")
             
             # Add all collected tools to the agent
-            if tools_to_add and hasattr(root_agent, "tools"):
-                root_agent.tools = list(root_agent.tools) + tools_to_add
+            if tools_to_add and hasattr(agent, "tools"):
+                agent.tools = list(agent.tools) + tools_to_add
                 logger.info(f"Added {len(tools_to_add)} total MCP tools to agent")
                 
         except Exception as e:
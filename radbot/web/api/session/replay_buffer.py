@@ -0,0 +1,305 @@
+"""
+Replay buffers for resuming WebSocket chat sessions.
+
+Each session gets a bounded buffer of chat messages numbered with monotonic
+sequence numbers, plus an index from message ID to sequence number. A client
+that reconnects sends the last sequence number (or message ID) it has seen and
+receives only the messages after it, without rebuilding the whole ADK session.
+
+A buffer is built from the ADK session the first time it is needed and kept
+up to date as new turns are processed. Every buffer has a random ``epoch``;
+sequence numbers are only comparable within one epoch, so a client holding a
+cursor from a previous process falls back to its message ID or a full history.
+
+Scrolling back past the oldest buffered message continues from the chat
+history database (``database_history``), using its keyset cursors.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from radbot.config.config_loader import config_loader
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Default number of messages kept per session, overridable via web.sessions.replay_buffer_size
+DEFAULT_REPLAY_BUFFER_SIZE = 500
+
+# Lowest message ID, so a cursor built from a timestamp excludes every message at it
+_NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+def parse_seq(value: Any) -> Optional[int]:
+    """Read a sequence number sent by a client.
+
+    Args:
+        value: Raw value from the client's message
+
+    Returns:
+        The sequence number, or None if the value is not a non-negative integer
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if value >= 0 else None
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        return int(value)
+    return None
+
+def message_id_for_event(event: Any) -> str:
+    """Get a stable chat message ID for an ADK event.
+
+    User events get an ID derived from their invocation, because the live turn
+    only knows the invocation ID of the user message, not its event ID.
+    """
+    invocation_id = getattr(event, 'invocation_id', None)
+    if getattr(event, 'author', None) == "user" and invocation_id:
+        return f"{invocation_id}-user"
+    event_id = getattr(event, 'id', None)
+    if event_id:
+        return str(event_id)
+    # No ID at all: derive one from the content so it is the same on every rebuild
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, f"{getattr(event, 'timestamp', '')}:{_event_text(event)}"))
+
+def _client_message_id(message_id: Any) -> Optional[str]:
+    """Get a client message ID, or None if it is not a UUID."""
+    if not isinstance(message_id, str):
+        return None
+    try:
+        uuid.UUID(message_id)
+    except ValueError:
+        return None
+    return message_id
+
+def _event_text(event: Any) -> str:
+    """Extract the text content of an ADK event."""
+    content = getattr(event, 'content', None)
+    if not content:
+        return ""
+    text_content = ""
+    if hasattr(content, 'parts') and content.parts:
+        for part in content.parts:
+            if hasattr(part, 'text') and part.text:
+                text_content += part.text
+    elif hasattr(content, 'text') and content.text:
+        text_content = content.text
+    return text_content
+
+def event_to_message(event: Any) -> Optional[Dict[str, Any]]:
+    """Convert an ADK event to a chat message, or None if it has no text."""
+    text_content = _event_text(event)
+    if not text_content:
+        return None
+    return {
+        "id": message_id_for_event(event),
+        "role": getattr(event, 'author', 'assistant'),
+        "content": text_content,
+        "timestamp": int((getattr(event, 'timestamp', None) or time.time()) * 1000),  # JS timestamp
+        "agent": getattr(event, 'agent_name', None) or getattr(event, 'agent', None)
+    }
+
+class ReplayBuffer:
+    """Bounded, sequence-numbered message buffer for one session."""
+
+    def __init__(self, max_messages: int = DEFAULT_REPLAY_BUFFER_SIZE):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.max_messages = max_messages
+        self.messages: Deque[Dict[str, Any]] = deque()
+        self.seq_by_id: Dict[str, int] = {}
+        self.last_seq = 0
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest buffered message, or the next one if empty."""
+        return self.messages[0]["seq"] if self.messages else self.last_seq + 1
+
+    def append(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Append a message, assigning its sequence number. Known IDs are ignored."""
+        if message["id"] in self.seq_by_id:
+            return None
+        self.last_seq += 1
+        stored = dict(message, seq=self.last_seq)
+        self.messages.append(stored)
+        self.seq_by_id[stored["id"]] = self.last_seq
+        while len(self.messages) > self.max_messages:
+            old = self.messages.popleft()
+            self.seq_by_id.pop(old["id"], None)
+        return stored
+
+    def after_seq(self, seq: int) -> Optional[List[Dict[str, Any]]]:
+        """Get the messages after a sequence number.
+
+        Returns:
+            The missing messages, or None if the buffer no longer holds all of them
+        """
+        if seq < self.first_seq - 1 or seq > self.last_seq:
+            return None
+        missing = self.last_seq - seq
+        # Walk back from the newest message, so a resume costs O(missing)
+        tail = list(islice(reversed(self.messages), missing))
+        tail.reverse()
+        return tail
+
+    def after_id(self, message_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Get the messages after a message ID, or None if the ID is unknown."""
+        seq = self.seq_by_id.get(message_id)
+        if seq is None:
+            return None
+        return self.after_seq(seq)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the most recent messages."""
+        if not limit or limit >= len(self.messages):
+            return list(self.messages)
+        tail = list(islice(reversed(self.messages), limit))
+        tail.reverse()
+        return tail
+
+    def before_seq(self, seq: int, limit: int) -> List[Dict[str, Any]]:
+        """Get up to ``limit`` messages older than a sequence number, oldest first.
+
+        The page is located by its offset from the oldest buffered message, so
+        scrolling back costs O(limit) however deep the page is.
+        """
+        end = min(seq, self.last_seq + 1) - self.first_seq
+        if end <= 0 or limit <= 0:
+            return []
+        start = max(0, end - limit)
+        return [self.messages[i] for i in range(start, end)]
+
+    def cursor(self) -> Dict[str, Any]:
+        """Get the resume cursor for the newest message."""
+        return {"epoch": self.epoch, "seq": self.last_seq}
+
+def database_history(session_id: str, limit: int, before: Optional[str] = None,
+                     before_timestamp: Optional[int] = None,
+                     known_ids: Iterable[str] = ()) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get chat messages older than the replay buffer from the chat history database.
+
+    Args:
+        session_id: Session identifier
+        limit: Maximum number of messages to return
+        before: Cursor returned by a previous call
+        before_timestamp: JS timestamp of the oldest buffered message, used to
+            start paging when there is no cursor yet
+        known_ids: IDs of messages the client already got from the buffer
+
+    Returns:
+        The messages, oldest first, in the replay buffer's message format, and
+        the cursor of the next older page (None when there are no older messages)
+    """
+    from radbot.web.db import chat_operations
+
+    if before is None and before_timestamp is not None:
+        oldest = datetime.fromtimestamp(before_timestamp / 1000, tz=timezone.utc).isoformat()
+        before = chat_operations.encode_cursor(oldest, _NIL_UUID)
+    rows = chat_operations.get_messages_by_session_id(session_id, limit=limit, before=before, newest=True)
+
+    known = set(known_ids)
+    messages = []
+    for row in rows:
+        message = {
+            "id": (row.get("metadata") or {}).get("client_id") or row["message_id"],
+            "role": row["role"],
+            "content": row["content"],
+            "timestamp": int(datetime.fromisoformat(row["timestamp"]).timestamp() * 1000),
+            "agent": row.get("agent_name"),
+        }
+        if message["id"] not in known:
+            messages.append(message)
+    next_cursor = chat_operations.message_cursor(rows[0]) if len(rows) == limit else None
+    return messages, next_cursor
+
+class ReplayBufferRegistry:
+    """Process-wide map of session IDs to replay buffers."""
+
+    def __init__(self, max_messages: int = DEFAULT_REPLAY_BUFFER_SIZE):
+        self.max_messages = max_messages
+        self._buffers: Dict[str, ReplayBuffer] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[ReplayBuffer]:
+        """Get the buffer of a session if it has been built."""
+        return self._buffers.get(session_id)
+
+    def get_or_build(self, session_id: str, load_events: Callable[[], Iterable[Any]]) -> ReplayBuffer:
+        """Get the buffer of a session, building it from the ADK session on first use.
+
+        Args:
+            session_id: Session identifier
+            load_events: Returns the ADK events of the session; only called on a miss
+        """
+        buffer = self._buffers.get(session_id)
+        if buffer is not None:
+            return buffer
+        with self._lock:
+            buffer = self._buffers.get(session_id)
+            if buffer is None:
+                buffer = ReplayBuffer(self.max_messages)
+                for event in load_events() or []:
+                    message = event_to_message(event)
+                    if message:
+                        buffer.append(message)
+                self._buffers[session_id] = buffer
+                logger.info(f"Built replay buffer for session {session_id} with {len(buffer.messages)} messages")
+        return buffer
+
+    def append_turn(self, session_id: str, user_message: str, events: List[Any],
+                    started_at: Optional[float] = None, user_message_id: Optional[str] = None) -> None:
+        """Add a processed turn to the session's buffer, if the buffer has been built.
+
+        An unbuilt buffer is left alone: it is built from the session, which
+        already holds this turn, when it is first needed.
+
+        Args:
+            session_id: Session identifier
+            user_message: Text of the user message that started the turn
+            events: ADK events produced by the turn
+            started_at: When the turn started, used as the user message timestamp
+            user_message_id: Client UUID of the user message, so the client can
+                resume from it; defaults to an ID derived from the invocation
+        """
+        buffer = self._buffers.get(session_id)
+        if buffer is None:
+            return
+        with self._lock:
+            invocation_id = next((e.invocation_id for e in events if getattr(e, 'invocation_id', None)), None)
+            if user_message and invocation_id:
+                buffer.append({
+                    "id": _client_message_id(user_message_id) or f"{invocation_id}-user",
+                    "role": "user",
+                    "content": user_message,
+                    "timestamp": int((started_at or time.time()) * 1000),
+                    "agent": None
+                })
+            for event in events:
+                message = event_to_message(event)
+                if message:
+                    buffer.append(message)
+
+    def drop(self, session_id: str) -> None:
+        """Forget the buffer of a session."""
+        with self._lock:
+            self._buffers.pop(session_id, None)
+
+# Singleton registry instance
+_registry: Optional[ReplayBufferRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_replay_buffers() -> ReplayBufferRegistry:
+    """Get the shared replay buffer registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                sessions_config = config_loader.get_config().get("web", {}).get("sessions", {})
+                _registry = ReplayBufferRegistry(
+                    int(sessions_config.get("replay_buffer_size", DEFAULT_REPLAY_BUFFER_SIZE))
+                )
+    return _registry
@@ -6,33 +6,62 @@ This module provides the SessionManager class for managing multiple sessions.
 
 import asyncio
 import logging
-from typing import Dict, Optional
+import time
+from collections import OrderedDict
+from typing import List, Optional
 
+from radbot.config.config_loader import config_loader
 from radbot.web.api.session.session_runner import SessionRunner
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Defaults for idle session eviction, overridable via web.sessions in config.yaml
+DEFAULT_MAX_SESSIONS = 500
+DEFAULT_IDLE_TIMEOUT = 3600  # seconds
+
 class SessionManager:
-    """Manager for web sessions and their associated runners."""
-    
-    def __init__(self):
-        """Initialize session manager."""
-        self.sessions: Dict[str, SessionRunner] = {}
+    """Manager for web sessions and their associated runners.
+
+    Sessions are kept in least-recently-used order. Sessions idle for longer
+    than ``idle_timeout`` seconds, and the oldest sessions beyond
+    ``max_sessions``, are evicted and their state released.
+    """
+
+    def __init__(self, max_sessions: Optional[int] = None, idle_timeout: Optional[float] = None):
+        """Initialize session manager.
+
+        Args:
+            max_sessions: Maximum number of live session handles
+            idle_timeout: Seconds of inactivity after which a session is evicted
+        """
+        sessions_config = config_loader.get_config().get("web", {}).get("sessions", {})
+        self.max_sessions = int(max_sessions or sessions_config.get("max_sessions", DEFAULT_MAX_SESSIONS))
+        self.idle_timeout = float(idle_timeout or sessions_config.get("idle_timeout", DEFAULT_IDLE_TIMEOUT))
+        self.sessions: "OrderedDict[str, SessionRunner]" = OrderedDict()
         self.lock = asyncio.Lock()
-        logger.info("Session manager initialized")
-    
+        logger.info(f"Session manager initialized (max_sessions={self.max_sessions}, idle_timeout={self.idle_timeout}s)")
+
     async def get_runner(self, session_id: str) -> Optional[SessionRunner]:
         """Get runner for a session."""
         async with self.lock:
-            return self.sessions.get(session_id)
-    
+            runner = self.sessions.get(session_id)
+            if runner:
+                runner.touch()
+                self.sessions.move_to_end(session_id)
+            evicted = self._collect_evictions()
+        self._release(evicted)
+        return runner
+
     async def set_runner(self, session_id: str, runner: SessionRunner):
         """Set runner for a session."""
         async with self.lock:
             self.sessions[session_id] = runner
+            self.sessions.move_to_end(session_id)
+            evicted = self._collect_evictions()
             logger.info(f"Runner set for session {session_id}")
-    
+        self._release(evicted)
+
     async def reset_session(self, session_id: str):
         """Reset a session."""
         runner = await self.get_runner(session_id)
@@ -41,15 +70,39 @@ class SessionManager:
             logger.info(f"Reset session {session_id}")
         else:
             logger.warning(f"Attempted to reset non-existent session {session_id}")
-    
+
     async def remove_session(self, session_id: str):
         """Remove a session."""
         async with self.lock:
-            if session_id in self.sessions:
-                del self.sessions[session_id]
-                logger.info(f"Removed session {session_id}")
-            else:
-                logger.warning(f"Attempted to remove non-existent session {session_id}")
+            runner = self.sessions.pop(session_id, None)
+        if runner:
+            self._release([(session_id, runner)])
+            logger.info(f"Removed session {session_id}")
+        else:
+            logger.warning(f"Attempted to remove non-existent session {session_id}")
+
+    def _collect_evictions(self) -> List[tuple]:
+        """Pop idle and over-capacity sessions. Must be called with the lock held."""
+        evicted = []
+        cutoff = time.monotonic() - self.idle_timeout
+
+        # The OrderedDict is in LRU order, so idle sessions are at the front
+        while self.sessions:
+            session_id, runner = next(iter(self.sessions.items()))
+            if len(self.sessions) <= self.max_sessions and runner.last_used >= cutoff:
+                break
+            self.sessions.popitem(last=False)
+            evicted.append((session_id, runner))
+        return evicted
+
+    def _release(self, evicted: List[tuple]):
+        """Release the state held for evicted sessions."""
+        for session_id, runner in evicted:
+            try:
+                runner.release()
+                logger.info(f"Evicted idle session {session_id}")
+            except Exception as e:
+                logger.warning(f"Error releasing session {session_id}: {str(e)}")
 
 # Singleton session manager instance
 _session_manager = SessionManager()
@@ -8,6 +8,8 @@ import logging
 import os
 import sys
 import json
+import time
+import uuid
 from typing import Dict, Any, Optional, Union
 
 # Set up logging
@@ -23,13 +25,10 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 # Import needed ADK components
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.artifacts import InMemoryArtifactService
 from google.genai.types import Content, Part
 
-# Import root_agent directly from agent.py
-from agent import root_agent
+# Import the shared agent runtime
+from radbot.web.api.session.agent_runtime import AgentRuntime, get_agent_runtime
 
 # Import the malformed function handler
 from radbot.web.api.malformed_function_handler import extract_text_from_malformed_function
@@ -50,102 +49,69 @@ from radbot.web.api.session.event_processing import (
     _process_model_response_event,
     _process_generic_event,
     _get_plan_step_summary,
-    _get_event_details
+    _get_event_details,
+    _trace_event
 )
 
+# Import tracing
+from radbot.utils.tracing import get_tracer
+
+# Import the reconnect replay buffers
+from radbot.web.api.session.replay_buffer import get_replay_buffers
+
 # Import serialization function
 from radbot.web.api.session.serialization import _safely_serialize
 
-# Import MCP tools loader
-from radbot.web.api.session.mcp_tools import _try_load_mcp_tools
+# Import event size limits
+from radbot.web.api.event_wire import get_wire_settings, store_event_payload, truncate_event_text
+from radbot.web.api.payload_store import get_payload_store, get_preview_chars
 
 class SessionRunner:
-    """Enhanced ADK Runner for web sessions."""
+    """Lightweight per-session handle onto the shared agent runtime."""
     
-    def __init__(self, user_id: str, session_id: str):
+    def __init__(self, user_id: str, session_id: str, runtime: Optional[AgentRuntime] = None):
         """Initialize a SessionRunner for a specific user.
         
+        The agent tree, MCP tools, session service and ADK Runner are owned by
+        the process-level AgentRuntime, so creating a handle is cheap.
+        
         Args:
             user_id: Unique user identifier
             session_id: Session identifier
+            runtime: Optional runtime to use instead of the shared one
         """
         self.user_id = user_id
         self.session_id = session_id
-        self.session_service = InMemorySessionService()
-        
-        # Create artifact service for this session
-        self.artifact_service = InMemoryArtifactService()
-        logger.info("Created InMemoryArtifactService for the session")
-        
-        # Try to load MCP tools for this session
-        self._try_load_mcp_tools()
-        
-        # Log agent tree structure
-        self._log_agent_tree()
-        
-        # Create the ADK Runner with app_name matching the agent name for ADK 0.4.0+
-        app_name = root_agent.name if hasattr(root_agent, 'name') else "beto"
-        logger.info(f"Using app_name='{app_name}' for session management")
-        
-        # Get memory service from root_agent if available
-        memory_service = None
-        if hasattr(root_agent, '_memory_service'):
-            memory_service = root_agent._memory_service
-            logger.info("Using memory service from root agent")
-        elif hasattr(root_agent, 'memory_service'):
-            memory_service = root_agent.memory_service
-            logger.info("Using memory service from root agent")
-        
-        # Store memory_service in the global ToolContext class so memory tools can find it
-        if memory_service:
-            from google.adk.tools.tool_context import ToolContext
-            # Set memory_service in the ToolContext class for tools to access
-            setattr(ToolContext, "memory_service", memory_service)
-            logger.info("Set memory_service in global ToolContext class")
-            
-        # Create the Runner with artifact service and memory service
-        self.runner = Runner(
-            agent=root_agent,
-            app_name=app_name,
-            session_service=self.session_service,
-            artifact_service=self.artifact_service,  # Pass artifact service to Runner
-            memory_service=memory_service  # Pass memory service to Runner
-        )
-    
-    def _log_agent_tree(self):
-        """Log the agent tree structure for debugging."""
-        logger.info("===== AGENT TREE STRUCTURE =====")
+        self.runtime = runtime or get_agent_runtime()
         
-        # Check root agent
-        if hasattr(root_agent, 'name'):
-            logger.info(f"ROOT AGENT: name='{root_agent.name}'")
-        else:
-            logger.warning("ROOT AGENT: No name attribute")
+        # Expose the shared services under the attribute names callers already use
+        self.session_service = self.runtime.session_service
+        self.artifact_service = self.runtime.artifact_service
+        self.runner = self.runtime.runner
         
-        # Check sub-agents
-        if hasattr(root_agent, 'sub_agents') and root_agent.sub_agents:
-            sub_agent_names = [sa.name for sa in root_agent.sub_agents if hasattr(sa, 'name')]
-            logger.info(f"SUB-AGENTS: {sub_agent_names}")
-            
-            # Check each sub-agent
-            for i, sa in enumerate(root_agent.sub_agents):
-                sa_name = sa.name if hasattr(sa, 'name') else f"unnamed-{i}"
-                logger.info(f"SUB-AGENT {i}: name='{sa_name}'")
-                
-                # Check if sub-agent has its own sub-agents
-                if hasattr(sa, 'sub_agents') and sa.sub_agents:
-                    sa_sub_names = [ssa.name for ssa in sa.sub_agents if hasattr(ssa, 'name')]
-                    logger.info(f"  SUB-AGENTS OF '{sa_name}': {sa_sub_names}")
-        else:
-            logger.warning("ROOT AGENT: No sub_agents found")
-        
-        logger.info("===============================")
+        # Last time this handle was used, for idle eviction by the SessionManager
+        self.last_used = time.monotonic()
+    
+    def touch(self):
+        """Mark the session as recently used."""
+        self.last_used = time.monotonic()
     
-    def process_message(self, message: str) -> dict:
+    def release(self):
+        """Release the per-session state held by the shared runtime."""
+        self.runtime.release_session(self.user_id, self.session_id)
+        
+        # Drop the session's buffered UI events and replay buffer too
+        from radbot.web.api.event_store import get_event_store
+        get_event_store().drop_session(self.session_id)
+        get_payload_store().drop_session(self.session_id)
+        get_replay_buffers().drop(self.session_id)
+    
+    def process_message(self, message: str, message_id: Optional[str] = None) -> dict:
         """Process a user message and return the agent's response with event data.
         
         Args:
             message: The user's message text
+            message_id: Optional client ID of the message, used to resume a sync from it
                 
         Returns:
             Dictionary containing the agent's response text and event data
@@ -157,113 +123,65 @@ class SessionRunner:
                 role="user"
             )
             
-            # Get the app_name from the runner
-            app_name = self.runner.app_name if hasattr(self.runner, 'app_name') else "beto"
-            
-            # Get or create a session with the user_id and session_id
-            session = self.session_service.get_session(
-                app_name=app_name,
-                user_id=self.user_id,
-                session_id=self.session_id
-            )
+            self.touch()
             
-            if not session:
-                logger.info(f"Creating new session for user {self.user_id} with app_name='{app_name}'")
-                session = self.session_service.create_session(
-                    app_name=app_name,
-                    user_id=self.user_id,
-                    session_id=self.session_id
-                )
+            # Get the app_name from the shared runtime
+            app_name = self.runtime.app_name
             
-            # OPTIMIZATION: Limit message history to reduce context size
-            # Get the current message count and truncate if needed
-            try:
-                # Check current message count
-                message_count = session.message_count if hasattr(session, 'message_count') else 0
-                # Get messages list
-                messages = session.messages if hasattr(session, 'messages') else []
-                
-                # If there are too many messages, keep only the most recent ones
-                # For very short messages like "hi", use an even smaller history
-                message_length = len(message.strip()) if isinstance(message, str) else 0
-                
-                # Dynamically adjust history size based on message length
-                if message_length <= 5:  # Very short message like "hi"
-                    MAX_MESSAGES = 5  # Keep only the 5 most recent messages for very short inputs
-                    logger.info(f"Using reduced history size (5) for short message: '{message}'")
-                elif message_length <= 20:  # Short message
-                    MAX_MESSAGES = 10  # Keep 10 messages for short inputs
-                    logger.info(f"Using reduced history size (10) for medium-length message")
-                else:
-                    MAX_MESSAGES = 15  # Default: keep 15 messages for normal inputs
-                
-                if message_count > MAX_MESSAGES and len(messages) > MAX_MESSAGES:
-                    logger.info(f"Truncating message history from {message_count} to {MAX_MESSAGES} messages")
-                    # Keep only the most recent messages
-                    session.messages = messages[-MAX_MESSAGES:]
-                    # Update the message count
-                    session.message_count = len(session.messages)
-                    logger.info(f"Message history truncated to {session.message_count} messages")
-            except Exception as e:
-                logger.warning(f"Could not truncate message history: {e}")
+            # Get or create a session with the user_id and session_id
+            session = self.runtime.get_or_create_session(self.user_id, self.session_id)
             
             # Use the runner to process the message
             logger.info(f"Running agent with message: {message[:50]}{'...' if len(message) > 50 else ''}")
-            
-            # Log key parameters
-            logger.info(f"USER_ID: '{self.user_id}'")
-            logger.info(f"SESSION_ID: '{self.session_id}'")
-            logger.info(f"APP_NAME: '{app_name}'")
+            logger.debug(f"USER_ID: '{self.user_id}', SESSION_ID: '{self.session_id}', APP_NAME: '{app_name}'")
             
             # Set user_id in ToolContext for memory tools
             if hasattr(self.runner, 'memory_service') and self.runner.memory_service:
                 from google.adk.tools.tool_context import ToolContext
                 setattr(ToolContext, "user_id", self.user_id)
-                logger.info(f"Set user_id '{self.user_id}' in global ToolContext")
-                
-            # Run with consistent parameters
-            events = list(self.runner.run(
-                user_id=self.user_id,
-                session_id=session.id,
-                new_message=user_message
-            ))
             
-            # Process events
+            # Run with consistent parameters, tracing the turn when sampled
+            started_at = time.time()
+            tracer = get_tracer()
+            events = []
+            with tracer.start_span("agent.turn", {
+                "session.id": self.session_id,
+                "user.id": self.user_id,
+                "app.name": app_name,
+            }) as turn_span:
+                last_time = time.time()
+                for event in self.runner.run(
+                    user_id=self.user_id,
+                    session_id=session.id,
+                    new_message=user_message
+                ):
+                    events.append(event)
+                    if turn_span.is_recording():
+                        now = time.time()
+                        _trace_event(tracer, event, last_time, now)
+                        last_time = now
+                turn_span.set_attribute("turn.event_count", len(events))
+            
             logger.info(f"Received {len(events)} events from runner")
-            logger.info(f"Event types: {[type(e).__name__ for e in events]}")
-
-            # Log detailed information about each event
-            for i, event in enumerate(events):
-                logger.info(f"Event {i} attributes: {dir(event)}")
-
-                # Log message structure (ADK 0.4.0 specific)
-                if hasattr(event, 'message'):
-                    logger.info(f"Event {i} has message attribute")
-                    if hasattr(event.message, 'content'):
-                        logger.info(f"Event {i} message.content type: {type(event.message.content)}")
-                        if hasattr(event.message, 'end_turn'):
-                            logger.info(f"Event {i} message.end_turn: {event.message.end_turn}")
-
-                # Log content structure
-                if hasattr(event, 'content'):
-                    logger.info(f"Event {i} content type: {type(event.content)}")
-
-                # Log is_final_response
-                if hasattr(event, 'is_final_response'):
-                    if callable(getattr(event, 'is_final_response')):
-                        logger.info(f"Event {i} is_final_response(): {event.is_final_response()}")
-                    else:
-                        logger.info(f"Event {i} is_final_response: {event.is_final_response}")
+            
+            # Keep the reconnect replay buffer in step with the session
+            get_replay_buffers().append_turn(self.session_id, message, events, started_at, message_id)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Event types: {[type(e).__name__ for e in events]}")
 
             # Initialize variables for collecting event data
             final_response = None
             processed_events = []
             raw_response = None
+            wire_settings = get_wire_settings()
+            max_text_chars = wire_settings["max_text_chars"]
+            preview_chars = get_preview_chars()
             
             for event in events:
                 # Extract event type and create a base event object
                 event_type = _get_event_type(event)
                 event_data = {
+                    "event_id": uuid.uuid4().hex,
                     "type": event_type,
                     "timestamp": _get_current_timestamp()
                 }
@@ -291,6 +209,11 @@ class SessionRunner:
                     if hasattr(event, 'raw_response'):
                         raw_response = event.raw_response
                 
+                # Truncate once here, so nothing downstream copies events to do
+                # it, and keep large tool outputs out of the event itself
+                truncate_event_text(event_data, max_text_chars)
+                store_event_payload(self.session_id, event_data,
+                                    wire_settings["inline_payload_chars"], preview_chars)
                 processed_events.append(event_data)
                 
                 # Store the event in the events storage
@@ -323,6 +246,7 @@ class SessionRunner:
                         
                         # Create a synthetic model response event
                         model_event = {
+                            "event_id": uuid.uuid4().hex,
                             "type": "model_response",
                             "category": "model_response",
                             "timestamp": _get_current_timestamp(),
@@ -334,6 +258,7 @@ class SessionRunner:
                                 "session_id": self.session_id
                             }
                         }
+                        truncate_event_text(model_event, max_text_chars)
                         processed_events.append(model_event)
                         
                         # Add this event to the event storage
@@ -386,117 +311,13 @@ class SessionRunner:
         """
         Process response text to handle special content types using web standards approach.
         
-        This identifies special content like JSON and wraps it with appropriate 
-        data attributes for proper rendering in the frontend.
-        
         Args:
             text: The text to process
             
         Returns:
             Processed text with content type annotations
         """
-        import re
-        import json
-        from html import escape
-        
-        try:
-            # First check if this is already HTML content with data attributes
-            # If so, return it as is to avoid double-processing
-            if '<pre data-content-type=' in text:
-                return text
-            
-            # Check for special JSON responses that need to be preserved as-is
-            special_patterns = [
-                r'{"call_search_agent_response":', 
-                r'{"call_web_search_response":', 
-                r'{"function_call_response":'
-            ]
-            
-            # First, check if the entire text is a special JSON response
-            is_special_json = False
-            for pattern in special_patterns:
-                if re.search(pattern, text):
-                    is_special_json = True
-                    break
-                    
-            if is_special_json:
-                try:
-                    # For special JSON that appears to be the full response, wrap the entire thing
-                    if text.strip().startswith('{') and text.strip().endswith('}'):
-                        # Validate it's actually valid JSON first
-                        json.loads(text)
-                        
-                        # Escape HTML entities
-                        safe_json = escape(text)
-                        
-                        # Wrap in our content-type element
-                        return f'<pre data-content-type="json-raw" class="content-json-raw">{safe_json}</pre>'
-                    else:
-                        # Look for JSON object in the text
-                        json_obj_match = re.search(r'({.*})', text, re.DOTALL)
-                        if json_obj_match:
-                            full_text = text
-                            json_str = json_obj_match.group(1)
-                            
-                            # Validate JSON
-                            json.loads(json_str)
-                            
-                            # Replace the JSON part with wrapped version
-                            safe_json = escape(json_str)
-                            wrapped_json = f'<pre data-content-type="json-raw" class="content-json-raw">{safe_json}</pre>'
-                            
-                            # If the JSON is embedded in other text, preserve it
-                            result = full_text.replace(json_str, wrapped_json)
-                            return result
-                except (json.JSONDecodeError, Exception) as e:
-                    logger.warning(f"Error processing special JSON: {str(e)}")
-                    # If parsing fails, just return the original text
-                    return text
-            
-            # Process regular JSON code blocks in markdown
-            code_block_pattern = r'```(?:json)?\s*([\s\S]*?)```'
-            modified_text = text
-            
-            # Find all JSON code blocks
-            matches = list(re.finditer(code_block_pattern, text))
-            
-            # Process in reverse order to avoid index issues when replacing
-            for match in reversed(matches):
-                block_content = match.group(1)
-                # Check if this looks like JSON
-                if (block_content.strip().startswith('{') and block_content.strip().endswith('}')) or \
-                   (block_content.strip().startswith('[') and block_content.strip().endswith(']')):
-                    try:
-                        # Try to parse as JSON
-                        json_obj = json.loads(block_content)
-                        
-                        # Check if it's a special JSON content
-                        block_text = json.dumps(json_obj)
-                        is_special = any(pattern.replace(r'{', '').replace(':', '') in block_text for pattern in special_patterns)
-                        
-                        if is_special:
-                            # For special API responses, preserve exact formatting
-                            safe_content = escape(block_content)
-                            wrapped_content = f'<pre data-content-type="json-raw" class="content-json-raw">{safe_content}</pre>'
-                        else:
-                            # For regular JSON, format it nicely
-                            formatted = json.dumps(json_obj, indent=2)
-                            safe_content = escape(formatted)
-                            wrapped_content = f'<pre data-content-type="json-formatted" class="content-json-formatted">{safe_content}</pre>'
-                        
-                        # Replace the code block with our data-attribute version
-                        start, end = match.span()
-                        modified_text = modified_text[:start] + wrapped_content + modified_text[end:]
-                    except json.JSONDecodeError:
-                        # Not valid JSON, leave as is
-                        pass
-            
-            return modified_text
-                
-        except Exception as e:
-            logger.warning(f"Error processing response text: {str(e)}")
-            # Return original text if any processing error occurs
-            return text
+        return _process_response_text(text)
         
     def _get_current_timestamp(self):
         """Get the current timestamp in ISO format."""
@@ -821,126 +642,6 @@ class SessionRunner:
         # Fallback to string representation
         return str(event)
     
-    def _try_load_mcp_tools(self):
-        """Try to load and add MCP tools to the root agent."""
-        try:
-            # Import necessary modules
-            from radbot.config.config_loader import config_loader
-            from radbot.tools.mcp.mcp_client_factory import MCPClientFactory
-            from google.adk.tools import FunctionTool
-            
-            # Get enabled MCP servers
-            servers = config_loader.get_enabled_mcp_servers()
-            if not servers:
-                logger.info("No enabled MCP servers found in configuration")
-                return
-                
-            logger.info(f"Loading tools from {len(servers)} MCP servers")
-            
-            # Initialize clients and collect tools
-            tools_to_add = []
-            existing_tool_names = set()
-            
-            # Get existing tool names
-            if hasattr(root_agent, "tools"):
-                for tool in root_agent.tools:
-                    if hasattr(tool, "name"):
-                        existing_tool_names.add(tool.name)
-                    elif hasattr(tool, "__name__"):
-                        existing_tool_names.add(tool.__name__)
-            
-            # Go through each server and directly initialize the client
-            for server in servers:
-                server_id = server.get("id")
-                server_name = server.get("name", server_id)
-                
-                try:
-                    # Create a client directly instead of using factory
-                    transport = server.get("transport", "sse")
-                    url = server.get("url")
-                    auth_token = server.get("auth_token")
-                    
-                    # Handle different transport types
-                    if transport == "sse":
-                        # Use our custom SSE client implementation
-                        from radbot.tools.mcp.client import MCPSSEClient
-                        client = MCPSSEClient(url=url, auth_token=auth_token)
-                        
-                        # Initialize the client (this is synchronous and safe)
-                        if client.initialize():
-                            # Get tools from the client
-                            server_tools = client.tools
-                            
-                            if server_tools:
-                                logger.info(f"Successfully loaded {len(server_tools)} tools from {server_name}")
-                                
-                                # Add unique tools
-                                for tool in server_tools:
-                                    tool_name = getattr(tool, "name", None) or getattr(tool, "__name__", str(tool))
-                                    if tool_name not in existing_tool_names:
-                                        tools_to_add.append(tool)
-                                        existing_tool_names.add(tool_name)
-                                        logger.info(f"Added tool: {tool_name} from {server_name}")
-                        else:
-                            logger.warning(f"Failed to initialize MCP client for {server_name}")
-                            
-                    elif transport == "stdio":
-                        # For Claude CLI, use the simplified prompt tool implementation
-                        try:
-                            from radbot.tools.claude_prompt import create_claude_prompt_tool
-                            
-                            # Get the Claude prompt tool
-                            claude_prompt_tool = create_claude_prompt_tool()
-                            
-                            if claude_prompt_tool:
-                                logger.info(f"Successfully loaded Claude prompt tool")
-                                
-                                # Get the tool name - use multiple approaches to be robust
-                                tool_name = None
-                                # Try to get name attribute
-                                if hasattr(claude_prompt_tool, "name"):
-                                    tool_name = claude_prompt_tool.name
-                                # Try to get __name__ attribute
-                                elif hasattr(claude_prompt_tool, "__name__"):
-                                    tool_name = claude_prompt_tool.__name__
-                                # Try to get name from _get_declaration().name
-                                elif hasattr(claude_prompt_tool, "_get_declaration"):
-                                    try:
-                                        declaration = claude_prompt_tool._get_declaration()
-                                        if hasattr(declaration, "name"):
-                                            tool_name = declaration.name
-                                    except:
-                                        pass
-                                # Fallback to string representation
-                                if not tool_name:
-                                    tool_name = str(claude_prompt_tool)
-                                
-                                # Add if not already present
-                                if tool_name not in existing_tool_names:
-                                    tools_to_add.append(claude_prompt_tool)
-                                    existing_tool_names.add(tool_name)
-                                    logger.info(f"Added tool: {tool_name} from {server_name}")
-                                
-                                # Successfully loaded prompt tool, no need to try other methods
-                                continue
-                            else:
-                                logger.warning(f"Failed to create Claude prompt tool")
-                        except Exception as e:
-                            logger.warning(f"Error loading Claude prompt tool: {e}")
-                    else:
-                        logger.warning(f"Unsupported transport '{transport}' for MCP server {server_name}")
-                        
-                except Exception as e:
-                    logger.warning(f"Error loading tools from MCP server {server_name}: {str(e)}")
-            
-            # Add all collected tools to the agent
-            if tools_to_add and hasattr(root_agent, "tools"):
-                root_agent.tools = list(root_agent.tools) + tools_to_add
-                logger.info(f"Added {len(tools_to_add)} total MCP tools to agent")
-                
-        except Exception as e:
-            logger.warning(f"Error loading MCP tools: {str(e)}")
-
     def _safely_serialize(self, obj):
         """Safely serialize objects to JSON-compatible structures."""
         import json
@@ -981,6 +682,9 @@ class SessionRunner:
                 session_id=self.session_id
             )
             
+            # The old conversation can no longer be replayed
+            get_replay_buffers().drop(self.session_id)
+            
             logger.info(f"Reset session for user {self.user_id}")
             return True
         except Exception as e:
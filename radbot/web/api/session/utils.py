@@ -5,12 +5,18 @@ This module provides utility functions for the session management.
 """
 
 import logging
-import re
 import json
 from html import escape
 from datetime import datetime
 from typing import Optional, Any
 
+# orjson is optional; it makes parsing large JSON blocks several times faster
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -53,6 +59,125 @@ def _extract_response_from_event(event):
 
     return None
     
+# Marker of a markdown code fence
+_FENCE = "```"
+
+# Keys of agent/tool responses that are shown as raw JSON rather than reformatted
+_SPECIAL_KEYS = (
+    '"call_search_agent_response"',
+    '"call_web_search_response"',
+    '"function_call_response"',
+)
+_SPECIAL_MARKERS = tuple("{" + key + ":" for key in _SPECIAL_KEYS)
+
+def _json_loads(text):
+    """Parse JSON, with orjson when it is installed.
+
+    Raises:
+        ValueError: If the text is not valid JSON
+    """
+    if ORJSON_AVAILABLE:
+        # Stricter than json: NaN and integers over 64 bits are rejected too
+        return orjson.loads(text)
+    return json.loads(text)
+
+def _json_dumps_indented(obj):
+    """Serialize JSON with a two-space indent, with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+def _wrap_json(json_text, content_type):
+    """Wrap JSON text in a <pre> element tagged with its content type."""
+    return f'<pre data-content-type="{content_type}" class="content-{content_type}">{escape(json_text)}</pre>'
+
+def _looks_like_json(text):
+    """Check whether text, ignoring surrounding whitespace, is delimited like a JSON object or array."""
+    stripped = text.strip()
+    return len(stripped) >= 2 and (stripped[0], stripped[-1]) in (("{", "}"), ("[", "]"))
+
+def _annotate_special_json(text):
+    """Wrap a special agent/tool JSON response found in text.
+
+    Returns:
+        The annotated text, or None if text holds no JSON object at all
+
+    Raises:
+        ValueError: If the JSON is not valid
+    """
+    stripped = text.strip()
+    if stripped.startswith('{') and stripped.endswith('}'):
+        # The whole response is the JSON
+        _json_loads(text)
+        return _wrap_json(text, "json-raw")
+
+    # JSON embedded in other text: from the first { to the last }
+    first = text.find('{')
+    last = text.rfind('}')
+    if first < 0 or last < first:
+        return None
+    json_text = text[first:last + 1]
+    _json_loads(json_text)
+    return "".join((text[:first], _wrap_json(json_text, "json-raw"), text[last + 1:]))
+
+def _annotate_json_block(block):
+    """Get the annotated replacement of a fenced code block, or None if it is not JSON."""
+    if not _looks_like_json(block):
+        return None
+    try:
+        obj = _json_loads(block)
+    except ValueError:
+        return None
+
+    if any(key in block for key in _SPECIAL_KEYS):
+        # For special API responses, preserve exact formatting
+        return _wrap_json(block, "json-raw")
+    # For regular JSON, format it nicely
+    return _wrap_json(_json_dumps_indented(obj), "json-formatted")
+
+def _annotate_json_code_blocks(text):
+    """Replace fenced code blocks holding JSON with annotated <pre> elements.
+
+    The text is scanned once: each fence is found with str.find, each block is
+    parsed at most once, and the output is assembled with a single join.
+    """
+    chunks = []
+    copied = 0  # End of the text already copied to chunks
+    length = len(text)
+    search_from = 0
+
+    while True:
+        start = text.find(_FENCE, search_from)
+        if start < 0:
+            break
+
+        # Skip an optional "json" language tag and the whitespace before the content
+        content_start = start + len(_FENCE)
+        if text.startswith("json", content_start):
+            content_start += len("json")
+        while content_start < length and text[content_start].isspace():
+            content_start += 1
+
+        close = text.find(_FENCE, content_start)
+        if close < 0:
+            break
+        end = close + len(_FENCE)
+
+        replacement = _annotate_json_block(text[content_start:close])
+        if replacement is not None:
+            chunks.append(text[copied:start])
+            chunks.append(replacement)
+            copied = end
+        search_from = end
+
+    if not chunks:
+        return text
+    chunks.append(text[copied:])
+    return "".join(chunks)
+
 def _process_response_text(text):
     """
     Process response text to handle special content types using web standards approach.
@@ -71,95 +196,21 @@ def _process_response_text(text):
         # If so, return it as is to avoid double-processing
         if '<pre data-content-type=' in text:
             return text
-        
-        # Check for special JSON responses that need to be preserved as-is
-        special_patterns = [
-            r'{"call_search_agent_response":', 
-            r'{"call_web_search_response":', 
-            r'{"function_call_response":'
-        ]
-        
-        # First, check if the entire text is a special JSON response
-        is_special_json = False
-        for pattern in special_patterns:
-            if re.search(pattern, text):
-                is_special_json = True
-                break
-                
-        if is_special_json:
+
+        # Special JSON responses are preserved as-is
+        if any(marker in text for marker in _SPECIAL_MARKERS):
             try:
-                # For special JSON that appears to be the full response, wrap the entire thing
-                if text.strip().startswith('{') and text.strip().endswith('}'):
-                    # Validate it's actually valid JSON first
-                    json.loads(text)
-                    
-                    # Escape HTML entities
-                    safe_json = escape(text)
-                    
-                    # Wrap in our content-type element
-                    return f'<pre data-content-type="json-raw" class="content-json-raw">{safe_json}</pre>'
-                else:
-                    # Look for JSON object in the text
-                    json_obj_match = re.search(r'({.*})', text, re.DOTALL)
-                    if json_obj_match:
-                        full_text = text
-                        json_str = json_obj_match.group(1)
-                        
-                        # Validate JSON
-                        json.loads(json_str)
-                        
-                        # Replace the JSON part with wrapped version
-                        safe_json = escape(json_str)
-                        wrapped_json = f'<pre data-content-type="json-raw" class="content-json-raw">{safe_json}</pre>'
-                        
-                        # If the JSON is embedded in other text, preserve it
-                        result = full_text.replace(json_str, wrapped_json)
-                        return result
-            except (json.JSONDecodeError, Exception) as e:
+                annotated = _annotate_special_json(text)
+                if annotated is not None:
+                    return annotated
+            except ValueError as e:
                 logger.warning(f"Error processing special JSON: {str(e)}")
                 # If parsing fails, just return the original text
                 return text
-        
+
         # Process regular JSON code blocks in markdown
-        code_block_pattern = r'```(?:json)?\s*([\s\S]*?)```'
-        modified_text = text
-        
-        # Find all JSON code blocks
-        matches = list(re.finditer(code_block_pattern, text))
-        
-        # Process in reverse order to avoid index issues when replacing
-        for match in reversed(matches):
-            block_content = match.group(1)
-            # Check if this looks like JSON
-            if (block_content.strip().startswith('{') and block_content.strip().endswith('}')) or \
-               (block_content.strip().startswith('[') and block_content.strip().endswith(']')):
-                try:
-                    # Try to parse as JSON
-                    json_obj = json.loads(block_content)
-                    
-                    # Check if it's a special JSON content
-                    block_text = json.dumps(json_obj)
-                    is_special = any(pattern.replace(r'{', '').replace(':', '') in block_text for pattern in special_patterns)
-                    
-                    if is_special:
-                        # For special API responses, preserve exact formatting
-                        safe_content = escape(block_content)
-                        wrapped_content = f'<pre data-content-type="json-raw" class="content-json-raw">{safe_content}</pre>'
-                    else:
-                        # For regular JSON, format it nicely
-                        formatted = json.dumps(json_obj, indent=2)
-                        safe_content = escape(formatted)
-                        wrapped_content = f'<pre data-content-type="json-formatted" class="content-json-formatted">{safe_content}</pre>'
-                    
-                    # Replace the code block with our data-attribute version
-                    start, end = match.span()
-                    modified_text = modified_text[:start] + wrapped_content + modified_text[end:]
-                except json.JSONDecodeError:
-                    # Not valid JSON, leave as is
-                    pass
-        
-        return modified_text
-            
+        return _annotate_json_code_blocks(text)
+
     except Exception as e:
         logger.warning(f"Error processing response text: {str(e)}")
         # Return original text if any processing error occurs
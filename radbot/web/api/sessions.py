@@ -14,6 +14,7 @@ from radbot.web.api.session import (
     get_session_manager,
     get_or_create_runner_for_session,
 )
+from radbot.db import run_db
 from radbot.web.db import chat_operations
 from radbot.web.db.connection import get_chat_db_connection, get_chat_db_cursor, CHAT_SCHEMA
 
@@ -43,6 +44,16 @@ class SessionsListResponse(BaseModel):
     """Response model for listing sessions."""
     sessions: List[SessionMetadata]
     active_session_id: Optional[str] = None
+    next_cursor: Optional[str] = None
+
+def _delete_session_messages(session_id: str) -> None:
+    """Delete all chat messages of a session."""
+    with get_chat_db_connection() as conn:
+        with get_chat_db_cursor(conn, commit=True) as cursor:
+            cursor.execute(f"""
+                DELETE FROM {CHAT_SCHEMA}.chat_messages
+                WHERE session_id = %s;
+            """, (uuid.UUID(session_id),))
 
 # Register the router with FastAPI
 def register_sessions_router(app):
@@ -57,9 +68,10 @@ def register_sessions_router(app):
         user_id: Optional[str] = None,
         limit: int = Query(20, ge=1, le=100),
         offset: int = Query(0, ge=0),
+        before: Optional[str] = Query(None, description="Cursor from next_cursor of the previous page"),
         session_manager: SessionManager = Depends(get_session_manager)
     ):
-        """List all sessions for the current user."""
+        """List all sessions for the current user, most recently active first."""
         logger.info("Listing sessions for user %s", user_id or "anonymous")
 
         # Create the response with placeholder data - in a real system
@@ -69,10 +81,12 @@ def register_sessions_router(app):
 
         try:
             # Get sessions from database
-            db_sessions = chat_operations.list_sessions(
+            db_sessions = await run_db(
+                chat_operations.list_sessions,
                 user_id=user_id,
                 limit=limit,
-                offset=offset
+                offset=offset,
+                before=before
             )
 
             # Transform to API model
@@ -94,7 +108,8 @@ def register_sessions_router(app):
 
             return SessionsListResponse(
                 sessions=sessions,
-                active_session_id=active_session_id
+                active_session_id=active_session_id,
+                next_cursor=chat_operations.session_cursor(db_sessions[-1]) if len(db_sessions) == limit else None
             )
         except Exception as e:
             logger.error("Error listing sessions: %s", str(e), exc_info=True)
@@ -120,7 +135,8 @@ def register_sessions_router(app):
             session_name = request.name or f"Session {session_id[:8]}"
 
             # Create in database
-            success = chat_operations.create_or_update_session(
+            success = await run_db(
+                chat_operations.create_or_update_session,
                 session_id=session_id,
                 name=session_name,
                 user_id=user_id
@@ -165,7 +181,8 @@ def register_sessions_router(app):
                 raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
 
             # Update in database
-            success = chat_operations.create_or_update_session(
+            success = await run_db(
+                chat_operations.create_or_update_session,
                 session_id=session_id,
                 name=request.name
             )
@@ -174,7 +191,7 @@ def register_sessions_router(app):
                 raise HTTPException(status_code=500, detail="Failed to rename session in database")
 
             # Get session details
-            sessions = chat_operations.list_sessions(limit=1)
+            sessions = await run_db(chat_operations.list_sessions, limit=1)
             db_session = next((s for s in sessions if s["session_id"] == session_id), None)
 
             if not db_session:
@@ -211,7 +228,7 @@ def register_sessions_router(app):
             await session_manager.remove_session(session_id)
 
             # Mark as inactive in database
-            success = chat_operations.delete_session(session_id)
+            success = await run_db(chat_operations.delete_session, session_id)
 
             if not success:
                 logger.warning(f"Failed to mark session {session_id} as inactive in database")
@@ -238,12 +255,13 @@ def register_sessions_router(app):
                 raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
 
             # Get session from database
-            sessions = chat_operations.list_sessions(limit=1)
+            sessions = await run_db(chat_operations.list_sessions, limit=1)
             db_session = next((s for s in sessions if s["session_id"] == session_id), None)
 
             if not db_session:
                 # Create session in database if it exists in manager but not in DB
-                chat_operations.create_or_update_session(
+                await run_db(
+                    chat_operations.create_or_update_session,
                     session_id=session_id,
                     name=f"Session {session_id[:8]}"
                 )
@@ -296,15 +314,11 @@ def register_sessions_router(app):
             try:
                 # Delete all messages for this session
                 # In a real implementation, you might want to move them to an archive table
-                with get_chat_db_connection() as conn:
-                    with get_chat_db_cursor(conn, commit=True) as cursor:
-                        cursor.execute(f"""
-                            DELETE FROM {CHAT_SCHEMA}.chat_messages
-                            WHERE session_id = %s;
-                        """, (uuid.UUID(session_id),))
+                await run_db(_delete_session_messages, session_id)
 
                 # Update session preview
-                chat_operations.create_or_update_session(
+                await run_db(
+                    chat_operations.create_or_update_session,
                     session_id=session_id,
                     preview="Session reset"
                 )
@@ -0,0 +1,68 @@
+"""
+Shell command API endpoints for RadBot web interface.
+
+This module provides API endpoints for listing the shell commands the agent is
+running and for cancelling them from the UI. The output of running commands is
+pushed to the session's WebSocket as ``shell_output`` messages.
+"""
+import logging
+from typing import Dict, List, Any
+from fastapi import APIRouter, HTTPException, Path, Query
+
+from radbot.tools.shell import cancel_command, list_running_commands
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create router
+router = APIRouter(
+    prefix="/api/shell",
+    tags=["shell"],
+)
+
+@router.get("/commands")
+async def get_commands(session_id: str = Query(...)) -> List[Dict[str, Any]]:
+    """List the shell commands waiting or running for a chat session.
+
+    Args:
+        session_id: Chat session whose commands to list
+
+    Returns:
+        List of commands with their ID, command line, state and start time
+    """
+    return list_running_commands(session_id)
+
+@router.post("/commands/{command_id}/cancel")
+async def cancel_shell_command(
+    command_id: str = Path(...),
+    session_id: str = Query(...),
+) -> Dict[str, Any]:
+    """Cancel a waiting or running shell command of a chat session.
+
+    The agent receives the output produced so far, marked as cancelled.
+
+    Args:
+        command_id: Command identifier, from its shell_output messages
+        session_id: Chat session the command runs for
+
+    Returns:
+        Confirmation of the cancellation
+
+    Raises:
+        HTTPException: 404 if the session has no such command running
+    """
+    # Commands of other sessions are reported as not running, so their IDs don't leak
+    if not cancel_command(command_id, session_id):
+        raise HTTPException(status_code=404, detail=f"Command {command_id} is not running")
+    logger.info(f"Cancelled shell command {command_id} of session {session_id} from the UI")
+    return {"command_id": command_id, "status": "cancelling"}
+
+def register_shell_router(app):
+    """Register shell router with the FastAPI app.
+
+    Args:
+        app: FastAPI application
+    """
+    app.include_router(router)
+    logger.info("Registered shell router")
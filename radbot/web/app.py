@@ -4,6 +4,7 @@ Main FastAPI application for RadBot web interface.
 This module defines the FastAPI application for the RadBot web interface.
 """
 import asyncio
+import json
 import logging
 import os
 import uuid
@@ -19,18 +20,25 @@ from starlette.middleware.cors import CORSMiddleware
 import uvicorn
 
 from radbot.config import config_manager
+from radbot.config.config_loader import config_loader
+from radbot.db import check_pools_health, get_pool_metrics, run_db
 from radbot.web.api.session import (
     SessionManager,
     get_session_manager,
     get_or_create_runner_for_session,
+    get_runner_for_connection,
+    get_replay_buffers,
     memory_router,
 )
+from radbot.web.api.session.replay_buffer import database_history, parse_seq
 
 # Import API routers for registration
 from radbot.web.api.events import register_events_router
+from radbot.web.api.event_wire import WIRE_COMPACT, WIRE_FULL, encode_events, get_wire_settings, truncate_event_text
 from radbot.web.api.agent_info import register_agent_info_router
 from radbot.web.api.sessions import register_sessions_router
 from radbot.web.api.messages import register_messages_router
+from radbot.web.api.shell import register_shell_router
 
 # Set up logging
 logging.basicConfig(
@@ -57,6 +65,7 @@ def create_app():
     register_agent_info_router(app)
     register_sessions_router(app)
     register_messages_router(app)
+    register_shell_router(app)
     app.include_router(memory_router)
     logger.info("API routers registered during app initialization")
     
@@ -79,6 +88,16 @@ async def initialize_app_startup():
                 logger.info("Chat history database schema initialized successfully")
             else:
                 logger.warning("Failed to initialize chat history database schema")
+            
+            # Start the write-behind queue now, so messages left by a crash are written
+            chat_operations.get_write_behind_queue()
+
+            # Events pushed out of the in-memory event store are spilled to the database
+            from radbot.web.api.event_store import get_event_store
+            if get_event_store().spill:
+                from radbot.web.db import event_operations
+                if not event_operations.create_events_table_if_not_exists():
+                    logger.warning("Failed to initialize session events table")
         except Exception as db_error:
             logger.error(f"Error initializing chat history database: {str(db_error)}", exc_info=True)
             # Continue app startup even if database initialization fails
@@ -97,8 +116,11 @@ async def initialize_app_startup():
             server_name = server.get("name", server_id)
             logger.info(f"MCP server enabled: {server_name} (ID: {server_id})")
             
-        # Don't attempt to create tools here - we'll do that in the session
-        # when a new client connects, which is safer and more reliable
+        # Build the shared agent runtime (agent tree, MCP tools, ADK Runner) once,
+        # so the first session does not pay for it
+        from radbot.web.api.session import get_agent_runtime
+        await asyncio.get_running_loop().run_in_executor(None, get_agent_runtime)
+        logger.info("Shared agent runtime ready")
         
     except Exception as e:
         logger.error(f"Failed during application startup: {str(e)}", exc_info=True)
@@ -136,6 +158,51 @@ def mount_static_files():
     except Exception as e:
         logger.error(f"Error mounting static files: {str(e)}", exc_info=True)
 
+@app.on_event("shutdown")
+async def flush_chat_messages_on_shutdown():
+    """Write the chat messages still queued for the database."""
+    try:
+        from radbot.web.db import chat_operations
+        queue = chat_operations.get_write_behind_queue()
+        if queue is not None:
+            await run_db(queue.close)
+    except Exception as e:
+        logger.error(f"Error flushing queued chat messages: {str(e)}", exc_info=True)
+
+@app.on_event("shutdown")
+async def close_payload_store_on_shutdown():
+    """Remove the spilled event payloads of this process."""
+    from radbot.web.api.payload_store import get_payload_store
+    get_payload_store().close()
+
+@app.on_event("shutdown")
+async def close_mcp_pools_on_shutdown():
+    """Stop the MCP server processes and connections of this process."""
+    from radbot.tools.mcp.mcp_client_factory import MCPClientFactory
+    await asyncio.get_running_loop().run_in_executor(None, MCPClientFactory.clear_cache)
+
+@app.on_event("shutdown")
+async def stop_shell_commands_on_shutdown():
+    """Kill the shell commands still running, with the processes they started."""
+    from radbot.tools.shell.shell_session import close_shell_sessions
+    from radbot.tools.shell.streaming import close_shell_executor
+    await asyncio.get_running_loop().run_in_executor(None, close_shell_sessions)
+    await asyncio.get_running_loop().run_in_executor(None, close_shell_executor)
+
+@app.on_event("startup")
+async def stream_shell_output_on_startup():
+    """Forward the output of running shell commands to their session's WebSocket."""
+    from radbot.tools.shell import add_output_listener
+    loop = asyncio.get_running_loop()
+
+    def forward_shell_output(event: Dict[str, Any]):
+        # Called on the shell loop thread; the WebSocket belongs to this loop
+        session_id = event.get("session_id")
+        if session_id in manager.active_connections:
+            asyncio.run_coroutine_threadsafe(manager.send_shell_output(session_id, event), loop)
+
+    add_output_listener(forward_shell_output)
+
 # Schedule static files mounting after all other routes are registered
 @app.on_event("startup")
 async def mount_static_files_on_startup():
@@ -149,14 +216,21 @@ templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), "t
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
+        # Event wire format negotiated by each connection
+        self.wire_formats: Dict[str, str] = {}
+        self.inline_payload_chars = get_wire_settings()["inline_payload_chars"]
 
     async def connect(self, websocket: WebSocket, session_id: str):
         await websocket.accept()
         self.active_connections[session_id] = websocket
+        # Clients opt into the compact event format with ?wire=compact
+        wire_format = websocket.query_params.get("wire", WIRE_FULL)
+        self.wire_formats[session_id] = WIRE_COMPACT if wire_format == WIRE_COMPACT else WIRE_FULL
 
     def disconnect(self, session_id: str):
         if session_id in self.active_connections:
             del self.active_connections[session_id]
+        self.wire_formats.pop(session_id, None)
 
     async def send_message(self, session_id: str, message: str):
         if session_id in self.active_connections:
@@ -172,54 +246,57 @@ class ConnectionManager:
                 "content": status
             })
             
+    async def send_shell_output(self, session_id: str, event: Dict[str, Any]):
+        websocket = self.active_connections.get(session_id)
+        if websocket is not None:
+            try:
+                await websocket.send_json({"type": "shell_output", "content": event})
+            except Exception as e:
+                logger.debug(f"Could not send shell output to session {session_id}: {e}")
+
     async def send_events(self, session_id: str, events: list):
         if session_id in self.active_connections:
-            # Check for excessively large messages
-            import json
-            events_json = json.dumps({"type": "events", "content": events})
-            max_size = 1024 * 1024  # 1MB limit
-            
-            if len(events_json) > max_size:
-                # Log the oversized message
-                logger.warning(f"Event payload too large: {len(events_json)} bytes. Splitting into chunks.")
-                
-                # Process events individually to find large ones
-                for event in events:
-                    single_event_json = json.dumps({"type": "events", "content": [event]})
-                    event_size = len(single_event_json)
-                    event_type = event.get('type', 'unknown')
-                    event_summary = event.get('summary', 'no summary')
-                    
-                    if event_size > max_size:
-                        # This event is too large - truncate any text content
-                        logger.warning(f"Oversized event: {event_type} - {event_summary}: {event_size} bytes")
-                        if 'text' in event and isinstance(event['text'], str) and len(event['text']) > 100000:
-                            # Truncate text and add indicator
-                            original_length = len(event['text'])
-                            event['text'] = event['text'][:100000] + f"\n\n[Message truncated due to size constraints. Original length: {original_length} characters]"
-                            logger.info(f"Truncated event text from {original_length} to {len(event['text'])} characters")
-                            
-                            # Send this single truncated event
-                            await self.active_connections[session_id].send_json({
-                                "type": "events",
-                                "content": [event]
-                            })
-                    else:
-                        # Send normal-sized events individually
-                        await self.active_connections[session_id].send_json({
-                            "type": "events",
-                            "content": [event]
-                        })
-            else:
-                # Send as normal if not oversized
-                await self.active_connections[session_id].send_json({
-                    "type": "events",
-                    "content": events
-                })
+            # Event text was already truncated when the events were created
+            wire_format = self.wire_formats.get(session_id, WIRE_FULL)
+            content = encode_events(events, wire_format, self.inline_payload_chars)
+            await self.active_connections[session_id].send_text(
+                json.dumps({"type": "events", "format": wire_format, "content": content},
+                           separators=(",", ":"), default=str)
+            )
 
 # Create connection manager
 manager = ConnectionManager()
 
+def _agent_response_result(session_id: str, response_text: str, agent_name: str) -> Dict[str, Any]:
+    """Build the result of a message answered directly by a targeted agent.
+
+    The model response event is built like the ones of a runner turn: it gets
+    an ``event_id``, its text is truncated once, and it is stored so the UI
+    can fetch it again.
+
+    Args:
+        session_id: Session the message belongs to
+        response_text: Text of the agent's response
+        agent_name: Name of the agent that answered
+
+    Returns:
+        A result with the response and its event, like ``process_message``
+    """
+    from radbot.web.api.events import add_event
+
+    event = {
+        "event_id": uuid.uuid4().hex,
+        "type": "model_response",
+        "category": "model_response",
+        "text": response_text,
+        "is_final": True,
+        "agent_name": agent_name,
+        "timestamp": datetime.now().isoformat()
+    }
+    truncate_event_text(event)
+    add_event(session_id, event)
+    return {"response": response_text, "events": [event]}
+
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     """Render the main chat interface."""
@@ -233,6 +310,31 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "ok"}
 
+@app.get("/health/db")
+async def database_health_check():
+    """Check the shared database pools and report their metrics.
+
+    Returns:
+        JSON with the health of each pool, plus its checkout/wait/error counters
+    """
+    health = await run_db(check_pools_health)
+    healthy = all(result["healthy"] for result in health.values())
+    content = {"status": "ok" if healthy else "error", "pools": health, "metrics": get_pool_metrics()}
+    return JSONResponse(content=content, status_code=200 if healthy else 503)
+
+@app.get("/health/mcp")
+async def mcp_health_check():
+    """Report the health and metrics of the MCP client pools.
+
+    Returns:
+        JSON with, per MCP server, the healthy client count and call/restart/ping counters
+    """
+    from radbot.tools.mcp.mcp_client_factory import MCPClientFactory
+    pools = MCPClientFactory.get_pool_metrics()
+    healthy = all(pool["healthy"] > 0 for pool in pools.values())
+    return JSONResponse(content={"status": "ok" if healthy else "error", "pools": pools},
+                        status_code=200 if healthy else 503)
+
 @app.post("/api/chat")
 async def chat(
     message: str = Form(...),
@@ -267,26 +369,12 @@ async def chat(
         response = result.get("response", "")
         events = result.get("events", [])
         
-        # Process events for size constraints to match WebSocket behavior
-        max_size = 1024 * 1024  # 1MB limit
-        processed_events = []
-        
-        for event in events:
-            if 'text' in event and isinstance(event['text'], str) and len(event['text']) > 100000:
-                # Truncate large text events
-                event_copy = event.copy()  # Create a copy to avoid modifying the original
-                original_length = len(event_copy['text'])
-                event_copy['text'] = event_copy['text'][:100000] + f"\n\n[Message truncated due to size constraints. Original length: {original_length} characters]"
-                logger.info(f"Truncated REST API event text from {original_length} to {len(event_copy['text'])} characters")
-                processed_events.append(event_copy)
-            else:
-                processed_events.append(event)
-        
-        # Return the response with session information and processed events
+        # Return the response with session information and events, whose
+        # text was already truncated when they were created
         return {
             "session_id": session_id,
             "response": response,
-            "events": processed_events
+            "events": events
         }
     except Exception as e:
         logger.error(f"Error processing message: {str(e)}", exc_info=True)
@@ -303,49 +391,23 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, session_mana
     await manager.connect(websocket, session_id)
 
     try:
-        # Get or create a runner for this session
-        runner = await get_or_create_runner_for_session(session_id, session_manager)
-
-        # Reset the session to ensure new connection starts with Beto
-        if hasattr(runner, 'reset_session'):
-            logger.info(f"Resetting session {session_id} to ensure starting with Beto agent")
-            runner.reset_session()
+        # Get or create a runner for this session; only a new session is reset,
+        # so a reconnecting client can resume from its replay buffer
+        runner = await get_runner_for_connection(session_id, session_manager)
 
         # Send ready status
         await manager.send_status(session_id, "ready")
         
-        # Helper function to get events from a session
-        def get_events_from_session(session):
-            if not hasattr(session, 'events') or not session.events:
-                return []
-            
-            messages = []
-            for event in session.events:
-                if hasattr(event, 'content') and event.content:
-                    # Try to extract text content for different ADK versions
-                    text_content = ""
-                    if hasattr(event.content, 'parts') and event.content.parts:
-                        for part in event.content.parts:
-                            if hasattr(part, 'text') and part.text:
-                                text_content += part.text
-                    elif hasattr(event.content, 'text') and event.content.text:
-                        text_content = event.content.text
-                    
-                    # Determine the role/author
-                    role = getattr(event, 'author', 'assistant')
-                    
-                    # Create a message object if we have content
-                    if text_content:
-                        message = {
-                            "id": getattr(event, 'id', str(uuid.uuid4())),
-                            "role": role,
-                            "content": text_content,
-                            "timestamp": int(getattr(event, 'timestamp', time.time()) * 1000),  # Convert to JS timestamp
-                            "agent": getattr(event, 'agent_name', None) or getattr(event, 'agent', None)
-                        }
-                        messages.append(message)
-            
-            return messages
+        # Replay buffer used to resume this session after a reconnect
+        def get_replay_buffer():
+            def load_events():
+                session = runner.session_service.get_session(
+                    app_name=runner.runtime.app_name,
+                    user_id=runner.user_id,
+                    session_id=session_id
+                )
+                return getattr(session, 'events', None) or []
+            return get_replay_buffers().get_or_build(session_id, load_events)
         
         # Process heartbeat messages
         async def handle_heartbeat():
@@ -355,82 +417,75 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, session_mana
             logger.debug(f"Sent heartbeat response for session {session_id}")
         
         # Process sync_request messages
-        async def handle_sync_request(last_message_id, timestamp=None):
-            logger.info(f"Handling sync request for session {session_id} since message {last_message_id}")
-            
-            # Get app name for this session
-            app_name = runner.runner.app_name if hasattr(runner, 'runner') and hasattr(runner.runner, 'app_name') else "beto"
-            
-            # Retrieve the session from ADK
-            session = runner.session_service.get_session(
-                app_name=app_name,
-                user_id=runner.user_id,
-                session_id=session_id
-            )
-            
-            if not session:
-                logger.warning(f"No session found for sync request with ID {session_id}")
-                await websocket.send_json({
-                    "type": "sync_response",
-                    "messages": []
-                })
-                return
+        async def handle_sync_request(last_message_id=None, last_seq=None, epoch=None):
+            logger.info(f"Handling sync request for session {session_id} since seq {last_seq} / message {last_message_id}")
             
-            # Get all messages from the session
-            all_messages = get_events_from_session(session)
+            buffer = get_replay_buffer()
             
-            # Find the index of the last known message
-            last_index = -1
-            for i, msg in enumerate(all_messages):
-                if msg.get("id") == last_message_id:
-                    last_index = i
-                    break
+            # Sequence numbers are only meaningful within the epoch that issued them;
+            # otherwise fall back to the message ID index
+            messages = None
+            if last_seq is not None and epoch == buffer.epoch:
+                messages = buffer.after_seq(last_seq)
+            if messages is None and last_message_id:
+                messages = buffer.after_id(last_message_id)
             
-            # Extract messages after the last known one
-            messages = []
-            if last_index >= 0 and last_index < len(all_messages) - 1:
-                messages = all_messages[last_index + 1:]
+            resumed = messages is not None
+            if not resumed:
+                # The client's position is unknown or older than the buffer; hand it a
+                # fresh cursor so the next reconnect can resume
+                logger.info(f"Sync cursor not found for session {session_id}")
+                messages = []
             
             # Send the sync response
             await websocket.send_json({
                 "type": "sync_response",
-                "messages": messages
+                "messages": messages,
+                "resumed": resumed,
+                "cursor": buffer.cursor()
             })
             
             logger.info(f"Sent sync response with {len(messages)} messages for session {session_id}")
         
         # Process history_request messages
-        async def handle_history_request(limit=50):
-            logger.info(f"Handling history request for session {session_id}, limit={limit}")
-            
-            # Get app name for this session
-            app_name = runner.runner.app_name if hasattr(runner, 'runner') and hasattr(runner.runner, 'app_name') else "beto"
-            
-            # Retrieve the session from ADK
-            session = runner.session_service.get_session(
-                app_name=app_name,
-                user_id=runner.user_id,
-                session_id=session_id
-            )
+        async def handle_history_request(limit=50, before_seq=None, before_cursor=None):
+            logger.info(f"Handling history request for session {session_id}, limit={limit}, before_seq={before_seq}")
             
-            if not session:
-                logger.warning(f"No session found for history request with ID {session_id}")
-                await websocket.send_json({
-                    "type": "history",
-                    "messages": []
-                })
-                return
-            
-            # Get all messages from the session
-            all_messages = get_events_from_session(session)
+            buffer = get_replay_buffer()
+            if before_cursor is not None:
+                # Already paging through the database
+                messages = []
+            elif before_seq is not None:
+                # Scrolling back: the page just before the oldest message the client has
+                messages = buffer.before_seq(before_seq, limit)
+            else:
+                messages = buffer.recent(limit)
+            has_more = bool(messages) and messages[0]["seq"] > buffer.first_seq
             
-            # Limit the number of messages if needed
-            messages = all_messages[-limit:] if limit and len(all_messages) > limit else all_messages
+            # Older than the replay buffer holds: continue from the chat history database
+            next_cursor = None
+            if before_cursor is not None or (before_seq is not None and not has_more and len(messages) < limit):
+                oldest = messages[0] if messages else (buffer.messages[0] if buffer.messages else None)
+                try:
+                    older, next_cursor = await run_db(
+                        database_history, session_id, limit - len(messages),
+                        before=before_cursor,
+                        before_timestamp=oldest["timestamp"] if oldest and before_cursor is None else None,
+                        known_ids=list(buffer.seq_by_id)
+                    )
+                    messages = older + messages
+                    has_more = next_cursor is not None
+                except Exception as e:
+                    logger.warning(f"Could not load older messages for session {session_id}: {str(e)}")
             
-            # Send the history response
+            # Send the history response; pass beforeCursor back to page further
             await websocket.send_json({
                 "type": "history",
-                "messages": messages
+                "messages": messages,
+                "hasMore": has_more,
+                "beforeSeq": before_seq,
+                "beforeCursor": next_cursor,
+                "cursor": buffer.cursor()
             })
             
             logger.info(f"Sent history response with {len(messages)} messages for session {session_id}")
@@ -446,16 +501,24 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, session_mana
             
             elif data.get("type") == "sync_request":
                 last_message_id = data.get("lastMessageId")
-                timestamp = data.get("timestamp")
-                if last_message_id:
-                    await handle_sync_request(last_message_id, timestamp)
+                last_seq = parse_seq(data.get("lastSeq"))
+                if data.get("lastSeq") is not None and last_seq is None:
+                    await manager.send_status(session_id, "error: Invalid lastSeq in sync_request")
+                elif last_message_id or last_seq is not None:
+                    await handle_sync_request(last_message_id, last_seq, data.get("epoch"))
                 else:
-                    await manager.send_status(session_id, "error: Missing lastMessageId in sync_request")
+                    await manager.send_status(session_id, "error: Missing lastSeq or lastMessageId in sync_request")
                 continue
             
             elif data.get("type") == "history_request":
-                limit = data.get("limit", 50)
-                await handle_history_request(limit)
+                limit = parse_seq(data.get("limit", 50))
+                before_seq = parse_seq(data.get("beforeSeq"))
+                if not limit:
+                    await manager.send_status(session_id, "error: Invalid limit in history_request")
+                elif data.get("beforeSeq") is not None and before_seq is None:
+                    await manager.send_status(session_id, "error: Invalid beforeSeq in history_request")
+                else:
+                    await handle_history_request(limit, before_seq, data.get("beforeCursor"))
                 continue
             
             # Handle regular chat messages
@@ -464,6 +527,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, session_mana
                 continue
 
             user_message = data["message"]
+            message_id = data.get("message_id")
 
             # Check for special command to reset session to Beto
             if user_message.lower() in ["reset to beto", "use beto", "start beto"]:
@@ -500,20 +564,14 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, session_mana
                 if target_agent:
                     # Import agent transfer tool
                     from radbot.tools.agent_transfer import process_request, find_agent_by_name
+                    from radbot.agent.agent_tools_setup import attach_sub_agents
                     from agent import root_agent  # Import from root module
 
-                    # Debug the agent tree
-                    logger.info("DEBUG: Agent tree structure:")
-                    if hasattr(root_agent, 'name'):
-                        logger.info(f"Root agent name: {root_agent.name}")
-                    else:
-                        logger.info("Root agent has no name attribute")
+                    # Sub-agents are built on first use; a targeted message may come first
+                    await asyncio.to_thread(attach_sub_agents, root_agent)
 
-                    if hasattr(root_agent, 'sub_agents'):
-                        sub_agents = [sa.name for sa in root_agent.sub_agents if hasattr(sa, 'name')]
-                        logger.info(f"Sub-agents: {sub_agents}")
-                    else:
-                        logger.info("Root agent has no sub_agents attribute")
+                    # The agent tree is logged once when the shared runtime starts,
+                    # not on every targeted message
 
                     # Make case-insensitive check for scout
                     if target_agent.lower() == 'scout':
@@ -556,17 +614,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, session_mana
                                 logger.info(f"Scout's response (first 100 chars): {response_text[:100]}...")
 
                                 # Create a result with the response
-                                result = {
-                                    "response": response_text,
-                                    "events": [{
-                                        "type": "model_response",
-                                        "category": "model_response",
-                                        "text": response_text,
-                                        "is_final": True,
-                                        "agent_name": "SCOUT",
-                                        "timestamp": datetime.now().isoformat()
-                                    }]
-                                }
+                                result = _agent_response_result(session_id, response_text, "SCOUT")
                                 break
                         else:
                             # If we get here, we didn't find Scout directly
@@ -576,20 +624,10 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, session_mana
                             if target:
                                 logger.info(f"Found target agent with find_agent_by_name: {target.name}")
                                 response_text = process_request(target, user_message)
-                                result = {
-                                    "response": response_text,
-                                    "events": [{
-                                        "type": "model_response",
-                                        "category": "model_response",
-                                        "text": response_text,
-                                        "is_final": True,
-                                        "agent_name": target.name,
-                                        "timestamp": datetime.now().isoformat()
-                                    }]
-                                }
+                                result = _agent_response_result(session_id, response_text, target.name)
                             else:
                                 logger.warning(f"Target agent {target_agent} not found, using default runner")
-                                result = runner.process_message(user_message)
+                                result = await asyncio.to_thread(runner.process_message, user_message, message_id)
                     else:
                         # Standard approach for other agents
                         target = find_agent_by_name(root_agent, target_agent)
@@ -598,23 +636,14 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, session_mana
                             # Process the request with the specific agent
                             response_text = process_request(target, user_message)
                             # Create a result with the response
-                            result = {
-                                "response": response_text,
-                                "events": [{
-                                    "type": "model_response",
-                                    "category": "model_response",
-                                    "text": response_text,
-                                    "is_final": True,
-                                    "agent_name": target.name,
-                                    "timestamp": datetime.now().isoformat()
-                                }]
-                            }
+                            result = _agent_response_result(session_id, response_text, target.name)
                         else:
                             logger.warning(f"Target agent {target_agent} not found, using default runner")
-                            result = runner.process_message(user_message)
+                            result = await asyncio.to_thread(runner.process_message, user_message, message_id)
                 else:
-                    # Use normal runner for processing
-                    result = runner.process_message(user_message)
+                    # Use normal runner for processing, off the event loop so
+                    # shell output can stream to the client while the turn runs
+                    result = await asyncio.to_thread(runner.process_message, user_message, message_id)
                 
                 # Extract response and events
                 response = result.get("response", "")
@@ -635,6 +664,13 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, session_mana
                     logger.info(f"Sending {len(events)} events to client")
                     await manager.send_events(session_id, events)
                 
+                # Tell the client where it is in the replay buffer, so a reconnect
+                # only asks for what it missed
+                await websocket.send_json({
+                    "type": "cursor",
+                    "cursor": get_replay_buffer().cursor()
+                })
+                
                 # Update status to ready (no need to send the response separately)
                 await manager.send_status(session_id, "ready")
             except Exception as e:
@@ -680,7 +716,7 @@ async def get_tasks():
         from radbot.tools.todo.api.list_tools import list_all_tasks
         
         # Call the function directly
-        tasks = list_all_tasks()
+        tasks = await run_db(list_all_tasks)
         
         # Convert tasks to a serializable format
         serializable_tasks = []
@@ -721,7 +757,7 @@ async def get_projects():
         from radbot.tools.todo.api.list_tools import list_projects
         
         # Call the function directly
-        projects = list_projects()
+        projects = await run_db(list_projects)
         
         # Convert projects to a serializable format
         serializable_projects = []
@@ -817,5 +853,11 @@ def start_server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False):
     """
     # Events router is already registered during module initialization
     
-    logger.info(f"Starting RadBot web server on {host}:{port}")
-    uvicorn.run("radbot.web.app:app", host=host, port=port, reload=reload)
\ No newline at end of file
+    # Negotiate permessage-deflate with browsers that offer it, so large
+    # event frames are compressed on the wire
+    websocket_config = config_loader.get_config().get("web", {}).get("websocket", {})
+    compression = bool(websocket_config.get("compression", True))
+    
+    logger.info(f"Starting RadBot web server on {host}:{port} (WebSocket compression: {compression})")
+    uvicorn.run("radbot.web.app:app", host=host, port=port, reload=reload,
+                ws_per_message_deflate=compression)
\ No newline at end of file
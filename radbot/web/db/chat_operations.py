@@ -4,18 +4,99 @@ Database operations for chat message persistence.
 This module handles all operations for storing and retrieving chat messages
 using the dedicated radbot_chathistory schema.
 """
+import base64
 import logging
+import re
+import threading
 import uuid
 import json
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import List, Dict, Any, Optional, Tuple
 import psycopg2
 import psycopg2.extras
 
 # Use our custom connection functions
 from radbot.web.db.connection import get_chat_db_connection, get_chat_db_cursor, CHAT_SCHEMA
+from radbot.web.db.write_behind import WriteBehindQueue, create_write_behind_queue
 
 logger = logging.getLogger(__name__)
 
+# Text search configuration used for the content_tsv column and search queries
+SEARCH_CONFIG = "english"
+
+# Decimal places search scores are rounded to, so cursors compare exactly
+SEARCH_SCORE_SCALE = 6
+
+# A quoted phrase (optionally negated) or a bare word of a web search query
+_SEARCH_TOKEN = re.compile(r'(-?)"([^"]*)"?|(\S+)')
+
+# Whether pg_trgm is installed, checked on first fuzzy search
+_trigram_available: Optional[bool] = None
+
+# Write-behind queue, created from config on first use
+_write_behind_queue: Optional[WriteBehindQueue] = None
+_write_behind_initialized = False
+_write_behind_lock = threading.Lock()
+
+def get_write_behind_queue() -> Optional[WriteBehindQueue]:
+    """
+    Get the shared write-behind queue for chat messages.
+
+    Returns:
+        The queue, or None if write-behind is disabled or could not be set up
+    """
+    global _write_behind_queue, _write_behind_initialized
+    if not _write_behind_initialized:
+        with _write_behind_lock:
+            if not _write_behind_initialized:
+                try:
+                    _write_behind_queue = create_write_behind_queue(insert_messages)
+                except Exception as e:
+                    logger.error(f"Could not set up chat write-behind queue, writing synchronously: {e}")
+                _write_behind_initialized = True
+    return _write_behind_queue
+
+def encode_cursor(timestamp: str, row_id: str) -> str:
+    """
+    Encode a keyset pagination cursor.
+
+    Args:
+        timestamp: Sort key of the row, usually its ISO timestamp
+        row_id: ID of the row, which breaks ties between equal sort keys
+
+    Returns:
+        str: Opaque, URL-safe cursor
+    """
+    raw = json.dumps([timestamp, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, str]]:
+    """
+    Decode a keyset pagination cursor.
+
+    Args:
+        cursor: Cursor produced by encode_cursor
+
+    Returns:
+        (timestamp, row_id) tuple, or None if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(timestamp), str(row_id)
+    except Exception:
+        logger.warning(f"Invalid pagination cursor: {cursor}")
+        return None
+
+def message_cursor(message: Dict[str, Any]) -> str:
+    """Get the keyset cursor pointing at a message returned by get_messages_by_session_id."""
+    return encode_cursor(message["timestamp"], message["message_id"])
+
+def session_cursor(session: Dict[str, Any]) -> str:
+    """Get the keyset cursor pointing at a session returned by list_sessions."""
+    return encode_cursor(session.get("last_message_at") or session["created_at"], session["session_id"])
+
 def create_schema_if_not_exists() -> bool:
     """
     Create the chat history schema and tables if they don't exist.
@@ -29,9 +110,6 @@ def create_schema_if_not_exists() -> bool:
                 # Create schema if not exists
                 cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {CHAT_SCHEMA};")
 
-                # Set search path to our schema
-                cursor.execute(f"SET search_path TO {CHAT_SCHEMA}, public;")
-
                 # Create chat_messages table if not exists
                 cursor.execute(f"""
                     CREATE TABLE IF NOT EXISTS {CHAT_SCHEMA}.chat_messages (
@@ -67,6 +145,17 @@ def create_schema_if_not_exists() -> bool:
                             CREATE INDEX idx_chat_messages_timestamp
                             ON {CHAT_SCHEMA}.chat_messages(timestamp);
                         END IF;
+
+                        -- Keyset pagination index: serves WHERE session_id = ? AND
+                        -- (timestamp, message_id) > / < (?, ?) ORDER BY timestamp, message_id
+                        IF NOT EXISTS (
+                            SELECT 1 FROM pg_indexes
+                            WHERE schemaname = '{CHAT_SCHEMA}'
+                            AND indexname = 'idx_chat_messages_session_keyset'
+                        ) THEN
+                            CREATE INDEX idx_chat_messages_session_keyset
+                            ON {CHAT_SCHEMA}.chat_messages(session_id, timestamp, message_id);
+                        END IF;
                     END
                     $$;
                 """)
@@ -84,12 +173,71 @@ def create_schema_if_not_exists() -> bool:
                     );
                 """)
 
+                # Keyset pagination index for listing sessions by recent activity
+                cursor.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_chat_sessions_activity_keyset
+                    ON {CHAT_SCHEMA}.chat_sessions ((COALESCE(last_message_at, created_at)) DESC, session_id DESC)
+                    WHERE is_active = true;
+                """)
+
+                # Full-text search: a generated tsvector kept in sync by Postgres, with a GIN index
+                cursor.execute(f"""
+                    ALTER TABLE {CHAT_SCHEMA}.chat_messages
+                    ADD COLUMN IF NOT EXISTS content_tsv tsvector
+                    GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', content)) STORED;
+                """)
+                cursor.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_chat_messages_content_tsv
+                    ON {CHAT_SCHEMA}.chat_messages USING GIN (content_tsv);
+                """)
+
                 logger.info(f"Chat history schema and tables created or verified in schema '{CHAT_SCHEMA}'")
-                return True
     except Exception as e:
         logger.error(f"Error creating chat history schema: {e}")
         return False
 
+    create_trigram_index_if_possible()
+    return True
+
+def create_trigram_index_if_possible() -> bool:
+    """
+    Enable pg_trgm and index chat message content for fuzzy search.
+
+    Creating the extension needs privileges the database user may not have;
+    without it, search falls back to full-text matching only.
+
+    Returns:
+        bool: True if the trigram index is available
+    """
+    global _trigram_available
+    try:
+        with get_chat_db_connection() as conn:
+            with get_chat_db_cursor(conn, commit=True) as cursor:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+                cursor.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_chat_messages_content_trgm
+                    ON {CHAT_SCHEMA}.chat_messages USING GIN (content gin_trgm_ops);
+                """)
+        _trigram_available = True
+    except Exception as e:
+        logger.warning(f"pg_trgm is not available, chat search will not do fuzzy matching: {e}")
+        _trigram_available = False
+    return _trigram_available
+
+def _has_trigram_support() -> bool:
+    """Check once per process whether the pg_trgm extension is installed."""
+    global _trigram_available
+    if _trigram_available is None:
+        try:
+            with get_chat_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm');")
+                    _trigram_available = bool(cursor.fetchone()[0])
+        except Exception as e:
+            logger.warning(f"Could not check for pg_trgm: {e}")
+            return False
+    return _trigram_available
+
 def add_message(session_id: str, role: str, content: str,
                agent_name: Optional[str] = None,
                user_id: Optional[str] = None,
@@ -143,14 +291,184 @@ def add_message(session_id: str, role: str, content: str,
         logger.error(f"Error adding message: {e}")
         return None
 
-def get_messages_by_session_id(session_id: str, limit: int = 200, offset: int = 0) -> List[Dict[str, Any]]:
+def insert_messages(session_id: str, messages: List[Dict[str, Any]]) -> List[str]:
+    """
+    Insert several messages in one transaction with a single multi-row INSERT.
+
+    Messages may carry their own message_id and timestamp; messages whose ID
+    is already stored are skipped, so a batch can safely be written twice.
+    The session is created if needed, and its preview is updated once, from
+    the last user or assistant message.
+
+    Args:
+        session_id: Session identifier
+        messages: Message dicts with role and content, and optionally
+            message_id, timestamp, agent_name, user_id and metadata
+
+    Returns:
+        List of message_id UUIDs of the messages, in input order, including
+        those that were already stored
+
+    Raises:
+        ValueError: If session_id is not a valid UUID
+        psycopg2.Error: If the insert fails
+    """
+    if not messages:
+        return []
+
+    # Convert session_id to UUID if string
+    if isinstance(session_id, str):
+        session_id = uuid.UUID(session_id)
+
+    message_ids = [str(message.get('message_id') or uuid.uuid4()) for message in messages]
+    rows = []
+    for message_id, message in zip(message_ids, messages):
+        metadata = message.get('metadata')
+        rows.append((
+            message_id,
+            session_id,
+            message['role'],
+            message['content'],
+            message.get('agent_name'),
+            message.get('user_id'),
+            json.dumps(metadata) if metadata is not None else None,
+            message.get('timestamp')
+        ))
+
+    sql = f"""
+        INSERT INTO {CHAT_SCHEMA}.chat_messages
+        (message_id, session_id, role, content, agent_name, user_id, metadata, timestamp)
+        VALUES %s
+        ON CONFLICT (message_id) DO NOTHING;
+    """
+
+    with get_chat_db_connection() as conn:
+        with get_chat_db_cursor(conn, commit=True) as cursor:
+            psycopg2.extras.execute_values(
+                cursor, sql, rows,
+                template="(%s::uuid, %s, %s, %s, %s, %s, %s::jsonb, "
+                         "COALESCE(%s::timestamptz, CURRENT_TIMESTAMP))",
+                page_size=len(rows)
+            )
+
+            # Make sure the session exists and is active, in the same transaction
+            cursor.execute(f"""
+                INSERT INTO {CHAT_SCHEMA}.chat_sessions (session_id)
+                VALUES (%s)
+                ON CONFLICT (session_id) DO UPDATE SET is_active = true;
+            """, (session_id,))
+
+            # Update the session preview once for the whole batch
+            last = next((m for m in reversed(messages) if m['role'] in ('user', 'assistant')), None)
+            if last:
+                _upsert_session_preview(cursor, session_id, last['content'], last['role'])
+
+            return message_ids
+
+def add_messages_bulk(session_id: str, messages: List[Dict[str, Any]]) -> List[str]:
+    """
+    Insert several messages in one transaction with a single multi-row INSERT.
+
+    Args:
+        session_id: Session identifier
+        messages: Message dicts with role and content, and optionally
+            message_id, agent_name, user_id and metadata
+
+    Returns:
+        List of message_id UUIDs of the messages, in input order
+        (empty on error)
+    """
+    try:
+        return insert_messages(session_id, messages)
+    except ValueError:
+        logger.error(f"Invalid session_id format: {session_id}")
+        return []
+    except Exception as e:
+        logger.error(f"Error adding {len(messages)} messages in bulk: {e}")
+        return []
+
+def queue_messages(session_id: str, messages: List[Dict[str, Any]]) -> List[str]:
+    """
+    Persist messages through the write-behind queue.
+
+    The messages are acknowledged once queued and written to the database in
+    the background; reads through get_messages_by_session_id already include
+    them. Without a write-behind queue they are written directly.
+
+    Args:
+        session_id: Session identifier
+        messages: Message dicts with role and content, and optionally
+            message_id, agent_name, user_id and metadata
+
+    Returns:
+        List of message_id UUIDs assigned to the messages, in input order
+        (empty on error)
+    """
+    if not messages:
+        return []
+    try:
+        uuid.UUID(str(session_id))
+    except ValueError:
+        logger.error(f"Invalid session_id format: {session_id}")
+        return []
+
+    queue = get_write_behind_queue()
+    if queue is None:
+        return add_messages_bulk(session_id, messages)
+    try:
+        return queue.enqueue(str(session_id), messages)
+    except Exception as e:
+        logger.error(f"Error queueing {len(messages)} messages: {e}")
+        return []
+
+def queue_message(session_id: str, role: str, content: str,
+                  agent_name: Optional[str] = None,
+                  user_id: Optional[str] = None,
+                  metadata: Optional[Dict] = None,
+                  message_id: Optional[str] = None) -> Optional[str]:
+    """
+    Persist one message through the write-behind queue.
+
+    Args:
+        session_id: Session identifier
+        role: Message role ('user', 'assistant', 'system')
+        content: Message content
+        agent_name: Optional agent name for assistant messages
+        user_id: Optional user identifier
+        metadata: Optional metadata as dict
+        message_id: Optional UUID chosen by the client; a message whose ID is
+            already stored is not written again
+
+    Returns:
+        message_id: UUID assigned to the message or None on error
+    """
+    message_ids = queue_messages(session_id, [{
+        'message_id': message_id,
+        'role': role,
+        'content': content,
+        'agent_name': agent_name,
+        'user_id': user_id,
+        'metadata': metadata
+    }])
+    return message_ids[0] if message_ids else None
+
+def get_messages_by_session_id(session_id: str, limit: int = 200, offset: int = 0,
+                               before: Optional[str] = None, after: Optional[str] = None,
+                               newest: bool = False) -> List[Dict[str, Any]]:
     """
-    Get messages for a specific session.
+    Get messages for a specific session, oldest first.
+
+    Pages are selected with keyset cursors on (timestamp, message_id), so deep
+    pages cost the same as the first one. ``offset`` is still accepted for
+    older callers but scans every skipped row.
 
     Args:
         session_id: Session identifier
         limit: Maximum number of messages to return
-        offset: Number of messages to skip
+        offset: Number of messages to skip (prefer before/after)
+        before: Cursor; only return messages older than it (the page just before it)
+        after: Cursor; only return messages newer than it
+        newest: Without a cursor, return the newest page instead of the oldest
 
     Returns:
         List of message dictionaries
@@ -163,22 +481,45 @@ def get_messages_by_session_id(session_id: str, limit: int = 200, offset: int =
             logger.error(f"Invalid session_id format: {session_id}")
             return []
 
+    where = "session_id = %s"
+    params: List[Any] = [session_id]
+
+    # Walk backwards when paging towards older messages, then flip the page
+    descending = newest or before is not None
+    for cursor, op in ((before, "<"), (after, ">")):
+        if cursor is None:
+            continue
+        key = decode_cursor(cursor)
+        if key is None:
+            return []
+        where += f" AND (timestamp, message_id) {op} (%s::timestamptz, %s::uuid)"
+        params.extend(key)
+
+    order = "DESC" if descending else "ASC"
     sql = f"""
         SELECT message_id, session_id, role, content, agent_name,
                timestamp, user_id, metadata
         FROM {CHAT_SCHEMA}.chat_messages
-        WHERE session_id = %s
-        ORDER BY timestamp ASC
-        LIMIT %s OFFSET %s;
+        WHERE {where}
+        ORDER BY timestamp {order}, message_id {order}
+        LIMIT %s
     """
+    params.append(limit)
+    if offset:
+        sql += " OFFSET %s"
+        params.append(offset)
 
-    params = (session_id, limit, offset)
+    # Snapshot queued messages before reading, so a message being flushed is seen at least once
+    queue = get_write_behind_queue()
+    pending = queue.pending_messages(str(session_id)) if queue else []
 
     try:
         with get_chat_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                cursor.execute(sql, params)
+                cursor.execute(sql, tuple(params))
                 results = cursor.fetchall()
+                if descending:
+                    results = list(reversed(results))
 
                 # Convert to standard dicts and format fields
                 messages = []
@@ -192,10 +533,48 @@ def get_messages_by_session_id(session_id: str, limit: int = 200, offset: int =
                         message['timestamp'] = message['timestamp'].isoformat()
                     messages.append(message)
 
+                if pending:
+                    messages = _merge_pending_messages(messages, pending, limit, before, after, descending)
                 return messages
     except Exception as e:
         logger.error(f"Error getting messages for session {session_id}: {e}")
-        return []
+        # The queued messages are still readable while the database is down
+        return _merge_pending_messages([], pending, limit, before, after, descending) if pending else []
+
+def _message_key(timestamp: str, message_id: str) -> Tuple[datetime, str]:
+    """Sort key matching ORDER BY timestamp, message_id."""
+    return datetime.fromisoformat(timestamp), message_id
+
+def _merge_pending_messages(messages: List[Dict[str, Any]], pending: List[Dict[str, Any]], limit: int,
+                            before: Optional[str], after: Optional[str],
+                            descending: bool) -> List[Dict[str, Any]]:
+    """
+    Merge queued, not yet written messages into a page read from the database.
+
+    Args:
+        messages: Page read from the database, oldest first
+        pending: Queued messages of the session
+        limit: Page size
+        before: Cursor the page was read before, if any
+        after: Cursor the page was read after, if any
+        descending: Whether the page was read newest first
+
+    Returns:
+        The merged page, oldest first
+    """
+    bounds = [(decode_cursor(c), op) for c, op in ((before, "<"), (after, ">")) if c is not None]
+    stored_ids = {m['message_id'] for m in messages}
+    merged = list(messages)
+    for message in pending:
+        if message['message_id'] in stored_ids:
+            continue
+        key = _message_key(message['timestamp'], message['message_id'])
+        if all((key < _message_key(*bound)) if op == "<" else (key > _message_key(*bound))
+               for bound, op in bounds):
+            merged.append(dict(message))
+    merged.sort(key=lambda m: _message_key(m['timestamp'], m['message_id']))
+    # Keep the page closest to where the read started
+    return merged[-limit:] if descending else merged[:limit]
 
 def create_or_update_session(session_id: str, name: Optional[str] = None,
                            user_id: Optional[str] = None) -> bool:
@@ -254,9 +633,19 @@ def update_session_last_message(conn, session_id: uuid.UUID, preview: str, role:
     Returns:
         bool: True if successful, False on error
     """
+    try:
+        with get_chat_db_cursor(conn, commit=True) as cursor:
+            _upsert_session_preview(cursor, session_id, preview, role)
+            return True
+    except Exception as e:
+        logger.error(f"Error updating session last message: {e}")
+        return False
+
+def _upsert_session_preview(cursor, session_id: uuid.UUID, preview: str, role: str) -> None:
+    """Set a session's last message time and preview within the caller's transaction."""
     # Only update preview for user or assistant messages
     if role not in ('user', 'assistant'):
-        return True
+        return
 
     # Truncate preview text
     if preview and len(preview) > 100:
@@ -273,24 +662,18 @@ def update_session_last_message(conn, session_id: uuid.UUID, preview: str, role:
             preview = %s;
     """
 
-    params = (session_id, preview, preview)
+    cursor.execute(sql, (session_id, preview, preview))
 
-    try:
-        with get_chat_db_cursor(conn, commit=True) as cursor:
-            cursor.execute(sql, params)
-            return True
-    except Exception as e:
-        logger.error(f"Error updating session last message: {e}")
-        return False
-
-def list_sessions(user_id: Optional[str] = None, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+def list_sessions(user_id: Optional[str] = None, limit: int = 20, offset: int = 0,
+                  before: Optional[str] = None) -> List[Dict[str, Any]]:
     """
-    List chat sessions, optionally filtered by user.
+    List chat sessions, most recently active first, optionally filtered by user.
 
     Args:
         user_id: Optional user identifier to filter by
         limit: Maximum number of sessions to return
-        offset: Number of sessions to skip
+        offset: Number of sessions to skip (prefer before)
+        before: Cursor from session_cursor; only return sessions listed after it
 
     Returns:
         List of session dictionaries
@@ -307,12 +690,22 @@ def list_sessions(user_id: Optional[str] = None, limit: int = 20, offset: int =
         base_sql += " AND user_id = %s"
         params.append(user_id)
 
+    if before:
+        key = decode_cursor(before)
+        if key is None:
+            return []
+        base_sql += " AND (COALESCE(last_message_at, created_at), session_id) < (%s::timestamptz, %s::uuid)"
+        params.extend(key)
+
     base_sql += """
-        ORDER BY COALESCE(last_message_at, created_at) DESC
-        LIMIT %s OFFSET %s;
+        ORDER BY COALESCE(last_message_at, created_at) DESC, session_id DESC
+        LIMIT %s
     """
+    params.append(limit)
 
-    params.extend([limit, offset])
+    if offset:
+        base_sql += " OFFSET %s"
+        params.append(offset)
 
     try:
         with get_chat_db_connection() as conn:
@@ -338,6 +731,154 @@ def list_sessions(user_id: Optional[str] = None, limit: int = 20, offset: int =
         logger.error(f"Error listing sessions: {e}")
         return []
 
+def search_cursor(result: Dict[str, Any]) -> str:
+    """Get the keyset cursor pointing at a result returned by search_messages."""
+    return encode_cursor(repr(result["score"]), result["message_id"])
+
+def split_search_query(query: str) -> Tuple[str, str]:
+    """
+    Split a web search query into its loose words and its exact parts.
+
+    Quoted phrases and excluded (``-word``) terms are exact parts; the other
+    words, without ``or``, are loose words that may be matched fuzzily.
+
+    Args:
+        query: Search query in websearch_to_tsquery syntax
+
+    Returns:
+        (loose, exact) query strings; either may be empty
+    """
+    loose, exact = [], []
+    for negated, phrase, word in _SEARCH_TOKEN.findall(query):
+        if not word:
+            if phrase.strip():
+                exact.append(f'{negated}"{phrase}"')
+        elif word.startswith("-") and len(word) > 1:
+            exact.append(word)
+        elif word.lower() != "or":
+            loose.append(word)
+    return " ".join(loose), " ".join(exact)
+
+def search_messages(query: str, session_id: Optional[str] = None, user_id: Optional[str] = None,
+                    limit: int = 20, after: Optional[str] = None, fuzzy: bool = True,
+                    html: bool = True) -> List[Dict[str, Any]]:
+    """
+    Search chat messages of active sessions, best matches first.
+
+    Matching uses the GIN-indexed content_tsv column, with web search syntax:
+    quoted phrases match exactly, ``-word`` excludes a word and ``or``
+    combines alternatives. With ``fuzzy``, messages whose words are similar to
+    the query's loose (unquoted) words match too, so typos still find
+    results; quoted phrases and exclusions still apply to those matches.
+    Messages still in the write-behind queue are not searched.
+
+    Results are ordered by score, rounded to SEARCH_SCORE_SCALE decimals, then
+    by message_id, and pages continue after the (score, message_id) cursor.
+
+    Args:
+        query: Search query
+        session_id: Optional session to search in
+        user_id: Optional user whose sessions are searched
+        limit: Maximum number of results to return
+        after: Cursor from search_cursor; only return results ranked after it
+        fuzzy: Also match similar words when pg_trgm is installed
+        html: Return an HTML-escaped snippet with <mark> highlights; otherwise
+            a plain-text snippet with **bold** highlights
+
+    Returns:
+        List of result dictionaries with message fields, session_name, score
+        and a highlighted snippet
+    """
+    if not query or not query.strip():
+        return []
+
+    params: Dict[str, Any] = {"query": query, "limit": limit}
+    loose, exact = split_search_query(query)
+    fuzzy = fuzzy and bool(loose) and _has_trigram_support()
+
+    match = "m.content_tsv @@ q.tsq"
+    score = "ts_rank_cd(m.content_tsv, q.tsq)"
+    if fuzzy:
+        # <% is word_similarity(loose, content) above pg_trgm.word_similarity_threshold;
+        # phrases and exclusions are not fuzzy, so similar matches must still satisfy them
+        params["loose"] = loose
+        similar = "%(loose)s <%% m.content"
+        if exact:
+            params["exact"] = exact
+            similar += f" AND m.content_tsv @@ websearch_to_tsquery('{SEARCH_CONFIG}', %(exact)s)"
+        match = f"({match} OR ({similar}))"
+        score = f"({score} + word_similarity(%(loose)s, m.content))"
+    score = f"round(({score})::numeric, {SEARCH_SCORE_SCALE})"
+
+    where = [match, "COALESCE(s.is_active, true)"]
+    if session_id:
+        try:
+            params["session_id"] = uuid.UUID(str(session_id))
+        except ValueError:
+            logger.error(f"Invalid session_id format: {session_id}")
+            return []
+        where.append("m.session_id = %(session_id)s")
+    if user_id:
+        params["user_id"] = user_id
+        where.append("s.user_id = %(user_id)s")
+    if after:
+        key = decode_cursor(after)
+        if key is None:
+            return []
+        try:
+            params["after_score"], params["after_id"] = Decimal(key[0]), str(uuid.UUID(key[1]))
+        except (InvalidOperation, ValueError):
+            logger.warning(f"Invalid search cursor: {after}")
+            return []
+        where.append(f"({score}, m.message_id) < (%(after_score)s::numeric, %(after_id)s::uuid)")
+
+    if html:
+        # Escape before highlighting, so the snippet can be inserted as HTML
+        headline_source = "replace(replace(replace(page.content, '&', '&amp;'), '<', '&lt;'), '>', '&gt;')"
+        headline_options = 'StartSel="<mark>", StopSel="</mark>", MaxWords=30, MinWords=10, MaxFragments=2'
+    else:
+        headline_source = "page.content"
+        headline_options = 'StartSel="**", StopSel="**", MaxWords=30, MinWords=10, MaxFragments=2'
+    params["headline_options"] = headline_options
+
+    # Rank and page first, so snippets are only built for the returned rows
+    sql = f"""
+        WITH q AS (SELECT websearch_to_tsquery('{SEARCH_CONFIG}', %(query)s) AS tsq)
+        SELECT page.message_id, page.session_id, page.session_name, page.role, page.content,
+               page.agent_name, page.timestamp, page.score,
+               ts_headline('{SEARCH_CONFIG}', {headline_source}, q.tsq, %(headline_options)s) AS snippet
+        FROM (
+            SELECT m.message_id, m.session_id, s.name AS session_name, m.role, m.content,
+                   m.agent_name, m.timestamp, {score} AS score
+            FROM {CHAT_SCHEMA}.chat_messages m
+            CROSS JOIN q
+            LEFT JOIN {CHAT_SCHEMA}.chat_sessions s ON s.session_id = m.session_id
+            WHERE {" AND ".join(where)}
+            ORDER BY score DESC, m.message_id DESC
+            LIMIT %(limit)s
+        ) page
+        CROSS JOIN q
+        ORDER BY page.score DESC, page.message_id DESC;
+    """
+
+    try:
+        with get_chat_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                cursor.execute(sql, params)
+                results = []
+                for row in cursor.fetchall():
+                    result = dict(row)
+                    result['message_id'] = str(result['message_id'])
+                    result['session_id'] = str(result['session_id'])
+                    result['score'] = float(result['score'])
+                    if result['timestamp']:
+                        result['timestamp'] = result['timestamp'].isoformat()
+                    results.append(result)
+                return results
+    except Exception as e:
+        logger.error(f"Error searching chat messages for '{query}': {e}")
+        return []
+
 def get_session_message_count(session_id: str) -> int:
     """
     Get count of messages in a session.
@@ -362,12 +903,17 @@ def get_session_message_count(session_id: str) -> int:
         WHERE session_id = %s;
     """
 
+    queue = get_write_behind_queue()
+    pending = queue.pending_messages(str(session_id)) if queue else []
+
     try:
         with get_chat_db_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(sql, (session_id,))
                 result = cursor.fetchone()
-                return result[0] if result else 0
+                stored = result[0] if result else 0
+                # Queued messages flushed while counting are counted twice; the count is only a hint
+                return stored + len(pending)
     except Exception as e:
         logger.error(f"Error getting message count for session {session_id}: {e}")
         return 0
@@ -1,13 +1,13 @@
 """
 Database connection handling for Chat History Storage.
 
-This module creates a connection pool specifically for the chat history schema.
+This module resolves the chat history connection settings and hands out
+connections from the shared pool in radbot.db.
 """
 
 import os
 import logging
 import psycopg2
-import psycopg2.pool
 import psycopg2.extras
 import uuid
 from contextlib import contextmanager
@@ -15,6 +15,7 @@ from typing import Generator
 
 # Import configuration
 from radbot.config import config_loader
+from radbot.db import get_pool
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -44,60 +45,16 @@ if not all([DB_NAME, DB_USER, DB_PASSWORD]):
 # Register UUID adapter for psycopg2
 psycopg2.extensions.register_adapter(uuid.UUID, lambda u: psycopg2.extensions.adapt(str(u)))
 
-# Configure and initialize the connection pool
-# Adjust minconn and maxconn based on expected load
-MIN_CONN = 1
-MAX_CONN = 5  # Start conservatively
-
-# Global pool reference
-chat_pool = None
-
-def initialize_connection_pool():
-    """Initialize the connection pool for chat history database."""
-    global chat_pool
-
-    try:
-        chat_pool = psycopg2.pool.ThreadedConnectionPool(
-            minconn=MIN_CONN,
-            maxconn=MAX_CONN,
-            database=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port=DB_PORT
-        )
-        logger.info(f"Chat history database connection pool initialized (Min: {MIN_CONN}, Max: {MAX_CONN})")
-        logger.info(f"Connected to PostgreSQL database '{DB_NAME}' using schema '{CHAT_SCHEMA}' at {DB_HOST}:{DB_PORT}")
-        return True
-    except psycopg2.OperationalError as e:
-        logger.error(f"FATAL: Could not connect to database: {e}")
-        # Handle fatal error gracefully - return False instead of raising
-        return False
+# Shared pool; sizing comes from database.pool in config.yaml. All chat
+# history SQL is schema-qualified with CHAT_SCHEMA, so connections need no
+# per-checkout search_path and can be shared with the other database users.
+chat_pool = get_pool("chat_history", DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT)
 
 @contextmanager
 def get_chat_db_connection() -> Generator[psycopg2.extensions.connection, None, None]:
     """Provides a database connection from the pool, managing cleanup."""
-    global chat_pool
-
-    # Initialize pool if not already initialized
-    if chat_pool is None:
-        if not initialize_connection_pool():
-            raise RuntimeError("Could not initialize database connection pool")
-
-    conn = None
-    try:
-        conn = chat_pool.getconn()
-        # Set the search path to use our schema
-        with conn.cursor() as cursor:
-            cursor.execute(f"SET search_path TO {CHAT_SCHEMA}, public;")
+    with chat_pool.connection() as conn:
         yield conn
-    except psycopg2.Error as e:
-        # Log or handle pool errors if necessary
-        logger.error(f"Error getting connection from pool: {e}")
-        raise  # Re-raise the original psycopg2 error
-    finally:
-        if conn:
-            chat_pool.putconn(conn)  # Return connection to the pool
 
 @contextmanager
 def get_chat_db_cursor(conn: psycopg2.extensions.connection, commit: bool = False) -> Generator[psycopg2.extensions.cursor, None, None]:
@@ -0,0 +1,157 @@
+"""
+Database operations for web UI event persistence.
+
+Events that fall out of the in-memory event store's per-session buffer are
+spilled to the ``session_events`` table in the radbot_chathistory schema, so
+older events stay reachable through the events API.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+import psycopg2.extras
+
+from radbot.web.db.connection import get_chat_db_connection, get_chat_db_cursor, CHAT_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+def create_events_table_if_not_exists() -> bool:
+    """
+    Create the session events table in the chat history schema if it doesn't exist.
+
+    Returns:
+        bool: True if the table was created or already exists, False on error
+    """
+    try:
+        with get_chat_db_connection() as conn:
+            with get_chat_db_cursor(conn, commit=True) as cursor:
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {CHAT_SCHEMA};")
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {CHAT_SCHEMA}.session_events (
+                        session_id TEXT NOT NULL,
+                        seq BIGINT NOT NULL,
+                        event JSONB NOT NULL,
+                        created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (session_id, seq)
+                    );
+                """)
+                logger.info(f"Session events table created or verified in schema '{CHAT_SCHEMA}'")
+                return True
+    except Exception as e:
+        logger.error(f"Error creating session events table: {e}")
+        return False
+
+def save_events(session_id: str, events: List[Dict[str, Any]]) -> bool:
+    """
+    Store events for a session. Each event must carry its ``seq`` number.
+
+    Args:
+        session_id: Session identifier
+        events: Events to store
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if not events:
+        return True
+    try:
+        with get_chat_db_connection() as conn:
+            with get_chat_db_cursor(conn, commit=True) as cursor:
+                psycopg2.extras.execute_values(
+                    cursor,
+                    f"""
+                    INSERT INTO {CHAT_SCHEMA}.session_events (session_id, seq, event)
+                    VALUES %s
+                    ON CONFLICT (session_id, seq) DO NOTHING;
+                    """,
+                    [(session_id, event["seq"], psycopg2.extras.Json(event)) for event in events]
+                )
+                return True
+    except Exception as e:
+        logger.error(f"Error saving events for session {session_id}: {e}")
+        return False
+
+def get_events(session_id: str, since: int = 0, before: Optional[int] = None,
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Get stored events for a session in sequence order.
+
+    Args:
+        session_id: Session identifier
+        since: Only return events with a sequence number greater than this
+        before: Only return events with a sequence number lower than this
+        limit: Maximum number of events to return
+
+    Returns:
+        List of event dictionaries
+    """
+    query = f"""
+        SELECT event FROM {CHAT_SCHEMA}.session_events
+        WHERE session_id = %s AND seq > %s
+    """
+    params: List[Any] = [session_id, since]
+    if before is not None:
+        query += " AND seq < %s"
+        params.append(before)
+    query += " ORDER BY seq ASC"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    try:
+        with get_chat_db_connection() as conn:
+            with get_chat_db_cursor(conn) as cursor:
+                cursor.execute(query, params)
+                return [row[0] for row in cursor.fetchall()]
+    except Exception as e:
+        logger.error(f"Error getting events for session {session_id}: {e}")
+        return []
+
+def get_event(session_id: str, event_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get one stored event of a session by its ``event_id``.
+
+    Args:
+        session_id: Session identifier
+        event_id: Event identifier
+
+    Returns:
+        The event, or None if it is not stored
+    """
+    try:
+        with get_chat_db_connection() as conn:
+            with get_chat_db_cursor(conn) as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT event FROM {CHAT_SCHEMA}.session_events
+                    WHERE session_id = %s AND event->>'event_id' = %s
+                    LIMIT 1;
+                    """,
+                    (session_id, event_id)
+                )
+                row = cursor.fetchone()
+                return row[0] if row else None
+    except Exception as e:
+        logger.error(f"Error getting event {event_id} for session {session_id}: {e}")
+        return None
+
+def get_last_seq(session_id: str) -> int:
+    """
+    Get the highest stored sequence number for a session.
+
+    Args:
+        session_id: Session identifier
+
+    Returns:
+        The last sequence number, or 0 if the session has no stored events
+    """
+    try:
+        with get_chat_db_connection() as conn:
+            with get_chat_db_cursor(conn) as cursor:
+                cursor.execute(
+                    f"SELECT COALESCE(MAX(seq), 0) FROM {CHAT_SCHEMA}.session_events WHERE session_id = %s;",
+                    (session_id,)
+                )
+                return int(cursor.fetchone()[0])
+    except Exception as e:
+        logger.error(f"Error getting last event sequence for session {session_id}: {e}")
+        return 0
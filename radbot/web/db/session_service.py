@@ -0,0 +1,395 @@
+"""
+Persistent ADK session service backed by the chat history database.
+
+This module implements an ADK ``BaseSessionService`` on top of the
+radbot_chathistory schema and its connection pool, so conversation state
+survives restarts and can be shared by several web worker processes.
+
+Events are appended to ``adk_events`` as they happen, and sessions are loaded
+lazily with a bounded window of recent events. Appends are compare-and-swap
+on the session row's ``update_time``, which the in-memory session carries as
+``last_update_time`` (the same check ADK's own database service makes). When
+another writer got there first, the session state is reloaded under a row
+lock and the append is retried, so state deltas are never applied to a stale
+copy of the state.
+"""
+import logging
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+import psycopg2.extras
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import (
+    GetSessionConfig,
+    ListEventsResponse,
+    ListSessionsResponse,
+)
+from google.adk.sessions.state import State
+
+from radbot.web.db.connection import get_chat_db_connection, get_chat_db_cursor, CHAT_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+# Number of most recent events loaded with a session unless a config asks otherwise
+DEFAULT_RECENT_EVENTS = 100
+
+# Smallest step update_time moves forward by, so every update gives a new value
+# even when writers' clocks disagree
+UPDATE_TIME_STEP = 0.000001
+
+class StaleSessionError(ValueError):
+    """Raised when an event is appended to a session that no longer exists."""
+    pass
+
+def create_session_tables_if_not_exists() -> bool:
+    """
+    Create the ADK session tables in the chat history schema if they don't exist.
+
+    Returns:
+        bool: True if the tables were created or already exist, False on error
+    """
+    try:
+        with get_chat_db_connection() as conn:
+            with get_chat_db_cursor(conn, commit=True) as cursor:
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {CHAT_SCHEMA};")
+
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {CHAT_SCHEMA}.adk_sessions (
+                        app_name TEXT NOT NULL,
+                        user_id TEXT NOT NULL,
+                        session_id TEXT NOT NULL,
+                        state JSONB NOT NULL DEFAULT '{{}}'::jsonb,
+                        state_version BIGINT NOT NULL DEFAULT 0,
+                        create_time TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        update_time DOUBLE PRECISION NOT NULL,
+                        PRIMARY KEY (app_name, user_id, session_id)
+                    );
+                """)
+
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {CHAT_SCHEMA}.adk_events (
+                        seq BIGSERIAL PRIMARY KEY,
+                        event_id TEXT NOT NULL,
+                        app_name TEXT NOT NULL,
+                        user_id TEXT NOT NULL,
+                        session_id TEXT NOT NULL,
+                        invocation_id TEXT,
+                        author TEXT,
+                        timestamp DOUBLE PRECISION NOT NULL,
+                        event JSONB NOT NULL,
+                        FOREIGN KEY (app_name, user_id, session_id)
+                            REFERENCES {CHAT_SCHEMA}.adk_sessions (app_name, user_id, session_id)
+                            ON DELETE CASCADE
+                    );
+                """)
+
+                cursor.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_adk_events_session_seq
+                    ON {CHAT_SCHEMA}.adk_events (app_name, user_id, session_id, seq);
+                """)
+
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {CHAT_SCHEMA}.adk_app_states (
+                        app_name TEXT PRIMARY KEY,
+                        state JSONB NOT NULL DEFAULT '{{}}'::jsonb
+                    );
+                """)
+
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {CHAT_SCHEMA}.adk_user_states (
+                        app_name TEXT NOT NULL,
+                        user_id TEXT NOT NULL,
+                        state JSONB NOT NULL DEFAULT '{{}}'::jsonb,
+                        PRIMARY KEY (app_name, user_id)
+                    );
+                """)
+
+                logger.info(f"ADK session tables created or verified in schema '{CHAT_SCHEMA}'")
+                return True
+    except Exception as e:
+        logger.error(f"Error creating ADK session tables: {e}")
+        return False
+
+def _split_state_delta(delta: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Split a state delta into app, user and session scoped parts, dropping temp keys."""
+    app_delta, user_delta, session_delta = {}, {}, {}
+    for key, value in (delta or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app_delta[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_delta[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_delta[key] = value
+    return app_delta, user_delta, session_delta
+
+def _merge_state(app_state: Dict[str, Any], user_state: Dict[str, Any], session_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge app, user and session state into the flat dict ADK sessions expose."""
+    merged = dict(session_state)
+    for key, value in app_state.items():
+        merged[State.APP_PREFIX + key] = value
+    for key, value in user_state.items():
+        merged[State.USER_PREFIX + key] = value
+    return merged
+
+class PostgresSessionService(BaseSessionService):
+    """ADK session service that persists sessions and events in PostgreSQL."""
+
+    def __init__(self, recent_events: int = DEFAULT_RECENT_EVENTS):
+        """Initialize the service.
+
+        Args:
+            recent_events: Number of most recent events loaded with a session
+        """
+        self.recent_events = recent_events
+        if not create_session_tables_if_not_exists():
+            raise RuntimeError("Could not create ADK session tables")
+        logger.info(f"PostgreSQL session service initialized (recent_events={recent_events})")
+
+    def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        """Create a new session, or return the existing one with the same ID.
+
+        When the session already exists, ``state`` is merged into its state
+        rather than dropped.
+        """
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        app_delta, user_delta, session_state = _split_state_delta(state)
+        now = time.time()
+
+        if session_state:
+            on_conflict = f"""
+                DO UPDATE SET state = adk_sessions.state || EXCLUDED.state,
+                              state_version = adk_sessions.state_version + 1,
+                              update_time = GREATEST(EXCLUDED.update_time, adk_sessions.update_time + {UPDATE_TIME_STEP})
+            """
+        else:
+            on_conflict = "DO NOTHING"
+
+        with get_chat_db_connection() as conn:
+            with get_chat_db_cursor(conn, commit=True) as cursor:
+                cursor.execute(f"""
+                    INSERT INTO {CHAT_SCHEMA}.adk_sessions
+                    (app_name, user_id, session_id, state, update_time)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (app_name, user_id, session_id) {on_conflict};
+                """, (app_name, user_id, session_id, psycopg2.extras.Json(session_state), now))
+                self._upsert_scoped_state(cursor, app_name, user_id, app_delta, user_delta)
+
+        return self.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        """Load a session with its most recent events."""
+        num_recent = self.recent_events
+        after_timestamp = None
+        if config:
+            if config.num_recent_events:
+                num_recent = config.num_recent_events
+            after_timestamp = config.after_timestamp
+
+        with get_chat_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                cursor.execute(f"""
+                    SELECT s.state, s.state_version, s.update_time,
+                           COALESCE(a.state, '{{}}'::jsonb) AS app_state,
+                           COALESCE(u.state, '{{}}'::jsonb) AS user_state
+                    FROM {CHAT_SCHEMA}.adk_sessions s
+                    LEFT JOIN {CHAT_SCHEMA}.adk_app_states a ON a.app_name = s.app_name
+                    LEFT JOIN {CHAT_SCHEMA}.adk_user_states u
+                        ON u.app_name = s.app_name AND u.user_id = s.user_id
+                    WHERE s.app_name = %s AND s.user_id = %s AND s.session_id = %s;
+                """, (app_name, user_id, session_id))
+                row = cursor.fetchone()
+                if not row:
+                    return None
+
+                # Fetch the newest events first so the window is bounded by the index
+                event_sql = f"""
+                    SELECT event FROM {CHAT_SCHEMA}.adk_events
+                    WHERE app_name = %s AND user_id = %s AND session_id = %s
+                """
+                params = [app_name, user_id, session_id]
+                if after_timestamp:
+                    event_sql += " AND timestamp >= %s"
+                    params.append(after_timestamp)
+                event_sql += " ORDER BY seq DESC LIMIT %s;"
+                params.append(num_recent)
+                cursor.execute(event_sql, tuple(params))
+                event_rows = cursor.fetchall()
+
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=_merge_state(row["app_state"], row["user_state"], row["state"]),
+            events=[Event.model_validate(r["event"]) for r in reversed(event_rows)],
+            last_update_time=row["update_time"],
+        )
+
+    def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        """List a user's sessions without their events."""
+        with get_chat_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                cursor.execute(f"""
+                    SELECT session_id, state, update_time
+                    FROM {CHAT_SCHEMA}.adk_sessions
+                    WHERE app_name = %s AND user_id = %s
+                    ORDER BY update_time DESC;
+                """, (app_name, user_id))
+                rows = cursor.fetchall()
+
+        return ListSessionsResponse(sessions=[
+            Session(
+                id=row["session_id"],
+                app_name=app_name,
+                user_id=user_id,
+                state=row["state"],
+                last_update_time=row["update_time"],
+            )
+            for row in rows
+        ])
+
+    def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        """Delete a session and, through the foreign key, all of its events."""
+        with get_chat_db_connection() as conn:
+            with get_chat_db_cursor(conn, commit=True) as cursor:
+                cursor.execute(f"""
+                    DELETE FROM {CHAT_SCHEMA}.adk_sessions
+                    WHERE app_name = %s AND user_id = %s AND session_id = %s;
+                """, (app_name, user_id, session_id))
+
+    def evict_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        """Release a session from this process, keeping it in the database.
+
+        Nothing is held per session in this process, since the concurrency
+        token travels with the session itself, so this has nothing to do.
+        """
+        pass
+
+    def list_events(self, *, app_name: str, user_id: str, session_id: str) -> ListEventsResponse:
+        """List all events of a session in order."""
+        with get_chat_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT event FROM {CHAT_SCHEMA}.adk_events
+                    WHERE app_name = %s AND user_id = %s AND session_id = %s
+                    ORDER BY seq ASC;
+                """, (app_name, user_id, session_id))
+                rows = cursor.fetchall()
+        return ListEventsResponse(events=[Event.model_validate(r[0]) for r in rows])
+
+    def append_event(self, session: Session, event: Event) -> Event:
+        """Persist an event and its state delta, then apply it to the in-memory session.
+
+        The session row is only updated if it still has the ``update_time`` the
+        in-memory session was loaded with. If another writer updated it since,
+        the row is locked, the in-memory state is refreshed from it and the
+        update is applied on top.
+
+        Raises:
+            StaleSessionError: If the session was deleted by another writer
+        """
+        if event.partial:
+            return event
+
+        key = (session.app_name, session.user_id, session.id)
+        delta = event.actions.state_delta if event.actions else None
+        app_delta, user_delta, session_delta = _split_state_delta(delta)
+        now = time.time()
+
+        update_sql = f"""
+            UPDATE {CHAT_SCHEMA}.adk_sessions
+            SET state = state || %s,
+                state_version = state_version + %s,
+                update_time = GREATEST(%s, update_time + {UPDATE_TIME_STEP})
+            WHERE app_name = %s AND user_id = %s AND session_id = %s
+        """
+        update_params = (psycopg2.extras.Json(session_delta), 1 if session_delta else 0, now, *key)
+
+        with get_chat_db_connection() as conn:
+            with get_chat_db_cursor(conn, commit=True) as cursor:
+                cursor.execute(update_sql + " AND update_time = %s RETURNING update_time;",
+                               (*update_params, session.last_update_time))
+                row = cursor.fetchone()
+                if not row:
+                    # Changed by another writer: catch up with it, then apply on top
+                    self._refresh_session_state(cursor, session)
+                    cursor.execute(update_sql + " RETURNING update_time;", update_params)
+                    row = cursor.fetchone()
+                update_time = row[0]
+
+                self._upsert_scoped_state(cursor, session.app_name, session.user_id, app_delta, user_delta)
+
+                cursor.execute(f"""
+                    INSERT INTO {CHAT_SCHEMA}.adk_events
+                    (event_id, app_name, user_id, session_id, invocation_id, author, timestamp, event)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s::jsonb);
+                """, (event.id, *key, event.invocation_id, event.author, event.timestamp,
+                      event.model_dump_json(exclude_none=True)))
+
+        # Let the base class apply the delta and append to the in-memory session
+        super().append_event(session=session, event=event)
+        session.last_update_time = update_time
+        return event
+
+    def _refresh_session_state(self, cursor, session: Session) -> None:
+        """Lock a session row and reload the in-memory session state from it.
+
+        Temp state is kept, since it only lives in memory for the current invocation.
+
+        Raises:
+            StaleSessionError: If the session no longer exists
+        """
+        cursor.execute(f"""
+            SELECT s.state,
+                   COALESCE(a.state, '{{}}'::jsonb) AS app_state,
+                   COALESCE(u.state, '{{}}'::jsonb) AS user_state
+            FROM {CHAT_SCHEMA}.adk_sessions s
+            LEFT JOIN {CHAT_SCHEMA}.adk_app_states a ON a.app_name = s.app_name
+            LEFT JOIN {CHAT_SCHEMA}.adk_user_states u
+                ON u.app_name = s.app_name AND u.user_id = s.user_id
+            WHERE s.app_name = %s AND s.user_id = %s AND s.session_id = %s
+            FOR UPDATE OF s;
+        """, (session.app_name, session.user_id, session.id))
+        row = cursor.fetchone()
+        if not row:
+            raise StaleSessionError(f"Session {session.id} was deleted by another writer")
+
+        logger.info(f"Session {session.id} was updated by another writer; reloaded its state")
+        temp_state = {k: v for k, v in session.state.items() if k.startswith(State.TEMP_PREFIX)}
+        session.state.clear()
+        session.state.update(_merge_state(row[1], row[2], row[0]))
+        session.state.update(temp_state)
+
+    def _upsert_scoped_state(self, cursor, app_name: str, user_id: str,
+                             app_delta: Dict[str, Any], user_delta: Dict[str, Any]) -> None:
+        """Merge app- and user-scoped state deltas into their tables."""
+        if app_delta:
+            cursor.execute(f"""
+                INSERT INTO {CHAT_SCHEMA}.adk_app_states (app_name, state)
+                VALUES (%s, %s)
+                ON CONFLICT (app_name)
+                DO UPDATE SET state = adk_app_states.state || EXCLUDED.state;
+            """, (app_name, psycopg2.extras.Json(app_delta)))
+        if user_delta:
+            cursor.execute(f"""
+                INSERT INTO {CHAT_SCHEMA}.adk_user_states (app_name, user_id, state)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (app_name, user_id)
+                DO UPDATE SET state = adk_user_states.state || EXCLUDED.state;
+            """, (app_name, user_id, psycopg2.extras.Json(user_delta)))
@@ -0,0 +1,453 @@
+"""
+Write-behind queue for chat message persistence.
+
+Messages are acknowledged as soon as they are queued in memory and appended to
+a local spill file; a background thread writes them to the database in
+batches. The spill file is an append-only journal of queued messages that have
+not been written yet: it is compacted after every flush and replayed on
+startup, so a crash loses nothing. Replayed messages keep their IDs, and the
+database ignores IDs it already has.
+
+Each process journals to its own file, the configured path with its PID
+added, and holds a lock on it while running. On startup, a process takes over
+the journals whose lock it can get, i.e. those of processes that are gone, so
+workers sharing a data directory never replay each other's live journal.
+
+A message whose write keeps failing (a constraint violation, a bad payload) is
+retried a bounded number of times. It is then written on its own, so that the
+rest of its batch gets through, and moved to a dead-letter file next to the
+journal if it still fails. Failures to reach the database (connection errors,
+pool timeouts) don't count towards that limit: the messages stay queued,
+however long the outage lasts.
+
+Each message gets its ID and timestamp when it is queued, so reads can merge
+the pending messages with the stored ones and the UI sees them right away.
+"""
+import fcntl
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import psycopg2
+
+from radbot.config.config_loader import config_loader
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable via web.write_behind in config.yaml
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_PENDING = 5000
+DEFAULT_FLUSH_INTERVAL = 0.5  # seconds
+DEFAULT_MAX_RETRY_DELAY = 30.0  # seconds
+DEFAULT_MAX_ATTEMPTS = 10
+DEFAULT_SPILL_FILE = "data/chat_write_behind.jsonl"
+
+def is_connection_error(error: Exception) -> bool:
+    """Check whether a write failed because the database could not be reached.
+
+    Covers psycopg2's OperationalError (which includes the pool's
+    PoolTimeoutError) and InterfaceError, as opposed to errors caused by the
+    data being written.
+    """
+    return isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError,
+                              ConnectionError, TimeoutError))
+
+class WriteBehindQueue:
+    """Bounded in-memory queue of chat messages flushed to the database in the background."""
+
+    def __init__(self, write_messages: Callable[[str, List[Dict[str, Any]]], Any],
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_retry_delay: float = DEFAULT_MAX_RETRY_DELAY,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 spill_file: Optional[str] = DEFAULT_SPILL_FILE,
+                 is_transient: Callable[[Exception], bool] = is_connection_error):
+        """Initialize the queue, replaying any messages left in the spill file.
+
+        Args:
+            write_messages: Writes a list of messages of one session to the
+                database, raising on failure; must ignore IDs that already exist
+            batch_size: Maximum number of messages written per flush
+            max_pending: Maximum number of queued messages; beyond that,
+                messages are written synchronously
+            flush_interval: Seconds between background flushes
+            max_retry_delay: Upper bound of the retry backoff after a failed flush
+            max_attempts: Failed writes after which a message is written on its
+                own, and dead-lettered if that fails too
+            spill_file: Base path of the crash-safe journal, or None to keep
+                pending messages in memory only; each process adds its PID,
+                and dead letters go to the base path with ".dead" added
+            is_transient: Tells write errors that are retried without limit,
+                because the database was unreachable, from those counted
+                towards max_attempts
+        """
+        self.write_messages = write_messages
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(1, max_pending)
+        self.flush_interval = flush_interval
+        self.max_retry_delay = max_retry_delay
+        self.max_attempts = max(1, max_attempts)
+        self.is_transient = is_transient
+        self.spill_file: Optional[str] = None
+        self.dead_letter_file = f"{spill_file}.dead" if spill_file else None
+
+        # message_id -> message, in queue order
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._failures = 0
+        # message_id -> failed write attempts
+        self._attempts: Dict[str, int] = {}
+        self._journal_lock = None
+        self._last_timestamp = datetime.min.replace(tzinfo=timezone.utc)
+        self.stats = {"queued": 0, "flushed": 0, "flush_failures": 0, "written_through": 0,
+                      "dead_lettered": 0}
+
+        if spill_file:
+            directory = os.path.dirname(os.path.abspath(spill_file))
+            os.makedirs(directory, exist_ok=True)
+            self._open_journal(spill_file)
+
+    def enqueue(self, session_id: str, messages: List[Dict[str, Any]]) -> List[str]:
+        """Queue messages of one session for writing.
+
+        Args:
+            session_id: Session identifier
+            messages: Message dicts with role and content, and optionally
+                agent_name, user_id and metadata
+
+        Returns:
+            IDs assigned to the messages, in input order
+        """
+        with self._lock:
+            queued = [self._prepare(session_id, message) for message in messages]
+            full = len(self._pending) + len(queued) > self.max_pending
+            if not full:
+                self._journal(queued)
+                for message in queued:
+                    self._pending[message["message_id"]] = message
+                self.stats["queued"] += len(queued)
+
+        if full:
+            # Back-pressure: rather than growing without bound, write on the caller's thread
+            logger.warning(f"Write-behind queue full ({self.max_pending} messages), writing synchronously")
+            self.write_messages(session_id, queued)
+            self.stats["written_through"] += len(queued)
+        else:
+            self._ensure_started()
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+        return [message["message_id"] for message in queued]
+
+    def pending_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        """Get the queued, not yet written messages of a session, oldest first."""
+        with self._lock:
+            return [dict(m) for m in self._pending.values() if m["session_id"] == session_id]
+
+    def pending_count(self) -> int:
+        """Get the number of queued messages."""
+        return len(self._pending)
+
+    def flush(self) -> bool:
+        """Write one batch of queued messages.
+
+        Returns:
+            True if the batch was written (or there was nothing to write)
+        """
+        with self._lock:
+            batch = list(self._pending.values())[:self.batch_size]
+        if not batch:
+            return True
+
+        # The database write is per session, in queue order
+        by_session: Dict[str, List[Dict[str, Any]]] = {}
+        for message in batch:
+            by_session.setdefault(message["session_id"], []).append(message)
+
+        written: List[str] = []
+        dead: List[Dict[str, Any]] = []
+        ok = True
+        # A failing session does not hold back the others
+        for session_id, messages in by_session.items():
+            try:
+                self.write_messages(session_id, messages)
+                written.extend(m["message_id"] for m in messages)
+            except Exception as e:
+                ok = False
+                self.stats["flush_failures"] += 1
+                logger.warning(f"Write-behind flush of {len(messages)} messages of session {session_id} "
+                               f"failed, {len(self._pending)} messages pending: {e}")
+                if self.is_transient(e):
+                    # The messages are fine; wait for the database to come back
+                    continue
+                exhausted = []
+                for message in messages:
+                    attempts = self._attempts.get(message["message_id"], 0) + 1
+                    self._attempts[message["message_id"]] = attempts
+                    if attempts >= self.max_attempts:
+                        exhausted.append(message)
+                if exhausted:
+                    ids, failed = self._write_one_by_one(session_id, exhausted)
+                    written.extend(ids)
+                    dead.extend(failed)
+
+        with self._lock:
+            # Drop messages only once they are in the database, so reads always see them
+            for message_id in written:
+                self._pending.pop(message_id, None)
+                self._attempts.pop(message_id, None)
+            for message in dead:
+                self._pending.pop(message["message_id"], None)
+                self._attempts.pop(message["message_id"], None)
+            if dead:
+                self._dead_letter(dead)
+            self.stats["flushed"] += len(written)
+            if written or dead:
+                self._compact_spill_file()
+        if ok:
+            self._failures = 0
+        else:
+            self._failures += 1
+        return ok
+
+    def flush_all(self) -> bool:
+        """Write every queued message, stopping at the first failed batch.
+
+        Returns:
+            True if the queue was emptied
+        """
+        while self._pending:
+            if not self.flush():
+                return False
+        return True
+
+    def close(self) -> None:
+        """Stop the background thread and write what is still queued."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.max_retry_delay + 5)
+            self._thread = None
+        if not self.flush_all():
+            logger.warning(f"{len(self._pending)} chat messages left in the write-behind spill file")
+        elif self.spill_file:
+            # Nothing left to replay; do not leave a journal per process behind
+            self._remove_journal(self.spill_file, self._journal_lock)
+            self._journal_lock = None
+            self.spill_file = None
+
+    def _prepare(self, session_id: str, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Give a message its ID and a timestamp later than every queued message."""
+        timestamp = datetime.now(timezone.utc)
+        if timestamp <= self._last_timestamp:
+            # Keep queue order stable in (timestamp, message_id) order
+            timestamp = self._last_timestamp + timedelta(microseconds=1)
+        self._last_timestamp = timestamp
+        return {
+            "message_id": str(message.get("message_id") or uuid.uuid4()),
+            "session_id": str(session_id),
+            "role": message["role"],
+            "content": message["content"],
+            "agent_name": message.get("agent_name"),
+            "user_id": message.get("user_id"),
+            "metadata": message.get("metadata"),
+            "timestamp": timestamp.isoformat(),
+        }
+
+    def _ensure_started(self) -> None:
+        if self._thread is None and not self._stopped.is_set():
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="radbot-chat-write-behind",
+                                                    daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        """Background loop: flush on an interval, backing off while the database fails."""
+        while not self._stopped.is_set():
+            if self._failures:
+                delay = min(self.flush_interval * (2 ** self._failures), self.max_retry_delay)
+            else:
+                delay = self.flush_interval
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            # Drain the queue while batches succeed
+            while self._pending and self.flush() and not self._stopped.is_set():
+                pass
+
+    def _journal(self, messages: List[Dict[str, Any]]) -> None:
+        """Append messages to the spill file and sync it to disk. Called with the lock held."""
+        if not self.spill_file:
+            return
+        with open(self.spill_file, "a", encoding="utf-8") as f:
+            for message in messages:
+                f.write(json.dumps(message, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _compact_spill_file(self) -> None:
+        """Rewrite the spill file with only the pending messages. Called with the lock held."""
+        if not self.spill_file:
+            return
+        tmp_path = f"{self.spill_file}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for message in self._pending.values():
+                f.write(json.dumps(message, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.spill_file)
+
+    def _write_one_by_one(self, session_id: str,
+                          messages: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Write messages that failed too often one at a time, to isolate the bad ones.
+
+        Stops at a connection error, leaving the remaining messages queued.
+
+        Returns:
+            (IDs of the messages written, messages that still failed)
+        """
+        written, failed = [], []
+        for message in messages:
+            try:
+                self.write_messages(session_id, [message])
+                written.append(message["message_id"])
+            except Exception as e:
+                if self.is_transient(e):
+                    logger.warning(f"Write-behind lost the database while isolating failed messages: {e}")
+                    break
+                logger.error(f"Giving up on chat message {message['message_id']} of session {session_id} "
+                             f"after {self._attempts.get(message['message_id'], 0)} attempts: {e}")
+                failed.append(message)
+        return written, failed
+
+    def _dead_letter(self, messages: List[Dict[str, Any]]) -> None:
+        """Set aside messages that cannot be written. Called with the lock held."""
+        self.stats["dead_lettered"] += len(messages)
+        if not self.dead_letter_file:
+            logger.error(f"Dropped {len(messages)} chat messages that could not be written")
+            return
+        # One append per call, so processes sharing the file do not interleave lines
+        data = "".join(json.dumps(message, default=str) + "\n" for message in messages)
+        with open(self.dead_letter_file, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        logger.error(f"Moved {len(messages)} chat messages that could not be written to {self.dead_letter_file}")
+
+    @staticmethod
+    def _lock_journal(path: str):
+        """Lock a journal through its .lock file, without waiting.
+
+        Returns:
+            The open lock file, which holds the lock until closed, or None if
+            another live process holds it
+        """
+        lock_file = open(f"{path}.lock", "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    @staticmethod
+    def _remove_journal(path: str, lock_file) -> None:
+        """Delete a journal and its lock file, then release the lock."""
+        for stale in (path, f"{path}.lock"):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+        if lock_file is not None:
+            lock_file.close()
+
+    def _open_journal(self, base_path: str) -> None:
+        """Take this process's journal and replay it with those left by processes that are gone."""
+        root, ext = os.path.splitext(base_path)
+        pid = os.getpid()
+        own_path = f"{root}.{pid}{ext}"
+        suffix = 0
+        while True:
+            self._journal_lock = self._lock_journal(own_path)
+            if self._journal_lock is not None:
+                break
+            # Another queue of this process holds it
+            suffix += 1
+            own_path = f"{root}.{pid}-{suffix}{ext}"
+        self.spill_file = own_path
+
+        # The base path itself is the journal of versions without per-process files
+        directory = os.path.dirname(os.path.abspath(base_path))
+        name = re.compile(re.escape(os.path.basename(root)) + r"(\.\d+(-\d+)?)?" + re.escape(ext))
+        adopted = []
+        for entry in sorted(os.listdir(directory)):
+            path = os.path.join(os.path.dirname(base_path), entry)
+            if path == own_path or not name.fullmatch(entry):
+                continue
+            lock_file = self._lock_journal(path)
+            if lock_file is None:
+                continue
+            adopted.append((path, lock_file))
+
+        for path in [own_path] + [path for path, _ in adopted]:
+            self._replay_spill_file(path)
+        if adopted:
+            # Move the adopted messages into this process's journal before deleting theirs
+            with self._lock:
+                self._compact_spill_file()
+            for path, lock_file in adopted:
+                self._remove_journal(path, lock_file)
+        if self._pending:
+            latest = max(m["timestamp"] for m in self._pending.values())
+            self._last_timestamp = datetime.fromisoformat(latest)
+            self._ensure_started()
+
+    def _replay_spill_file(self, path: str) -> None:
+        """Queue the messages a previous process left in a journal."""
+        try:
+            f = open(path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        replayed = 0
+        with f:
+            for line in f:
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line torn by a crash mid-write; its message was never acknowledged
+                    logger.warning(f"Skipping unreadable line in {path}")
+                    continue
+                self._pending[message["message_id"]] = message
+                replayed += 1
+        if replayed:
+            logger.info(f"Replaying {replayed} unwritten chat messages from {path}")
+
+def create_write_behind_queue(write_messages: Callable[[str, List[Dict[str, Any]]], Any]) -> Optional[WriteBehindQueue]:
+    """Create the write-behind queue from the web.write_behind config section.
+
+    Returns:
+        The queue, or None if write-behind is disabled
+    """
+    config = config_loader.get_config().get("web", {}).get("write_behind", {})
+    if not config.get("enabled", True):
+        return None
+    return WriteBehindQueue(
+        write_messages,
+        batch_size=int(config.get("batch_size", DEFAULT_BATCH_SIZE)),
+        max_pending=int(config.get("max_pending", DEFAULT_MAX_PENDING)),
+        flush_interval=float(config.get("flush_interval", DEFAULT_FLUSH_INTERVAL)),
+        max_retry_delay=float(config.get("max_retry_delay", DEFAULT_MAX_RETRY_DELAY)),
+        max_attempts=int(config.get("max_attempts", DEFAULT_MAX_ATTEMPTS)),
+        spill_file=config.get("spill_file", DEFAULT_SPILL_FILE),
+    )
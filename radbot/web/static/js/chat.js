@@ -82,7 +82,7 @@ export function initChat() {
     return true;
 }
 
-// Add a message to the chat UI
+// Add a message to the chat UI and return its ID
 export function addMessage(role, content, agentName) {
     // Ensure chatMessages element exists
     if (!chatMessages) {
@@ -311,6 +311,9 @@ export function addMessage(role, content, agentName) {
     // Append the message
     chatMessages.appendChild(messageDiv);
     
+    // Unique ID of the message, also sent to the server with user messages
+    const messageId = crypto.randomUUID ? crypto.randomUUID() : generateUUID();
+    
     // Store message in persistence layer if we have a session ID
     // Check if this message is part of the initial load from localStorage
     const isInitialLoad = window.initialLoadInProgress === true;
@@ -321,7 +324,7 @@ export function addMessage(role, content, agentName) {
             
             // Create a message object with a unique ID
             const messageObj = {
-                id: crypto.randomUUID ? crypto.randomUUID() : generateUUID(),
+                id: messageId,
                 role: role,
                 content: content,
                 timestamp: Date.now(),
@@ -390,6 +393,8 @@ export function addMessage(role, content, agentName) {
     
     // Also try scrolling after a longer delay just to be sure
     setTimeout(scrollToBottom, 300);
+    
+    return messageId;
 }
 
 // Helper function to generate a UUID if not available in the browser
@@ -769,8 +774,8 @@ export function sendMessage() {
     // Convert emoji shortcodes to unicode emojis for display, but send original text to server
     const displayMessage = window.emojiUtils.convertEmoji(message);
     
-    // Add user message to UI
-    addMessage('user', displayMessage);
+    // Add user message to UI; the server keys its replay buffer by this ID
+    const messageId = addMessage('user', displayMessage);
     
     // Clear input immediately after adding the message to UI
     chatInput.value = '';
@@ -794,7 +799,8 @@ export function sendMessage() {
             console.log(`Including agent targeting: ${currentAgentName}`);
 
             window.socket.send(JSON.stringify({
-                message: targetedMessage
+                message: targetedMessage,
+                message_id: messageId
             }));
 
             // Set status to indicate processing
@@ -809,7 +815,8 @@ export function sendMessage() {
 
                 // Queue the message to be sent when connection is established
                 window.socket.manager.pendingMessages.push(JSON.stringify({
-                    message: message
+                    message: message,
+                    message_id: messageId
                 }));
 
                 // Set status to indicate processing
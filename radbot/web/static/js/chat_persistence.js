@@ -11,6 +11,9 @@ export class ChatPersistence {
     this.messageCache = {}; // In-memory cache
     this.saveBatchTimeout = null;
     this.serverSyncEnabled = options.serverSyncEnabled !== false; // Enable by default
+    this.pendingServerMessages = {}; // chatId -> messages waiting for the next bulk flush
+    this.serverFlushTimeout = null;
+    this.serverFlushDelay = options.serverFlushDelay || 500;
 
     // Session metadata - will be initialized by session manager
     this.sessionsIndexKey = 'radbot_sessions_index';
@@ -208,15 +211,81 @@ export class ChatPersistence {
     // Save the updated messages locally
     const saveResult = this.saveMessages(chatId, messages);
 
-    // Send to server if server sync is enabled and online
+    // Queue for the server if server sync is enabled and online
     if (this.serverSyncEnabled && this.isOnline) {
-      this.sendMessageToServer(chatId, message)
-        .catch(error => console.error('Error sending message to server:', error));
+      this.queueServerMessage(chatId, message);
     }
 
     return saveResult;
   }
 
+  // Queue a message for the next bulk flush, so a burst of messages is
+  // written to the server with one request
+  queueServerMessage(chatId, message) {
+    if (!this.pendingServerMessages[chatId]) {
+      this.pendingServerMessages[chatId] = [];
+    }
+    this.pendingServerMessages[chatId].push(message);
+
+    if (!this.serverFlushTimeout) {
+      this.serverFlushTimeout = setTimeout(() => {
+        this.serverFlushTimeout = null;
+        this.flushServerMessages()
+          .catch(error => console.error('Error flushing messages to server:', error));
+      }, this.serverFlushDelay);
+    }
+  }
+
+  // Send all queued messages using the bulk endpoint
+  async flushServerMessages() {
+    const pending = this.pendingServerMessages;
+    this.pendingServerMessages = {};
+
+    for (const [chatId, messages] of Object.entries(pending)) {
+      if (await this.sendMessagesToServer(chatId, messages)) {
+        // Mark them synced so syncWithServer doesn't send them again;
+        // on failure syncWithServer picks them up later
+        this.markMessagesSynced(chatId, messages);
+      }
+    }
+  }
+
+  // Id of the newest local message known to be on the server. An id rather
+  // than a count stays right when the local history is trimmed or when only
+  // some queued messages were flushed.
+  getSyncedMessageId(chatId) {
+    return this.getStorage().getItem(`${this.storagePrefix}${chatId}_synced_id`);
+  }
+
+  // Move the synced marker forward over sent messages. It only advances
+  // through messages that directly follow it, so a message whose flush failed
+  // is never skipped.
+  markMessagesSynced(chatId, sentMessages) {
+    const messages = this.getMessages(chatId);
+    const sentIds = new Set(sentMessages.map(msg => msg.id));
+    let index = messages.findIndex(msg => msg.id === this.getSyncedMessageId(chatId));
+    let advanced = false;
+    while (index + 1 < messages.length && sentIds.has(messages[index + 1].id)) {
+      index += 1;
+      advanced = true;
+    }
+    if (advanced) {
+      this.getStorage().setItem(`${this.storagePrefix}${chatId}_synced_id`, messages[index].id);
+    }
+  }
+
+  // Get the local messages newer than the synced marker
+  getUnsyncedMessages(chatId, messages) {
+    const syncedId = this.getSyncedMessageId(chatId);
+    if (!syncedId) {
+      return messages;
+    }
+    const index = messages.findIndex(msg => msg.id === syncedId);
+    // Not found: the marker was trimmed off the front of the history, so
+    // every message kept is newer than it
+    return index === -1 ? messages : messages.slice(index + 1);
+  }
+
   // Clear chat history for a specific chat ID
   clearChat(chatId) {
     if (!chatId) return false;
@@ -231,6 +300,7 @@ export class ChatPersistence {
       const storage = this.getStorage();
       const key = `${this.storagePrefix}${chatId}`;
       storage.removeItem(key);
+      storage.removeItem(`${key}_synced_id`);
 
       // Notify server if enabled and online
       if (this.serverSyncEnabled && this.isOnline) {
@@ -392,40 +462,34 @@ export class ChatPersistence {
         return true;
       }
 
-      // Check if we've already synced these messages
-      const syncedMessageKey = `${this.storagePrefix}${sessionId}_synced`;
-      const storage = this.getStorage();
-      const lastSyncedCount = parseInt(storage.getItem(syncedMessageKey) || '0');
-      
-      // Only sync if we have new messages or haven't synced before
-      if (messages.length <= lastSyncedCount && lastSyncedCount > 0) {
-        console.log(`Skipping sync - already synced ${lastSyncedCount} messages, current count: ${messages.length}`);
+      // Only send messages newer than the last one we know the server has
+      const unsynced = this.getUnsyncedMessages(sessionId, messages);
+      if (unsynced.length === 0) {
+        console.log(`Skipping sync - all ${messages.length} messages already synced`);
         return true;
       }
 
-      // Send to server in batches, but only send messages we haven't synced yet
-      const batchSize = 50;
-      let syncCount = 0;
-
       // First, check if this is a duplicate session that we've just loaded
-      if (messages.length > 100) {
+      if (!this.getSyncedMessageId(sessionId) && messages.length > 100) {
         // If we have more than 100 messages, only do initial sync, not full batch sync
         console.log(`Large message count (${messages.length}), limiting initial sync to avoid duplicates`);
-        syncCount = messages.length;
-        storage.setItem(syncedMessageKey, syncCount.toString());
+        this.markMessagesSynced(sessionId, messages);
         return true;
       }
-      
-      // Normal sync for small message counts
-      for (let i = 0; i < messages.length; i += batchSize) {
-        const batch = messages.slice(i, i + batchSize);
-        await this.sendMessagesToServer(sessionId, batch);
+
+      // Send to server in batches; each batch is written with a single
+      // multi-row insert on the server
+      const batchSize = 200;
+      let syncCount = 0;
+      for (let i = 0; i < unsynced.length; i += batchSize) {
+        const batch = unsynced.slice(i, i + batchSize);
+        if (!await this.sendMessagesToServer(sessionId, batch)) {
+          break;
+        }
+        this.markMessagesSynced(sessionId, batch);
         syncCount += batch.length;
       }
 
-      // Store the number of messages we've synced
-      storage.setItem(syncedMessageKey, syncCount.toString());
-
       console.log(`Successfully synced ${syncCount} messages with server for session ${sessionId}`);
       return true;
     } catch (e) {
@@ -446,6 +510,8 @@ export class ChatPersistence {
         role: msg.role,
         content: msg.content,
         agent_name: msg.agent,
+        // The server skips a message whose ID it already has, so resending is safe
+        message_id: serverMessageId(msg),
         metadata: {
           client_id: msg.id,
           client_timestamp: msg.timestamp
@@ -484,6 +550,7 @@ export class ChatPersistence {
         role: message.role,
         content: message.content,
         agent_name: message.agent,
+        message_id: serverMessageId(message),
         metadata: {
           client_id: message.id,
           client_timestamp: message.timestamp
@@ -516,8 +583,9 @@ export class ChatPersistence {
     }
 
     try {
-      // Get messages from server
-      const response = await fetch(`/api/messages/${sessionId}`);
+      // Get the newest page of messages from server; older pages are fetched
+      // with ?before=<prev_cursor>
+      const response = await fetch(`/api/messages/${sessionId}?newest=true`);
 
       // Handle 404 or other errors gracefully
       if (!response.ok) {
@@ -593,6 +661,13 @@ export function mergeMessages(localMessages, serverMessages) {
     });
 }
 
+const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
+// Use a message's client ID as its server ID when it is a UUID
+function serverMessageId(message) {
+  return message.id && UUID_PATTERN.test(message.id) ? message.id : undefined;
+}
+
 // Create a message object with consistent structure
 export function createMessageObject(role, content, agentName = null) {
   return {
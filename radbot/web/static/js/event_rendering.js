@@ -249,10 +249,63 @@ export function formatEventType(type) {
     }
 }
 
+// Largest part of an event payload loaded into the detail view
+const MAX_PAYLOAD_VIEW_BYTES = 1024 * 1024;
+
+// Create a button that loads the full output of an event from the server
+function createLoadPayloadButton(event) {
+    const button = document.createElement('button');
+    button.className = 'load-payload-button';
+    button.textContent = `Load full output (${Math.round(event.payload.size / 1024)}KB)`;
+    button.addEventListener('click', () => {
+        button.disabled = true;
+        button.textContent = 'Loading...';
+        fetch(event.payload.url, { headers: { Range: `bytes=0-${MAX_PAYLOAD_VIEW_BYTES - 1}` } })
+            .then(response => response.ok ? response.text() : Promise.reject(response.status))
+            .then(text => {
+                const complete = event.payload.size <= MAX_PAYLOAD_VIEW_BYTES;
+                if (complete && event.payload.content_type === 'application/json') {
+                    try {
+                        event.output = JSON.parse(text);
+                    } catch (e) {
+                        event.output = text;
+                    }
+                } else {
+                    event.output = complete ? text :
+                        text + `\n\n[Showing the first ${Math.round(MAX_PAYLOAD_VIEW_BYTES / 1024)}KB of ${Math.round(event.payload.size / 1024)}KB]`;
+                }
+                event.payloadLoaded = true;
+                showEventDetails(event);
+            })
+            .catch(error => {
+                console.warn(`Could not load payload of event ${event.event_id}: ${error}`);
+                button.textContent = 'Full output is no longer available';
+            });
+    });
+    return button;
+}
+
 // Show event details
 export function showEventDetails(event) {
     console.log('Showing event details:', event);
     
+    // Events from compact WebSocket frames leave out bulky fields; fetch them once
+    if (event.lazy && event.event_id && state.sessionId) {
+        fetch(`/api/events/${state.sessionId}/${event.event_id}`)
+            .then(response => response.ok ? response.json() : Promise.reject(response.status))
+            .then(fullEvent => {
+                Object.assign(event, fullEvent);
+                delete event.lazy;
+                showEventDetails(event);
+            })
+            .catch(error => {
+                console.warn(`Could not load full event ${event.event_id}: ${error}`);
+                delete event.lazy;
+                showEventDetails(event);
+            });
+        return;
+    }
+    
     // First, ensure the events tile is visible - this is using the tiling system
     let eventsPanel = document.querySelector('[data-content="events"]');
     if (!eventsPanel) {
@@ -465,6 +518,11 @@ export function showEventDetails(event) {
             outputValue.innerHTML = formatJsonSyntax(event.output);
             outputSection.appendChild(outputValue);
             
+            // Large outputs are kept on the server; only a preview came with the event
+            if (event.payload && !event.payloadLoaded) {
+                outputSection.appendChild(createLoadPayloadButton(event));
+            }
+            
             detailsContainer.appendChild(outputSection);
         }
     } else if (event.type === 'agent_transfer') {
@@ -15,6 +15,30 @@ let pendingMessages = [];
 // Map to keep track of all active WebSocket connections by session ID
 const sessionConnections = {};
 
+// Short keys of the compact event wire format (see radbot/web/api/event_wire.py)
+const WIRE_KEYS = {
+  id: 'event_id', q: 'seq', t: 'type', c: 'category', s: 'summary', ts: 'timestamp',
+  x: 'text', f: 'is_final', n: 'tool_name', i: 'input', o: 'output', d: 'details',
+  r: 'raw_response', p: 'plan', ps: 'plan_step', ta: 'to_agent', fa: 'from_agent',
+  a: 'agent_name', ac: 'actions'
+};
+
+// Expand a compact event; fields left out are listed in event.lazy with their sizes
+function decodeEvent(compact) {
+  const event = {};
+  for (const [key, value] of Object.entries(compact)) {
+    if (key === 'lz') {
+      event.lazy = {};
+      for (const [field, size] of Object.entries(value)) {
+        event.lazy[WIRE_KEYS[field] || field] = size;
+      }
+    } else {
+      event[WIRE_KEYS[key] || key] = value;
+    }
+  }
+  return event;
+}
+
 /**
  * WebSocketManager class for handling WebSocket connections with reconnection logic
  */
@@ -90,7 +114,8 @@ class WebSocketManager {
   // Actual connection implementation
   _doConnect() {
     
-    const wsUrl = `${this.baseUrl}/ws/${this.sessionId}`;
+    // Ask for compact event frames; bulky fields are fetched when an event is opened
+    const wsUrl = `${this.baseUrl}/ws/${this.sessionId}?wire=compact`;
     console.log(`Connecting to WebSocket at ${wsUrl} (attempt #${this.reconnectAttempts + 1})`);
 
     try {
@@ -139,11 +164,18 @@ class WebSocketManager {
           const messages = window.chatPersistence.getMessages(this.sessionId);
           if (messages.length > 0) {
             const lastMessage = messages[messages.length - 1];
-            console.log(`Requesting sync for session ${this.sessionId} since last message:`, lastMessage.id);
+            // The server only knows the IDs of the user messages we sent it
+            const lastUserMessage = messages.filter(msg => msg.role === 'user').pop() || lastMessage;
+            const cursor = this.getSyncCursor();
+            console.log(`Requesting sync for session ${this.sessionId} since`, cursor || lastUserMessage.id);
             
+            // The server resumes from the sequence number when the epoch still
+            // matches, and falls back to the message ID otherwise
             this.send(JSON.stringify({
               type: 'sync_request',
-              lastMessageId: lastMessage.id,
+              lastSeq: cursor ? cursor.seq : null,
+              epoch: cursor ? cursor.epoch : null,
+              lastMessageId: lastUserMessage.id,
               timestamp: lastMessage.timestamp
             }));
           } else {
@@ -338,6 +370,26 @@ class WebSocketManager {
     }, 90000);  // Increased from 60s to 90s
   }
   
+  getSyncCursor() {
+    try {
+      const stored = localStorage.getItem(`radbot_sync_cursor_${this.sessionId}`);
+      return stored ? JSON.parse(stored) : null;
+    } catch (e) {
+      return null;
+    }
+  }
+  
+  setSyncCursor(cursor) {
+    if (!cursor) {
+      return;
+    }
+    try {
+      localStorage.setItem(`radbot_sync_cursor_${this.sessionId}`, JSON.stringify(cursor));
+    } catch (e) {
+      console.warn(`Could not store sync cursor: ${e}`);
+    }
+  }
+  
   stopHeartbeat() {
     if (this.heartbeatInterval) {
       clearInterval(this.heartbeatInterval);
@@ -364,9 +416,16 @@ class WebSocketManager {
         return;
       }
       
+      if (data.type === 'cursor') {
+        // Remember our position in the server's replay buffer
+        this.setSyncCursor(data.cursor);
+        return;
+      }
+      
       if (data.type === 'sync_response' || data.type === 'history') {
         // Handle server providing message history
         console.log(`Received ${data.type} with ${data.messages ? data.messages.length : 0} messages`);
+        this.setSyncCursor(data.cursor);
         
         if (data.messages && data.messages.length > 0 && window.chatPersistence) {
           const localMessages = window.chatPersistence.getMessages(this.sessionId);
@@ -407,6 +466,10 @@ class WebSocketManager {
       if (data.type === 'status') {
         window.statusUtils.handleStatusUpdate(data.content);
       } else if (data.type === 'events') {
+        if (data.format === 'compact' && Array.isArray(data.content)) {
+          data.content = data.content.map(decodeEvent);
+        }
+        
         // Process incoming events
         console.log('Received events data:', data.content);
         
@@ -617,6 +680,9 @@ class WebSocketManager {
         if (typeof handleTasks === 'function') {
           handleTasks(data.content);
         }
+      } else if (data.type === 'shell_output') {
+        // Live output of a shell command the agent is running
+        handleShellOutput(data.content);
       }
     } catch (error) {
       console.error('Error handling WebSocket message:', error);
@@ -786,6 +852,77 @@ function handleTasks(tasksData) {
   }
 }
 
+// Largest live output kept per shell command in the chat
+const MAX_SHELL_OUTPUT_CHARS = 200000;
+
+// Show the live output of a shell command, with a button to cancel it
+function handleShellOutput(event) {
+  if (!event || !event.command_id) {
+    return;
+  }
+  const chatMessages = document.getElementById('chat-messages');
+  if (!chatMessages) {
+    return;
+  }
+
+  let block = document.getElementById(`shell-${event.command_id}`);
+  if (!block) {
+    block = document.createElement('div');
+    block.id = `shell-${event.command_id}`;
+    block.className = 'message system shell-output';
+
+    const header = document.createElement('div');
+    header.className = 'shell-output-header';
+    header.textContent = `$ ${event.command}`;
+
+    const cancelButton = document.createElement('button');
+    cancelButton.className = 'shell-cancel-button';
+    cancelButton.textContent = 'Cancel';
+    cancelButton.addEventListener('click', () => {
+      cancelButton.disabled = true;
+      const params = new URLSearchParams({ session_id: event.session_id || '' });
+      fetch(`/api/shell/commands/${event.command_id}/cancel?${params}`, { method: 'POST' })
+        .catch(error => console.warn(`Could not cancel command ${event.command_id}: ${error}`));
+    });
+    header.appendChild(cancelButton);
+
+    const output = document.createElement('pre');
+    output.className = 'shell-output-text';
+    block.appendChild(header);
+    block.appendChild(output);
+    chatMessages.appendChild(block);
+  }
+
+  const output = block.querySelector('.shell-output-text');
+  if (event.text) {
+    let text = output.textContent;
+    if (event.skipped_chars) {
+      text += `\n[... ${event.skipped_chars} characters skipped ...]\n`;
+    }
+    text += event.text;
+    if (text.length > MAX_SHELL_OUTPUT_CHARS) {
+      text = text.slice(text.length - MAX_SHELL_OUTPUT_CHARS);
+    }
+    output.textContent = text;
+  }
+
+  if (event.state === 'finished' || event.state === 'cancelled') {
+    const cancelButton = block.querySelector('.shell-cancel-button');
+    if (cancelButton) {
+      cancelButton.remove();
+    }
+    const status = document.createElement('div');
+    status.className = 'shell-output-status';
+    status.textContent = event.state === 'cancelled' ? 'Cancelled' :
+      (event.error ? event.error : `Exited with status ${event.return_code}`);
+    block.appendChild(status);
+  }
+
+  if (window.chatModule && window.chatModule.scrollToBottom) {
+    window.chatModule.scrollToBottom();
+  }
+}
+
 // Handle incoming events data
 function handleEvents(eventsData) {
   if (!eventsData || !Array.isArray(eventsData)) {
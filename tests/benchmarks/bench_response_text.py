@@ -0,0 +1,46 @@
+"""
+Benchmark for _process_response_text on large responses.
+
+Run with ``python tests/benchmarks/bench_response_text.py`` (or ``make bench``).
+Each case is a ~1MB agent response; the time should grow linearly with size.
+"""
+import json
+import time
+
+from radbot.web.api.session.utils import ORJSON_AVAILABLE, _process_response_text
+
+TARGET_SIZE = 1_000_000
+ROUNDS = 5
+
+
+def _repeat_to_size(unit: str) -> str:
+    return unit * max(1, TARGET_SIZE // len(unit))
+
+
+def _cases():
+    record = {"items": [{"id": i, "name": f"entity_{i}", "state": "on"} for i in range(40)]}
+    json_block = "```json\n" + json.dumps(record) + "\n```\n"
+    prose = "The tool returned the following results for the request.\n" * 3
+    yield "many small JSON blocks", _repeat_to_size(prose + json_block)
+    yield "one large JSON block", "```json\n" + json.dumps({"rows": [record] * (TARGET_SIZE // 2500)}) + "\n```"
+    yield "non-JSON code blocks", _repeat_to_size(prose + "```python\nprint('hello')\n```\n")
+    yield "plain prose", _repeat_to_size(prose)
+    special = json.dumps({"call_search_agent_response": {"pages": ["x" * 200] * (TARGET_SIZE // 210)}})
+    yield "special tool response", "Here is what I found: " + special
+
+
+def main():
+    print(f"orjson: {'yes' if ORJSON_AVAILABLE else 'no'}")
+    for name, text in _cases():
+        timings = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            _process_response_text(text)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{name:<24} {len(text) / 1e6:5.2f} MB  best {best * 1000:8.2f} ms  "
+              f"{len(text) / 1e6 / best:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
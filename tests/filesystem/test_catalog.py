@@ -0,0 +1,76 @@
+"""
+Tests for the file catalog behind filesystem search.
+"""
+
+import os
+import tempfile
+import shutil
+import unittest
+
+from radbot.filesystem.catalog import FileCatalog, compile_globs
+from radbot.filesystem.security import set_allowed_directories
+from radbot.filesystem.tools import search, write_file, delete
+
+
+class FileCatalogTest(unittest.TestCase):
+    """Test crawling, refreshing and searching the catalog."""
+
+    def setUp(self):
+        """Create a small tree."""
+        self.temp_dir = os.path.realpath(tempfile.mkdtemp(prefix="fs_catalog_test_"))
+        for rel in ("a/one.txt", "a/b/two.txt", "a/b/three.log", "node_modules/x/skip.txt"):
+            full = os.path.join(self.temp_dir, rel)
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            with open(full, "w") as f:
+                f.write(f"content of {rel}\n")
+        set_allowed_directories([self.temp_dir])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        set_allowed_directories([])
+
+    def test_walk_prunes_excluded_directories(self):
+        """Test that excluded directories are not descended into."""
+        catalog = FileCatalog([self.temp_dir], use_watchdog=False)
+        walked = catalog.walk(self.temp_dir, compile_globs(("node_modules",)))
+        directories = [os.path.relpath(d, self.temp_dir) for d, _, _, _ in walked]
+        self.assertEqual(directories, [".", "a", os.path.join("a", "b")])
+        self.assertEqual(catalog.stats()["directories"], 5)
+
+    def test_polling_picks_up_changes(self):
+        """Test that changed directories are re-read when polling."""
+        catalog = FileCatalog([self.temp_dir], poll_interval=0, use_watchdog=False)
+        catalog.walk(self.temp_dir)
+        os.makedirs(os.path.join(self.temp_dir, "a", "new"))
+        with open(os.path.join(self.temp_dir, "a", "new", "four.txt"), "w") as f:
+            f.write("4")
+        shutil.rmtree(os.path.join(self.temp_dir, "a", "b"))
+
+        files = {name for _, _, names, _ in catalog.walk(self.temp_dir) for name in names}
+        self.assertIn("four.txt", files)
+        self.assertNotIn("two.txt", files)
+
+    def test_search(self):
+        """Test glob, regex, content and result limits, and tool writes."""
+        names = sorted(r["name"] for r in search(self.temp_dir, "*.txt", exclude_patterns=["node_modules"]))
+        self.assertEqual(names, ["one.txt", "two.txt"])
+
+        names = sorted(r["name"] for r in search(self.temp_dir, r"^t\w+\.", regex=True))
+        self.assertEqual(names, ["three.log", "two.txt"])
+
+        results = search(self.temp_dir, "*", content_pattern="b/three")
+        self.assertEqual([r["name"] for r in results], ["three.log"])
+        self.assertEqual(results[0]["matches"][0]["line"], 1)
+
+        self.assertEqual(len(search(self.temp_dir, "*", max_results=2)), 2)
+
+        # Files written and deleted by the tools are seen right away
+        new_file = os.path.join(self.temp_dir, "c", "five.txt")
+        write_file(new_file, "5")
+        self.assertIn("five.txt", [r["name"] for r in search(self.temp_dir, "five.*")])
+        delete(new_file)
+        self.assertEqual(search(self.temp_dir, "five.*"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for the file content search.
+"""
+
+import asyncio
+import os
+import tempfile
+import shutil
+import unittest
+from unittest.mock import patch
+
+from radbot.filesystem import windowed
+from radbot.filesystem.content_search import compile_pattern, scan_file
+from radbot.filesystem.security import set_allowed_directories
+from radbot.filesystem.tools import search_file_contents
+
+
+class ContentSearchTest(unittest.TestCase):
+    """Test scanning single files and searching trees."""
+
+    def setUp(self):
+        """Create source files, a binary file and a large file."""
+        self.temp_dir = os.path.realpath(tempfile.mkdtemp(prefix="fs_content_test_"))
+        os.makedirs(os.path.join(self.temp_dir, "src", "pkg"))
+        os.makedirs(os.path.join(self.temp_dir, "build"))
+        self._write("src/main.py", "import os\n\ndef main():\n    return os.getcwd()\n")
+        self._write("src/pkg/util.py", "def helper():\n    # TODO: remove\n    pass\n")
+        self._write("build/main.py", "def main():\n    pass\n")
+        self._write("notes.txt", "todo: write tests\nTODO: ship\n")
+        with open(os.path.join(self.temp_dir, "image.bin"), "wb") as f:
+            f.write(b"\x89PNG\0\0TODO\n")
+        set_allowed_directories([self.temp_dir])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        set_allowed_directories([])
+
+    def _write(self, rel_path, content):
+        with open(os.path.join(self.temp_dir, rel_path), "w") as f:
+            f.write(content)
+
+    def test_scan_file_lines_and_context(self):
+        """Test line numbers and context lines of a match."""
+        path = os.path.join(self.temp_dir, "src", "main.py")
+        status, matches = scan_file(path, compile_pattern("getcwd", literal=True), context=1)
+        self.assertEqual(status, "scanned")
+        self.assertEqual(matches, [{"line": 4, "text": "    return os.getcwd()",
+                                    "before": ["def main():"], "after": []}])
+
+        # The memory-mapped path finds the same lines
+        with patch.object(windowed, "MMAP_THRESHOLD", 0):
+            _, mapped = scan_file(path, compile_pattern("getcwd", literal=True), context=1)
+        self.assertEqual(mapped, matches)
+
+        # One result per line, anchors match at line starts
+        _, matches = scan_file(path, compile_pattern(r"^\s*\w"))
+        self.assertEqual([m["line"] for m in matches], [1, 3, 4])
+
+    def test_search_tree(self):
+        """Test include and exclude patterns, case folding and binary skipping."""
+        result = search_file_contents(self.temp_dir, r"def main", include_patterns=["*.py"],
+                                      exclude_patterns=["build"])
+        self.assertEqual([(m["path"], m["line"]) for m in result["matches"]],
+                         [(os.path.join(self.temp_dir, "src", "main.py"), 3)])
+
+        result = search_file_contents(self.temp_dir, "todo", ignore_case=True)
+        paths = sorted({os.path.basename(m["path"]) for m in result["matches"]})
+        self.assertEqual(paths, ["notes.txt", "util.py"])
+        self.assertEqual(result["files_skipped"]["binary"], 1)
+
+    def test_result_cap(self):
+        """Test that results are capped and flagged."""
+        result = search_file_contents(self.temp_dir, "def", max_results=2)
+        self.assertEqual(len(result["matches"]), 2)
+        self.assertTrue(result["truncated"])
+
+    def test_size_limit_and_invalid_pattern(self):
+        """Test skipping large files and rejecting invalid patterns."""
+        result = search_file_contents(self.temp_dir, "def", max_file_bytes=30)
+        self.assertGreater(result["files_skipped"]["too_large"], 0)
+
+        with self.assertRaises(ValueError):
+            search_file_contents(self.temp_dir, "(")
+        with self.assertRaises(PermissionError):
+            search_file_contents("/etc", "root")
+
+    def test_symlinks_out_of_the_sandbox_are_skipped(self):
+        """Test that files linked from outside the allowed directories are not read."""
+        outside_dir = os.path.realpath(tempfile.mkdtemp(prefix="fs_content_outside_"))
+        self.addCleanup(shutil.rmtree, outside_dir)
+        secret = os.path.join(outside_dir, "creds.txt")
+        with open(secret, "w") as f:
+            f.write("SECRET=hunter2\n")
+        os.symlink(secret, os.path.join(self.temp_dir, "link.txt"))
+        self._write("config.txt", "SECRET=shown\n")
+
+        result = search_file_contents(self.temp_dir, "SECRET")
+        self.assertEqual([m["text"] for m in result["matches"]], ["SECRET=shown"])
+        with self.assertRaises(PermissionError):
+            search_file_contents(os.path.join(self.temp_dir, "link.txt"), "SECRET")
+
+    def test_fileserver_skips_symlinks_out_of_the_root(self):
+        """Test that the MCP fileserver's content search stays inside its root."""
+        try:
+            from radbot.tools.mcp.mcp_fileserver_server import FileServerMCP
+        except ImportError:
+            self.skipTest("mcp is not installed")
+        outside_dir = os.path.realpath(tempfile.mkdtemp(prefix="fs_content_outside_"))
+        self.addCleanup(shutil.rmtree, outside_dir)
+        secret = os.path.join(outside_dir, "creds.txt")
+        with open(secret, "w") as f:
+            f.write("SECRET=hunter2\n")
+        os.symlink(secret, os.path.join(self.temp_dir, "link.txt"))
+        self._write("config.txt", "SECRET=shown\n")
+
+        server = FileServerMCP(self.temp_dir)
+        result = asyncio.run(server.search_file_contents("", "SECRET"))
+        self.assertEqual([m["text"] for m in result["matches"]], ["SECRET=shown"])
+        with self.assertRaises(ValueError):
+            asyncio.run(server.search_file_contents("link.txt", "SECRET"))
+
+if __name__ == "__main__":
+    unittest.main()
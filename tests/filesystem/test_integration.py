@@ -44,8 +44,9 @@ class FilesystemIntegrationTest(unittest.TestCase):
             enable_delete=False
         )
         
-        # Should have 4 tools: read_file, list_directory, get_info, search
-        self.assertEqual(len(tools), 4)
+        # Should have 8 tools: read_file, read_file_window, tail_file, grep_file,
+        # list_directory, get_info, search, search_file_contents
+        self.assertEqual(len(tools), 8)
         
         # Verify all tools are FunctionTool instances
         for tool in tools:
@@ -58,9 +59,8 @@ class FilesystemIntegrationTest(unittest.TestCase):
             enable_delete=False
         )
         
-        # Should have 7 tools: read_file, list_directory, get_info, search, 
-        # write_file, edit_file, copy
-        self.assertEqual(len(tools), 7)
+        # Should have 11 tools: the 8 read tools, write_file, edit_file, copy
+        self.assertEqual(len(tools), 11)
         
         # Test with write and delete tools
         tools = create_filesystem_tools(
@@ -69,9 +69,8 @@ class FilesystemIntegrationTest(unittest.TestCase):
             enable_delete=True
         )
         
-        # Should have 8 tools: read_file, list_directory, get_info, search,
-        # write_file, edit_file, copy, delete
-        self.assertEqual(len(tools), 8)
+        # Should have 12 tools: the 8 read tools, write_file, edit_file, copy, delete
+        self.assertEqual(len(tools), 12)
 
     @patch.dict(os.environ, {
         "MCP_FS_ROOT_DIR": "/test/dir",
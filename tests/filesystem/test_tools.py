@@ -176,6 +176,36 @@ class FilesystemToolsTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             edit_file(multiline_file, edits)
 
+    def test_edit_file_in_one_pass(self):
+        """Test single-pass edits, chained edits, the compact diff and the atomic replace."""
+        big_file = os.path.join(self.test_dir, "big.txt")
+        with open(big_file, "w") as f:
+            f.write("".join(f"row {i}\n" for i in range(1000)))
+        os.chmod(big_file, 0o640)
+        
+        # Edits are given out of order; each hunk shows only its own lines
+        diff = edit_file(big_file, [
+            {"oldText": "row 900\n", "newText": "row nine hundred\n"},
+            {"oldText": "row 10\n", "newText": ""},
+        ])
+        self.assertIn("@@ -8,7 +8,6 @@", diff)
+        self.assertIn("@@ -898,7 +897,7 @@", diff)
+        self.assertEqual(len(diff.splitlines()), 2 + 8 + 9)
+        with open(big_file, "r") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 999)
+        self.assertEqual(lines[899], "row nine hundred")
+        self.assertEqual(os.stat(big_file).st_mode & 0o777, 0o640)
+        self.assertEqual([n for n in os.listdir(self.test_dir) if n.endswith(".tmp")], [])
+        
+        # An edit matching text inserted by an earlier one still applies in order
+        edit_file(big_file, [
+            {"oldText": "row 1\n", "newText": "first\n"},
+            {"oldText": "first", "newText": "second"},
+        ])
+        with open(big_file, "r") as f:
+            self.assertEqual(f.read().splitlines()[1], "second")
+
     def test_copy(self):
         """Test copying a file or directory."""
         # Test copying a file
@@ -329,6 +359,23 @@ class FilesystemToolsTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             search(self.test_file1, "*.txt")
 
+    def test_search_content_stays_in_allowed_directories(self):
+        """Test that content search skips links out of the sandbox and binary files."""
+        outside_dir = tempfile.mkdtemp(prefix="fs_tools_outside_")
+        self.addCleanup(shutil.rmtree, outside_dir)
+        secret = os.path.join(outside_dir, "creds.txt")
+        with open(secret, "w") as f:
+            f.write("SECRET=hunter2\n")
+        os.symlink(secret, os.path.join(self.test_dir, "link.txt"))
+        with open(os.path.join(self.test_dir, "blob.txt"), "wb") as f:
+            f.write(b"SECRET\0\1")
+        with open(os.path.join(self.test_dir, "plain.txt"), "w") as f:
+            f.write("SECRET=shown\n")
+        
+        results = search(self.test_dir, "*.txt", content_pattern="SECRET")
+        self.assertEqual([item["name"] for item in results], ["plain.txt"])
+        self.assertEqual(results[0]["matches"], [{"line": 1, "text": "SECRET=shown"}])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,118 @@
+"""
+Tests for windowed reads of large files.
+"""
+
+import os
+import tempfile
+import shutil
+import unittest
+from unittest.mock import patch
+
+from radbot.filesystem import windowed
+from radbot.filesystem.security import set_allowed_directories
+from radbot.filesystem.tools import read_file, read_file_window, tail_file, grep_file
+
+
+class WindowedReadTest(unittest.TestCase):
+    """Test byte, line, tail and grep windows."""
+
+    def setUp(self):
+        """Create a log file of 1000 numbered lines."""
+        self.temp_dir = tempfile.mkdtemp(prefix="fs_windowed_test_")
+        self.log_file = os.path.join(self.temp_dir, "app.log")
+        with open(self.log_file, "w") as f:
+            for i in range(1, 1001):
+                level = "ERROR" if i % 100 == 0 else "INFO"
+                f.write(f"{level} line {i}\n")
+        set_allowed_directories([self.temp_dir])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        set_allowed_directories([])
+
+    def test_read_range_pages_through_file(self):
+        """Test that consecutive byte windows cover the file exactly."""
+        with open(self.log_file, "r") as f:
+            expected = f.read()
+        content = ""
+        offset = 0
+        while True:
+            window = read_file_window(self.log_file, offset=offset, length=1000)
+            content += window["content"]
+            offset = window["next_offset"]
+            if window["eof"]:
+                break
+        self.assertEqual(content, expected)
+
+    def test_read_range_aligns_utf8(self):
+        """Test that windows never split a multi-byte character."""
+        path = os.path.join(self.temp_dir, "utf8.txt")
+        text = "aé€😀" * 50
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        content = ""
+        offset = 0
+        while True:
+            window = windowed.read_range(path, offset, 7)
+            self.assertNotIn("�", window["content"])
+            content += window["content"]
+            offset = window["next_offset"]
+            if window["eof"]:
+                break
+        self.assertEqual(content, text)
+
+        # A window starting inside a character skips to the next one
+        window = windowed.read_range(path, 2, 4)
+        self.assertEqual(window["offset"], 3)
+        self.assertTrue(window["content"].startswith("€"))
+
+    def test_read_range_mmap(self):
+        """Test the memory-mapped path and offsets from the end."""
+        with patch.object(windowed, "MMAP_THRESHOLD", 0):
+            window = windowed.read_range(self.log_file, -len("ERROR line 1000\n"))
+        self.assertEqual(window["content"], "ERROR line 1000\n")
+        self.assertTrue(window["eof"])
+
+    def test_read_lines(self):
+        """Test line ranges and truncation at max_bytes."""
+        window = read_file_window(self.log_file, start_line=10, end_line=12)
+        self.assertEqual(window["content"], "INFO line 10\nINFO line 11\nINFO line 12\n")
+        self.assertEqual(window["next_line"], 13)
+        self.assertFalse(window["eof"])
+
+        window = windowed.read_lines(self.log_file, 1, None, max_bytes=50)
+        self.assertTrue(window["truncated"])
+        self.assertEqual(window["end_line"], 4)
+
+    def test_tail(self):
+        """Test reading the last lines of a file."""
+        result = tail_file(self.log_file, lines=2)
+        self.assertEqual(result["content"], "INFO line 999\nERROR line 1000\n")
+        self.assertEqual(result["lines"], 2)
+        self.assertFalse(result["truncated"])
+
+        result = windowed.tail_lines(self.log_file, lines=100, max_bytes=40)
+        self.assertTrue(result["truncated"])
+        self.assertTrue(result["content"].endswith("ERROR line 1000\n"))
+        self.assertLessEqual(len(result["content"]), 40)
+
+    def test_grep(self):
+        """Test matches, context lines and the match limit."""
+        result = grep_file(self.log_file, r"^ERROR", context=1, max_matches=2)
+        self.assertEqual(result["match_count"], 2)
+        self.assertTrue(result["truncated"])
+        self.assertEqual([m["line"] for m in result["matches"]], [99, 100, 101, 199, 200, 201])
+        self.assertEqual([m["match"] for m in result["matches"]], [False, True, False] * 2)
+
+        with self.assertRaises(ValueError):
+            grep_file(self.log_file, "(")
+
+    def test_read_file_refuses_large_files(self):
+        """Test that read_file points to windowed reads for files over the limit."""
+        with patch.object(windowed, "MAX_FULL_READ_BYTES", 100):
+            with self.assertRaises(ValueError):
+                read_file(self.log_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
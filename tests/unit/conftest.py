@@ -0,0 +1,87 @@
+"""
+Fixtures shared by the unit tests.
+"""
+import importlib
+import sys
+from contextlib import contextmanager
+from types import ModuleType
+from unittest.mock import patch
+
+import pytest
+
+
+class FakeCursor:
+    """Cursor that records statements and returns scripted rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params=None):
+        self.executed.append((" ".join(sql.split()), params))
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        return self.rows.pop(0) if self.rows else []
+
+    def statements(self):
+        return [sql for sql, _ in self.executed]
+
+
+class FakeChatDatabase:
+    """Stands in for radbot.web.db.connection, so database code runs without PostgreSQL.
+
+    Queue the rows that ``fetchone``/``fetchall`` return, in order, with ``rows``.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self.cur = FakeCursor(self.rows)
+        self.commits = 0
+
+    def module(self):
+        module = ModuleType("radbot.web.db.connection")
+        module.CHAT_SCHEMA = "radbot_chathistory"
+        module.get_chat_db_connection = self._connection
+        module.get_chat_db_cursor = self._cursor
+        return module
+
+    @contextmanager
+    def _connection(self):
+        yield self
+
+    @contextmanager
+    def _cursor(self, conn, commit=False):
+        yield self.cur
+        if commit:
+            self.commits += 1
+
+    # psycopg2 connection interface used by the database modules
+    def cursor(self, cursor_factory=None):
+        return self.cur
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def chat_db():
+    """Fake chat history database; import database modules with ``chat_db.load``."""
+    db = FakeChatDatabase()
+    with patch.dict("sys.modules", {"radbot.web.db.connection": db.module()}):
+
+        def load(name):
+            # Import afresh so the module binds to the fake connection functions
+            sys.modules.pop(name, None)
+            return importlib.import_module(name)
+
+        db.load = load
+        yield db
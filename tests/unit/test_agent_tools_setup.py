@@ -0,0 +1,46 @@
+"""
+Unit tests for attaching the lazily built sub-agents to the root agent.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from radbot.agent import agent_tools_setup
+from radbot.callbacks.context_window import ContextWindowManager, install_context_window_manager
+
+
+def _agent(name, sub_agents=None):
+    return SimpleNamespace(name=name, before_model_callback=None, sub_agents=sub_agents or [],
+                           parent_agent=None)
+
+
+@pytest.fixture
+def sub_agents(monkeypatch):
+    built = (_agent("search_agent"), _agent("scout", [_agent("scout_helper")]))
+    monkeypatch.setattr(agent_tools_setup, "get_sub_agents", lambda: built)
+    return built
+
+
+def test_attached_sub_agents_get_the_context_window_manager(sub_agents):
+    root = _agent("beto")
+    manager = ContextWindowManager()
+    install_context_window_manager(root, manager)
+    original = root.sub_agents
+
+    agent_tools_setup.attach_sub_agents(root)
+
+    assert [a.name for a in root.sub_agents] == ["search_agent", "scout"]
+    assert all(a.parent_agent is root for a in root.sub_agents)
+    assert all(a.before_model_callback is manager for a in root.sub_agents)
+    assert sub_agents[1].sub_agents[0].before_model_callback is manager
+    # The list a running turn may be walking is left as it was
+    assert original == []
+
+
+def test_attaching_twice_does_not_duplicate(sub_agents):
+    root = _agent("beto")
+    agent_tools_setup.attach_sub_agents(root)
+    agent_tools_setup.attach_sub_agents(root)
+
+    assert [a.name for a in root.sub_agents] == ["search_agent", "scout"]
+    assert root.sub_agents[0].before_model_callback is None
@@ -0,0 +1,203 @@
+"""
+Unit tests for the chat history database operations.
+"""
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import psycopg2
+import psycopg2.extras
+import pytest
+
+SESSION_ID = "7d8e1a9c-2f4b-4c3d-9e5f-6a7b8c9d0e1f"
+
+
+@pytest.fixture
+def chat_operations(chat_db):
+    return chat_db.load("radbot.web.db.chat_operations")
+
+
+@pytest.fixture
+def inserts(monkeypatch):
+    calls = []
+
+    def execute_values(cursor, sql, rows, template=None, page_size=100, fetch=False):
+        calls.append({"sql": " ".join(sql.split()), "rows": rows, "template": template})
+
+    monkeypatch.setattr(psycopg2.extras, "execute_values", execute_values)
+    return calls
+
+
+class TestAddMessagesBulk:
+    def test_messages_are_written_with_one_insert(self, chat_operations, chat_db, inserts):
+        client_id = str(uuid.uuid4())
+        ids = chat_operations.add_messages_bulk(SESSION_ID, [
+            {"role": "user", "content": "book the ferry", "message_id": client_id},
+            {"role": "assistant", "content": "done", "agent_name": "beto", "metadata": {"k": 1}},
+        ])
+
+        (insert,) = inserts
+        assert "ON CONFLICT (message_id) DO NOTHING" in insert["sql"]
+        assert [row[0] for row in insert["rows"]] == ids
+        assert ids[0] == client_id
+        uuid.UUID(ids[1])
+        assert insert["rows"][1][2:7] == ("assistant", "done", "beto", None, '{"k": 1}')
+
+        statements = chat_db.cur.statements()
+        assert any("INSERT INTO radbot_chathistory.chat_sessions" in sql for sql in statements)
+        assert chat_db.commits == 1
+
+    def test_stored_messages_are_still_listed(self, chat_operations, inserts):
+        messages = [{"role": "user", "content": "hi", "message_id": str(uuid.uuid4())}]
+
+        first = chat_operations.add_messages_bulk(SESSION_ID, messages)
+        second = chat_operations.add_messages_bulk(SESSION_ID, messages)
+
+        # A resend is a no-op in the database but still reports the IDs
+        assert first == second == [messages[0]["message_id"]]
+
+    def test_invalid_session_id_writes_nothing(self, chat_operations, inserts):
+        assert chat_operations.add_messages_bulk("not-a-uuid", [{"role": "user", "content": "hi"}]) == []
+        assert inserts == []
+
+    def test_database_errors_return_no_ids(self, chat_operations, monkeypatch):
+        def execute_values(*args, **kwargs):
+            raise psycopg2.OperationalError("server closed the connection")
+
+        monkeypatch.setattr(psycopg2.extras, "execute_values", execute_values)
+        assert chat_operations.add_messages_bulk(SESSION_ID, [{"role": "user", "content": "hi"}]) == []
+
+
+class TestSplitSearchQuery:
+    @pytest.mark.parametrize("query, expected", [
+        ("ferry tickets", ("ferry tickets", "")),
+        ('"the ferry" tickts', ("tickts", '"the ferry"')),
+        ("ferry -bus or train", ("ferry train", "-bus")),
+        ('-"night bus" ferry', ("ferry", '-"night bus"')),
+        ('"unclosed phrase', ("", '"unclosed phrase"')),
+        ('"" ferry', ("ferry", "")),
+    ])
+    def test_loose_words_and_exact_parts(self, chat_operations, query, expected):
+        assert chat_operations.split_search_query(query) == expected
+
+
+class TestSearchMessages:
+    @pytest.fixture(autouse=True)
+    def trigram(self, chat_operations, monkeypatch):
+        monkeypatch.setattr(chat_operations, "_trigram_available", True)
+
+    def _search(self, chat_operations, chat_db, query, **kwargs):
+        chat_operations.search_messages(query, **kwargs)
+        return chat_db.cur.executed[-1]
+
+    def test_fuzzy_matches_still_need_phrases_and_exclusions(self, chat_operations, chat_db):
+        sql, params = self._search(chat_operations, chat_db, '"the ferry" -bus tickts')
+
+        assert "%(loose)s <%% m.content AND m.content_tsv @@ websearch_to_tsquery('english', %(exact)s)" in sql
+        assert params["loose"] == "tickts"
+        assert params["exact"] == '"the ferry" -bus'
+        assert params["query"] == '"the ferry" -bus tickts'
+
+    def test_phrase_only_queries_are_not_fuzzy(self, chat_operations, chat_db):
+        sql, params = self._search(chat_operations, chat_db, '"the ferry"')
+
+        assert "<%%" not in sql and "word_similarity" not in sql
+        assert "loose" not in params
+
+    def test_fuzzy_can_be_turned_off(self, chat_operations, chat_db):
+        sql, _ = self._search(chat_operations, chat_db, "tickts", fuzzy=False)
+        assert "<%%" not in sql
+
+    def test_results_page_on_score_and_message_id(self, chat_operations, chat_db):
+        message_id = uuid.uuid4()
+        chat_db.rows.append([{
+            "message_id": message_id, "session_id": uuid.UUID(SESSION_ID), "session_name": None,
+            "role": "user", "content": "the ferry", "agent_name": None,
+            "timestamp": datetime(2026, 1, 1, tzinfo=timezone.utc), "score": Decimal("0.100000"),
+            "snippet": "the **ferry**",
+        }])
+        (result,) = chat_operations.search_messages("ferry")
+        assert result["score"] == 0.1
+
+        sql, params = self._search(chat_operations, chat_db, "ferry",
+                                   after=chat_operations.search_cursor(result))
+
+        assert "round((" in sql and "::numeric, 6)" in sql
+        assert ", m.message_id) < (%(after_score)s::numeric, %(after_id)s::uuid)" in sql
+        assert "ORDER BY score DESC, m.message_id DESC" in sql
+        assert params["after_score"] == Decimal("0.1")
+        assert params["after_id"] == str(message_id)
+
+    def test_malformed_cursor_returns_nothing(self, chat_operations, chat_db):
+        cursor = chat_operations.encode_cursor("not-a-number", str(uuid.uuid4()))
+        assert chat_operations.search_messages("ferry", after=cursor) == []
+        assert chat_db.cur.executed == []
+
+
+class TestGetMessagesBySessionId:
+    @pytest.fixture(autouse=True)
+    def no_queue(self, chat_operations, monkeypatch):
+        monkeypatch.setattr(chat_operations, "get_write_behind_queue", lambda: None)
+
+    def _rows(self, *seconds):
+        return [{
+            "message_id": uuid.UUID(int=s), "session_id": uuid.UUID(SESSION_ID), "role": "user",
+            "content": f"message {s}", "agent_name": None, "user_id": None, "metadata": None,
+            "timestamp": datetime(2026, 1, 1, 0, 0, s, tzinfo=timezone.utc),
+        } for s in seconds]
+
+    def test_newest_page_is_read_backwards_and_returned_oldest_first(self, chat_operations, chat_db):
+        chat_db.rows.append(self._rows(5, 4))
+
+        messages = chat_operations.get_messages_by_session_id(SESSION_ID, limit=2, newest=True)
+
+        sql, params = chat_db.cur.executed[0]
+        assert "ORDER BY timestamp DESC, message_id DESC LIMIT %s" in sql
+        assert params[-1] == 2
+        assert [m["content"] for m in messages] == ["message 4", "message 5"]
+
+    def test_before_cursor_pages_towards_older_messages(self, chat_operations, chat_db):
+        chat_db.rows.append(self._rows(4, 5))
+        oldest = chat_operations.get_messages_by_session_id(SESSION_ID, limit=2)[0]
+        cursor = chat_operations.message_cursor(oldest)
+
+        chat_db.rows.append(self._rows(3, 2))
+        messages = chat_operations.get_messages_by_session_id(SESSION_ID, limit=2, before=cursor)
+
+        sql, params = chat_db.cur.executed[-1]
+        assert "AND (timestamp, message_id) < (%s::timestamptz, %s::uuid)" in sql
+        assert "ORDER BY timestamp DESC" in sql
+        assert params[1:3] == (oldest["timestamp"], oldest["message_id"])
+        assert [m["content"] for m in messages] == ["message 2", "message 3"]
+
+    def test_after_cursor_pages_towards_newer_messages(self, chat_operations, chat_db):
+        cursor = chat_operations.encode_cursor("2026-01-01T00:00:03+00:00", str(uuid.UUID(int=3)))
+        chat_db.rows.append(self._rows(4, 5))
+
+        messages = chat_operations.get_messages_by_session_id(SESSION_ID, limit=2, after=cursor)
+
+        sql, _ = chat_db.cur.executed[0]
+        assert "AND (timestamp, message_id) > (%s::timestamptz, %s::uuid)" in sql
+        assert "ORDER BY timestamp ASC, message_id ASC" in sql
+        assert [m["content"] for m in messages] == ["message 4", "message 5"]
+
+    def test_malformed_cursor_returns_nothing(self, chat_operations, chat_db):
+        assert chat_operations.get_messages_by_session_id(SESSION_ID, before="not a cursor") == []
+        assert chat_db.cur.executed == []
+
+    def test_queued_messages_are_read_while_the_database_is_down(self, chat_operations, chat_db,
+                                                                  monkeypatch):
+        queue = chat_operations.WriteBehindQueue(lambda *args: None, flush_interval=60, spill_file=None)
+        monkeypatch.setattr(chat_operations, "get_write_behind_queue", lambda: queue)
+        ids = queue.enqueue(SESSION_ID, [{"role": "user", "content": f"queued {i}"} for i in range(3)])
+
+        def execute(sql, params=None):
+            raise psycopg2.OperationalError("could not connect to server")
+
+        monkeypatch.setattr(chat_db.cur, "execute", execute)
+        messages = chat_operations.get_messages_by_session_id(SESSION_ID, limit=2, newest=True)
+        assert [m["message_id"] for m in messages] == ids[1:]
+
+        cursor = chat_operations.message_cursor(messages[0])
+        older = chat_operations.get_messages_by_session_id(SESSION_ID, limit=2, before=cursor)
+        assert [m["message_id"] for m in older] == ids[:1]
@@ -0,0 +1,49 @@
+"""
+Unit tests for the chat history search tool.
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from radbot.tools.memory.chat_search_tools import search_chat_history
+
+
+@pytest.fixture
+def search_messages(chat_db, monkeypatch):
+    chat_operations = chat_db.load("radbot.web.db.chat_operations")
+    search = MagicMock(return_value=[])
+    monkeypatch.setattr(chat_operations, "search_messages", search)
+    return search
+
+
+def _result(content):
+    return {
+        "message_id": "m1",
+        "session_id": "s1",
+        "session_name": "Trip planning",
+        "role": "user",
+        "agent_name": None,
+        "timestamp": "2026-01-01T10:00:00+00:00",
+        "score": 0.5,
+        "snippet": "book the **ferry** to the island",
+        "content": content,
+    }
+
+
+def test_results_are_formatted_for_the_agent(search_messages):
+    search_messages.return_value = [_result("x" * 2000)]
+    response = search_chat_history('"the ferry"', max_results=3)
+
+    assert response["status"] == "success"
+    (result,) = response["results"]
+    assert result["snippet"] == "book the **ferry** to the island"
+    assert len(result["content"]) == 500
+    search_messages.assert_called_once_with('"the ferry"', session_id=None, limit=3, html=False)
+
+
+def test_database_errors_are_reported(search_messages):
+    search_messages.side_effect = RuntimeError("connection refused")
+    response = search_chat_history("ferry")
+
+    assert response["status"] == "error"
+    assert "connection refused" in response["error_message"]
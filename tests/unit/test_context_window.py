@@ -0,0 +1,202 @@
+"""
+Unit tests for the token-budget-aware context window manager.
+"""
+from types import SimpleNamespace
+
+from google.genai import types
+
+from radbot.callbacks.context_window import (
+    ContextWindowManager,
+    SUMMARY_HEADER,
+    SUMMARY_STATE_PREFIX,
+    estimate_content_tokens,
+    estimate_text_tokens,
+    install_context_window_manager,
+    split_turns,
+)
+
+
+def _text(role, text):
+    return types.Content(role=role, parts=[types.Part(text=text)])
+
+
+def _tool_call(name):
+    return types.Content(role="model", parts=[
+        types.Part(function_call=types.FunctionCall(name=name, args={"q": "x"}))
+    ])
+
+
+def _tool_response(name, payload):
+    return types.Content(role="user", parts=[
+        types.Part(function_response=types.FunctionResponse(name=name, response={"result": payload}))
+    ])
+
+
+def _conversation(turns, size=400, start=0):
+    contents = []
+    for i in range(start, start + turns):
+        contents.append(_text("user", f"question {i} " + "q" * size))
+        contents.append(_text("model", f"answer {i} " + "a" * size))
+    return contents
+
+
+def _request(contents, model="gemini-2.0-flash"):
+    return SimpleNamespace(model=model, contents=contents,
+                           config=SimpleNamespace(system_instruction="Be helpful.", tools=None))
+
+
+def _context(agent_name="beto"):
+    return SimpleNamespace(agent_name=agent_name, state={})
+
+
+class TestSplitTurns:
+    def test_tool_calls_stay_with_their_turn(self):
+        contents = [
+            _text("user", "first"),
+            _tool_call("search"),
+            _tool_response("search", "found"),
+            _text("model", "done"),
+            _text("user", "second"),
+        ]
+        turns = split_turns(contents)
+        assert len(turns) == 2
+        assert len(turns[0]) == 4
+        assert turns[1][0].parts[0].text == "second"
+
+
+class TestContextWindowManager:
+    def test_small_request_is_untouched(self):
+        contents = _conversation(2, size=10)
+        request = _request(list(contents))
+        ContextWindowManager(default_budget=10000)(_context(), request)
+        assert request.contents == contents
+
+    def test_large_request_is_trimmed_to_budget(self):
+        contents = _conversation(50)
+        contents.append(_text("user", "latest question"))
+        request = _request(list(contents))
+        manager = ContextWindowManager(default_budget=2000, summary_max_chars=100000)
+        context = _context()
+
+        manager(context, request)
+
+        kept_tokens = sum(estimate_content_tokens(c) for c in request.contents)
+        assert kept_tokens < sum(estimate_content_tokens(c) for c in contents)
+        assert request.contents[-1].parts[-1].text == "latest question"
+        assert request.contents[0].parts[0].text.startswith(SUMMARY_HEADER)
+        assert "question 0" in context.state[SUMMARY_STATE_PREFIX + "beto"]["text"]
+
+    def test_summary_is_merged_into_the_first_kept_user_message(self):
+        contents = _conversation(50)
+        request = _request(list(contents))
+        ContextWindowManager(default_budget=2000)(_context(), request)
+
+        first, second = request.contents[:2]
+        assert first.role == "user" and second.role == "model"
+        assert len(first.parts) == 2
+        assert first.parts[1].text.startswith("question ")
+        # The session's own content isn't modified
+        assert all(len(c.parts) == 1 for c in contents)
+
+    def test_summary_counts_against_the_budget(self):
+        budget = 2000
+        request = _request(_conversation(50))
+        ContextWindowManager(default_budget=budget, summary_max_chars=100000)(_context(), request)
+
+        fixed = estimate_text_tokens("Be helpful.")
+        assert fixed + sum(estimate_content_tokens(c) for c in request.contents) <= budget
+
+    def test_current_turn_is_never_evicted(self):
+        contents = [
+            _text("user", "run the tool"),
+            _tool_call("read_file"),
+            _tool_response("read_file", "x" * 50000),
+        ]
+        request = _request(list(contents))
+        ContextWindowManager(default_budget=1000)(_context(), request)
+        assert request.contents == contents
+
+    def test_summary_rolls_forward_without_duplicates(self):
+        manager = ContextWindowManager(default_budget=2000, summary_max_chars=100000)
+        context = _context()
+        contents = _conversation(20)
+
+        manager(context, _request(list(contents)))
+        first = context.state[SUMMARY_STATE_PREFIX + "beto"]["text"]
+
+        contents += _conversation(5, start=20)
+        manager(context, _request(list(contents)))
+        second = context.state[SUMMARY_STATE_PREFIX + "beto"]["text"]
+
+        assert second.startswith(first)
+        assert second.count("question 0 ") == 1
+
+    def test_fewer_evicted_turns_do_not_duplicate_the_summary(self):
+        manager = ContextWindowManager(default_budget=2000, summary_max_chars=100000)
+        context = _context()
+        contents = _conversation(20)
+        manager(context, _request(list(contents)))
+
+        # A bigger budget evicts fewer turns than the summary already covers
+        manager.default_budget = 4000
+        manager(context, _request(list(contents)))
+        manager.default_budget = 2000
+        contents += _conversation(5, start=20)
+        manager(context, _request(list(contents)))
+
+        summary = context.state[SUMMARY_STATE_PREFIX + "beto"]["text"]
+        for i in range(5):
+            assert summary.count(f"question {i} ") == 1
+
+    def test_repeated_short_turns_are_told_apart(self):
+        manager = ContextWindowManager(default_budget=300, summary_max_chars=100000)
+        context = _context()
+        contents = []
+        for i in range(10):
+            contents += [_text("user", "ok"), _text("model", f"reply {i} " + "r" * 200)]
+        manager(context, _request(list(contents)))
+        contents += [_text("user", "ok"), _text("model", "reply 10 " + "r" * 200)]
+        manager(context, _request(list(contents)))
+
+        summary = context.state[SUMMARY_STATE_PREFIX + "beto"]["text"]
+        assert summary.count("reply 0 ") == 1
+        assert "reply 8 " in summary
+
+    def test_summary_is_capped(self):
+        manager = ContextWindowManager(default_budget=2000, summary_max_chars=1000)
+        context = _context()
+        manager(context, _request(_conversation(50)))
+        summary = context.state[SUMMARY_STATE_PREFIX + "beto"]["text"]
+        assert len(summary) <= 1000
+        assert summary.startswith("- User:")
+
+    def test_per_model_budget(self):
+        manager = ContextWindowManager(budgets={"gemini-2.5-pro": 64000}, default_budget=8000)
+        assert manager.get_budget("gemini-2.5-pro") == 64000
+        assert manager.get_budget("gemini-2.5-pro-preview-05-06") == 64000
+        assert manager.get_budget("gemini-2.0-flash") == 8000
+
+
+class TestInstall:
+    def test_runs_before_existing_callback(self):
+        calls = []
+
+        def existing(callback_context, llm_request):
+            calls.append(len(llm_request.contents))
+            return None
+
+        sub_agent = SimpleNamespace(name="scout", before_model_callback=None, sub_agents=[])
+        root = SimpleNamespace(name="beto", before_model_callback=existing, sub_agents=[sub_agent])
+        manager = ContextWindowManager(default_budget=2000)
+
+        assert install_context_window_manager(root, manager) == 2
+        assert sub_agent.before_model_callback is manager
+
+        contents = _conversation(50)
+        root.before_model_callback(callback_context=_context(), llm_request=_request(contents))
+        assert calls and calls[0] < len(contents)
+
+        # Installing twice doesn't stack the manager
+        chained = root.before_model_callback
+        install_context_window_manager(root, manager)
+        assert root.before_model_callback is chained
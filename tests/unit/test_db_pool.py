@@ -0,0 +1,135 @@
+"""
+Unit tests for the shared database pool.
+"""
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+import pytest
+
+from radbot.db import pool as db_pool
+from radbot.db.pool import DatabasePool, PoolTimeoutError, run_db
+
+
+class FakeConnection:
+    def __init__(self, healthy=True):
+        self.closed = 0
+        self.healthy = healthy
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def cursor(self):
+        cursor = MagicMock()
+        cursor.__enter__.return_value = cursor
+        if not self.healthy:
+            cursor.execute.side_effect = psycopg2.OperationalError("server closed the connection")
+        return cursor
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def get_transaction_status(self):
+        return self.status
+
+
+class FakeThreadedPool:
+    def __init__(self, minconn, maxconn, **kwargs):
+        self.available = []
+        self.closed_conns = []
+
+    def getconn(self):
+        return self.available.pop() if self.available else FakeConnection()
+
+    def putconn(self, conn, close=False):
+        if close:
+            self.closed_conns.append(conn)
+        else:
+            self.available.append(conn)
+
+    def closeall(self):
+        pass
+
+
+@pytest.fixture
+def make_pool():
+    with patch.object(db_pool.psycopg2.pool, "ThreadedConnectionPool", FakeThreadedPool):
+        def make(**kwargs):
+            return DatabasePool("test", {"database": "radbot"}, **kwargs)
+        yield make
+
+
+class TestDatabasePool:
+    def test_connections_are_reused(self, make_pool):
+        pool = make_pool()
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        assert first is second
+        metrics = pool.metrics()
+        assert metrics["checkouts"] == 2
+        assert metrics["in_use"] == 0
+
+    def test_checkout_waits_then_times_out(self, make_pool):
+        pool = make_pool(max_connections=1, checkout_timeout=0.05)
+        with pool.connection():
+            with pytest.raises(PoolTimeoutError):
+                with pool.connection():
+                    pass
+        assert pool.metrics()["checkout_timeouts"] == 1
+
+        # A waiting caller gets the connection once it is returned
+        pool.checkout_timeout = 2
+        release = threading.Event()
+        done = []
+
+        def holder():
+            with pool.connection():
+                release.wait()
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+
+        def waiter_target():
+            with pool.connection() as conn:
+                done.append(conn)
+
+        waiter = threading.Thread(target=waiter_target)
+        waiter.start()
+        release.set()
+        thread.join()
+        waiter.join(timeout=2)
+        assert done
+
+    def test_unhealthy_idle_connection_is_replaced(self, make_pool):
+        pool = make_pool(health_check_interval=0)
+        broken = FakeConnection(healthy=False)
+        pool._get_pool().available.append(broken)
+
+        with pool.connection() as conn:
+            assert conn is not broken
+        assert pool._pool.closed_conns == [broken]
+        assert pool.metrics()["connections_replaced"] == 1
+
+    def test_open_transaction_is_rolled_back_on_return(self, make_pool):
+        pool = make_pool()
+        with pool.connection() as conn:
+            rollbacks = conn.rollbacks
+            conn.status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        assert conn.rollbacks == rollbacks + 1
+
+    def test_health_check_reports_failure(self, make_pool):
+        pool = make_pool(max_connections=1, checkout_timeout=0)
+        assert pool.health_check()["healthy"]
+        with pool.connection():
+            result = pool.health_check()
+        assert not result["healthy"]
+        assert "No connection available" in result["error"]
+
+
+def test_run_db_runs_off_the_event_loop():
+    loop_thread = threading.get_ident()
+    worker_thread = asyncio.run(run_db(threading.get_ident))
+    assert worker_thread != loop_thread
@@ -0,0 +1,131 @@
+"""
+Unit tests for the web UI event store.
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from radbot.web.api.event_store import EventStore
+
+
+def _event(i, type_="tool_call"):
+    return {"type": type_, "summary": f"event {i}", "timestamp": f"2025-01-01 00:00:{i:02d}.000"}
+
+
+class TestEventStore:
+    def test_duplicates_are_skipped(self):
+        store = EventStore()
+        assert store.add_event("s1", _event(1)) is not None
+        assert store.add_event("s1", _event(1)) is None
+        assert store.add_event("s2", _event(1)) is not None
+        assert len(store.get_events("s1")) == 1
+
+    def test_events_get_sequence_numbers_and_since_cursor(self):
+        store = EventStore()
+        for i in range(5):
+            store.add_event("s1", _event(i))
+
+        events = store.get_events("s1")
+        assert [e["seq"] for e in events] == [1, 2, 3, 4, 5]
+        assert [e["seq"] for e in store.get_events("s1", since=3)] == [4, 5]
+        assert [e["seq"] for e in store.get_events("s1", since=1, limit=2)] == [2, 3]
+
+    def test_get_event_by_id(self):
+        store = EventStore(max_events_per_session=2)
+        for i in range(3):
+            store.add_event("s1", dict(_event(i), event_id=f"e{i}"))
+
+        assert store.get_event("s1", "e2")["seq"] == 3
+        # Evicted and unknown events are not found
+        assert store.get_event("s1", "e0") is None
+        assert store.get_event("s2", "e2") is None
+
+    def test_buffer_is_bounded(self):
+        store = EventStore(max_events_per_session=3)
+        for i in range(10):
+            store.add_event("s1", _event(i))
+
+        events = store.get_events("s1")
+        assert [e["seq"] for e in events] == [8, 9, 10]
+        # An evicted event is no longer considered a duplicate
+        assert store.add_event("s1", _event(0)) is not None
+
+    def test_least_recently_used_sessions_are_dropped(self):
+        store = EventStore(max_sessions=2)
+        store.add_event("s1", _event(1))
+        store.add_event("s2", _event(1))
+        store.get_events("s1")
+        store.add_event("s3", _event(1))
+
+        assert store.get_events("s2") == []
+        assert len(store.get_events("s1")) == 1
+
+    def test_evicted_events_are_spilled(self):
+        saved = {}
+
+        def save_events(session_id, events):
+            saved.setdefault(session_id, []).extend(events)
+            return True
+
+        def get_events(session_id, since=0, before=None, limit=None):
+            rows = [e for e in saved.get(session_id, []) if e["seq"] > since and (before is None or e["seq"] < before)]
+            return rows[:limit] if limit else rows
+
+        fake_operations = SimpleNamespace(save_events=save_events, get_events=get_events,
+                                          get_last_seq=lambda session_id: 0)
+        with patch.dict("sys.modules", {"radbot.web.db.event_operations": fake_operations}):
+            store = EventStore(max_events_per_session=3, spill=True)
+            for i in range(10):
+                store.add_event("s1", _event(i))
+
+            assert [e["seq"] for e in saved["s1"]] == [1, 2, 3, 4, 5, 6, 7]
+            assert [e["seq"] for e in store.get_events("s1")] == list(range(1, 11))
+            assert [e["seq"] for e in store.get_events("s1", since=5, limit=3)] == [6, 7, 8]
+
+    def test_evicted_events_are_found_by_id_in_the_database(self):
+        saved = {}
+
+        def save_events(session_id, events):
+            saved.setdefault(session_id, []).extend(events)
+            return True
+
+        def get_event(session_id, event_id):
+            return next((e for e in saved.get(session_id, []) if e.get("event_id") == event_id), None)
+
+        fake_operations = SimpleNamespace(save_events=save_events, get_event=get_event,
+                                          get_last_seq=lambda session_id: 0)
+        with patch.dict("sys.modules", {"radbot.web.db.event_operations": fake_operations}):
+            store = EventStore(max_events_per_session=2, spill=True)
+            for i in range(3):
+                store.add_event("s1", dict(_event(i), event_id=f"e{i}"))
+
+            assert store.get_event("s1", "e0")["seq"] == 1
+            assert store.get_event("s1", "e2")["seq"] == 3
+            assert store.get_event("s1", "missing") is None
+
+    def test_sequence_continues_after_a_session_is_dropped(self):
+        store = EventStore(max_sessions=1)
+        for i in range(3):
+            store.add_event("s1", _event(i))
+        store.drop_session("s1")
+        store.add_event("s1", _event(3))
+
+        # A client holding cursor 3 still sees the new event
+        assert [e["seq"] for e in store.get_events("s1", since=3)] == [4]
+
+        store.add_event("s2", _event(0))  # evicts s1
+        store.add_event("s1", _event(4))
+        assert [e["seq"] for e in store.get_events("s1", since=4)] == [6]
+
+    def test_stored_sequence_is_read_outside_the_lock(self):
+        def get_last_seq(session_id):
+            assert not store._lock.locked()
+            return 41
+
+        fake_operations = SimpleNamespace(save_events=lambda session_id, events: True,
+                                          get_last_seq=get_last_seq)
+        with patch.dict("sys.modules", {"radbot.web.db.event_operations": fake_operations}):
+            store = EventStore(spill=True)
+            store.add_event("s1", _event(1))
+            store.add_event("s1", _event(2))
+
+        assert [e["seq"] for e in store.get_events("s1", since=41)] == [42, 43]
@@ -0,0 +1,51 @@
+"""
+Unit tests for the web UI event wire format.
+"""
+from radbot.web.api.event_wire import WIRE_COMPACT, WIRE_FULL, encode_events, truncate_event_text
+
+
+def _tool_event(output):
+    return {
+        "event_id": "e1",
+        "type": "tool_call",
+        "category": "tool_call",
+        "summary": "Tool Response: read_file",
+        "tool_name": "read_file",
+        "output": output,
+        "details": {"model": "gemini-2.5-pro", "raw": "x" * 5000},
+    }
+
+
+class TestEventWire:
+    def test_text_is_truncated_in_place(self):
+        event = {"type": "model_response", "text": "a" * 200}
+        assert truncate_event_text(event, max_chars=100) is event
+        assert event["text"].startswith("a" * 100 + "\n\n[Message truncated")
+        assert event["truncated"]
+
+        short = {"type": "model_response", "text": "short"}
+        truncate_event_text(short, max_chars=100)
+        assert short == {"type": "model_response", "text": "short"}
+
+    def test_compact_format_shortens_keys_and_defers_bulky_fields(self):
+        event = _tool_event("y" * 10000)
+        [encoded] = encode_events([event], WIRE_COMPACT, inline_chars=4096)
+
+        assert encoded["id"] == "e1"
+        assert encoded["n"] == "read_file"
+        assert "o" not in encoded
+        assert encoded["lz"]["o"] == 10000
+        # Details the UI reads outside the detail view stay inline
+        assert encoded["d"] == {"model": "gemini-2.5-pro"}
+        assert "d" in encoded["lz"]
+        # The stored event is untouched
+        assert event["output"] == "y" * 10000
+
+    def test_small_fields_stay_inline(self):
+        [encoded] = encode_events([_tool_event({"status": "ok"})], WIRE_COMPACT, inline_chars=8192)
+        assert encoded["o"] == {"status": "ok"}
+        assert "lz" not in encoded
+
+    def test_full_format_sends_events_unchanged(self):
+        events = [_tool_event("y" * 10000)]
+        assert encode_events(events, WIRE_FULL) is events
@@ -0,0 +1,126 @@
+"""
+Unit tests for the multiplexed JSON-RPC stdio transport.
+"""
+import asyncio
+import sys
+import time
+
+import pytest
+
+from radbot.tools.mcp.jsonrpc_transport import JSONRPCError, StdioJSONRPCTransport
+
+# A server that answers each request from its own thread, after the requested delay
+SERVER = r'''
+import json, sys, threading, time
+lock = threading.Lock()
+def send(message):
+    with lock:
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+def handle(request):
+    params = request.get("params") or {}
+    if request["method"] == "touch":
+        send({"jsonrpc": "2.0", "id": request["id"], "result": "touched"})
+    elif request["method"] == "sleep":
+        time.sleep(params["seconds"])
+        send({"jsonrpc": "2.0", "id": request["id"], "result": params["seconds"]})
+    else:
+        send({"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32601, "message": "Method not found"}})
+for line in sys.stdin:
+    message = json.loads(line)
+    if "id" not in message:
+        send({"jsonrpc": "2.0", "method": "notifications/echo", "params": message})
+        continue
+    if message["method"] == "touch":
+        send({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
+    threading.Thread(target=handle, args=(message,), daemon=True).start()
+'''
+
+
+@pytest.fixture
+def server_script(tmp_path):
+    path = tmp_path / "server.py"
+    path.write_text(SERVER)
+    return str(path)
+
+
+def test_concurrent_requests_are_matched_by_id(server_script):
+    async def run():
+        transport = StdioJSONRPCTransport(sys.executable, [server_script], timeout=10)
+        await transport.start()
+        try:
+            start = time.monotonic()
+            results = await asyncio.gather(
+                transport.request("sleep", {"seconds": 0.6}),
+                transport.request("sleep", {"seconds": 0.1}),
+                transport.request("sleep", {"seconds": 0.3}),
+            )
+            elapsed = time.monotonic() - start
+            with pytest.raises(JSONRPCError) as error:
+                await transport.request("missing")
+            return results, elapsed, error.value.code
+        finally:
+            await transport.close()
+
+    results, elapsed, code = asyncio.run(run())
+    assert results == [0.6, 0.1, 0.3]
+    assert elapsed < 0.9
+    assert code == -32601
+
+
+def test_timeout_withdraws_request_and_notifications_reach_handlers(server_script):
+    async def run():
+        transport = StdioJSONRPCTransport(sys.executable, [server_script], timeout=10)
+        received = []
+        transport.on_notification("notifications/echo", lambda method, params: received.append(params))
+        await transport.start()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await transport.request("sleep", {"seconds": 1}, timeout=0.1)
+            assert transport.pending_count == 0
+            # The server still answers later requests
+            assert await transport.request("sleep", {"seconds": 0}) == 0
+            return received
+        finally:
+            await transport.close()
+
+    received = asyncio.run(run())
+    assert received and received[0]["method"] == "notifications/cancelled"
+
+
+def test_pending_requests_fail_when_server_exits(tmp_path):
+    async def run():
+        transport = StdioJSONRPCTransport(sys.executable, ["-c", "import sys; sys.stdin.readline()"])
+        await transport.start()
+        try:
+            with pytest.raises(ConnectionError):
+                await transport.request("sleep", {"seconds": 1})
+            assert transport.closed
+        finally:
+            await transport.close()
+
+    asyncio.run(run())
+
+
+def test_notification_handler_can_send_requests(server_script):
+    async def run():
+        transport = StdioJSONRPCTransport(sys.executable, [server_script], timeout=2)
+        reloaded = asyncio.Event()
+
+        async def on_tools_changed(method, params):
+            # Like MCPStdioClient._on_tools_changed: its response comes through the reader
+            await transport.request("sleep", {"seconds": 0})
+            reloaded.set()
+
+        transport.on_notification("notifications/tools/list_changed", on_tools_changed)
+        await transport.start()
+        try:
+            start = time.monotonic()
+            assert await transport.request("touch") == "touched"
+            assert await transport.request("sleep", {"seconds": 0.1}) == 0.1
+            await asyncio.wait_for(reloaded.wait(), 1)
+            return time.monotonic() - start
+        finally:
+            await transport.close()
+
+    assert asyncio.run(run()) < 1
@@ -0,0 +1,119 @@
+"""
+Unit tests for the MCP I/O loop and the SSE client running on it.
+"""
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from radbot.tools.mcp.io_loop import MCPIOLoop
+
+
+@pytest.fixture
+def io_loop():
+    io_loop = MCPIOLoop(name="mcp-io-test")
+    yield io_loop
+    io_loop.close()
+
+
+class TestMCPIOLoop:
+    def test_coroutines_run_on_the_loop_thread(self, io_loop):
+        async def where():
+            return threading.current_thread().name
+
+        assert io_loop.run(where()) == "mcp-io-test"
+        assert io_loop.submit(where()).result(5) == "mcp-io-test"
+        assert asyncio.run(io_loop.run_async(where())) == "mcp-io-test"
+
+    def test_timeout_cancels_the_coroutine(self, io_loop):
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(concurrent.futures.TimeoutError):
+            io_loop.run(slow(), timeout=0.1)
+        assert cancelled.wait(5)
+
+    def test_run_from_the_loop_itself_is_refused(self, io_loop):
+        async def nested():
+            async def inner():
+                return 1
+            with pytest.raises(RuntimeError):
+                io_loop.run(inner())
+            return await io_loop.run_async(inner())
+
+        assert io_loop.run(nested()) == 1
+
+
+class FakeSession:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.pings = 0
+
+    async def call_tool(self, name, args):
+        if self.fail:
+            raise ConnectionError("session closed")
+        return {"tool": name, "args": args, "thread": threading.current_thread().name}
+
+    async def send_ping(self):
+        self.pings += 1
+
+
+@pytest.fixture
+def sse_client():
+    pytest.importorskip("mcp")
+    from radbot.tools.mcp.client import MCPSSEClient
+
+    client = MCPSSEClient("http://mcp.example/sse")
+    yield client
+    client.session = None
+
+
+class TestMCPSSEClient:
+    def test_call_tool_returns_the_result(self, sse_client):
+        sse_client.session = FakeSession()
+
+        result = sse_client.call_tool("echo", {"text": "hi"})
+        assert result["args"] == {"text": "hi"}
+        assert result["thread"] == "mcp-io"
+        assert sse_client.submit_tool_call("echo", {}).result(5)["tool"] == "echo"
+        assert asyncio.run(sse_client.call_tool_async("echo", {}))["tool"] == "echo"
+
+    def test_session_failure_falls_back_to_http(self, sse_client, monkeypatch):
+        sse_client.session = FakeSession(fail=True)
+        assert "session closed" in sse_client.call_tool("echo", {})["message"]
+
+        async def call_http(tool_name, args):
+            return {"via": "http", "tool": tool_name}
+
+        sse_client.message_endpoint = "http://mcp.example/messages/"
+        monkeypatch.setattr(sse_client, "_call_tool_http", call_http)
+        assert sse_client.call_tool("echo", {}) == {"via": "http", "tool": "echo"}
+
+    def test_ping(self, sse_client, monkeypatch):
+        assert not sse_client.ping()
+
+        sse_client.session = FakeSession()
+        assert sse_client.ping()
+        assert sse_client.session.pings == 1
+
+        # Clients initialized over direct HTTP have no session; ping the message endpoint
+        sse_client.session = None
+        sse_client.initialized = True
+        sse_client.message_endpoint = "http://mcp.example/messages/"
+        pinged = []
+
+        async def ping_http():
+            pinged.append(True)
+
+        monkeypatch.setattr(sse_client, "_ping_http", ping_http)
+        assert sse_client.ping()
+        assert pinged == [True]
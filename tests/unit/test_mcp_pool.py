@@ -0,0 +1,157 @@
+"""
+Unit tests for the supervised MCP client pool.
+"""
+import asyncio
+import itertools
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.tools.base_tool import BaseTool
+
+from radbot.tools.mcp.mcp_pool import MCPServerPool
+
+
+class FakeTool(BaseTool):
+    def __init__(self, client):
+        super().__init__(name="echo", description="Echo the client number")
+        self.client = client
+
+    def _get_declaration(self):
+        return "live"
+
+    async def run_async(self, *, args, tool_context):
+        if not self.client.alive:
+            raise ConnectionError("server process exited")
+        await asyncio.sleep(args.get("delay", 0))
+        return {"client": self.client.number}
+
+
+class FakeClient:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.tools = [FakeTool(self)]
+
+    def ping(self):
+        return self.alive
+
+    def stop(self):
+        self.alive = False
+
+
+@pytest.fixture
+def pool():
+    numbers = itertools.count()
+    clients = []
+
+    def create():
+        client = FakeClient(next(numbers))
+        clients.append(client)
+        return client
+
+    pool = MCPServerPool("fake", create, size=2, health_check_interval=0.05)
+    pool.clients = clients
+    pool.start()
+    deadline = time.monotonic() + 5
+    while pool.metrics()["healthy"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield pool
+    pool.close()
+
+
+def test_calls_go_to_the_least_busy_client(pool):
+    tool = pool.get_tools()[0]
+
+    async def run():
+        return await asyncio.gather(*[
+            tool.run_async(args={"delay": 0.1}, tool_context=None) for _ in range(4)
+        ])
+
+    results = asyncio.run(run())
+    assert sorted(r["client"] for r in results) == [0, 0, 1, 1]
+    assert pool.metrics()["calls"] == 4
+
+
+def test_crashed_client_is_bypassed_and_restarted(pool):
+    tool = pool.get_tools()[0]
+    pool.clients[0].alive = False
+
+    results = [asyncio.run(tool.run_async(args={}, tool_context=None)) for _ in range(3)]
+    assert results[0]["client"] == 1
+    assert all(r["client"] != 0 for r in results)
+
+    deadline = time.monotonic() + 5
+    while pool.metrics()["restarts"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    metrics = pool.metrics()
+    assert metrics["restarts"] == 1
+    assert metrics["healthy"] == 2
+    assert asyncio.run(tool.run_async(args={}, tool_context=None))["client"] in (1, 2)
+
+
+def test_cached_declarations_serve_tools_until_the_server_is_up():
+    started = []
+
+    def create():
+        client = FakeClient(len(started))
+        started.append(client)
+        return client
+
+    pool = MCPServerPool("fake", create, size=1, health_check_interval=60,
+                         cached_declarations={"echo": "cached", "old_tool": "cached"})
+    # Not started yet: tools come from the cache
+    assert sorted(tool.name for tool in pool.get_tools()) == ["echo", "old_tool"]
+    assert pool.get_declaration("echo") == "cached"
+
+    pool.start(background=True)
+    try:
+        tool = [t for t in pool.get_tools() if t.name == "echo"][0]
+        assert asyncio.run(tool.run_async(args={}, tool_context=None)) == {"client": 0}
+        # The live server no longer has old_tool; its cached declaration is dropped
+        assert pool.get_declaration("old_tool") is None
+        assert pool.get_declaration("echo") == "live"
+    finally:
+        pool.close()
+
+
+def test_starting_one_server_does_not_block_other_pools(monkeypatch):
+    from radbot.tools.mcp import schema_cache
+    from radbot.tools.mcp.mcp_client_factory import MCPClientFactory, config_loader
+
+    release = threading.Event()
+    slow_started = threading.Event()
+
+    def create_client(server_config):
+        if server_config["id"] == "slow":
+            slow_started.set()
+            release.wait(5)
+        return FakeClient(0)
+
+    monkeypatch.setattr(config_loader, "get_mcp_server", lambda server_id: {"id": server_id})
+    monkeypatch.setattr(schema_cache, "get_schema_cache", lambda: None)
+    monkeypatch.setattr(MCPClientFactory, "create_client", staticmethod(create_client))
+    monkeypatch.setattr(MCPClientFactory, "_pools", {})
+
+    slow = threading.Thread(target=MCPClientFactory.get_pool, args=("slow",))
+    slow.start()
+    try:
+        assert slow_started.wait(5)
+        pools = {}
+        fast = threading.Thread(target=lambda: pools.update(
+            fast=MCPClientFactory.get_pool("fast"), metrics=MCPClientFactory.get_pool_metrics()))
+        fast.start()
+        fast.join(2)
+
+        # Done while the slow server is still starting
+        assert not fast.is_alive() and slow.is_alive()
+        assert pools["fast"].metrics()["healthy"] == 1
+        assert set(pools["metrics"]) == {"slow", "fast"}
+    finally:
+        release.set()
+        slow.join(5)
+        MCPClientFactory.clear_cache()
+    assert not slow.is_alive()
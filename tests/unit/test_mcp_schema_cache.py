@@ -0,0 +1,33 @@
+"""
+Unit tests for the MCP tool schema cache.
+"""
+from radbot.tools.mcp.schema_cache import MCPSchemaCache, config_hash
+
+SERVER = {"id": "crawl4ai", "transport": "sse", "url": "http://localhost:11235/mcp/sse"}
+TOOLS = {"crawl": {"name": "crawl", "description": "Crawl a page"}}
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = MCPSchemaCache(path)
+    assert cache.put("crawl4ai", config_hash(SERVER), TOOLS, "1.2.0")
+    assert not cache.put("crawl4ai", config_hash(SERVER), TOOLS, "1.2.0")
+
+    entry = MCPSchemaCache(path).get("crawl4ai", config_hash(SERVER))
+    assert entry["tools"] == TOOLS
+    assert entry["server_version"] == "1.2.0"
+
+
+def test_changed_config_misses(tmp_path):
+    cache = MCPSchemaCache(str(tmp_path / "cache.json"))
+    cache.put("crawl4ai", config_hash(SERVER), TOOLS)
+    assert cache.get("crawl4ai", config_hash(dict(SERVER, url="http://other:11235/mcp/sse"))) is None
+
+
+def test_unreadable_file_is_ignored(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{not json")
+    cache = MCPSchemaCache(str(path))
+    assert cache.get("crawl4ai", config_hash(SERVER)) is None
+    cache.put("crawl4ai", config_hash(SERVER), TOOLS)
+    assert MCPSchemaCache(str(path)).get("crawl4ai", config_hash(SERVER)) is not None
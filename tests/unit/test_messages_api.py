@@ -0,0 +1,84 @@
+"""
+Unit tests for the chat messages API cursors.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+SESSION_ID = "7d8e1a9c-2f4b-4c3d-9e5f-6a7b8c9d0e1f"
+
+
+@pytest.fixture
+def stored():
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [{
+        "message_id": str(uuid.UUID(int=i)), "session_id": SESSION_ID, "role": "user",
+        "content": f"message {i}", "agent_name": None, "user_id": None, "metadata": None,
+        "timestamp": (start + timedelta(seconds=i)).isoformat(),
+    } for i in range(1, 6)]
+
+
+@pytest.fixture
+def client(chat_db, stored, monkeypatch):
+    chat_operations = chat_db.load("radbot.web.db.chat_operations")
+    messages_api = chat_db.load("radbot.web.api.messages")
+
+    def get_messages_by_session_id(session_id, limit=200, offset=0, before=None, after=None, newest=False):
+        # Keyset semantics of the real query, over the stored list
+        key = lambda m: (m["timestamp"], m["message_id"])
+        rows = list(stored)
+        if before is not None:
+            rows = [m for m in rows if key(m) < chat_operations.decode_cursor(before)]
+        if after is not None:
+            rows = [m for m in rows if key(m) > chat_operations.decode_cursor(after)]
+        return rows[-limit:] if (newest or before is not None) else rows[:limit]
+
+    monkeypatch.setattr(chat_operations, "get_messages_by_session_id", get_messages_by_session_id)
+    monkeypatch.setattr(chat_operations, "get_session_message_count", lambda session_id: len(stored))
+
+    app = FastAPI()
+    messages_api.register_messages_router(app)
+    return TestClient(app)
+
+
+def _contents(page):
+    return [m["content"] for m in page["messages"]]
+
+
+def test_scrolling_back_from_the_newest_page(client):
+    page = client.get(f"/api/messages/{SESSION_ID}", params={"limit": 2, "newest": True}).json()
+    assert _contents(page) == ["message 4", "message 5"]
+    assert page["has_more"] and page["total_count"] == 5
+
+    page = client.get(f"/api/messages/{SESSION_ID}", params={"limit": 2, "before": page["prev_cursor"]}).json()
+    assert _contents(page) == ["message 2", "message 3"]
+    assert page["has_more"] and page["total_count"] is None
+
+    page = client.get(f"/api/messages/{SESSION_ID}", params={"limit": 2, "before": page["prev_cursor"]}).json()
+    assert _contents(page) == ["message 1"]
+    assert not page["has_more"]
+
+
+def test_catching_up_with_the_next_cursor(client):
+    page = client.get(f"/api/messages/{SESSION_ID}", params={"limit": 3}).json()
+    assert _contents(page) == ["message 1", "message 2", "message 3"]
+    assert page["has_more"]
+
+    page = client.get(f"/api/messages/{SESSION_ID}", params={"limit": 3, "after": page["next_cursor"]}).json()
+    assert _contents(page) == ["message 4", "message 5"]
+    assert not page["has_more"]
+
+    # Nothing new yet: the cursor is handed back unchanged
+    empty = client.get(f"/api/messages/{SESSION_ID}", params={"after": page["next_cursor"]}).json()
+    assert empty["messages"] == [] and empty["next_cursor"] == page["next_cursor"]
+
+
+def test_offset_cannot_be_combined_with_a_cursor(client):
+    response = client.get(f"/api/messages/{SESSION_ID}", params={"offset": 1, "before": "x"})
+    assert response.status_code == 400
@@ -0,0 +1,66 @@
+"""
+Unit tests for the event payload store.
+"""
+from unittest.mock import patch
+
+from radbot.web.api.event_wire import store_event_payload
+from radbot.web.api.payload_store import PayloadStore, parse_byte_range
+
+
+class TestPayloadStore:
+    def test_payloads_spill_to_disk_and_stay_readable(self, tmp_path):
+        store = PayloadStore(max_memory_bytes=10, max_disk_bytes=100, spill_dir=str(tmp_path))
+        store.put("s1", "e1", b"0123456789")
+        store.put("s1", "e2", b"abcdefghij")
+
+        # e1 was pushed out of memory to disk
+        assert len(list(tmp_path.iterdir())) == 1
+        assert store.read("s1", "e1") == b"0123456789"
+        assert store.read("s1", "e1", 2, 5) == b"234"
+        assert store.read("s1", "e2", 8) == b"ij"
+        assert store.get_info("s1", "e1") == (10, "application/json")
+
+    def test_disk_budget_drops_oldest(self, tmp_path):
+        store = PayloadStore(max_memory_bytes=0, max_disk_bytes=15, spill_dir=str(tmp_path))
+        store.put("s1", "e1", b"0123456789")
+        store.put("s1", "e2", b"abcdefghij")
+
+        assert store.read("s1", "e1") is None
+        assert store.read("s1", "e2") == b"abcdefghij"
+
+    def test_drop_session(self, tmp_path):
+        store = PayloadStore(max_memory_bytes=10, spill_dir=str(tmp_path))
+        store.put("s1", "e1", b"0123456789")
+        store.put("s1", "e2", b"abcdefghij")
+        store.put("s2", "e3", b"x")
+
+        store.drop_session("s1")
+        assert store.get_info("s1", "e1") is None
+        assert store.get_info("s1", "e2") is None
+        assert store.read("s2", "e3") == b"x"
+        assert list(tmp_path.iterdir()) == []
+
+
+def test_large_output_is_replaced_by_a_handle(tmp_path):
+    store = PayloadStore(spill_dir=str(tmp_path))
+    event = {"event_id": "e1", "type": "tool_call", "output": {"content": "x" * 1000}}
+    with patch("radbot.web.api.payload_store.get_payload_store", return_value=store):
+        store_event_payload("s1", event, inline_chars=100, preview_chars=20)
+        small = {"event_id": "e2", "type": "tool_call", "output": {"status": "ok"}}
+        store_event_payload("s1", small, inline_chars=100, preview_chars=20)
+
+    assert event["output"] == '{"content": "xxxxxxx...'
+    assert event["payload"]["url"] == "/api/events/s1/e1/payload"
+    assert store.read("s1", "e1").startswith(b'{"content": "xxx')
+    assert event["payload"]["size"] == len(store.read("s1", "e1"))
+    assert small == {"event_id": "e2", "type": "tool_call", "output": {"status": "ok"}}
+
+
+def testparse_byte_range():
+    assert parse_byte_range("bytes=0-99", 1000) == (0, 100)
+    assert parse_byte_range("bytes=900-", 1000) == (900, 1000)
+    assert parse_byte_range("bytes=-100", 1000) == (900, 1000)
+    assert parse_byte_range("bytes=500-5000", 1000) == (500, 1000)
+    assert parse_byte_range("bytes=1000-", 1000) is None
+    assert parse_byte_range("bytes=0-1,5-9", 1000) is None
+    assert parse_byte_range("items=0-1", 1000) is None
@@ -0,0 +1,196 @@
+"""
+Unit tests for the WebSocket reconnect replay buffers.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from radbot.web.api.session import dependencies, replay_buffer
+from radbot.web.api.session.replay_buffer import (
+    ReplayBuffer,
+    ReplayBufferRegistry,
+    database_history,
+    event_to_message,
+    parse_seq,
+)
+from radbot.web.api.session.session_manager import SessionManager
+from radbot.web.api.session.session_runner import SessionRunner
+
+
+def _event(event_id, author, text, invocation_id="inv-1", timestamp=1700000000.0):
+    content = SimpleNamespace(parts=[SimpleNamespace(text=text)])
+    return SimpleNamespace(id=event_id, author=author, content=content,
+                           invocation_id=invocation_id, timestamp=timestamp)
+
+
+def _message(i):
+    return {"id": f"m{i}", "role": "user", "content": f"message {i}", "timestamp": i, "agent": None}
+
+
+class TestParseSeq:
+    def test_non_negative_integers_are_accepted(self):
+        assert parse_seq(0) == 0
+        assert parse_seq(42) == 42
+        assert parse_seq("42") == 42
+
+    def test_anything_else_is_rejected(self):
+        for value in (None, -1, "-1", "4.2", 4.2, "abc", "", True, [1], {"seq": 1}, "٤٢"):
+            assert parse_seq(value) is None, value
+
+
+class TestReplayBuffer:
+    def test_resume_from_sequence_number(self):
+        buffer = ReplayBuffer()
+        for i in range(5):
+            buffer.append(_message(i))
+
+        assert [m["id"] for m in buffer.after_seq(3)] == ["m3", "m4"]
+        assert buffer.after_seq(5) == []
+        assert buffer.after_seq(6) is None
+
+    def test_resume_from_message_id(self):
+        buffer = ReplayBuffer()
+        for i in range(5):
+            buffer.append(_message(i))
+
+        assert [m["seq"] for m in buffer.after_id("m2")] == [4, 5]
+        assert buffer.after_id("unknown") is None
+
+    def test_evicted_cursor_cannot_resume(self):
+        buffer = ReplayBuffer(max_messages=3)
+        for i in range(10):
+            buffer.append(_message(i))
+
+        assert buffer.after_seq(2) is None
+        assert buffer.after_id("m0") is None
+        assert [m["seq"] for m in buffer.after_seq(7)] == [8, 9, 10]
+        assert [m["id"] for m in buffer.recent(2)] == ["m8", "m9"]
+
+    def test_scroll_back_pages(self):
+        buffer = ReplayBuffer(max_messages=10)
+        for i in range(15):
+            buffer.append(_message(i))
+
+        page = buffer.before_seq(12, limit=3)
+        assert [m["seq"] for m in page] == [9, 10, 11]
+        assert [m["seq"] for m in buffer.before_seq(page[0]["seq"], limit=3)] == [6, 7, 8]
+        # Pages stop at the oldest buffered message
+        assert [m["seq"] for m in buffer.before_seq(8, limit=5)] == [6, 7]
+        assert buffer.before_seq(6, limit=5) == []
+
+    def test_duplicate_ids_are_ignored(self):
+        buffer = ReplayBuffer()
+        buffer.append(_message(1))
+        assert buffer.append(_message(1)) is None
+        assert buffer.last_seq == 1
+
+
+class TestReplayBufferRegistry:
+    def test_live_turns_match_a_rebuild(self):
+        session_events = [
+            _event("e1", "user", "hello", invocation_id="inv-1"),
+            _event("e2", "beto", "hi there", invocation_id="inv-1"),
+        ]
+        registry = ReplayBufferRegistry()
+        buffer = registry.get_or_build("s1", lambda: session_events)
+        cursor = buffer.cursor()
+
+        turn = [_event("e4", "beto", "sure", invocation_id="inv-2")]
+        registry.append_turn("s1", "can you help?", turn)
+
+        missing = buffer.after_seq(cursor["seq"])
+        assert [m["content"] for m in missing] == ["can you help?", "sure"]
+
+        # A fresh rebuild of the same session produces the same IDs
+        rebuilt = ReplayBufferRegistry().get_or_build("s1", lambda: session_events + [
+            _event("e3", "user", "can you help?", invocation_id="inv-2"),
+        ] + turn)
+        assert [m["id"] for m in rebuilt.messages] == [m["id"] for m in buffer.messages]
+
+    def test_user_messages_are_keyed_by_client_id(self):
+        client_id = "0b5ba8a4-3c0e-4f4e-9a52-0dc1f1f0c6a1"
+        registry = ReplayBufferRegistry()
+        buffer = registry.get_or_build("s1", lambda: [])
+        registry.append_turn("s1", "hello", [_event("e1", "beto", "hi")], user_message_id=client_id)
+        registry.append_turn("s1", "more", [_event("e2", "beto", "sure", invocation_id="inv-2")],
+                             user_message_id="not-a-uuid")
+
+        assert [m["content"] for m in buffer.after_id(client_id)] == ["hi", "more", "sure"]
+        assert buffer.messages[2]["id"] == "inv-2-user"
+
+    def test_unbuilt_buffer_is_not_appended(self):
+        registry = ReplayBufferRegistry()
+        registry.append_turn("s1", "hello", [_event("e1", "beto", "hi")])
+        assert registry.get("s1") is None
+
+    def test_events_without_text_are_skipped(self):
+        event = SimpleNamespace(id="e1", author="beto", content=SimpleNamespace(parts=[]),
+                                invocation_id="inv-1", timestamp=1.0)
+        assert event_to_message(event) is None
+
+
+class TestReconnect:
+    def test_reconnect_resumes_from_the_cursor(self, monkeypatch):
+        registry = ReplayBufferRegistry()
+        monkeypatch.setattr(replay_buffer, "_registry", registry)
+        runtime = SimpleNamespace(persistent_sessions=False, session_service=MagicMock(),
+                                  artifact_service=None, runner=SimpleNamespace(app_name="beto"))
+        monkeypatch.setattr(dependencies, "SessionRunner",
+                            lambda user_id, session_id: SessionRunner(user_id, session_id, runtime))
+        session_manager = SessionManager(max_sessions=10, idle_timeout=3600)
+
+        async def connect():
+            return await dependencies.get_runner_for_connection("s1", session_manager)
+
+        runner = asyncio.run(connect())
+        buffer = registry.get_or_build("s1", lambda: [])
+        registry.append_turn("s1", "hello", [_event("e1", "beto", "hi")])
+        cursor = buffer.cursor()
+
+        # A turn finishes while the client is disconnected
+        registry.append_turn("s1", "still there?", [_event("e2", "beto", "yes", invocation_id="inv-2")])
+
+        assert asyncio.run(connect()) is runner
+        # Only the new session was reset
+        assert runtime.session_service.delete_session.call_count == 1
+
+        resumed = registry.get_or_build("s1", lambda: [])
+        assert resumed.epoch == cursor["epoch"]
+        assert [m["content"] for m in resumed.after_seq(cursor["seq"])] == ["still there?", "yes"]
+
+
+class TestDatabaseHistory:
+    def _rows(self, *seconds):
+        return [{
+            "message_id": f"00000000-0000-0000-0000-00000000000{s}", "role": "user", "content": f"message {s}",
+            "agent_name": None, "metadata": {"client_id": f"c{s}"} if s % 2 else None,
+            "timestamp": f"2026-01-01T00:00:0{s}+00:00",
+        } for s in seconds]
+
+    def test_paging_continues_before_the_oldest_buffered_message(self, chat_db, monkeypatch):
+        chat_operations = chat_db.load("radbot.web.db.chat_operations")
+        calls = []
+
+        def get_messages_by_session_id(session_id, limit=200, before=None, newest=False, **kwargs):
+            calls.append((limit, chat_operations.decode_cursor(before), newest))
+            return self._rows(2, 3, 4)
+
+        monkeypatch.setattr(chat_operations, "get_messages_by_session_id", get_messages_by_session_id)
+
+        # The oldest buffered message is at 00:00:05
+        messages, cursor = database_history("s1", 3, before_timestamp=1767225605000, known_ids=["c3"])
+
+        assert calls == [(3, ("2026-01-01T00:00:05+00:00", "00000000-0000-0000-0000-000000000000"), True)]
+        assert [(m["id"], m["content"]) for m in messages] == [
+            ("00000000-0000-0000-0000-000000000002", "message 2"),
+            ("00000000-0000-0000-0000-000000000004", "message 4"),
+        ]
+        assert messages[0]["timestamp"] == 1767225602000
+        # A full page: the next one continues before its oldest message
+        assert chat_operations.decode_cursor(cursor) == ("2026-01-01T00:00:02+00:00",
+                                                         "00000000-0000-0000-0000-000000000002")
+
+        calls.clear()
+        _, cursor = database_history("s1", 5, before=cursor)
+        assert calls[0][1] == ("2026-01-01T00:00:02+00:00", "00000000-0000-0000-0000-000000000002")
+        assert cursor is None
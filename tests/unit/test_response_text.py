@@ -0,0 +1,56 @@
+"""
+Unit tests for response text annotation.
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+
+from radbot.web.api.session import utils
+from radbot.web.api.session.utils import _process_response_text
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "json"])
+def json_backend(request):
+    if request.param and not utils.ORJSON_AVAILABLE:
+        pytest.skip("orjson is not installed")
+    with patch.object(utils, "ORJSON_AVAILABLE", request.param):
+        yield
+
+
+class TestProcessResponseText:
+    def test_json_code_blocks_are_formatted(self, json_backend):
+        text = 'Result:\n```json\n{"a": 1, "b": [1, 2]}\n```\nand\n```\n[true]\n```\ndone'
+        expected_block = json.dumps({"a": 1, "b": [1, 2]}, indent=2).replace('"', "&quot;")
+        result = _process_response_text(text)
+
+        assert result.startswith('Result:\n<pre data-content-type="json-formatted" class="content-json-formatted">')
+        assert expected_block in result
+        assert result.count("<pre") == 2
+        assert result.endswith("</pre>\ndone")
+
+    def test_non_json_blocks_are_left_alone(self, json_backend):
+        text = "```python\nprint({1: 2})\n```\n```json\n{invalid}\n```\n```unclosed {"
+        assert _process_response_text(text) == text
+
+    def test_special_response_is_kept_raw(self, json_backend):
+        payload = '{"call_search_agent_response": {"result": "<b>x</b>"}}'
+        result = _process_response_text(f"Found: {payload} (end)")
+
+        assert result.startswith('Found: <pre data-content-type="json-raw"')
+        assert "&lt;b&gt;x&lt;/b&gt;" in result
+        assert result.endswith("</pre> (end)")
+
+    def test_invalid_special_response_is_returned_unchanged(self, json_backend):
+        text = '{"function_call_response": {"broken": }'
+        assert _process_response_text(text) == text
+
+    def test_annotated_text_is_not_processed_twice(self, json_backend):
+        once = _process_response_text('```json\n{"a": 1}\n```')
+        assert _process_response_text(once) == once
+
+    def test_large_response_is_processed(self, json_backend):
+        block = '```json\n{"id": 1, "tags": ["a", "b"]}\n```\n'
+        text = ("Some prose.\n" + block) * 20000
+        result = _process_response_text(text)
+        assert result.count('data-content-type="json-formatted"') == 20000
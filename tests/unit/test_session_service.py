@@ -0,0 +1,86 @@
+"""
+Unit tests for the PostgreSQL-backed ADK session service.
+"""
+import pytest
+
+pytest.importorskip("google.adk.sessions")
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import Session
+
+
+@pytest.fixture
+def service(chat_db):
+    module = chat_db.load("radbot.web.db.session_service")
+    module.create_session_tables_if_not_exists = lambda: True
+    return module, module.PostgresSessionService()
+
+
+def _session(state=None, last_update_time=100.0):
+    return Session(id="s1", app_name="beto", user_id="u1", state=state or {},
+                   last_update_time=last_update_time)
+
+
+def _event(delta):
+    return Event(invocation_id="i1", author="beto", actions=EventActions(state_delta=delta))
+
+
+class TestAppendEvent:
+    def test_append_is_compare_and_swap_on_update_time(self, service, chat_db):
+        _, sessions = service
+        session = _session({"topic": "ferries"})
+        chat_db.rows.append((101.0,))
+
+        sessions.append_event(session, _event({"topic": "trains"}))
+
+        update_sql, update_params = chat_db.cur.executed[0]
+        assert update_sql.startswith("UPDATE radbot_chathistory.adk_sessions")
+        assert update_sql.endswith("AND update_time = %s RETURNING update_time;")
+        assert update_params[-1] == 100.0
+        assert not any("FOR UPDATE" in sql for sql in chat_db.cur.statements())
+        assert session.state == {"topic": "trains"}
+        assert session.last_update_time == 101.0
+        assert len(session.events) == 1
+
+    def test_conflicting_append_reloads_state_and_retries(self, service, chat_db):
+        _, sessions = service
+        session = _session({"topic": "ferries", "temp:draft": "x"})
+        chat_db.rows.extend([
+            None,  # another writer changed the row
+            ({"topic": "ferries", "city": "Oslo"}, {}, {"name": "Sam"}),
+            (105.0,),
+        ])
+
+        sessions.append_event(session, _event({"topic": "trains"}))
+
+        statements = chat_db.cur.statements()
+        assert "FOR UPDATE OF s" in statements[1]
+        assert statements[2].endswith("RETURNING update_time;")
+        assert "AND update_time = %s" not in statements[2]
+        assert session.state == {"topic": "trains", "city": "Oslo", "user:name": "Sam", "temp:draft": "x"}
+        assert session.last_update_time == 105.0
+        assert any(sql.startswith("INSERT INTO radbot_chathistory.adk_events") for sql in statements)
+
+    def test_append_to_deleted_session_raises(self, service, chat_db):
+        module, sessions = service
+        session = _session()
+        chat_db.rows.extend([None, None])
+
+        with pytest.raises(module.StaleSessionError):
+            sessions.append_event(session, _event({"topic": "trains"}))
+
+        assert not any("adk_events" in sql for sql in chat_db.cur.statements())
+        assert session.events == []
+
+
+class TestCreateSession:
+    def test_state_is_merged_into_an_existing_session(self, service, chat_db, monkeypatch):
+        _, sessions = service
+        monkeypatch.setattr(sessions, "get_session", lambda **kwargs: _session())
+
+        sessions.create_session(app_name="beto", user_id="u1", session_id="s1", state={"topic": "ferries"})
+        sessions.create_session(app_name="beto", user_id="u1", session_id="s1")
+
+        with_state, without_state = chat_db.cur.statements()
+        assert "DO UPDATE SET state = adk_sessions.state || EXCLUDED.state" in with_state
+        assert without_state.endswith("DO NOTHING;")
@@ -0,0 +1,151 @@
+"""
+Unit tests for streaming shell command execution.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from radbot.tools.shell.shell_session import ShellSessionManager
+from radbot.tools.shell.streaming import OutputBuffer, ShellExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = ShellExecutor(max_concurrent=1, max_output_bytes=1000)
+    yield executor
+    executor.close()
+
+
+@pytest.fixture
+def sessions(executor, tmp_path):
+    manager = ShellSessionManager(executor, cwd=str(tmp_path))
+    yield manager
+    manager.close_all()
+
+
+class TestOutputBuffer:
+    def test_keeps_head_and_tail(self):
+        buffer = OutputBuffer(max_bytes=10)
+        for chunk in (b"abc", b"defgh", b"ijklmnop", b"qr"):
+            buffer.append(chunk)
+
+        assert buffer.dropped == 8
+        assert buffer.text() == "abcde\n[... 8 bytes of output omitted ...]\nnopqr"
+
+    def test_short_output_is_kept_whole(self):
+        buffer = OutputBuffer(max_bytes=100)
+        buffer.append("héllo\n".encode("utf-8"))
+        assert buffer.dropped == 0
+        assert buffer.text() == "héllo\n"
+
+
+class TestShellExecutor:
+    def test_output_is_streamed_to_the_listener(self, executor):
+        events = []
+        result = executor.run("echo", ["hello"], session_id="s1", on_output=events.append)
+
+        assert result["stdout"] == "hello\n"
+        assert result["return_code"] == 0
+        assert result["error"] is None
+        assert {"stream": "stdout", "text": "hello\n"}.items() <= events[1].items()
+        assert events[-1]["state"] == "finished"
+        assert all(e["session_id"] == "s1" for e in events)
+
+    def test_strict_mode_checks_apply(self, executor):
+        result = executor.run("definitely_not_allowed_command")
+        assert result["return_code"] == -1
+        assert "not allowed" in result["error"]
+
+        result = executor.run("ls", ["a;b"])
+        assert "unsafe characters" in result["error"]
+
+    def test_cancel_waiting_command(self, executor):
+        started = threading.Event()
+        running = executor.submit("sleep", ["0.5"], strict_mode=False, on_output=lambda e: started.set())
+        started.wait(5)
+        waiting = executor.submit("echo", ["never"])
+
+        queued = [c for c in executor.list_commands() if c["state"] == "queued"]
+        assert len(queued) == 1
+        assert executor.cancel(queued[0]["command_id"])
+
+        assert "cancelled" in waiting.result(5)["error"]
+        assert running.result(5)["return_code"] == 0
+        assert executor.list_commands() == []
+
+    def test_commands_are_cancelled_only_by_their_session(self, executor):
+        started = threading.Event()
+        running = executor.submit("sleep", ["5"], strict_mode=False, session_id="s1",
+                                  on_output=lambda e: started.set())
+        started.wait(5)
+        (command,) = executor.list_commands("s1")
+
+        assert executor.list_commands("s2") == []
+        assert not executor.cancel(command["command_id"], "s2")
+        assert executor.cancel(command["command_id"], "s1")
+        assert "cancelled" in running.result(5)["error"]
+
+
+class TestShellSession:
+    def test_directory_and_environment_persist(self, executor, sessions, tmp_path):
+        (tmp_path / "sub").mkdir()
+        session = sessions.get("s1")
+
+        assert executor.run("cd", ["sub"], shell_session=session)["return_code"] == 0
+        assert executor.run("export", ["RADBOT_GREETING=hi there"], shell_session=session)["error"] is None
+        result = executor.run("pwd", shell_session=session)
+        assert result["stdout"] == f"{tmp_path / 'sub'}\n"
+        assert session.cwd == str(tmp_path / "sub")
+
+        result = executor.run("printenv", ["RADBOT_GREETING"], strict_mode=False, shell_session=session)
+        assert result["stdout"] == "hi there\n"
+
+    def test_arguments_are_not_expanded(self, executor, sessions):
+        session = sessions.get("s1")
+        assert "unsafe characters" in executor.run("echo", ["$(id)"], shell_session=session)["error"]
+
+        result = executor.run("echo", ["*", "~"], shell_session=session)
+        assert result["stdout"] == "* ~\n"
+
+    @pytest.mark.parametrize("arg", ["PATH=/tmp/evilbin", "LD_PRELOAD=/tmp/x.so", "GIT_SSH_COMMAND=ssh",
+                                     "PYTHONPATH=/tmp", "IFS=x", "https_proxy=http://proxy:3128",
+                                     "SSL_CERT_FILE=/tmp/ca.pem", "GZIP=-S.x", "LESSKEY=/tmp/k"])
+    def test_variables_outside_the_allow_list_are_rejected(self, executor, sessions, arg):
+        session = sessions.get("s1")
+        result = executor.run("export", [arg], strict_mode=False, shell_session=session)
+        assert "cannot be changed" in result["error"]
+
+        result = executor.run("unset", [arg.partition("=")[0]], shell_session=session)
+        assert "cannot be changed" in result["error"]
+
+    def test_allow_list_is_configurable(self, executor, tmp_path):
+        manager = ShellSessionManager(executor, cwd=str(tmp_path), env_allow=["PROJECT", "BUILD_*"])
+        try:
+            session = manager.get("s1")
+            for arg in ("PROJECT=radbot", "BUILD_MODE=fast", "RADBOT_X=1"):
+                assert executor.run("export", [arg], shell_session=session)["error"] is None
+            assert "cannot be changed" in executor.run("export", ["LANG=C"], shell_session=session)["error"]
+        finally:
+            manager.close_all()
+
+    def test_timeout_closes_the_session(self, executor, sessions, tmp_path):
+        session = sessions.get("s1")
+        executor.run("cd", ["/"], shell_session=session)
+
+        result = executor.run("sleep", ["5"], timeout=0.2, strict_mode=False, shell_session=session)
+        assert "timed out" in result["error"]
+        assert not session.alive
+
+        result = executor.run("pwd", shell_session=sessions.get("s1"))
+        assert result["stdout"] == f"{tmp_path}\n"
+
+
+class TestShellSessionTools:
+    def test_tools_need_a_chat_session(self):
+        shell_tool = pytest.importorskip("radbot.tools.shell.shell_tool")
+        run_tool, close_tool = shell_tool.get_shell_session_tools()
+
+        result = asyncio.run(run_tool.func("pwd", tool_context=None))
+        assert "only available within a chat session" in result["error"]
+        assert asyncio.run(close_tool.func(tool_context=None))["closed"] is False
@@ -0,0 +1,70 @@
+"""
+Unit tests for the lazy tool registry.
+"""
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from radbot.tools.registry import LazyTool, ToolSpec, create_lazy_tools, get_tool_load_status
+
+
+def test_tool_module_is_imported_on_first_use():
+    spec = ToolSpec("get_current_time", "radbot.tools.basic.basic_tools", "get_current_time", "basic")
+    tool = LazyTool(spec)
+    assert tool.name == "get_current_time"
+    assert not tool.loaded
+
+    assert tool._get_declaration().name == "get_current_time"
+    assert tool.loaded
+
+
+def test_missing_tool_family_is_reported_not_raised():
+    tools = create_lazy_tools([
+        ToolSpec("get_current_time", "radbot.tools.basic.basic_tools", "get_current_time", "basic"),
+        ToolSpec("missing", "radbot.tools.no_such_module", "missing", "test"),
+    ])
+    assert tools[1]._get_declaration() is None
+    result = asyncio.run(tools[1].run_async(args={}, tool_context=None))
+    assert result["status"] == "error"
+    assert get_tool_load_status(tools) == {"get_current_time": "pending", "missing": "unavailable"}
+
+
+def test_root_tools_import_no_tool_family():
+    code = (
+        "import sys; from radbot.tools.registry import create_lazy_tools; create_lazy_tools(); "
+        "print(','.join(m for m in sys.modules if m.startswith('radbot.tools.')))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    loaded = set(result.stdout.strip().split(","))
+    for family in ("homeassistant", "calendar", "todo", "web_search", "shell", "memory"):
+        assert f"radbot.tools.{family}" not in loaded
+
+
+# Import-time budget for radbot's own modules when building the root tools, in microseconds
+RADBOT_IMPORT_BUDGET_US = 500_000
+
+
+def test_root_tools_import_time_budget():
+    code = "from radbot.tools.registry import create_lazy_tools; create_lazy_tools()"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+    # Lines read "import time: <self us> | <cumulative us> | <indented module name>"
+    radbot_self_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[0].startswith("import time:") or "self" in parts[0]:
+            continue
+        module = parts[2].strip()
+        imported.add(module)
+        if module.split(".")[0] == "radbot":
+            radbot_self_us += int(parts[0].split(":")[1])
+
+    assert "radbot.tools.registry" in imported
+    assert not any(m.startswith(("radbot.tools.homeassistant", "radbot.tools.todo", "radbot.agent"))
+                   for m in imported)
+    assert radbot_self_us < RADBOT_IMPORT_BUDGET_US
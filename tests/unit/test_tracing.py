@@ -0,0 +1,73 @@
+"""
+Unit tests for the structured tracing layer.
+"""
+import json
+
+import pytest
+
+from radbot.utils.tracing import (
+    NOOP_SPAN,
+    InMemorySpanExporter,
+    JsonlFileSpanExporter,
+    Tracer,
+    create_tracer,
+)
+
+
+class TestTracer:
+    def test_disabled_tracer_returns_noop_span(self):
+        tracer = Tracer(enabled=False)
+        with tracer.start_span("turn") as span:
+            assert span is NOOP_SPAN
+            assert not span.is_recording()
+            with tracer.start_span("child") as child:
+                assert child is NOOP_SPAN
+        assert tracer.exporter.get_finished_spans() == []
+
+    def test_child_spans_share_the_trace(self):
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(enabled=True, exporter=exporter)
+        with tracer.start_span("turn", {"session.id": "s1"}) as turn:
+            child = tracer.start_span("tool_call", {"tool.calls": ["search"]})
+            child.end()
+
+        spans = {s["name"]: s for s in exporter.get_finished_spans()}
+        assert spans["tool_call"]["trace_id"] == spans["turn"]["trace_id"]
+        assert spans["tool_call"]["parent_id"] == turn.span_id
+        assert spans["turn"]["parent_id"] is None
+        assert spans["turn"]["status"] == "ok"
+        assert spans["turn"]["attributes"]["session.id"] == "s1"
+
+    def test_unsampled_trace_records_nothing(self):
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(enabled=True, sample_rate=0.0, exporter=exporter)
+        with tracer.start_span("turn") as turn:
+            assert not turn.is_recording()
+            child = tracer.start_span("model_call")
+            assert not child.is_recording()
+            child.end()
+        assert exporter.get_finished_spans() == []
+
+    def test_exception_marks_span_as_error(self):
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(enabled=True, exporter=exporter)
+        with pytest.raises(RuntimeError):
+            with tracer.start_span("turn"):
+                raise RuntimeError("boom")
+        (span,) = exporter.get_finished_spans()
+        assert span["status"] == "error"
+        assert "boom" in span["status_description"]
+
+    def test_file_exporter_writes_jsonl(self, tmp_path):
+        path = tmp_path / "traces" / "spans.jsonl"
+        tracer = Tracer(enabled=True, exporter=JsonlFileSpanExporter(str(path)))
+        with tracer.start_span("turn"):
+            pass
+        lines = path.read_text().splitlines()
+        assert json.loads(lines[0])["name"] == "turn"
+
+    def test_create_tracer_from_config(self):
+        assert not create_tracer({}).enabled
+        tracer = create_tracer({"enabled": True, "sample_rate": 0.25, "max_spans": 10})
+        assert tracer.enabled
+        assert tracer.sample_rate == 0.25
@@ -0,0 +1,142 @@
+"""
+Unit tests for the chat message write-behind queue.
+"""
+import pytest
+
+from radbot.web.db.write_behind import WriteBehindQueue
+
+SESSION_ID = "7d8e1a9c-2f4b-4c3d-9e5f-6a7b8c9d0e1f"
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.rows = {}
+        self.fail = False
+
+    def write(self, session_id, messages):
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        if any(m["content"] == "poison" for m in messages):
+            raise ValueError("constraint violation")
+        for message in messages:
+            self.rows.setdefault(message["message_id"], message)
+
+
+def _message(content, role="user"):
+    return {"role": role, "content": content}
+
+
+@pytest.fixture
+def db():
+    return FakeDatabase()
+
+
+class TestWriteBehindQueue:
+    def test_queued_messages_are_readable_before_flush(self, db, tmp_path):
+        queue = WriteBehindQueue(db.write, flush_interval=60, spill_file=str(tmp_path / "spill.jsonl"))
+        ids = queue.enqueue(SESSION_ID, [_message("hello"), _message("hi", role="assistant")])
+
+        pending = queue.pending_messages(SESSION_ID)
+        assert [m["message_id"] for m in pending] == ids
+        assert pending[0]["timestamp"] < pending[1]["timestamp"]
+        assert db.rows == {}
+
+        assert queue.flush_all()
+        assert set(db.rows) == set(ids)
+        assert queue.pending_messages(SESSION_ID) == []
+        with open(queue.spill_file) as f:
+            assert f.read() == ""
+
+    def test_failed_flush_keeps_messages(self, db, tmp_path):
+        queue = WriteBehindQueue(db.write, flush_interval=60, spill_file=str(tmp_path / "spill.jsonl"))
+        queue.enqueue(SESSION_ID, [_message("hello")])
+
+        db.fail = True
+        assert not queue.flush()
+        assert queue.pending_count() == 1
+        assert queue.stats["flush_failures"] == 1
+
+        db.fail = False
+        assert queue.flush()
+        assert queue.pending_count() == 0
+
+    def test_spill_file_is_replayed_after_a_crash(self, db, tmp_path):
+        spill_file = tmp_path / "spill.jsonl"
+        crashed = WriteBehindQueue(db.write, flush_interval=60, spill_file=str(spill_file))
+        ids = crashed.enqueue(SESSION_ID, [_message("one"), _message("two")])
+        # Simulate a torn write at the moment of the crash
+        with open(crashed.spill_file, "a") as f:
+            f.write('{"message_id": "trunc')
+
+        # A crash releases the journal lock
+        crashed._journal_lock.close()
+
+        restarted = WriteBehindQueue(db.write, flush_interval=60, spill_file=str(spill_file))
+        assert [m["message_id"] for m in restarted.pending_messages(SESSION_ID)] == ids
+        restarted.close()
+        assert set(db.rows) == set(ids)
+
+        # New messages still sort after the replayed ones
+        restarted.enqueue(SESSION_ID, [_message("three")])
+        assert restarted.pending_messages(SESSION_ID)[0]["timestamp"] > db.rows[ids[-1]]["timestamp"]
+
+    def test_full_queue_writes_synchronously(self, db):
+        queue = WriteBehindQueue(db.write, max_pending=2, flush_interval=60, spill_file=None)
+        queue.enqueue(SESSION_ID, [_message("one"), _message("two")])
+        ids = queue.enqueue(SESSION_ID, [_message("three")])
+
+        assert list(db.rows) == ids
+        assert queue.pending_count() == 2
+        assert queue.stats["written_through"] == 1
+
+    def test_poison_message_is_dead_lettered(self, db, tmp_path):
+        spill_file = tmp_path / "spill.jsonl"
+        queue = WriteBehindQueue(db.write, flush_interval=60, max_attempts=2, spill_file=str(spill_file))
+        good, poison = queue.enqueue(SESSION_ID, [_message("good"), _message("poison")])
+
+        assert not queue.flush()
+        assert queue.pending_count() == 2
+        assert not queue.flush()
+
+        # The good message got through on its own, the poison one is set aside
+        assert list(db.rows) == [good]
+        assert queue.pending_count() == 0
+        assert queue.stats["dead_lettered"] == 1
+        assert poison in (tmp_path / "spill.jsonl.dead").read_text()
+        assert queue.flush()
+
+    def test_database_outage_does_not_dead_letter(self, db, tmp_path):
+        queue = WriteBehindQueue(db.write, flush_interval=60, max_attempts=2,
+                                 spill_file=str(tmp_path / "spill.jsonl"))
+        ids = queue.enqueue(SESSION_ID, [_message("one"), _message("two")])
+
+        db.fail = True
+        for _ in range(5):
+            assert not queue.flush()
+        assert queue.pending_count() == 2
+        assert queue.stats["dead_lettered"] == 0
+        assert not (tmp_path / "spill.jsonl.dead").exists()
+
+        db.fail = False
+        assert queue.flush()
+        assert set(db.rows) == set(ids)
+
+    def test_each_process_has_its_own_journal(self, db, tmp_path):
+        spill_file = str(tmp_path / "spill.jsonl")
+        first = WriteBehindQueue(db.write, flush_interval=60, spill_file=spill_file)
+        ids = first.enqueue(SESSION_ID, [_message("one")])
+
+        # A live worker's journal is left alone
+        second = WriteBehindQueue(db.write, flush_interval=60, spill_file=spill_file)
+        assert second.spill_file != first.spill_file
+        assert second.pending_count() == 0
+
+        # Once its process is gone, the next worker takes it over
+        first._journal_lock.close()
+        third = WriteBehindQueue(db.write, flush_interval=60, spill_file=spill_file)
+        assert [m["message_id"] for m in third.pending_messages(SESSION_ID)] == ids
+        assert not (tmp_path / "spill.jsonl").exists()
+        third.close()
+        second.close()
+        assert list(db.rows) == ids
+        assert sorted(p.name for p in tmp_path.iterdir()) == []
@@ -70,18 +70,11 @@ def create_minimal_axel_toolset() -> List[Any]:
     
     # Add the shell command execution tool
     try:
-        # Try the normal import first
-        from radbot.tools.shell.shell_tool import execute_shell_command
+        from radbot.tools.shell.shell_command import execute_shell_command
         toolset.append(execute_shell_command)
         logger.info("Added execute_shell_command to minimal Axel toolset")
     except ImportError:
-        # If that fails, try the old path
-        try:
-            from radbot.tools.shell.shell_command import execute_shell_command
-            toolset.append(execute_shell_command)
-            logger.info("Added execute_shell_command to minimal Axel toolset (legacy path)")
-        except ImportError:
-            logger.warning("Could not import execute_shell_command from any known path")
+        logger.warning("Could not import execute_shell_command")
     
     # Add filesystem tools
     try:
@@ -28,7 +28,7 @@ def create_minimal_axel_toolset() -> List[Any]:
     
     # Try to add shell command execution
     try:
-        from radbot.tools.shell.shell_tool import execute_shell_command
+        from radbot.tools.shell.shell_command import execute_shell_command
         toolset.append(execute_shell_command)
         logger.info("Added execute_shell_command to minimal Axel toolset")
     except Exception as e:
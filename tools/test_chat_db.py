@@ -19,17 +19,17 @@ sys.path.insert(0, '..')
 try:
     # Import database modules
     from radbot.web.db import chat_operations
-    from radbot.web.db.connection import initialize_connection_pool, CHAT_SCHEMA
+    from radbot.web.db.connection import chat_pool, CHAT_SCHEMA
 
     def test_db_connection():
         """Test database connection."""
         logger.info("Testing database connection...")
-        result = initialize_connection_pool()
-        if result:
-            logger.info("✅ Database connection successful")
+        health = chat_pool.health_check()
+        if health["healthy"]:
+            logger.info(f"✅ Database connection successful ({health['latency_ms']} ms)")
         else:
-            logger.error("❌ Database connection failed")
-        return result
+            logger.error(f"❌ Database connection failed: {health.get('error')}")
+        return health["healthy"]
 
     def test_schema_creation():
         """Test schema creation."""
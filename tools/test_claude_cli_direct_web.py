@@ -78,7 +78,7 @@ def test_direct_command():
 def test_command_through_shell_tool():
     """Test command execution through the shell tool with direct Claude CLI."""
     try:
-        from radbot.tools.shell.shell_tool import execute_shell_command
+        from radbot.tools.shell.shell_command import execute_shell_command
         
         # Execute a simple command through the shell tool
         result = execute_shell_command("echo 'Shell tool command test'")